@@ -1,48 +1,198 @@
+"""
+Account Ledger Module
+
+Balance and equity live in memory; persistence is off the hot path:
+
+1. Every booked change (closed-trade PnL, reset) is appended to a JSONL
+   journal (balance.ledger.jsonl next to the snapshot) with a sequence
+   number, the amount and the resulting balance/equity, for audit and
+   replay.
+2. The balance.json snapshot is written by a background thread, via a temp
+   file and os.replace. Bursts of changes coalesce into one write.
+3. On start the snapshot is loaded and any newer journal entries are
+   replayed, so a snapshot that lagged behind a crash is caught up.
+4. get_snapshot() reads memory only, under the ledger lock (consistent
+   balance/equity pair); positions and PnL come from the risk engine.
+   Broker balance refreshes (sync_balance) are applied in memory only.
+
+The default file is anchored at the project root, not the CWD, and
+get_account() returns the process-wide instance.
+"""
+
 import json
+import logging
 import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("ForexPlatform")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BALANCE_FILE = os.path.join(PROJECT_ROOT, "balance.json")
+
+
+def journal_path(storage_file: str) -> str:
+    base, _ = os.path.splitext(storage_file)
+    return f"{base}.ledger.jsonl"
+
 
 class AccountManager:
-    def __init__(self, initial_balance=10000.0, storage_file="balance.json"):
-        self.storage_file = storage_file
+    def __init__(self, initial_balance=10000.0, storage_file=DEFAULT_BALANCE_FILE, risk_engine=None,
+                 fsync: bool = False):
+        self.storage_file = os.path.abspath(storage_file)
+        self.journal_file = journal_path(self.storage_file)
+        self.fsync = fsync
+        # Optional PortfolioRiskEngine: supplies open positions, daily PnL and VaR
+        self.risk_engine = risk_engine
         self.balance = initial_balance
         self.equity = initial_balance
-        # In a real app, we'd load existing balance. 
-        # For this session, we might want to reset or load. 
-        # Let's verify file existence.
+        self.seq = 0
+        self._lock = threading.RLock()
+        self._dirty = threading.Event()
+        self._saved_seq = 0
+        self._writer: Optional[threading.Thread] = None
         self._load()
 
     def _load(self):
+        """Snapshot, then replay journal entries the snapshot does not cover yet."""
         if os.path.exists(self.storage_file):
             try:
                 with open(self.storage_file, 'r') as f:
                     data = json.load(f)
-                    self.balance = data.get('balance', self.balance)
-                    self.equity = data.get('equity', self.equity)
-            except:
-                pass
+                self.balance = data.get('balance', self.balance)
+                self.equity = data.get('equity', self.equity)
+                self.seq = self._saved_seq = data.get('seq', 0)
+            except (OSError, ValueError) as e:
+                logger.error(f"AccountManager: snapshot {self.storage_file} unreadable ({e}), replaying journal")
+        if not os.path.exists(self.journal_file):
+            return
+        replayed = 0
+        with open(self.journal_file, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning("AccountManager: skipped a torn journal line")
+                    continue
+                if entry["seq"] > self.seq:
+                    self.balance, self.equity, self.seq = entry["balance"], entry["equity"], entry["seq"]
+                    replayed += 1
+        if replayed:
+            logger.info(f"AccountManager: replayed {replayed} journal entr{'y' if replayed == 1 else 'ies'}")
+            self._dirty.set()
+            self._ensure_writer()
 
-    def _save(self):
+    def _record(self, kind: str, amount: float, balance: float, equity: float) -> None:
+        """Applies a change and journals it (caller holds the lock)."""
+        self.balance, self.equity = balance, equity
+        self.seq += 1
+        entry = {"seq": self.seq, "ts": time.time(), "type": kind, "amount": amount,
+                 "balance": balance, "equity": equity}
         try:
-            with open(self.storage_file, 'w') as f:
-                json.dump({"balance": self.balance, "equity": self.equity}, f)
-        except Exception:
-            pass
+            os.makedirs(os.path.dirname(self.journal_file), exist_ok=True)
+            with open(self.journal_file, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+        except OSError as e:
+            logger.error(f"AccountManager: journal write failed: {e}")
+        self._dirty.set()
+        self._ensure_writer()
+
+    def _ensure_writer(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._run, name="account-snapshot-writer", daemon=True)
+            self._writer.start()
+
+    def _run(self) -> None:
+        while True:
+            self._dirty.wait()
+            self._dirty.clear()
+            self._save()
+
+    def _save(self) -> bool:
+        """Writes the current snapshot atomically; False on failure (retried on the next change)."""
+        with self._lock:
+            data = {"balance": self.balance, "equity": self.equity, "seq": self.seq}
+        if data["seq"] == self._saved_seq:
+            return True
+        directory = os.path.dirname(self.storage_file)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".balance-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                    if self.fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.replace(tmp, self.storage_file)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+        except OSError as e:
+            logger.error(f"AccountManager: snapshot write failed: {e}")
+            return False
+        self._saved_seq = data["seq"]
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until the snapshot covers every journaled change; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._saved_seq != self.seq:
+            if time.monotonic() >= deadline:
+                return False
+            if self._writer is None or not self._writer.is_alive():
+                return self._save()
+            time.sleep(0.005)
+        return True
 
     def update_balance(self, profit_loss):
         """Updates balance after a closed trade."""
-        self.balance += profit_loss
-        self.equity = self.balance # For MVP, assuming flattened usage
-        self._save()
-
-    def get_snapshot(self):
-        return {
-            "balance": self.balance,
-            "equity": self.equity,
-            "open_positions": [], 
-            "daily_loss": 0.0 
+        with self._lock:
+            balance = self.balance + profit_loss
+            self._record("pnl", profit_loss, balance, balance)  # For MVP, assuming flattened usage
+
+    def sync_balance(self, balance: float, equity: float) -> None:
+        """Broker-reported balance/equity: memory only, the broker stays the source of truth."""
+        with self._lock:
+            self.balance, self.equity = balance, equity
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            balance, equity = self.balance, self.equity
+        snapshot = {
+            "balance": balance,
+            "equity": equity,
+            "open_positions": [],
+            "daily_loss": 0.0
         }
+        if self.risk_engine is not None:
+            # Balance/equity stay broker-reported; positions and PnL come from the engine
+            live = self.risk_engine.snapshot(balance)
+            for key in ("open_positions", "daily_loss", "daily_loss_current", "daily_trades_count",
+                        "unrealized_pnl", "daily_pnl", "gross_lots", "var"):
+                snapshot[key] = live[key]
+        return snapshot
 
     def reset(self, amount=10000.0):
-        self.balance = amount
-        self.equity = amount
-        self._save()
+        with self._lock:
+            self._record("reset", amount - self.balance, amount, amount)
+
+
+_account: Optional[AccountManager] = None
+_account_lock = threading.Lock()
+
+
+def get_account() -> AccountManager:
+    """Process-wide account ledger on DEFAULT_BALANCE_FILE, backed by the shared PortfolioRiskEngine."""
+    global _account
+    with _account_lock:
+        if _account is None:
+            from execution.portfolio_risk import portfolio
+            _account = AccountManager(risk_engine=portfolio)
+    return _account
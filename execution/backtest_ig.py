@@ -14,6 +14,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from execution.brokers.ig_broker import IGBroker
 from execution.backtest_run import run_single_backtest  # Reuse logic
 from execution.generate_signals import SignalGenerator
+from execution.results_store import ResultsStore
 
 def fetch_ig_history(symbol="USDJPY", limit=6000):
     print(f"--- Fetching {limit} candles (1H) for {symbol} from IG ---")
@@ -71,7 +72,12 @@ def fetch_ig_history(symbol="USDJPY", limit=6000):
         print(f"Error fetching IG history: {e}")
         return pd.DataFrame()
 
-def run_ig_tournament():
+def run_ig_tournament(store=None):
+    """
+    Compounding backtest of the champion configs on IG history. Every config
+    is written to the results store (default: execution/data/results).
+    """
+    store = store or ResultsStore()
     print("--- Starting Backtest with IG Broker Data ---")
     
     champions = [
@@ -106,17 +112,19 @@ def run_ig_tournament():
         # Simulate Compounding
         current_balance = start_bal
         wins, losses = 0, 0
+        trade_rows = []
+        equity_rows = []
         
         for sig in signals:
             # Risk 2%
             risk_amt = current_balance * 0.02
-            entry = sig['entry_price']
-            sl = sig['stop_loss']
-            tp = sig['take_profit']
-            direction = sig['direction']
+            entry = sig.entry_price
+            sl = sig.stop_loss
+            tp = sig.take_profit
+            direction = sig.direction
             
             # Outcome
-            timestamp = sig['timestamp']
+            timestamp = sig.timestamp
             # Find index
             try:
                 idx = df_prices[df_prices['timestamp'] == timestamp].index[0]
@@ -141,12 +149,27 @@ def run_ig_tournament():
             
             if outcome:
                 current_balance += pnl_usd
+                exit_time = row['timestamp']  # Bar that hit SL/TP
+                trade_rows.append({
+                    "entry_time": timestamp, "exit_time": exit_time, "direction": direction,
+                    "entry_price": entry, "exit_price": sl if outcome == "LOSS" else tp,
+                    "pnl": pnl_usd, "r_multiple": pnl_usd / risk_amt, "outcome": outcome,
+                })
+                equity_rows.append({"timestamp": exit_time, "equity": current_balance})
                 if outcome == "WIN": wins += 1
                 else: losses += 1
         
         total = wins + losses
         wr = (wins/total*100) if total else 0
         growth = ((current_balance - start_bal) / start_bal) * 100
+
+        store.write_run(
+            strategy="baseline_sma_cross", symbol=symbol, timeframe="H1",
+            params={k: v for k, v in cfg.items() if k not in ['name', 'symbol']},
+            stats={"return_pct": growth, "win_rate_pct": wr, "n_trades": total,
+                   "equity_final": current_balance, "name": cfg["name"], "source": "ig"},
+            trades=pd.DataFrame(trade_rows), equity=pd.DataFrame(equity_rows),
+        )
         
         results.append({
             "Strategy": cfg['name'],
@@ -0,0 +1,278 @@
+"""
+Portfolio Backtest Module
+
+Runs all symbols on one merged timeline (k-way merge of the per-symbol bar
+streams) with a shared account: one equity, one margin pool and portfolio
+level RiskManager checks (daily loss, trades per day, max open lots).
+
+Usage:
+    python execution/backtest_portfolio.py
+"""
+
+import heapq
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add execution path to find modules
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from execution.config import config
+from execution.generate_signals import SignalGenerator
+from execution.risk import LOT_SIZE, MIN_LOT_SIZE, _calculate_sl_pips, _get_pip_value, get_point_size
+from execution.risk_limits import RiskConfig, RiskManager
+
+logger = logging.getLogger("ForexPlatform")
+
+DEFAULT_LEVERAGE = 30.0  # Retail leverage for FX majors
+
+
+class _SilentNotifier:
+    """Swallows risk alerts so a backtest never posts to Discord."""
+
+    def send_risk_alert(self, alert_type: str, details: Dict) -> None:
+        pass
+
+
+@dataclass
+class PortfolioResult:
+    """Outcome of a portfolio backtest."""
+    start_balance: float
+    end_balance: float
+    max_drawdown_pct: float
+    trades: List[Dict] = field(default_factory=list)
+    rejections: Dict[str, int] = field(default_factory=dict)
+    equity_curve: Optional[pd.DataFrame] = None
+
+    @property
+    def growth_pct(self) -> float:
+        return (self.end_balance - self.start_balance) / self.start_balance * 100.0
+
+    def per_symbol(self) -> pd.DataFrame:
+        """Trades, win rate and USD PnL per symbol."""
+        if not self.trades:
+            return pd.DataFrame(columns=["Symbol", "Trades", "Win Rate %", "PnL $"])
+        df = pd.DataFrame(self.trades)
+        grouped = df.groupby("symbol")
+        return pd.DataFrame({
+            "Trades": grouped.size(),
+            "Win Rate %": (grouped["outcome"].apply(lambda s: (s == "WIN").mean() * 100.0)).round(1),
+            "PnL $": grouped["pnl_usd"].sum().round(2),
+        }).rename_axis("Symbol").reset_index()
+
+
+def _bar_stream(sym_idx: int, timestamps: np.ndarray) -> Iterator[Tuple[np.datetime64, int, int]]:
+    """Yields (timestamp, symbol index, row) for one symbol in time order."""
+    for row, ts in enumerate(timestamps):
+        yield ts, sym_idx, row
+
+
+def _margin_required(symbol: str, lots: float, price: float, leverage: float) -> float:
+    """USD margin for a position (USD-base pairs are already quoted per USD)."""
+    notional = lots * LOT_SIZE
+    if not symbol.startswith("USD"):
+        notional *= price
+    return notional / leverage
+
+
+def _pnl_usd(symbol: str, direction: str, lots: float, entry: float, exit_price: float) -> float:
+    move = (exit_price - entry) if direction == "LONG" else (entry - exit_price)
+    return move / get_point_size(symbol) * _get_pip_value(symbol, exit_price) * lots
+
+
+def run_portfolio_backtest(data: Dict[str, pd.DataFrame],
+                           strategy_configs: Dict[str, Dict],
+                           risk_config: Optional[RiskConfig] = None,
+                           start_balance: float = 10000.0,
+                           leverage: float = DEFAULT_LEVERAGE) -> PortfolioResult:
+    """
+    Backtests several symbols against one shared account.
+
+    data: {symbol: candles with timestamp/open/high/low/close}
+    strategy_configs: {symbol: baseline_sma_cross params}
+    Only one position per symbol is held; signals on a symbol with an open
+    position are ignored. SL is checked before TP on ambiguous bars.
+    """
+    risk_config = risk_config or config.RISK_CONFIG
+    risk_manager = RiskManager(risk_config, notifier=_SilentNotifier())
+
+    symbols = [s for s in strategy_configs if s in data and not data[s].empty]
+    arrays = {}
+    signals = {}
+    for sym in symbols:
+        df = data[sym].reset_index(drop=True)
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        params = {k: v for k, v in strategy_configs[sym].items() if k not in ["name", "symbol"]}
+        generated = SignalGenerator("baseline_sma_cross", params).generate_frame(df)
+        signals[sym] = {pd.Timestamp(sig.timestamp): sig for sig in generated}
+        arrays[sym] = {
+            "timestamp": df["timestamp"].to_numpy(),
+            "high": df["high"].to_numpy(dtype=float),
+            "low": df["low"].to_numpy(dtype=float),
+            "close": df["close"].to_numpy(dtype=float),
+        }
+
+    balance = start_balance
+    unrealized: Dict[str, float] = {}
+    positions: Dict[str, Dict] = {}
+    used_margin = 0.0
+    open_lots = 0.0
+
+    current_day = None
+    daily_pnl = 0.0
+    daily_trades = 0
+
+    peak = start_balance
+    max_dd = 0.0
+    trades: List[Dict] = []
+    rejections: Dict[str, int] = {}
+    curve_ts, curve_eq = [], []
+
+    streams = [_bar_stream(i, arrays[sym]["timestamp"]) for i, sym in enumerate(symbols)]
+    for ts, sym_idx, row in heapq.merge(*streams):
+        sym = symbols[sym_idx]
+        bars = arrays[sym]
+        high, low, close = bars["high"][row], bars["low"][row], bars["close"][row]
+
+        day = pd.Timestamp(ts).date()
+        if day != current_day:
+            current_day, daily_pnl, daily_trades = day, 0.0, 0
+
+        # 1. Manage open position on this symbol
+        pos = positions.get(sym)
+        if pos is not None:
+            exit_price, outcome = None, None
+            if pos["direction"] == "LONG":
+                if low <= pos["sl"]:
+                    exit_price, outcome = pos["sl"], "LOSS"
+                elif high >= pos["tp"]:
+                    exit_price, outcome = pos["tp"], "WIN"
+            else:
+                if high >= pos["sl"]:
+                    exit_price, outcome = pos["sl"], "LOSS"
+                elif low <= pos["tp"]:
+                    exit_price, outcome = pos["tp"], "WIN"
+
+            if outcome:
+                pnl = _pnl_usd(sym, pos["direction"], pos["size"], pos["entry"], exit_price)
+                balance += pnl
+                daily_pnl += pnl
+                used_margin -= pos["margin"]
+                open_lots -= pos["size"]
+                unrealized.pop(sym, None)
+                del positions[sym]
+                trades.append({
+                    "symbol": sym, "direction": pos["direction"], "entry_time": pos["entry_time"],
+                    "exit_time": pd.Timestamp(ts), "size": pos["size"], "outcome": outcome,
+                    "pnl_usd": pnl, "r_multiple": pnl / pos["risk_amount"] if pos["risk_amount"] else 0.0,
+                })
+            else:
+                unrealized[sym] = _pnl_usd(sym, pos["direction"], pos["size"], pos["entry"], close)
+
+        equity = balance + sum(unrealized.values())
+
+        # 2. New entry (signals fire on bar close)
+        sig = signals[sym].get(pd.Timestamp(ts))
+        if sig is not None and sym not in positions:
+            snapshot = {
+                "equity": equity,
+                "daily_loss_current": max(0.0, -daily_pnl),
+                "daily_trades_count": daily_trades,
+                "open_positions": [{"size": open_lots}],
+            }
+            reason = None
+            limit_check = risk_manager.check_daily_limits(snapshot)
+            if not limit_check["allowed"]:
+                reason = limit_check["reason"].split(":")[0]
+            else:
+                risk_amount = equity * risk_config.risk_per_trade_pct / 100.0
+                sl_pips, pip_error = _calculate_sl_pips(sig.entry_price, sig.stop_loss, sym)
+                size = round(risk_amount / (sl_pips * _get_pip_value(sym, sig.entry_price)), 2) if not pip_error else 0.0
+                margin = _margin_required(sym, size, sig.entry_price, leverage)
+
+                if size < MIN_LOT_SIZE:
+                    reason = "SIZE_BELOW_MIN"
+                elif not risk_manager.check_exposure_limits(snapshot, size)["allowed"]:
+                    reason = "MAX_EXPOSURE_LIMIT"
+                elif used_margin + margin > equity:
+                    reason = "INSUFFICIENT_MARGIN"
+                else:
+                    positions[sym] = {
+                        "direction": sig.direction, "entry": sig.entry_price, "sl": sig.stop_loss,
+                        "tp": sig.take_profit, "size": size, "margin": margin,
+                        "risk_amount": risk_amount, "entry_time": pd.Timestamp(ts),
+                    }
+                    used_margin += margin
+                    open_lots += size
+                    daily_trades += 1
+
+            if reason:
+                rejections[reason] = rejections.get(reason, 0) + 1
+
+        # 3. Drawdown on the combined equity curve
+        if equity > peak:
+            peak = equity
+        elif peak > 0:
+            max_dd = max(max_dd, (peak - equity) / peak * 100.0)
+        curve_ts.append(ts)
+        curve_eq.append(equity)
+
+    equity_curve = pd.DataFrame({"timestamp": curve_ts, "equity": curve_eq})
+    return PortfolioResult(
+        start_balance=start_balance,
+        end_balance=balance,
+        max_drawdown_pct=max_dd,
+        trades=trades,
+        rejections=rejections,
+        equity_curve=equity_curve,
+    )
+
+
+def run_portfolio_tournament(store=None):
+    from execution.backtest_run import fetch_deep_history
+    from execution.results_store import ResultsStore
+
+    store = store or ResultsStore()
+
+    print("--- Starting Portfolio Backtest (H1 / shared account) ---")
+    params = {k: v for k, v in config.STRATEGY_PARAMS.items()}
+    data = {}
+    for sym in config.BROKER_ALLOWLIST:
+        df = fetch_deep_history(sym)
+        if df.empty:
+            print(f"  Warning: No data for {sym}")
+            continue
+        data[sym] = df
+        print(f"  Loaded {len(df)} candles for {sym}")
+
+    result = run_portfolio_backtest(data, {sym: params for sym in data})
+    if result.trades:
+        trades = pd.DataFrame(result.trades).rename(columns={"pnl_usd": "pnl"})
+        store.write_run(
+            strategy="baseline_sma_cross_portfolio", symbol="+".join(sorted(data)), timeframe="H1", params=params,
+            stats={"return_pct": result.growth_pct, "max_drawdown_pct": result.max_drawdown_pct,
+                   "n_trades": len(result.trades), "total_r": trades["r_multiple"].sum(),
+                   "equity_final": result.end_balance, "rejections": result.rejections},
+            trades=trades, equity=result.equity_curve,
+        )
+
+    print("\n" + "=" * 60)
+    print(result.per_symbol().to_string(index=False))
+    print("-" * 60)
+    print(f"End Balance: ${result.end_balance:.2f} ({result.growth_pct:+.1f}%)")
+    print(f"Max Drawdown (combined): {result.max_drawdown_pct:.2f}%")
+    if result.rejections:
+        print(f"Rejected entries: {result.rejections}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    run_portfolio_tournament()
@@ -13,15 +13,22 @@ if project_root not in sys.path:
 
 from execution.market_data import fetch_prices, normalize
 from execution.generate_signals import SignalGenerator
+from execution.intrabar import TP_FIRST, resolver_for
+from execution.monte_carlo import run_monte_carlo
+from execution.results_store import ResultsStore
+from execution.config import config
 
-def run_single_backtest(df, strategy_config):
+def run_single_backtest(df, strategy_config, intrabar=None):
     """
     Runs backtest for a single config on provided dataframe.
+
+    intrabar: optional IntrabarResolver. Bars touching both SL and TP are then
+    resolved on M1 data instead of being scored as a loss.
     """
     # Filter out non-param keys
     clean_config = {k: v for k, v in strategy_config.items() if k not in ['name', 'symbol']}
     engine = SignalGenerator("baseline_sma_cross", clean_config)
-    signals = engine.generate(df)
+    signals = engine.generate_frame(df)
     
     if not signals:
         return 0, 0, 0 # trades, win_rate, total_r
@@ -47,27 +54,24 @@ def run_single_backtest(df, strategy_config):
         
         for _, row in future_data.iterrows():
             if direction == 'LONG':
-                if row['low'] <= stop_loss:
-                    outcome = "LOSS"
-                    pnl = -1.0
-                    break
-                elif row['high'] >= take_profit:
-                    outcome = "WIN"
-                    pnl = 2.0
-                    break
-            elif direction == 'SHORT':
-                if row['high'] >= stop_loss:
-                    outcome = "LOSS"
-                    pnl = -1.0
-                    break
-                elif row['low'] <= take_profit:
-                    outcome = "WIN"
-                    pnl = 2.0
-                    break
-                elif row['low'] <= take_profit:
-                    outcome = "WIN"
-                    pnl = 2.0
-                    break
+                sl_hit = row['low'] <= stop_loss
+                tp_hit = row['high'] >= take_profit
+            else:
+                sl_hit = row['high'] >= stop_loss
+                tp_hit = row['low'] <= take_profit
+
+            # Ambiguous bar: ask the M1 data which level came first
+            if sl_hit and tp_hit and intrabar is not None:
+                sl_hit = intrabar.first_touch(row['timestamp'], direction, stop_loss, take_profit) != TP_FIRST
+
+            if sl_hit:
+                outcome = "LOSS"
+                pnl = -1.0
+                break
+            elif tp_hit:
+                outcome = "WIN"
+                pnl = 2.0
+                break
 
         # Check for open trades
         if outcome is None and not future_data.empty:
@@ -156,7 +160,16 @@ def fetch_deep_history(symbol):
             
     return df
 
-def run_deep_tournament():
+def run_deep_tournament(store=None, intrabar=None):
+    """
+    Compounding backtest of the champion configs. Every config is written to
+    the results store (default: execution/data/results).
+
+    intrabar: resolve bars touching both SL and TP on M1 data (default
+    config.INTRABAR_RESOLUTION); symbols without data/processed/{SYM}/M1.csv
+    keep scoring those bars as a loss.
+    """
+    store = store or ResultsStore()
     print("--- Starting Deep Backtest (H1 / 6000 candles / ~1 Year) ---")
     
     champions = [
@@ -177,6 +190,7 @@ def run_deep_tournament():
     # Process unique symbols
     unique_symbols = set(c['symbol'] for c in champions)
     data_cache = {}
+    resolvers = {sym: resolver_for(sym, intrabar) for sym in unique_symbols}
     
     for sym in unique_symbols:
         df = fetch_deep_history(sym)
@@ -200,12 +214,15 @@ def run_deep_tournament():
         
         # We need to act as the "run_single_backtest" but with state
         engine = SignalGenerator("baseline_sma_cross", {k: v for k, v in cfg.items() if k not in ['name', 'symbol']})
-        signals = engine.generate(df)
+        signals = engine.generate_frame(df)
         
         current_balance = start_bal
         wins = 0
         losses = 0
         trades_list = []
+        r_multiples = []
+        trade_rows = []
+        equity_rows = []
         
         for sig in signals:
             # 1. Calculate Size (Risk 2%)
@@ -234,29 +251,40 @@ def run_deep_tournament():
             
             for _, row in future.iterrows():
                 if direction == 'LONG':
-                    if row['low'] <= sl:
-                        outcome = "LOSS"
-                        # Loss is roughly the risk amount (slippage aside)
-                        pnl_usd = -risk_amt 
-                        break
-                    elif row['high'] >= tp:
-                        outcome = "WIN"
-                        # Win is 2x Risk (1:2 ratio)
-                        pnl_usd = risk_amt * 2.0
-                        break
+                    sl_hit = row['low'] <= sl
+                    tp_hit = row['high'] >= tp
                 elif direction == 'SHORT':
-                    if row['high'] >= sl:
-                        outcome = "LOSS"
-                        pnl_usd = -risk_amt
-                        break
-                    elif row['low'] <= tp:
-                        outcome = "WIN"
-                        pnl_usd = risk_amt * 2.0
-                        break
+                    sl_hit = row['high'] >= sl
+                    tp_hit = row['low'] <= tp
+                else:
+                    continue
+
+                # Ambiguous bar: ask the M1 data which level came first
+                if sl_hit and tp_hit and resolvers[sym] is not None:
+                    sl_hit = resolvers[sym].first_touch(row['timestamp'], direction, sl, tp) != TP_FIRST
+
+                if sl_hit:
+                    outcome = "LOSS"
+                    # Loss is roughly the risk amount (slippage aside)
+                    pnl_usd = -risk_amt 
+                    break
+                elif tp_hit:
+                    outcome = "WIN"
+                    # Win is 2x Risk (1:2 ratio)
+                    pnl_usd = risk_amt * 2.0
+                    break
             
             if outcome:
                 current_balance += pnl_usd
                 trades_list.append(outcome)
+                r_multiples.append(pnl_usd / risk_amt)
+                exit_time = row['timestamp']  # Bar that hit SL/TP
+                trade_rows.append({
+                    "entry_time": sig.timestamp, "exit_time": exit_time, "direction": direction,
+                    "size": lots, "entry_price": entry, "exit_price": sl if outcome == "LOSS" else tp,
+                    "pnl": pnl_usd, "r_multiple": pnl_usd / risk_amt, "outcome": outcome,
+                })
+                equity_rows.append({"timestamp": exit_time, "equity": current_balance})
                 if outcome == "WIN": wins += 1
                 else: losses += 1
                 
@@ -265,13 +293,22 @@ def run_deep_tournament():
         win_rate = (wins/total_trades*100) if total_trades > 0 else 0
         net_profit_percent = ((current_balance - start_bal) / start_bal) * 100
         
+        store.write_run(
+            strategy="baseline_sma_cross", symbol=sym, timeframe="H1",
+            params={k: v for k, v in cfg.items() if k not in ['name', 'symbol']},
+            stats={"return_pct": net_profit_percent, "win_rate_pct": win_rate, "n_trades": total_trades,
+                   "total_r": sum(r_multiples), "equity_final": current_balance, "name": cfg["name"]},
+            trades=pd.DataFrame(trade_rows), equity=pd.DataFrame(equity_rows),
+        )
+
         results.append({
             "Symbol": sym,
             "Strategy": cfg["name"],
             "Trades": total_trades,
             "Win Rate %": round(win_rate, 1),
             "End Balance": round(current_balance, 2),
-            "Growth %": round(net_profit_percent, 1)
+            "Growth %": round(net_profit_percent, 1),
+            "R Multiples": r_multiples
         })
 
     # Display Results
@@ -289,8 +326,25 @@ def run_deep_tournament():
         print("="*110)
         best_res = df_res.iloc[0]
         print(f"\nWINNER (Compound): {best_res['Symbol']} -> ${best_res['End Balance']} (+{best_res['Growth %']}%)")
+
+        # Robustness: resample each trade sequence under the configured sizing rule
+        risk_pct = config.RISK_CONFIG.risk_per_trade_pct
+        print(f"\n--- Monte Carlo (10,000 bootstrap paths @ {risk_pct}% risk/trade) ---")
+        print(f"{'Symbol':<10} | {'Strategy':<25} | {'DD p50 %':<10} | {'DD p95 %':<10} | {'Ruin %':<8} | {'Growth p5 %':<12}")
+        print("-" * 90)
+        for _, row in df_res.iterrows():
+            if not row['R Multiples']:
+                continue
+            mc = run_monte_carlo(row['R Multiples'], config.RISK_CONFIG, n_paths=10000, start_balance=start_bal, seed=42)
+            s = mc.summary()
+            print(f"{row['Symbol']:<10} | {row['Strategy']:<25} | {s['DD p50 %']:<10} | {s['DD p95 %']:<10} | {s['Ruin %']:<8} | {s['Growth p5 %']:<12}")
     else:
         print("No trades generated in deep run.")
 
 if __name__ == "__main__":
-    run_deep_tournament()
+    import argparse
+    parser = argparse.ArgumentParser(description="Compounding deep backtest of the champion configs")
+    parser.add_argument("--no-intrabar", action="store_true",
+                        help="Score bars touching both SL and TP as a loss instead of resolving them on M1 data")
+    args = parser.parse_args()
+    run_deep_tournament(intrabar=False if args.no_intrabar else None)
@@ -0,0 +1,278 @@
+"""
+SMA Parameter Sweep Module
+
+Evaluates a whole fast/slow period grid in one vectorized pass instead of
+one backtest per combination:
+
+1. One SMA row per distinct window, built from a single cumulative sum.
+2. Crossover matrix (combinations x bars) from the SMA rows.
+3. Per-bar trade outcomes (SL/TP first hit) computed once and shared by all
+   combinations, since they only depend on the entry bar and direction.
+
+`sweep_sma_cross` reproduces `run_single_backtest` (BaselineSMACross signals,
+ATR-based SL/TP, R-multiple PnL). `sweep_sma_reversal` evaluates the
+always-in-market SmaCross variant (flip on every crossover, fill next open).
+
+Usage:
+    python execution/backtest_sweep.py [--no-intrabar]
+
+With M1 data in data/processed/{SYMBOL}/M1.csv, bars touching both SL and
+TP are resolved on it (config.INTRABAR_RESOLUTION, execution/intrabar.py).
+"""
+
+import os
+import sys
+from itertools import product
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.append(project_root)
+
+from execution.intrabar import TP_FIRST, IntrabarResolver, resolver_for
+from execution.strategies.baseline_sma_cross import BaselineSMACross
+
+LONG = 1
+SHORT = -1
+_SIDE = {LONG: "LONG", SHORT: "SHORT"}
+
+
+def sma_matrix(values: np.ndarray, windows: Sequence[int]) -> np.ndarray:
+    """
+    Simple moving averages for several windows at once.
+
+    Returns an array of shape (len(windows), len(values)); the first w-1
+    entries of each row are NaN (same as pandas rolling(w).mean()).
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    # Center before summing to keep cumulative-sum rounding error small
+    offset = values.mean() if n else 0.0
+    csum = np.concatenate(([0.0], np.cumsum(values - offset)))
+
+    out = np.full((len(windows), n), np.nan)
+    for row, w in enumerate(windows):
+        if 0 < w <= n:
+            out[row, w - 1:] = (csum[w:] - csum[:-w]) / w + offset
+    return out
+
+
+def crossover_matrix(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    """
+    +1 where fast crosses above slow, -1 where it crosses below, else 0.
+
+    Same rule as BaselineSMACross: previous fast <= slow and current fast > slow.
+    """
+    prev_fast, prev_slow = fast[:, :-1], slow[:, :-1]
+    cur_fast, cur_slow = fast[:, 1:], slow[:, 1:]
+    with np.errstate(invalid="ignore"):
+        bullish = (prev_fast <= prev_slow) & (cur_fast > cur_slow)
+        bearish = (prev_fast >= prev_slow) & (cur_fast < cur_slow)
+    cross = np.zeros(fast.shape, dtype=np.int8)
+    cross[:, 1:] = bullish.astype(np.int8) - bearish.astype(np.int8)
+    return cross
+
+
+def _indicators(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """ATR and RSI with the BaselineSMACross formulas (independent of the SMA periods)."""
+    data = BaselineSMACross(fast_period=1, slow_period=1)._calculate_indicators(df[["high", "low", "close"]].copy())
+    return data["atr"].to_numpy(dtype=float), data["rsi"].to_numpy(dtype=float)
+
+
+def resolve_outcomes(high: np.ndarray, low: np.ndarray, stop_loss: np.ndarray, take_profit: np.ndarray,
+                     direction: int, bars: np.ndarray, reward: float,
+                     timestamps: Optional[np.ndarray] = None,
+                     intrabar: Optional[IntrabarResolver] = None) -> np.ndarray:
+    """
+    R-multiple outcome for a trade entered at the close of each bar in `bars`.
+
+    Scans forward from the next bar; the stop loss is checked before the take
+    profit on the same bar unless `intrabar` (with `timestamps`) is given, in
+    which case bars touching both levels are resolved on M1 data. Returns -1
+    (stop), `reward` (target) or NaN (still open at the end of the data / no
+    later bar).
+    """
+    n = len(high)
+    result = np.full(n, np.nan)
+    active = np.asarray(bars, dtype=np.int64)
+    k = 1
+    while active.size:
+        j = active + k
+        in_range = j < n
+        active, j = active[in_range], j[in_range]
+        if not active.size:
+            break
+        if direction == LONG:
+            loss = low[j] <= stop_loss[active]
+            target = high[j] >= take_profit[active]
+        else:
+            loss = high[j] >= stop_loss[active]
+            target = low[j] <= take_profit[active]
+        if intrabar is not None:
+            ambiguous = np.flatnonzero(loss & target)
+            if ambiguous.size:
+                first = intrabar.resolve_batch(timestamps[j[ambiguous]], [_SIDE[direction]] * ambiguous.size,
+                                               stop_loss[active[ambiguous]], take_profit[active[ambiguous]])
+                loss[ambiguous[first == TP_FIRST]] = False
+        win = ~loss & target
+        result[active[loss]] = -1.0
+        result[active[win]] = reward
+        active = active[~(loss | win)]
+        k += 1
+    return result
+
+
+def _grid(fast_periods: Iterable[int], slow_periods: Iterable[int]) -> List[Tuple[int, int]]:
+    return [(f, s) for f, s in product(fast_periods, slow_periods)]
+
+
+def sweep_sma_cross(df: pd.DataFrame, fast_periods: Sequence[int], slow_periods: Sequence[int],
+                    use_rsi_filter: bool = False,
+                    intrabar: Optional[IntrabarResolver] = None) -> pd.DataFrame:
+    """
+    Batched equivalent of calling `run_single_backtest` for every (fast, slow) pair.
+
+    Returns one row per combination: fast_period, slow_period, trades,
+    win_rate, total_r.
+    """
+    combos = _grid(fast_periods, slow_periods)
+    columns = ["fast_period", "slow_period", "trades", "win_rate", "total_r"]
+    if df.empty or not combos:
+        return pd.DataFrame(columns=columns)
+
+    close = df["close"].to_numpy(dtype=float)
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    n = len(close)
+    atr, rsi = _indicators(df)
+
+    # 1. One SMA row per distinct window
+    windows = sorted({p for combo in combos for p in combo})
+    row_of = {w: i for i, w in enumerate(windows)}
+    smas = sma_matrix(close, windows)
+    fast_idx = np.array([row_of[f] for f, _ in combos])
+    slow_idx = np.array([row_of[s] for _, s in combos])
+
+    # 2. Crossovers for every combination
+    cross = crossover_matrix(smas[fast_idx], smas[slow_idx])
+    slow_arr = np.array([s for _, s in combos])
+    bar = np.arange(n)
+    valid = (bar[None, :] >= slow_arr[:, None]) & ~np.isnan(atr)[None, :] & ~np.isnan(rsi)[None, :]
+    valid &= (n >= np.maximum(slow_arr, 15))[:, None]
+    if use_rsi_filter:
+        with np.errstate(invalid="ignore"):
+            long_ok = (BaselineSMACross.RSI_BULLISH_MIN < rsi) & (rsi < BaselineSMACross.RSI_OVERBOUGHT)
+            short_ok = (BaselineSMACross.RSI_OVERSOLD < rsi) & (rsi < BaselineSMACross.RSI_BEARISH_MAX)
+        cross = np.where(cross == LONG, cross * long_ok, cross * short_ok).astype(np.int8)
+    cross = np.where(valid, cross, 0).astype(np.int8)
+
+    # 3. Outcomes, computed once per signal bar and direction
+    sl_dist = BaselineSMACross.SL_MULTIPLIER * atr
+    tp_dist = BaselineSMACross.TP_MULTIPLIER * atr
+    reward = BaselineSMACross.TP_MULTIPLIER / BaselineSMACross.SL_MULTIPLIER
+    long_bars = np.flatnonzero((cross == LONG).any(axis=0))
+    short_bars = np.flatnonzero((cross == SHORT).any(axis=0))
+    timestamps = df["timestamp"].to_numpy() if intrabar is not None else None
+    long_r = resolve_outcomes(high, low, close - sl_dist, close + tp_dist, LONG, long_bars, reward,
+                              timestamps, intrabar)
+    short_r = resolve_outcomes(high, low, close + sl_dist, close - tp_dist, SHORT, short_bars, reward,
+                               timestamps, intrabar)
+
+    r = np.where(cross == LONG, long_r[None, :], np.where(cross == SHORT, short_r[None, :], np.nan))
+    closed = ~np.isnan(r)
+    trades = closed.sum(axis=1)
+    wins = (r > 0).sum(axis=1)
+    total_r = np.where(closed, r, 0.0).sum(axis=1)
+    win_rate = np.divide(wins * 100.0, trades, out=np.zeros(len(combos)), where=trades > 0)
+
+    return pd.DataFrame({
+        "fast_period": [f for f, _ in combos],
+        "slow_period": slow_arr,
+        "trades": trades,
+        "win_rate": win_rate,
+        "total_r": total_r,
+    })
+
+
+def sweep_sma_reversal(df: pd.DataFrame, fast_periods: Sequence[int],
+                       slow_periods: Sequence[int]) -> pd.DataFrame:
+    """
+    Stop-and-reverse SmaCross for every (fast, slow) pair, one unit per trade.
+
+    Crossover on bar t flips the position at the open of bar t+1 (as in
+    backtesting.py with exclusive_orders=True). Returns trades (position
+    flips) and pnl_points (price points gained, open position marked at the
+    last close).
+    """
+    combos = _grid(fast_periods, slow_periods)
+    columns = ["fast_period", "slow_period", "trades", "pnl_points"]
+    if df.empty or not combos:
+        return pd.DataFrame(columns=columns)
+
+    close = df["close"].to_numpy(dtype=float)
+    open_ = df["open"].to_numpy(dtype=float)
+    n = len(close)
+
+    windows = sorted({p for combo in combos for p in combo})
+    row_of = {w: i for i, w in enumerate(windows)}
+    smas = sma_matrix(close, windows)
+    cross = crossover_matrix(smas[[row_of[f] for f, _ in combos]], smas[[row_of[s] for _, s in combos]])
+
+    # Position held during bar t (entered at open of t), forward filled between crossovers
+    events = np.zeros(cross.shape, dtype=float)
+    events[:, 1:] = cross[:, :-1]
+    events[events == 0] = np.nan
+    position = pd.DataFrame(events.T).ffill().fillna(0.0).to_numpy().T
+
+    # PnL: open-to-open moves while held, last bar marked at its close
+    marks = np.append(open_[1:], close[-1])
+    pnl = (position * (marks - open_)[None, :]).sum(axis=1)
+    trades = (np.diff(np.concatenate([np.zeros((len(combos), 1)), position], axis=1), axis=1) != 0).sum(axis=1)
+
+    return pd.DataFrame({
+        "fast_period": [f for f, _ in combos],
+        "slow_period": [s for _, s in combos],
+        "trades": trades,
+        "pnl_points": pnl,
+    })
+
+
+def run_sma_sweep(symbol: str = "USDJPY", fast_periods: Sequence[int] = range(5, 55, 5),
+                  slow_periods: Sequence[int] = range(20, 220, 20), use_rsi_filter: bool = False,
+                  store=None, intrabar: Optional[bool] = None):
+    from execution.backtest_run import fetch_deep_history
+    from execution.results_store import ResultsStore
+
+    store = store or ResultsStore()
+
+    print(f"--- SMA Sweep for {symbol} ({len(fast_periods) * len(slow_periods)} combinations) ---")
+    df = fetch_deep_history(symbol)
+    if df.empty:
+        print(f"  Warning: No data for {symbol}")
+        return pd.DataFrame()
+
+    results = sweep_sma_cross(df, fast_periods, slow_periods, use_rsi_filter=use_rsi_filter,
+                              intrabar=resolver_for(symbol, intrabar))
+    results = results[results["fast_period"] < results["slow_period"]]
+    store.write_runs("baseline_sma_cross", symbol, "H1", [
+        {"params": {"fast_period": int(r.fast_period), "slow_period": int(r.slow_period),
+                    "use_rsi_filter": use_rsi_filter},
+         "n_trades": r.trades, "win_rate_pct": r.win_rate, "total_r": r.total_r}
+        for r in results.itertuples()
+    ])
+    top = results.sort_values("total_r", ascending=False).head(10)
+    print(top.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Vectorized SMA cross parameter sweep")
+    parser.add_argument("--no-intrabar", action="store_true",
+                        help="Score bars touching both SL and TP as a loss instead of resolving them on M1 data")
+    args = parser.parse_args()
+    run_sma_sweep(intrabar=False if args.no_intrabar else None)
@@ -0,0 +1,303 @@
+"""
+IG Async Execution Module
+
+Submit-and-confirm for IG deals on asyncio + httpx:
+
+1. POST /positions/otc carries our own dealReference (derived from the
+   intent's idempotency key), so a submit that failed in transit can be
+   checked via /confirms before it is retried: no duplicate deals.
+2. GET /confirms/{dealReference} is polled (404 = not processed yet) with
+   jittered backoff until IG confirms or rejects the deal, or the timeout
+   passes. Nothing sleeps on a thread.
+3. The OrderResult carries the confirmed level, size and dealId, plus
+   submit and confirmation latency in raw_response.
+4. update_position / close_position (confirmed the same way) back the
+   ExecutionRouter bracket orders.
+5. fetch_positions / fetch_working_orders / fetch_transactions pull the
+   account state in bulk; broker_state() normalises them for the
+   reconciliation worker.
+
+    result = await broker.execute_order_async(intent)   # IGBroker
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+
+from execution.execute_order import jittered_backoff
+from execution.models import BrokerState, OrderIntent, OrderResult
+
+logger = logging.getLogger("ForexPlatform")
+
+DEFAULT_CONFIRM_TIMEOUT_S = 10.0
+SUBMIT_ATTEMPTS = 3
+POLL_BASE_S = 0.1
+POLL_MAX_S = 1.0
+
+# IG dealIds are this prefix + the reference shown in the transaction history
+DEAL_ID_PREFIX = "DIAAAA"
+
+_SESSION_HEADERS = ("X-IG-API-KEY", "CST", "X-SECURITY-TOKEN", "AUTHORIZATION", "IG-ACCOUNT-ID")
+
+
+class IGTransientError(Exception):
+    """Network error or 5xx: the request may be retried."""
+
+
+class IGRequestError(Exception):
+    """4xx from IG: retrying will not help."""
+
+
+def deal_reference(intent: OrderIntent) -> str:
+    """Deterministic IG dealReference (max 30 chars of [A-Za-z0-9_-])."""
+    digest = hashlib.sha256(intent.idempotency_key.encode("utf-8")).hexdigest()
+    return f"FA-{digest[:24]}"
+
+
+class IGDealClient:
+    """Minimal async client for the IG dealing endpoints."""
+
+    def __init__(self, base_url: str, headers: Dict[str, str], client: Optional[httpx.AsyncClient] = None,
+                 timeout_s: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {k: v for k, v in headers.items() if k.upper() in _SESSION_HEADERS}
+        self.headers.update({"Content-Type": "application/json", "Accept": "application/json; charset=UTF-8"})
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(timeout=timeout_s)
+
+    async def _request(self, method: str, endpoint: str, version: str, headers_extra: Optional[Dict[str, str]] = None,
+                       **kwargs) -> httpx.Response:
+        headers = {**self.headers, "Version": version, **(headers_extra or {})}
+        try:
+            response = await self._client.request(method, self.base_url + endpoint, headers=headers, **kwargs)
+        except httpx.TransportError as e:
+            raise IGTransientError(str(e)) from e
+        if response.status_code >= 500:
+            raise IGTransientError(f"HTTP {response.status_code}")
+        return response
+
+    @staticmethod
+    def _error(response: httpx.Response) -> IGRequestError:
+        try:
+            code = response.json().get("errorCode", response.text)
+        except ValueError:
+            code = response.text
+        return IGRequestError(f"HTTP {response.status_code}: {code}")
+
+    async def open_position(self, payload: Dict[str, Any]) -> str:
+        """Submits an OTC position; returns the dealReference."""
+        response = await self._request("POST", "/positions/otc", "2", json=payload)
+        if response.status_code != 200:
+            raise self._error(response)
+        return response.json()["dealReference"]
+
+    async def fetch_confirm(self, reference: str) -> Optional[Dict[str, Any]]:
+        """The deal confirmation, or None while IG has not processed it."""
+        response = await self._request("GET", f"/confirms/{reference}", "1")
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise self._error(response)
+        return response.json()
+
+    async def confirm(self, reference: str, timeout_s: float = DEFAULT_CONFIRM_TIMEOUT_S) -> Optional[Dict[str, Any]]:
+        """Polls until the deal is confirmed/rejected; None on timeout."""
+        deadline = time.monotonic() + timeout_s
+        attempt = 0
+        while True:
+            try:
+                confirm = await self.fetch_confirm(reference)
+                if confirm is not None:
+                    return confirm
+            except IGTransientError as e:
+                logger.warning(f"IG confirm poll for {reference} failed: {e}")
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(jittered_backoff(attempt, POLL_BASE_S, POLL_MAX_S), remaining))
+
+    async def _confirmed(self, reference: str, action: str, timeout_s: float) -> Dict[str, Any]:
+        confirm = await self.confirm(reference, timeout_s)
+        if confirm is None:
+            raise IGTransientError(f"{action} {reference} not confirmed within {timeout_s}s")
+        if confirm.get("dealStatus") != "ACCEPTED":
+            raise IGRequestError(f"{action} rejected: {confirm.get('reason', 'UNKNOWN')}")
+        return confirm
+
+    async def update_position(self, deal_id: str, stop_level: Optional[float], limit_level: Optional[float],
+                              timeout_s: float = DEFAULT_CONFIRM_TIMEOUT_S) -> Dict[str, Any]:
+        """Sets stop/limit levels on an open position; raises unless IG accepts."""
+        payload = {"stopLevel": stop_level, "limitLevel": limit_level, "trailingStop": False}
+        response = await self._request("PUT", f"/positions/otc/{deal_id}", "2", json=payload)
+        if response.status_code != 200:
+            raise self._error(response)
+        return await self._confirmed(response.json()["dealReference"], "Update", timeout_s)
+
+    async def close_position(self, deal_id: str, timeout_s: float = DEFAULT_CONFIRM_TIMEOUT_S) -> Dict[str, Any]:
+        """Closes an open position at market; raises unless IG accepts."""
+        response = await self._request("GET", f"/positions/{deal_id}", "2")
+        if response.status_code != 200:
+            raise self._error(response)
+        position = response.json()["position"]
+        payload = {
+            "dealId": deal_id,
+            "direction": "SELL" if position["direction"] == "BUY" else "BUY",
+            "size": position["size"],
+            "orderType": "MARKET",
+        }
+        # IG takes DELETE bodies as a POST with the _method override
+        response = await self._request("POST", "/positions/otc", "1", json=payload,
+                                       headers_extra={"_method": "DELETE"})
+        if response.status_code != 200:
+            raise self._error(response)
+        return await self._confirmed(response.json()["dealReference"], "Close", timeout_s)
+
+    async def _get(self, endpoint: str, version: str, key: str, **kwargs) -> List[Dict[str, Any]]:
+        response = await self._request("GET", endpoint, version, **kwargs)
+        if response.status_code != 200:
+            raise self._error(response)
+        return response.json().get(key, [])
+
+    async def fetch_positions(self) -> List[Dict[str, Any]]:
+        """All open positions ({position, market} items)."""
+        return await self._get("/positions", "2", "positions")
+
+    async def fetch_working_orders(self) -> List[Dict[str, Any]]:
+        """All working orders ({workingOrderData, marketData} items)."""
+        return await self._get("/workingorders", "2", "workingOrders")
+
+    async def fetch_transactions(self, since: datetime) -> List[Dict[str, Any]]:
+        """Deal transactions (closes, with realised PnL) since `since`, unpaged."""
+        params = {"type": "ALL_DEAL", "from": since.strftime("%Y-%m-%dT%H:%M:%S"), "pageSize": 0}
+        return await self._get("/history/transactions", "2", "transactions", params=params)
+
+    async def aclose(self) -> None:
+        if self._owns_client:
+            await self._client.aclose()
+
+
+def _amount(text: Any) -> Optional[float]:
+    """IG money/size strings ("E-12.50", "£1,024.00", "+1") as float."""
+    if text is None or isinstance(text, (int, float)):
+        return text
+    match = re.search(r"[-+]?\d+(?:\.\d+)?", str(text).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def broker_state(positions: Iterable[Dict[str, Any]], working_orders: Iterable[Dict[str, Any]],
+                 transactions: Iterable[Dict[str, Any]], deal_ids: Iterable[str] = ()) -> BrokerState:
+    """
+    Normalises the bulk endpoints into a BrokerState. Transactions carry
+    only a reference, so they are mapped back onto the given deal ids.
+    """
+    state = BrokerState()
+    for item in positions:
+        pos = item.get("position", {})
+        state.positions[pos["dealId"]] = {
+            "deal_reference": pos.get("dealReference"),
+            "symbol": item.get("market", {}).get("epic"),
+            "direction": pos.get("direction"),
+            "size": _amount(pos.get("size")),
+            "level": _amount(pos.get("level")),
+            "stop_level": _amount(pos.get("stopLevel")),
+            "limit_level": _amount(pos.get("limitLevel")),
+        }
+    for item in working_orders:
+        order = item.get("workingOrderData", {})
+        state.working_orders[order["dealId"]] = {
+            "symbol": order.get("epic"),
+            "direction": order.get("direction"),
+            "size": _amount(order.get("orderSize")),
+            "level": _amount(order.get("orderLevel")),
+        }
+    by_reference = {d[len(DEAL_ID_PREFIX):] if d.startswith(DEAL_ID_PREFIX) else d: d for d in deal_ids}
+    for tx in transactions:
+        if tx.get("cashTransaction") or tx.get("transactionType", "DEAL") != "DEAL":
+            continue
+        ref = tx.get("reference", "")
+        deal_id = by_reference.get(ref, ref)
+        closed_at = tx.get("dateUtc") or tx.get("date")
+        state.closed[deal_id] = {
+            "exit_price": _amount(tx.get("closeLevel")),
+            "pnl": _amount(tx.get("profitAndLoss")),
+            "closed_at": datetime.fromisoformat(closed_at) if closed_at else None,
+        }
+    return state
+
+
+async def submit_and_confirm(client: IGDealClient, order: Dict[str, Any], reference: str,
+                             confirm_timeout_s: float = DEFAULT_CONFIRM_TIMEOUT_S) -> OrderResult:
+    """Submits a prepared market order (IGBroker._prepare_order) and awaits its confirmation."""
+    payload = {
+        "currencyCode": order["currency_code"],
+        "dealReference": reference,
+        "direction": order["direction"],
+        "epic": order["epic"],
+        "expiry": "-",
+        "forceOpen": True,
+        "guaranteedStop": False,
+        "orderType": "MARKET",
+        "size": order["size"],
+        "stopDistance": order["stop_distance"],
+        "limitDistance": order["limit_distance"],
+        "trailingStop": False,
+    }
+    start = time.perf_counter()
+    for attempt in range(1, SUBMIT_ATTEMPTS + 1):
+        try:
+            await client.open_position(payload)
+            break
+        except IGRequestError as e:
+            logger.error(f"IG rejected order {reference}: {e}")
+            return OrderResult(status="REJECTED", broker_order_id=reference, error_message=str(e),
+                               timestamp=datetime.utcnow())
+        except IGTransientError as e:
+            # The POST may still have reached IG: our reference tells us
+            try:
+                if await client.fetch_confirm(reference) is not None:
+                    break
+            except (IGTransientError, IGRequestError):
+                pass
+            if attempt == SUBMIT_ATTEMPTS:
+                logger.error(f"IG submit failed after {attempt} attempts: {e}")
+                return OrderResult(status="FAILED", broker_order_id=reference, error_message=str(e),
+                                   timestamp=datetime.utcnow())
+            logger.warning(f"IG submit attempt {attempt} failed ({e}), retrying")
+            await asyncio.sleep(jittered_backoff(attempt))
+    submitted = time.perf_counter()
+
+    confirm = await client.confirm(reference, confirm_timeout_s)
+    done = time.perf_counter()
+    timings = {"deal_reference": reference, "submit_ms": (submitted - start) * 1e3,
+               "latency_ms": (done - start) * 1e3}
+
+    if confirm is None:
+        logger.warning(f"IG deal {reference} not confirmed within {confirm_timeout_s}s")
+        return OrderResult(status="SUBMITTED", broker_order_id=reference, filled_quantity=order["size"],
+                           error_message="Confirmation timed out", timestamp=datetime.utcnow(),
+                           raw_response=timings)
+
+    timings["confirm"] = confirm
+    if confirm.get("dealStatus") != "ACCEPTED":
+        reason = confirm.get("reason", "UNKNOWN")
+        logger.error(f"IG deal {reference} rejected: {reason}")
+        return OrderResult(status="REJECTED", broker_order_id=confirm.get("dealId") or reference,
+                           error_message=reason, timestamp=datetime.utcnow(), raw_response=timings)
+
+    logger.info(f"IG deal {confirm.get('dealId')} filled at {confirm.get('level')} "
+                f"in {timings['latency_ms']:.0f}ms")
+    return OrderResult(
+        status="FILLED",
+        broker_order_id=confirm.get("dealId") or reference,
+        filled_price=confirm.get("level"),
+        filled_quantity=confirm.get("size") or order["size"],
+        timestamp=datetime.utcnow(),
+        raw_response=timings,
+    )
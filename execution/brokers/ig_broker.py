@@ -1,21 +1,26 @@
 import json
 import os
 from abc import ABC, abstractmethod
-from typing import Optional, Dict
+import asyncio
+from datetime import datetime
+from typing import Iterable, Optional, Dict, Tuple
 from trading_ig import IGService
-from execution.models import OrderIntent, OrderResult
+from execution.models import BrokerState, OrderIntent, OrderResult
 from execution.core.config import settings
 from execution.core.logger import get_logger
 from execution.core.interfaces import IBroker
+from execution.brokers.ig_async import (DEFAULT_CONFIRM_TIMEOUT_S, IGDealClient, broker_state,
+                                        deal_reference, submit_and_confirm)
 
 logger = get_logger("IGBroker")
 from execution.safety import SafetyGate
+from execution.idempotency import IdempotencyLedger, get_ledger
 
 class IGBroker(IBroker):
     """
     IG Markets Broker Implementation.
     """
-    def __init__(self):
+    def __init__(self, ledger: Optional[IdempotencyLedger] = None, deal_client: Optional[IGDealClient] = None):
         self.username = settings.IG_USERNAME
         self.password = settings.IG_PASSWORD
         self.api_key = settings.IG_API_KEY
@@ -26,7 +31,10 @@ class IGBroker(IBroker):
         )
         self.connected = False
         self._instruments_cache: Dict[str, dict] = {}
-        self._processed_keys = set()
+        # Durable, shared across broker instances and processes
+        self.ledger = ledger if ledger is not None else get_ledger()
+        # Shared async client (tests, long-lived loops); otherwise one per call
+        self._deal_client = deal_client
 
     def connect(self) -> bool:
         if self.connected: 
@@ -86,42 +94,29 @@ class IGBroker(IBroker):
         
         return self._instruments_cache.get(symbol)
 
-    def execute_order(self, order_intent: OrderIntent) -> OrderResult:
+    def _prepare_order(self, order_intent: OrderIntent) -> Tuple[Optional[Dict], Optional[OrderResult]]:
         """
-        Executes a market order using IG API with Safety Gates and Idempotency.
+        Safety gates and instrument lookup shared by the sync and async paths.
+        Returns (order params, None) or (None, failure result).
         """
         # --- SAFETY GATES ---
         # 1. Intent Validation (Allowlist, Size Sanity)
         if not SafetyGate.validate_intent(order_intent):
-            return OrderResult(status="FAILED", error_message="Safety Gate: Invalid Intent or Symbol not allowed")
+            return None, OrderResult(status="FAILED", error_message="Safety Gate: Invalid Intent or Symbol not allowed")
 
         # 2. Live Execution Guard
         if self.acc_type == "LIVE":
             if not SafetyGate.is_live_allowed(self.acc_type):
                 msg = "Safety Gate: Live Trading BLOCKED. Set LIVE_TRADING_ENABLED=true to confirm."
                 logger.critical(msg)
-                return OrderResult(status="FAILED", error_message=msg)
-
-        # 3. Idempotency Check
-        idem_key = SafetyGate.generate_idempotency_key(order_intent)
-        if idem_key in self._processed_keys:
-            msg = f"Idempotency Check: Order {idem_key} already processed. Skipping."
-            logger.warning(msg)
-            # Return SKIPPED or cached result if we had it. For now, FAILED/SKIPPED to avoid double fill.
-            return OrderResult(status="SKIPPED", error_message="Duplicate Order")
+                return None, OrderResult(status="FAILED", error_message=msg)
 
-        # --- EXECUTION ---
-        if not self.connect():
-            return OrderResult(status="FAILED", error_message="Not connected")
-            
         symbol = order_intent.symbol
         instrument_config = self._get_instrument(symbol)
         
         if not instrument_config:
-             return OrderResult(status="FAILED", error_message=f"Instrument config not found for {symbol}")
+             return None, OrderResult(status="FAILED", error_message=f"Instrument config not found for {symbol}")
 
-        epic = instrument_config.get("epic")
-        currency_code = instrument_config.get("currency", "USD")
         min_size = instrument_config.get("min_size", 0.1)
         
         # Prepare Size
@@ -130,33 +125,63 @@ class IGBroker(IBroker):
             logger.warning(f"Calculated size {contracts} < min {min_size}. Clamping to min.")
             contracts = min_size
 
-        try:
-            # Prepare Direction
-            direction = order_intent.direction.upper()
-            ig_direction = "BUY" if direction in ["LONG", "BUY"] else "SELL"
-            
+        # 3. Idempotency Check: the key is written to the ledger before submission
+        idem_key = SafetyGate.generate_idempotency_key(order_intent)
+        if self.ledger.reserve(idem_key) is not None:
+            msg = f"Idempotency Check: Order {idem_key} already processed. Skipping."
+            logger.warning(msg)
+            return None, OrderResult(status="SKIPPED", error_message="Duplicate Order")
+
+        # Prepare Direction
+        direction = order_intent.direction.upper()
+
+        return {
+            "idem_key": idem_key,
+            "epic": instrument_config.get("epic"),
+            "currency_code": instrument_config.get("currency", "USD"),
+            "direction": "BUY" if direction in ["LONG", "BUY"] else "SELL",
+            "size": contracts,
             # Prepare SL/TP logic
-            sl_dist = round(float(order_intent.sl_distance), 1) if order_intent.sl_distance else None
-            tp_dist = round(float(order_intent.tp_distance), 1) if order_intent.tp_distance else None
-            
+            "stop_distance": round(float(order_intent.sl_distance), 1) if order_intent.sl_distance else None,
+            "limit_distance": round(float(order_intent.tp_distance), 1) if order_intent.tp_distance else None,
+        }, None
+
+    def execute_order(self, order_intent: OrderIntent) -> OrderResult:
+        """
+        Executes a market order using IG API with Safety Gates and Idempotency.
+        Returns SUBMITTED (fill unknown); execute_order_async also confirms the deal.
+        """
+        order, failure = self._prepare_order(order_intent)
+        if failure:
+            return failure
+
+        # --- EXECUTION ---
+        if not self.connect():
+            self.ledger.release(order["idem_key"])
+            return OrderResult(status="FAILED", error_message="Not connected")
+
+        symbol = order_intent.symbol
+        contracts = order["size"]
+        try:
             # Log Intent (Safe)
-            logger.info(f"INTENT: {ig_direction} {contracts} {symbol} (SL:{sl_dist}, TP:{tp_dist}). Executing...")
+            logger.info(f"INTENT: {order['direction']} {contracts} {symbol} "
+                        f"(SL:{order['stop_distance']}, TP:{order['limit_distance']}). Executing...")
 
             response = self.ig_service.create_open_position(
-                currency_code=currency_code,
-                direction=ig_direction,
-                epic=epic,
+                currency_code=order["currency_code"],
+                direction=order["direction"],
+                epic=order["epic"],
                 expiry='-',
                 force_open='true',
                 guaranteed_stop='false',
                 level=None,
                 limit_level=None,
-                limit_distance=tp_dist, 
+                limit_distance=order["limit_distance"], 
                 order_type='MARKET',
                 quote_id=None,
                 size=contracts, 
                 stop_level=None,
-                stop_distance=sl_dist, 
+                stop_distance=order["stop_distance"], 
                 trailing_stop=False,
                 trailing_stop_increment=None
             )
@@ -167,19 +192,100 @@ class IGBroker(IBroker):
             deal_ref = response.get('dealReference')
             logger.info(f"Order Submitted. Deal Ref: {deal_ref}")
             
-            # Mark as processed only on successful submission
-            self._processed_keys.add(idem_key)
-            
-            return OrderResult(
+            result = OrderResult(
                 status="SUBMITTED",
                 broker_order_id=deal_ref,
                 filled_quantity=contracts,
                 filled_price=None # Unknown until confirmed
             )
+            # Key stays taken only for a successful submission
+            self.ledger.complete(order["idem_key"], result)
+            return result
             
         except Exception as e:
             logger.error(f"IG Order Error: {e}", exc_info=True)
+            self.ledger.release(order["idem_key"])
             return OrderResult(
                 status="FAILED",
                 error_message=str(e)
             )
+
+    def deal_client(self, client=None) -> IGDealClient:
+        """Async REST client on this broker's IG session."""
+        return IGDealClient(self.ig_service.BASE_URL, dict(self.ig_service.session.headers), client=client)
+
+    async def execute_order_async(self, order_intent: OrderIntent, client: Optional[IGDealClient] = None,
+                                  confirm_timeout_s: float = DEFAULT_CONFIRM_TIMEOUT_S) -> OrderResult:
+        """
+        Submits the order and awaits its deal confirmation (no blocking
+        sleeps). Returns FILLED with the confirmed level, REJECTED with IG's
+        reason, or SUBMITTED if no confirmation arrived within the timeout.
+        """
+        order, failure = self._prepare_order(order_intent)
+        if failure:
+            return failure
+        client = client or self._deal_client
+        owned = client is None
+        if owned:
+            if not await asyncio.to_thread(self.connect):
+                self.ledger.release(order["idem_key"])
+                return OrderResult(status="FAILED", error_message="Not connected")
+            client = self.deal_client()
+
+        logger.info(f"INTENT: {order['direction']} {order['size']} {order_intent.symbol} "
+                    f"(SL:{order['stop_distance']}, TP:{order['limit_distance']}). Executing async...")
+        try:
+            result = await submit_and_confirm(client, order, deal_reference(order_intent),
+                                              confirm_timeout_s=confirm_timeout_s)
+        finally:
+            if owned:
+                await client.aclose()
+        if result.status in ("FILLED", "SUBMITTED"):
+            self.ledger.complete(order["idem_key"], result)
+        else:
+            self.ledger.release(order["idem_key"])
+        return result
+
+    async def _with_client(self, call):
+        client = self._deal_client
+        if client is not None:
+            return await call(client)
+        if not await asyncio.to_thread(self.connect):
+            raise ConnectionError("Not connected")
+        client = self.deal_client()
+        try:
+            return await call(client)
+        finally:
+            await client.aclose()
+
+    async def attach_bracket_async(self, deal_id: str, stop_loss: Optional[float],
+                                   take_profit: Optional[float]) -> Dict:
+        """Sets SL/TP levels on an open deal (ExecutionRouter bracket orders)."""
+        return await self._with_client(lambda c: c.update_position(deal_id, stop_loss, take_profit))
+
+    async def close_position_async(self, deal_id: str) -> Dict:
+        """Closes an open deal at market."""
+        return await self._with_client(lambda c: c.close_position(deal_id))
+
+    def symbol_for_epic(self, epic: Optional[str]) -> Optional[str]:
+        """Instrument symbol (instruments.json) for an IG epic, e.g. CS.D.USDJPY.MINI.IP -> USDJPY."""
+        if not epic:
+            return epic
+        self._get_instrument("")  # Loads the instrument cache
+        for symbol, instrument in self._instruments_cache.items():
+            if instrument.get("epic") == epic:
+                return symbol
+        parts = epic.split(".")
+        return parts[2] if len(parts) >= 3 else epic
+
+    async def fetch_state_async(self, since: datetime, deal_ids: Iterable[str] = ()) -> BrokerState:
+        """Positions, working orders and deal history since `since`, fetched concurrently."""
+        async def fetch(client: IGDealClient) -> BrokerState:
+            positions, orders, transactions = await asyncio.gather(
+                client.fetch_positions(), client.fetch_working_orders(), client.fetch_transactions(since))
+            return broker_state(positions, orders, transactions, deal_ids)
+        state = await self._with_client(fetch)
+        # Epics -> the symbols trades and the PortfolioRiskEngine use
+        for item in (*state.positions.values(), *state.working_orders.values()):
+            item["symbol"] = self.symbol_for_epic(item.get("symbol"))
+        return state
@@ -1,7 +1,6 @@
 
 import logging
 import uuid
-import time
 from datetime import datetime
 from .base_broker import BaseBroker
 # We need to import OrderResult from the parent package, but for now we'll assume it's available or re-define if strictly needed to avoid circular dep issues in simple script
@@ -38,9 +37,9 @@ class MockBroker(BaseBroker):
     def execute_order(self, intent: OrderIntent) -> OrderResult:
         logger.info(f"MockBroker routing: {intent.direction} {intent.quantity} {intent.symbol}")
         
-        # Simulate Network Latency
-        time.sleep(0.1) 
-        
+        # No simulated latency here: sleeping only slowed PAPER runs and load
+        # tests down. SimulatedBroker (sim_engine) models latency on a virtual clock.
+
         # Simulate Fill
         # In a real backtest, we'd check current price. 
         # For MVP paper trading, we assume we fill at 'current market price' or limit price.
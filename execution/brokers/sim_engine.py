@@ -0,0 +1,476 @@
+"""
+Simulated Matching Engine Module
+
+Paper/load-test broker that fills against modelled market conditions instead
+of a dummy price:
+
+1. Quotes come from replayed candles (on_bar / replay) or single prices
+   (on_quote). Candle prices are taken as mid.
+2. SpreadModel: bid/ask = mid -/+ half spread (pips, per symbol).
+3. BookModel: a synthetic book of `levels` price levels of `level_lots`
+   each, `level_step_pips` apart. Market orders walk it (VWAP fill, PARTIAL
+   when larger than the book); a resting LIMIT order gets at most one level
+   of liquidity per bar, so large orders fill over several bars.
+4. LatencyModel: submit-to-fill latency sampled from a fixed, normal or
+   lognormal distribution. Time is a VirtualClock, so latency moves the
+   clock and nothing sleeps.
+5. LIMIT and STOP orders (price in intent.limit_price) rest until a bar
+   crosses them. Fills carry SL/TP from intent.sl_distance / tp_distance
+   (points, as run_cycle sets them), checked on every later bar; a bar that
+   touches both exits at the SL (conservative).
+6. Positions, balance and PnL live in a PortfolioRiskEngine.
+7. feed(symbol, candles) matches only candles newer than the last one fed,
+   so live PAPER mode can pass each cycle's overlapping window to one
+   long-lived broker and resting orders and brackets see every bar once.
+
+    broker = SimulatedBroker(spread=SpreadModel(pips=1.2), latency=LatencyModel("lognormal", 0.08, 0.03, seed=1))
+    broker.replay(candles, on_bar=strategy)   # strategy(broker, symbol, bar) places orders
+"""
+
+import itertools
+import logging
+import math
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from execution.brokers.base_broker import BaseBroker
+from execution.models import BrokerState, OrderIntent, OrderResult, OrderStatus, OrderType
+from execution.portfolio_risk import PortfolioRiskEngine, _sign
+from execution.risk import get_point_size
+
+logger = logging.getLogger("ForexPlatform")
+
+EPS_LOTS = 1e-9
+
+
+def _utc(ts) -> datetime:
+    ts = pd.Timestamp(ts)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return ts.to_pydatetime()
+
+
+class VirtualClock:
+    """Simulation time; only ever moves forward."""
+
+    def __init__(self, start: Optional[datetime] = None):
+        self._now = _utc(start) if start is not None else datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    @property
+    def now(self) -> datetime:
+        return self._now
+
+    def advance(self, seconds: float) -> datetime:
+        self._now += timedelta(seconds=seconds)
+        return self._now
+
+    def advance_to(self, ts: datetime) -> datetime:
+        if ts > self._now:
+            self._now = ts
+        return self._now
+
+
+@dataclass
+class LatencyModel:
+    """Submit-to-fill latency in seconds."""
+    kind: str = "fixed"  # fixed | normal | lognormal
+    mean_s: float = 0.05
+    std_s: float = 0.0
+    min_s: float = 0.0
+    seed: Optional[int] = None
+    _rng: np.random.Generator = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.kind not in ("fixed", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency model: {self.kind}")
+        self._rng = np.random.default_rng(self.seed)
+
+    def sample(self) -> float:
+        if self.kind == "fixed" or self.std_s <= 0:
+            value = self.mean_s
+        elif self.kind == "normal":
+            value = self._rng.normal(self.mean_s, self.std_s)
+        else:
+            # Parameterised by the mean/std of the latency itself
+            sigma2 = math.log1p((self.std_s / self.mean_s) ** 2)
+            value = self._rng.lognormal(math.log(self.mean_s) - sigma2 / 2, math.sqrt(sigma2))
+        return max(float(value), self.min_s)
+
+
+@dataclass
+class SpreadModel:
+    """Bid/ask spread in pips, optionally per symbol."""
+    pips: float = 1.0
+    per_symbol: Dict[str, float] = field(default_factory=dict)
+
+    def half_spread(self, symbol: str) -> float:
+        return self.per_symbol.get(symbol, self.pips) * get_point_size(symbol) / 2
+
+
+@dataclass
+class BookModel:
+    """Synthetic depth on each side of the quote."""
+    levels: int = 5
+    level_lots: float = 10.0
+    level_step_pips: float = 0.2
+
+    def walk(self, symbol: str, quantity: float, best: float, side: int,
+             limit: Optional[float] = None) -> Tuple[float, float]:
+        """Takes `quantity` lots from the book; returns (filled lots, VWAP)."""
+        step = self.level_step_pips * get_point_size(symbol)
+        remaining, cost = quantity, 0.0
+        for k in range(self.levels):
+            price = best + side * k * step
+            if limit is not None and side * (price - limit) > 0:
+                break
+            take = min(remaining, self.level_lots)
+            cost += take * price
+            remaining -= take
+            if remaining <= EPS_LOTS:
+                remaining = 0.0
+                break
+        filled = quantity - remaining
+        return filled, (cost / filled if filled > 0 else 0.0)
+
+
+@dataclass
+class SimOrder:
+    """One order in the simulator."""
+    order_id: str
+    intent: OrderIntent
+    side: int
+    submitted_at: datetime
+    active_at: datetime
+    latency_s: float
+    status: str = OrderStatus.PENDING.value
+    filled: float = 0.0
+    cost: float = 0.0
+    deals: List[str] = field(default_factory=list)
+
+    @property
+    def remaining(self) -> float:
+        return self.intent.quantity - self.filled
+
+    @property
+    def avg_price(self) -> Optional[float]:
+        return self.cost / self.filled if self.filled > 0 else None
+
+
+class SimulatedBroker(BaseBroker):
+    """Matching engine on a virtual clock; drop-in for MockBroker."""
+
+    def __init__(self, spread: Optional[SpreadModel] = None, latency: Optional[LatencyModel] = None,
+                 book: Optional[BookModel] = None, balance: float = 10000.0,
+                 clock: Optional[VirtualClock] = None, bar_seconds: float = 3600.0):
+        self.spread = spread or SpreadModel()
+        self.latency = latency or LatencyModel()
+        self.book = book or BookModel()
+        self.clock = clock or VirtualClock()
+        self.bar_seconds = bar_seconds
+        self.portfolio = PortfolioRiskEngine(balance)
+        self.orders: Dict[str, SimOrder] = {}
+        self.trades: List[Dict] = []
+        self._mid: Dict[str, float] = {}
+        self._working: Dict[str, Dict[str, SimOrder]] = {}
+        self._brackets: Dict[str, Dict[str, Tuple[Optional[float], Optional[float]]]] = {}
+        self._last_bar: Dict[str, datetime] = {}  # feed(): newest candle matched per symbol
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()  # ExecutionRouter may call from worker threads
+
+    # --- BaseBroker ---
+
+    def connect(self) -> bool:
+        return True
+
+    def get_balance(self) -> Dict[str, float]:
+        equity = self.portfolio.equity
+        return {"balance": self.portfolio.balance, "equity": equity, "available": equity}
+
+    def quote(self, symbol: str) -> Tuple[float, float]:
+        """Current (bid, ask)."""
+        mid, half = self._mid[symbol], self.spread.half_spread(symbol)
+        return mid - half, mid + half
+
+    def execute_order(self, intent: OrderIntent) -> OrderResult:
+        with self._lock:
+            return self._execute(intent)
+
+    def _execute(self, intent: OrderIntent) -> OrderResult:
+        latency = self.latency.sample()
+        submitted = self.clock.now
+        arrival = self.clock.advance(latency)
+        order = SimOrder(f"sim_{next(self._ids)}", intent, 0, submitted, arrival, latency)
+        self.orders[order.order_id] = order
+
+        error = self._validate(intent)
+        if error:
+            order.status = OrderStatus.REJECTED.value
+            return self._result(order, error)
+        order.side = _sign(intent.direction)
+
+        bid, ask = self.quote(intent.symbol)
+        best = ask if order.side > 0 else bid
+        order_type = getattr(intent.order_type, "value", intent.order_type)
+        if order_type == OrderType.MARKET.value:
+            self._take(order, best, limit=None, ts=arrival)
+            order.status = OrderStatus.FILLED.value if order.remaining <= EPS_LOTS else OrderStatus.PARTIAL.value
+        elif order_type == OrderType.LIMIT.value:
+            if order.side * (intent.limit_price - best) >= 0:  # Marketable
+                self._take(order, best, limit=intent.limit_price, ts=arrival)
+            self._rest(order)
+        else:  # STOP
+            if order.side * (best - intent.limit_price) >= 0:  # Already triggered
+                self._take(order, best, limit=None, ts=arrival)
+                order.status = OrderStatus.FILLED.value if order.remaining <= EPS_LOTS else OrderStatus.PARTIAL.value
+            else:
+                self._rest(order)
+        return self._result(order)
+
+    def get_status(self, broker_order_id: str) -> OrderResult:
+        order = self.orders.get(broker_order_id)
+        if order is None:
+            return OrderResult(status=OrderStatus.REJECTED.value, error_message="Unknown order",
+                               timestamp=self.clock.now)
+        return self._result(order)
+
+    # --- Orders and positions ---
+
+    def cancel_order(self, order_id: str) -> bool:
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None or order_id not in self._working.get(order.intent.symbol, {}):
+                return False
+            del self._working[order.intent.symbol][order_id]
+            order.status = OrderStatus.PARTIAL.value if order.filled > 0 else OrderStatus.CANCELLED.value
+            return True
+
+    def close_position(self, deal_id: str, reason: str = "MANUAL") -> float:
+        """Closes a deal at the current bid/ask; returns realized PnL."""
+        with self._lock:
+            pos = self.portfolio.positions[deal_id]
+            bid, ask = self.quote(pos.symbol)
+            return self._exit(deal_id, bid if pos.direction > 0 else ask, self.clock.now, reason)
+
+    def attach_bracket(self, deal_id: str, stop_loss: Optional[float], take_profit: Optional[float]) -> None:
+        """Sets SL/TP price levels on an open deal; raises if a level is on the wrong side."""
+        with self._lock:
+            pos = self.portfolio.positions[deal_id]
+            bid, ask = self.quote(pos.symbol)
+            exit_price = bid if pos.direction > 0 else ask
+            if stop_loss is not None and pos.direction * (exit_price - stop_loss) <= 0:
+                raise ValueError(f"Stop loss {stop_loss} on the wrong side of {exit_price}")
+            if take_profit is not None and pos.direction * (take_profit - exit_price) <= 0:
+                raise ValueError(f"Take profit {take_profit} on the wrong side of {exit_price}")
+            self._brackets.setdefault(pos.symbol, {})[deal_id] = (stop_loss, take_profit)
+
+    @property
+    def working_orders(self) -> List[SimOrder]:
+        return [o for orders in self._working.values() for o in orders.values()]
+
+    def fetch_state(self, since: Optional[datetime] = None, deal_ids=()) -> BrokerState:
+        """Open deals, resting orders and trades closed since `since` (reconciliation)."""
+        since = _utc(since) if since is not None else None
+        with self._lock:
+            state = BrokerState()
+            for deal_id, pos in self.portfolio.positions.items():
+                stop_level, limit_level = self._brackets.get(pos.symbol, {}).get(deal_id, (None, None))
+                state.positions[deal_id] = {
+                    "deal_reference": None, "symbol": pos.symbol,
+                    "direction": "BUY" if pos.direction > 0 else "SELL", "size": pos.size,
+                    "level": pos.entry_price, "stop_level": stop_level, "limit_level": limit_level,
+                }
+            for order in self.working_orders:
+                state.working_orders[order.order_id] = {
+                    "symbol": order.intent.symbol, "direction": order.intent.direction.value,
+                    "size": order.remaining, "level": order.intent.limit_price,
+                }
+            for trade in self.trades:
+                if since is None or trade["closed_at"] >= since:
+                    state.closed[trade["deal_id"]] = {"exit_price": trade["exit_price"], "pnl": trade["pnl"],
+                                                      "closed_at": trade["closed_at"]}
+        return state
+
+    # --- Market data ---
+
+    def on_quote(self, symbol: str, price: float, ts=None) -> None:
+        """Single price update (e.g. the last close in PAPER mode)."""
+        ts = self.clock.advance_to(_utc(ts)) if ts is not None else self.clock.now
+        self.on_bar(symbol, ts, price, price, price, price, bar_seconds=0.0)
+
+    def on_bar(self, symbol: str, ts, open_: float, high: float, low: float, close: float,
+               bar_seconds: Optional[float] = None) -> None:
+        """
+        Matches one candle: gaps at the open first, then the bar range.
+        Exits are checked before new fills, so a deal is never stopped out
+        in the bar it was filled in.
+        """
+        with self._lock:
+            self._on_bar(symbol, _utc(ts), open_, high, low, close, bar_seconds)
+
+    def _on_bar(self, symbol: str, ts: datetime, open_: float, high: float, low: float, close: float,
+                bar_seconds: Optional[float]) -> None:
+        start = self.clock.advance_to(ts)
+        end = start + timedelta(seconds=self.bar_seconds if bar_seconds is None else bar_seconds)
+        half = self.spread.half_spread(symbol)
+        self._mid[symbol] = open_
+
+        brackets = self._brackets.get(symbol)
+        if brackets:
+            self._check_brackets(symbol, brackets, open_ - half, high - half, low - half, start)
+
+        working = self._working.get(symbol)
+        if working:
+            for order in list(working.values()):
+                if order.active_at <= end:
+                    self._match_resting(order, open_, high, low, half, start)
+
+        self._mid[symbol] = close
+        self.portfolio.on_price(symbol, close, start)
+        self.clock.advance_to(end)
+
+    def feed(self, symbol: str, candles: pd.DataFrame) -> int:
+        """Matches the candles of `symbol` newer than the last one fed; returns how many."""
+        with self._lock:
+            last = self._last_bar.get(symbol)
+            fed = 0
+            for bar in candles.sort_values("timestamp", kind="stable").itertuples(index=False):
+                ts = _utc(bar.timestamp)
+                if last is not None and ts <= last:
+                    continue
+                self._on_bar(symbol, ts, bar.open, bar.high, bar.low, bar.close, None)
+                last = ts
+                fed += 1
+            if last is not None:
+                self._last_bar[symbol] = last
+            return fed
+
+    def replay(self, candles: pd.DataFrame,
+               on_bar: Optional[Callable[["SimulatedBroker", str, object], None]] = None) -> List[Dict]:
+        """
+        Feeds candles (timestamp, symbol, open, high, low, close) in time
+        order; `on_bar(broker, symbol, bar)` runs after each bar, at its
+        close. Returns the closed trades.
+        """
+        candles = candles.sort_values("timestamp", kind="stable")
+        if "symbol" not in candles.columns:
+            candles = candles.assign(symbol="UNKNOWN")
+        for bar in candles.itertuples(index=False):
+            self.on_bar(bar.symbol, bar.timestamp, bar.open, bar.high, bar.low, bar.close)
+            if on_bar is not None:
+                on_bar(self, bar.symbol, bar)
+        return self.trades
+
+    # --- Internals ---
+
+    def _validate(self, intent: OrderIntent) -> Optional[str]:
+        direction = getattr(intent.direction, "value", intent.direction)
+        if direction not in ("LONG", "SHORT", "BUY", "SELL"):
+            return f"Invalid direction: {direction}"
+        if not intent.quantity or intent.quantity <= 0:
+            return "Quantity must be positive"
+        if intent.symbol not in self._mid:
+            return f"No quote for {intent.symbol}"
+        order_type = getattr(intent.order_type, "value", intent.order_type)
+        if order_type != OrderType.MARKET.value and not intent.limit_price:
+            return f"{order_type} order needs a price (limit_price)"
+        return None
+
+    def _take(self, order: SimOrder, best: float, limit: Optional[float], ts: datetime,
+              max_lots: Optional[float] = None) -> None:
+        wanted = order.remaining if max_lots is None else min(order.remaining, max_lots)
+        filled, price = self.book.walk(order.intent.symbol, wanted, best, order.side, limit)
+        if filled > 0:
+            self._fill(order, filled, price, ts)
+
+    def _rest(self, order: SimOrder) -> None:
+        if order.remaining <= EPS_LOTS:
+            order.status = OrderStatus.FILLED.value
+            return
+        order.status = OrderStatus.PARTIAL.value if order.filled > 0 else OrderStatus.PENDING.value
+        self._working.setdefault(order.intent.symbol, {})[order.order_id] = order
+
+    def _fill(self, order: SimOrder, lots: float, price: float, ts: datetime) -> None:
+        intent = order.intent
+        deal_id = order.order_id if not order.deals else f"{order.order_id}.{len(order.deals)}"
+        order.deals.append(deal_id)
+        order.filled += lots
+        order.cost += lots * price
+        self.portfolio.open_position(deal_id, intent.symbol, order.side, lots, price, ts)
+
+        point = get_point_size(intent.symbol)
+        sl = price - order.side * intent.sl_distance * point if intent.sl_distance else None
+        tp = price + order.side * intent.tp_distance * point if intent.tp_distance else None
+        if sl is not None or tp is not None:
+            self._brackets.setdefault(intent.symbol, {})[deal_id] = (sl, tp)
+
+    def _match_resting(self, order: SimOrder, open_: float, high: float, low: float, half: float,
+                       ts: datetime) -> None:
+        side, level = order.side, order.intent.limit_price
+        # Prices this order would trade at: ask for buys, bid for sells
+        best_open = open_ + side * half
+        best_high, best_low = high + side * half, low + side * half
+        order_type = getattr(order.intent.order_type, "value", order.intent.order_type)
+
+        if order_type == OrderType.LIMIT.value:
+            if (best_low if side > 0 else best_high) * side > level * side:
+                return
+            price = min(best_open, level) if side > 0 else max(best_open, level)
+            self._take(order, price, limit=level, ts=ts, max_lots=self.book.level_lots)
+            if order.remaining <= EPS_LOTS:
+                order.status = OrderStatus.FILLED.value
+                del self._working[order.intent.symbol][order.order_id]
+            else:
+                order.status = OrderStatus.PARTIAL.value
+        else:  # STOP: triggers into a market order
+            if (best_high if side > 0 else best_low) * side < level * side:
+                return
+            price = max(best_open, level) if side > 0 else min(best_open, level)
+            self._take(order, price, limit=None, ts=ts)
+            order.status = OrderStatus.FILLED.value if order.remaining <= EPS_LOTS else OrderStatus.PARTIAL.value
+            del self._working[order.intent.symbol][order.order_id]
+
+    def _check_brackets(self, symbol: str, brackets: Dict, bid_open: float, bid_high: float,
+                        bid_low: float, ts: datetime) -> None:
+        ask_shift = 2 * self.spread.half_spread(symbol)
+        for deal_id, (sl, tp) in list(brackets.items()):
+            side = self.portfolio.positions[deal_id].direction
+            # Longs exit on the bid, shorts on the ask
+            if side > 0:
+                o, worst, best = bid_open, bid_low, bid_high
+            else:
+                o, worst, best = bid_open + ask_shift, bid_high + ask_shift, bid_low + ask_shift
+            if sl is not None and side * (o - sl) <= 0:
+                self._exit(deal_id, o, ts, "SL")  # Gapped through the stop
+            elif tp is not None and side * (o - tp) >= 0:
+                self._exit(deal_id, o, ts, "TP")
+            elif sl is not None and side * (worst - sl) <= 0:
+                self._exit(deal_id, sl, ts, "SL")
+            elif tp is not None and side * (best - tp) >= 0:
+                self._exit(deal_id, tp, ts, "TP")
+
+    def _exit(self, deal_id: str, price: float, ts: datetime, reason: str) -> float:
+        pos = self.portfolio.positions[deal_id]
+        realized = self.portfolio.close_position(deal_id, price, ts)
+        self._brackets.get(pos.symbol, {}).pop(deal_id, None)
+        self.trades.append({
+            "deal_id": deal_id, "symbol": pos.symbol, "direction": "LONG" if pos.direction > 0 else "SHORT",
+            "size": pos.size, "entry_price": pos.entry_price, "exit_price": price,
+            "opened_at": pos.opened_at, "closed_at": ts, "pnl": realized, "reason": reason,
+        })
+        return realized
+
+    def _result(self, order: SimOrder, error: Optional[str] = None) -> OrderResult:
+        return OrderResult(
+            status=order.status,
+            broker_order_id=order.order_id,
+            filled_price=order.avg_price,
+            filled_quantity=order.filled,
+            timestamp=order.active_at,
+            error_message=error,
+            raw_response={"latency_s": order.latency_s, "submitted_at": order.submitted_at,
+                          "remaining": order.remaining, "deals": list(order.deals)},
+        )
@@ -13,6 +13,13 @@ class Config:
     STRATEGY = "baseline_sma_cross"
     # Winner: SMA 10/30 (Aggressive)
     STRATEGY_PARAMS = {"fast_period": 10, "slow_period": 30, "use_rsi_filter": True}
+
+    # Signal Matrix: (symbol x strategy x params) cells evaluated concurrently per cycle.
+    # Empty -> single STRATEGY on SYMBOL. Example cell:
+    # {"symbol": "EURUSD", "strategy": "baseline_sma_cross", "params": {"fast_period": 20, "slow_period": 50}, "priority": 1}
+    SIGNAL_MATRIX = []
+    SIGNAL_LATENCY_BUDGET_S = 20.0
+    SIGNAL_WORKERS = 4
     
     # Risk Management
     RISK_CONFIG = RiskConfig(
@@ -30,6 +37,18 @@ class Config:
     DATA_PROVIDER = os.getenv("DATA_PROVIDER", "polygon") # Options: yfinance, mock, ig, twelvedata, polygon
     BROKER = os.getenv("BROKER", "ig") # Options: mock, ig
 
+    # Scheduler (execution/scheduler.py): UTC cron expressions, limits in seconds
+    CYCLE_DELAY_S = 5           # After bar close, so the broker has published the candle
+    CYCLE_TIMEOUT_S = 900
+    CYCLE_CATCH_UP_S = 900      # Bar close missed while down is still traded if this recent
+    HEALTH_SCHEDULE = "0 */5 * * *"
+    SUMMARY_SCHEDULE = "0 22 * * *"
+    BACKFILL_SCHEDULE = "30 22 * * *"
+    BACKFILL_HISTORY = 500      # Candles per (symbol, timeframe) re-fetched into the feature store
+
+    # Backtests: resolve bars touching both SL and TP on data/processed/{SYMBOL}/M1.csv when it exists
+    INTRABAR_RESOLUTION = os.getenv("INTRABAR_RESOLUTION", "true").lower() == "true"
+
     # Safety & Broker
     LIVE_TRADING_ENABLED = os.getenv("LIVE_TRADING_ENABLED", "false").lower() == "true"
     BROKER_ALLOWLIST = ["EURUSD", "USDJPY", "GBPUSD", "AUDUSD", "USDCAD"] # Allowed execution symbols
@@ -1,15 +1,58 @@
+"""
+Trade Database Module
+
+Engine, sessions and bulk writes for the trade store:
+
+1. SQLite: WAL journal, synchronous=NORMAL (DB_SQLITE_SYNCHRONOUS), busy
+   timeout, set on every pooled connection. Postgres: pool sized by
+   DB_POOL_SIZE / DB_MAX_OVERFLOW, pre-ping and recycle.
+2. bulk_insert / bulk_upsert write many rows in one transaction with
+   executemany, in chunks of BULK_CHUNK (backtests, reconciliation).
+   bulk_upsert finds existing rows with one indexed IN query per chunk.
+3. init_db creates missing tables, then applies pending schema migrations
+   (execution.core.migrations).
+"""
+
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import bindparam, create_engine, event, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./trades.db")
+if DATABASE_URL.startswith("postgres://"):
+    DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))
+SQLITE_SYNCHRONOUS = os.getenv("DB_SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = 30_000
+BULK_CHUNK = 500
+
 
-# Create engine - use check_same_thread only for SQLite
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args["check_same_thread"] = False
+def _sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
+
+def make_engine(url: str = DATABASE_URL) -> Engine:
+    """Engine tuned for the backend behind `url`."""
+    if url.startswith("sqlite"):
+        # check_same_thread only for SQLite
+        tuned = create_engine(url, connect_args={"check_same_thread": False})
+        event.listen(tuned, "connect", _sqlite_pragmas)
+        return tuned
+    return create_engine(url, pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_pre_ping=True,
+                         pool_recycle=POOL_RECYCLE_S)
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -23,7 +66,79 @@ def get_db():
         db.close()
 
 
-def init_db():
-    """Initialize database tables."""
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """Session committed on success, rolled back on error."""
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def init_db(bind: Engine = None):
+    """Initialize database tables and apply pending migrations."""
     from execution.core.models import TradeResult  # noqa: F401
-    Base.metadata.create_all(bind=engine)
+    from execution.core.migrations import migrate
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    migrate(bind)
+
+
+def _chunks(rows: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """Chunks of BULK_CHUNK rows sharing one key set (executemany needs uniform parameters)."""
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    for group in groups.values():
+        for i in range(0, len(group), BULK_CHUNK):
+            yield group[i:i + BULK_CHUNK]
+
+
+def bulk_insert(model, rows: Iterable[Dict[str, Any]], bind: Engine = None) -> int:
+    """Inserts `rows` (column dicts) in one transaction; returns how many."""
+    rows = list(rows)
+    if not rows:
+        return 0
+    with (bind or engine).begin() as conn:
+        for chunk in _chunks(rows):
+            conn.execute(insert(model.__table__), chunk)
+    return len(rows)
+
+
+def bulk_upsert(model, rows: Iterable[Dict[str, Any]], key: str, bind: Engine = None) -> Tuple[int, int]:
+    """
+    Inserts rows whose `key` column value is new, updates the others (last
+    row wins for a repeated key). One transaction; returns (inserted, updated).
+    """
+    table = model.__table__
+    pk = table.primary_key.columns.values()[0]
+    key_col = table.c[key]
+    by_key = {row[key]: row for row in rows}
+    if not by_key:
+        return 0, 0
+    inserted = updated = 0
+    with (bind or engine).begin() as conn:
+        keys = list(by_key)
+        existing: Dict[Any, Any] = {}
+        for i in range(0, len(keys), BULK_CHUNK):
+            chunk = keys[i:i + BULK_CHUNK]
+            existing.update({k: pk_value for pk_value, k in
+                             conn.execute(select(pk, key_col).where(key_col.in_(chunk)))})
+
+        updates = [{"_pk": existing[k], **{c: v for c, v in row.items() if c != pk.name}}
+                   for k, row in by_key.items() if k in existing]
+        for chunk in _chunks(updates):
+            columns = {c: bindparam(c) for c in chunk[0] if c != "_pk"}
+            conn.execute(update(table).where(pk == bindparam("_pk")).values(**columns), chunk)
+            updated += len(chunk)
+
+        new = [row for k, row in by_key.items() if k not in existing]
+        for chunk in _chunks(new):
+            conn.execute(insert(table), chunk)
+            inserted += len(chunk)
+    return inserted, updated
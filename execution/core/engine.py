@@ -1,19 +1,21 @@
 
+import asyncio
 import logging
 import os
 import time
 from execution.brokers.mock_broker import MockBroker
 from execution.brokers.ig_broker import IGBroker
 from execution.strategies.baseline_sma_cross import BaselineSMACross
+from execution.strategy_registry import registry as strategy_registry
 from execution.risk_eval import evaluate_risk
 from execution.risk_limits import RiskConfig
-from execution.execute_order import ExecutionRouter, OrderIntent
+from execution.execute_order import ExecutionRouter, OrderIntent, OrderResult
 from execution.verify_full_pipeline import generate_dummy_data  # Reuse for now
 from data.mcp_client import MCPDataClient
 from data.yfinance_provider import YFinanceDataProvider
 from execution.core.signals import Signal, SignalType
-from execution.core.database import SessionLocal, init_db
-from execution.core.models import TradeResult
+from execution.core.database import bulk_insert, init_db
+from execution.core.models import TradeResult, opens_position
 import uuid
 
 logger = logging.getLogger("ForexPlatform")
@@ -35,9 +37,11 @@ class TradingEngine:
         self.mcp_client = MCPDataClient()
         self.market_data = YFinanceDataProvider()
             
-        # Initialize Strategy (Plugin loader would go here)
+        # Initialize Strategy (any other name is resolved by the strategy registry)
         if self.strategy_name == "SMA_CROSS":
             self.strategy = BaselineSMACross(fast_period=50, slow_period=200)
+        elif self.strategy_name in strategy_registry:
+            self.strategy = strategy_registry.create(self.strategy_name)
         else:
             raise NotImplementedError(f"Strategy {strategy_name} not found")
             
@@ -111,39 +115,41 @@ class TradingEngine:
             order_type="MARKET"
         )
         
-        result = self.router.execute_order(order_intent)
+        result = asyncio.run(self.router.execute_order_async(order_intent))
         logger.info(f"Execution Result: {result}")
         
         # 5. Persist to Database
         self._persist_trade(latest_signal, order_intent, result)
     
-    def _persist_trade(self, signal: Signal, order_intent, result: dict):
+    def _persist_trade(self, signal: Signal, order_intent, result: OrderResult):
         """Persist trade result to database if enabled."""
         if not self.db_enabled:
             return
+        if not opens_position(result):
+            # REJECTED / FAILED / SKIPPED: nothing at the broker to reconcile or summarise
+            logger.info(f"Trade not persisted ({getattr(result, 'status', None)})")
+            return
         
+        row = dict(
+            timestamp=signal.timestamp,
+            symbol=signal.symbol,
+            direction=signal.direction,
+            entry_price=signal.entry_price,
+            quantity=order_intent.quantity,
+            stop_loss=signal.stop_loss,
+            take_profit=signal.take_profit,
+            status="OPEN",
+            broker_order_id=result.broker_order_id if result else None,
+            fill_price=result.filled_price if result else None,
+            latency_ms=(result.raw_response or {}).get("latency_ms") if result else None,
+            rationale=signal.rationale[:500] if signal.rationale else None
+        )
         try:
-            db = SessionLocal()
-            trade = TradeResult(
-                timestamp=signal.timestamp,
-                symbol=signal.symbol,
-                direction=signal.direction,
-                entry_price=signal.entry_price,
-                quantity=order_intent.quantity,
-                stop_loss=signal.stop_loss,
-                take_profit=signal.take_profit,
-                status="OPEN",
-                broker_order_id=result.get("order_id") if result else None,
-                rationale=signal.rationale[:500] if signal.rationale else None
-            )
-            db.add(trade)
-            db.commit()
-            logger.info(f"Trade persisted to DB: {trade}")
+            # One pooled-connection transaction, no ORM session per trade
+            bulk_insert(TradeResult, [row])
+            logger.info(f"Trade persisted to DB: {row['symbol']} {row['direction']} ({row['broker_order_id']})")
         except Exception as e:
             logger.error(f"Failed to persist trade: {e}")
-        finally:
-            db.close()
-
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
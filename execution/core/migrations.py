@@ -0,0 +1,100 @@
+"""
+Schema Migrations Module
+
+Numbered, forward-only schema revisions (Alembic-style, no extra
+dependency). Applied versions are recorded in `schema_migrations`; each
+revision runs in its own transaction together with its version row.
+
+To change the schema, change the model and append a revision to
+MIGRATIONS. Fresh databases get the current schema from create_all and
+still record every revision, so the steps must be idempotent.
+
+    python -m execution.core.migrations            # apply pending revisions
+    python -m execution.core.migrations --status   # show applied / pending
+"""
+
+import argparse
+import logging
+from datetime import datetime
+from typing import Callable, List, Set, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from execution.core.database import Base, engine
+
+logger = logging.getLogger("ForexPlatform")
+
+
+def add_missing_columns(conn: Connection) -> None:
+    """Adds nullable model columns that an existing table predates (create_all only creates tables)."""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing and column.nullable:
+                col_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+
+
+def add_missing_indexes(conn: Connection) -> None:
+    """Creates model indexes that an existing table predates."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+
+
+# (version, description, step) - append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "trade_results: fill_price, latency_ms, closed_at", add_missing_columns),
+    (2, "trade_results: indexes on timestamp, (symbol, timestamp), status, broker_order_id", add_missing_indexes),
+]
+
+
+def _ensure_table(bind: Engine) -> None:
+    with bind.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, description VARCHAR(200) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+
+
+def applied_versions(bind: Engine = None) -> Set[int]:
+    bind = bind or engine
+    _ensure_table(bind)
+    with bind.connect() as conn:
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def migrate(bind: Engine = None) -> List[int]:
+    """Applies pending revisions in order; returns the versions applied."""
+    from execution.core.models import TradeResult  # noqa: F401  (registers the tables)
+    bind = bind or engine
+    done = applied_versions(bind)
+    applied = []
+    for version, description, step in MIGRATIONS:
+        if version in done:
+            continue
+        with bind.begin() as conn:
+            step(conn)
+            conn.execute(text("INSERT INTO schema_migrations (version, description, applied_at) "
+                              "VALUES (:v, :d, :t)"), {"v": version, "d": description, "t": datetime.utcnow()})
+        logger.info(f"Schema migration {version} applied: {description}")
+        applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Trade database schema migrations")
+    parser.add_argument("--status", action="store_true", help="List applied and pending revisions")
+    args = parser.parse_args()
+    if args.status:
+        done = applied_versions()
+        for version, description, _ in MIGRATIONS:
+            print(f"{version:>4}  {'applied' if version in done else 'pending':<8} {description}")
+    else:
+        from execution.core.database import init_db
+        init_db()
+        print(f"Schema at version {max(applied_versions(), default=0)}")
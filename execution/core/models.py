@@ -1,17 +1,29 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, Enum as SQLEnum
 from execution.core.database import Base
 from execution.core.signals import SignalType
 
+# Order outcomes that leave a position (or a deal still being confirmed) at the broker
+OPEN_ORDER_STATUSES = ("FILLED", "PARTIAL", "SUBMITTED")
+
+
+def opens_position(result) -> bool:
+    """True if an OrderResult should be recorded as an OPEN trade."""
+    status = getattr(result, "status", None)
+    return getattr(status, "value", status) in OPEN_ORDER_STATUSES
+
 
 class TradeResult(Base):
     """
     Persisted record of an executed trade.
     """
     __tablename__ = "trade_results"
+    __table_args__ = (
+        Index("ix_trade_results_symbol_timestamp", "symbol", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     symbol = Column(String(20), nullable=False)
     direction = Column(String(10), nullable=False)  # LONG, SHORT
     entry_price = Column(Float, nullable=False)
@@ -20,8 +32,11 @@ class TradeResult(Base):
     stop_loss = Column(Float, nullable=True)
     take_profit = Column(Float, nullable=True)
     pnl = Column(Float, nullable=True)  # Null until closed
-    status = Column(String(20), default="OPEN", nullable=False)  # OPEN, CLOSED, CANCELLED
-    broker_order_id = Column(String(100), nullable=True)
+    status = Column(String(20), default="OPEN", nullable=False, index=True)  # OPEN, CLOSED, CANCELLED
+    broker_order_id = Column(String(100), nullable=True, index=True)
+    fill_price = Column(Float, nullable=True)  # Broker-confirmed level (entry_price is the signal's)
+    latency_ms = Column(Float, nullable=True)  # Submit -> confirmation
+    closed_at = Column(DateTime, nullable=True)  # Set by the reconciliation worker
     rationale = Column(String(500), nullable=True)
     
     def __repr__(self):
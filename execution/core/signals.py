@@ -1,5 +1,10 @@
 from enum import Enum, auto
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import List
+
+import numpy as np
+import pandas as pd
 from pydantic import BaseModel, Field, ConfigDict
 
 class SignalType(str, Enum):
@@ -28,3 +33,125 @@ class Signal(BaseModel):
         if isinstance(self.signal_type, str):
             return self.signal_type
         return self.signal_type.value
+
+
+# --- Hot-path signal types ---------------------------------------------------
+# Signal (pydantic) is the validated form used at the pipeline boundary
+# (run_cycle, risk, notifier, DB). Backtests and sweeps create thousands of
+# signals; they use FastSignal (slotted, unvalidated) or SignalFrame
+# (columnar) and validate only what leaves the hot loop.
+
+_DIRECTION_SIGN = {"LONG": 1, "SHORT": -1, "NEUTRAL": 0}
+_SIGN_DIRECTION = {1: "LONG", -1: "SHORT", 0: "NEUTRAL"}
+
+
+@dataclass(slots=True)
+class FastSignal:
+    """Unvalidated Signal with the same fields (attribute-compatible)."""
+    symbol: str
+    timestamp: datetime
+    signal_type: str
+    entry_price: float
+    stop_loss: float
+    take_profit: float
+    rationale: str = ""
+    metadata: dict = field(default_factory=dict)
+
+    @property
+    def direction(self) -> str:
+        return self.signal_type
+
+    @classmethod
+    def from_signal(cls, signal: Signal) -> "FastSignal":
+        return cls(signal.symbol, signal.timestamp, signal.direction, signal.entry_price, signal.stop_loss,
+                   signal.take_profit, signal.rationale, dict(signal.metadata))
+
+    def to_dict(self) -> dict:
+        return {
+            "symbol": self.symbol, "timestamp": self.timestamp, "signal_type": self.signal_type,
+            "direction": self.signal_type, "entry_price": self.entry_price, "stop_loss": self.stop_loss,
+            "take_profit": self.take_profit, "rationale": self.rationale, "metadata": self.metadata,
+        }
+
+    def to_signal(self) -> Signal:
+        """Validated Signal (raises pydantic.ValidationError on bad fields)."""
+        return Signal(
+            symbol=self.symbol, timestamp=self.timestamp, signal_type=self.signal_type,
+            entry_price=self.entry_price, stop_loss=self.stop_loss, take_profit=self.take_profit,
+            rationale=self.rationale, metadata=self.metadata,
+        )
+
+
+class SignalFrame:
+    """
+    Columnar batch of signals for backtests.
+
+    Prices are float64 arrays, direction is int8 (+1 LONG / -1 SHORT),
+    timestamps are a pandas Index (tz kept). Iterating yields FastSignals.
+    """
+
+    __slots__ = ("symbol", "timestamp", "direction", "entry_price", "stop_loss", "take_profit",
+                 "rationale", "metadata")
+
+    def __init__(self, symbol, timestamp, direction, entry_price, stop_loss, take_profit,
+                 rationale=None, metadata=None):
+        n = len(entry_price)
+        self.symbol = np.asarray(symbol, dtype=object) if not isinstance(symbol, str) else np.full(n, symbol, dtype=object)
+        self.timestamp = pd.Index(timestamp)
+        self.direction = np.asarray(direction, dtype=np.int8)
+        self.entry_price = np.asarray(entry_price, dtype=np.float64)
+        self.stop_loss = np.asarray(stop_loss, dtype=np.float64)
+        self.take_profit = np.asarray(take_profit, dtype=np.float64)
+        self.rationale = list(rationale) if rationale is not None else [""] * n
+        self.metadata = list(metadata) if metadata is not None else [{} for _ in range(n)]
+
+    @classmethod
+    def empty(cls) -> "SignalFrame":
+        return cls([], pd.DatetimeIndex([]), [], [], [], [])
+
+    @classmethod
+    def from_signals(cls, signals) -> "SignalFrame":
+        """From Signal / FastSignal objects (or dicts with the same keys)."""
+        rows = [FastSignal(**{k: v for k, v in s.items() if k != "direction"}) if isinstance(s, dict) else s
+                for s in signals]
+        if not rows:
+            return cls.empty()
+        return cls(
+            symbol=[s.symbol for s in rows],
+            timestamp=[s.timestamp for s in rows],
+            direction=[_DIRECTION_SIGN[s.direction] for s in rows],
+            entry_price=[s.entry_price for s in rows],
+            stop_loss=[s.stop_loss for s in rows],
+            take_profit=[s.take_profit for s in rows],
+            rationale=[s.rationale for s in rows],
+            metadata=[s.metadata for s in rows],
+        )
+
+    def __len__(self) -> int:
+        return len(self.entry_price)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, i: int) -> FastSignal:
+        return FastSignal(self.symbol[i], self.timestamp[i], _SIGN_DIRECTION[int(self.direction[i])], float(self.entry_price[i]),
+                          float(self.stop_loss[i]), float(self.take_profit[i]), self.rationale[i],
+                          self.metadata[i])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def to_fast(self) -> List[FastSignal]:
+        return list(self)
+
+    def to_signals(self) -> List[Signal]:
+        """Validated Signals (pipeline boundary)."""
+        return [s.to_signal() for s in self]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "timestamp": self.timestamp, "symbol": self.symbol,
+            "direction": [_SIGN_DIRECTION[int(d)] for d in self.direction],
+            "entry_price": self.entry_price, "stop_loss": self.stop_loss, "take_profit": self.take_profit,
+            "rationale": self.rationale,
+        })
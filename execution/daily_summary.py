@@ -20,7 +20,9 @@ from sqlalchemy.orm import Session
 from execution.core.database import engine
 from execution.core.models import TradeResult
 from execution.notifier import DiscordNotifier
-from execution.account import AccountManager
+from execution.notify_dispatcher import get_dispatcher
+from execution.account import get_account
+from execution.journal import get_journal
 
 
 def get_todays_trades(db: Session) -> list:
@@ -71,7 +73,7 @@ def run_daily_summary():
     print(f"[{datetime.now()}] Running Daily Summary...")
     
     # Get current equity
-    account = AccountManager()
+    account = get_account()
     snapshot = account.get_snapshot()
     equity = snapshot.get("equity", 10000)
     
@@ -80,12 +82,17 @@ def run_daily_summary():
     try:
         trades = get_todays_trades(db)
         summary = calculate_summary(trades, equity)
+        # Pipeline cycles that ended in ERROR over the last 24h (indexed journal query)
+        decisions = get_journal().counts(("decision",), days=1)
+        summary["errors_count"] = sum(d["count"] for d in decisions if d["decision"] == "ERROR")
         
         print(f"Summary: {summary}")
         
         # Send to Discord
-        notifier = DiscordNotifier()
+        notifier = DiscordNotifier(dispatcher=get_dispatcher())
         notifier.send_daily_summary(summary)
+        # Short-lived script: deliver before the process exits
+        get_dispatcher().flush(timeout=15)
         
         print(f"[{datetime.now()}] Daily Summary sent to Discord.")
     finally:
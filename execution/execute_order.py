@@ -1,22 +1,35 @@
+import asyncio
+import inspect
 import logging
+import random
 import time
-from typing import Dict
+from typing import List, Optional, Sequence, Union
 from datetime import datetime
-from execution.models import OrderIntent, OrderResult
+from execution.idempotency import IdempotencyLedger
+from execution.models import BracketOrder, BracketResult, OrderIntent, OrderResult
+from execution.safety import SafetyGate
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("ExecutionRouter")
 
+DEFAULT_MAX_PARALLEL = 4
+
+
+def jittered_backoff(attempt: int, base_s: float = 0.5, max_s: float = 8.0) -> float:
+    """Exponential backoff with equal jitter: half fixed, half random."""
+    delay = min(max_s, base_s * (2 ** (attempt - 1)))
+    return delay / 2 + random.uniform(0, delay / 2)
+
 class ExecutionRouter:
     """
     Routes orders to the configured broker and handles basic idempotency and retries.
     """
-    def __init__(self, broker_instance):
+    def __init__(self, broker_instance, ledger: Optional[IdempotencyLedger] = None):
         self.broker = broker_instance
-        # Simple in-memory idempotency check (Limit size to avoid memory leaks)
-        self._processed_orders: Dict[str, OrderResult] = {} 
-        self._max_cache_size = 1000
+        # Idempotency: pass the shared durable ledger (get_ledger()) to survive
+        # restarts and new router instances; the default only lives in memory.
+        self.ledger = ledger if ledger is not None else IdempotencyLedger(path=None)
 
     def execute_order(self, intent: OrderIntent) -> OrderResult:
         """
@@ -25,15 +38,15 @@ class ExecutionRouter:
         """
         logger.info(f"Received Execution Request: {intent}")
 
-        # Idempotency Check
-        if intent.idempotency_key in self._processed_orders:
-            logger.info(f"Idempotency hit for key: {intent.idempotency_key}. Returning cached result.")
-            return self._processed_orders[intent.idempotency_key]
+        # Idempotency Check (key is reserved before the broker is called)
+        duplicate = self._reserve(intent)
+        if duplicate is not None:
+            return duplicate
 
         result = self._execute_with_retry(intent)
         
-        # Cache Result
-        self._cache_result(intent.idempotency_key, result)
+        # Record Result
+        self._record(intent, result)
         
         logger.info(f"Execution Result for {intent.idempotency_key}: {result.status}")
         return result
@@ -60,22 +73,138 @@ class ExecutionRouter:
                         timestamp=datetime.utcnow()
                     )
                 
-                # Simple backoff: 0.5s, 1.0s, 2.0s...
-                time.sleep(0.5 * (2 ** (attempt - 1)))
+                # Jittered backoff: ~0.5s, ~1.0s, ~2.0s...
+                time.sleep(jittered_backoff(attempt))
         
         # Should be unreachable given return in loop
         return OrderResult(status="FAILED", error_message="Unknown retry error")
 
-    def _cache_result(self, key: str, result: OrderResult):
+    async def execute_order_async(self, intent: OrderIntent) -> OrderResult:
+        """
+        Async variant of execute_order: awaits the broker's
+        execute_order_async (e.g. IG submit + deal confirmation) when it has
+        one, otherwise runs execute_order in a worker thread.
+        """
+        duplicate = self._reserve(intent)
+        if duplicate is not None:
+            return duplicate
+
+        result = await self._execute_with_retry_async(intent)
+        self._record(intent, result)
+        logger.info(f"Execution Result for {intent.idempotency_key}: {result.status}")
+        return result
+
+    async def _execute_with_retry_async(self, intent: OrderIntent) -> OrderResult:
+        max_retries = 3
+        execute_async = getattr(self.broker, "execute_order_async", None)
+        if not inspect.iscoroutinefunction(execute_async):
+            execute_async = None
+
+        for attempt in range(1, max_retries + 1):
+            try:
+                if execute_async is not None:
+                    return await execute_async(intent)
+                return await asyncio.to_thread(self.broker.execute_order, intent)
+            except Exception as e:
+                logger.warning(f"Execution attempt {attempt} failed: {e}")
+                if attempt == max_retries:
+                    logger.error(f"Max retries reached. Execution Failed: {e}", exc_info=True)
+                    return OrderResult(status="FAILED", error_message=str(e), timestamp=datetime.utcnow())
+                await asyncio.sleep(jittered_backoff(attempt))
+
+        return OrderResult(status="FAILED", error_message="Unknown retry error")
+
+    def execute_batch(self, orders: Sequence[Union[OrderIntent, BracketOrder]],
+                      max_parallel: int = DEFAULT_MAX_PARALLEL,
+                      open_lots: Optional[float] = None) -> List[Union[OrderResult, BracketResult]]:
+        """Sync wrapper around execute_batch_async."""
+        return asyncio.run(self.execute_batch_async(orders, max_parallel, open_lots))
+
+    async def execute_batch_async(self, orders: Sequence[Union[OrderIntent, BracketOrder]],
+                                  max_parallel: int = DEFAULT_MAX_PARALLEL,
+                                  open_lots: Optional[float] = None) -> List[Union[OrderResult, BracketResult]]:
         """
-        Caches the result, maintaining a maximum size limit.
+        Validates all orders through SafetyGate in one pass, then dispatches
+        the valid ones concurrently (at most `max_parallel` in flight).
+        Results come back in input order; blocked orders get a REJECTED result.
+        open_lots: lots already open (default: the shared PortfolioRiskEngine),
+        counted against max_open_lots together with the batch.
+        """
+        intents = [o.entry if isinstance(o, BracketOrder) else o for o in orders]
+        reasons = SafetyGate.validate_batch(intents, open_lots)
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        async def dispatch(order, reason):
+            if reason is not None:
+                rejected = OrderResult(status="REJECTED", error_message=reason, timestamp=datetime.utcnow())
+                return BracketResult("REJECTED", rejected, error_message=reason) if isinstance(order, BracketOrder) else rejected
+            async with semaphore:
+                if isinstance(order, BracketOrder):
+                    return await self.execute_bracket_async(order)
+                return await self.execute_order_async(order)
+
+        logger.info(f"Batch: {len(orders)} orders, {reasons.count(None)} passed SafetyGate")
+        return list(await asyncio.gather(*(dispatch(o, r) for o, r in zip(orders, reasons))))
+
+    async def execute_bracket_async(self, bracket: BracketOrder) -> BracketResult:
         """
-        if len(self._processed_orders) >= self._max_cache_size:
-            # Simple eviction: remove one arbitrary item (FIFO in Python 3.7+)
-            # Not optimally efficient for large caches but fine for this scale.
-            self._processed_orders.pop(next(iter(self._processed_orders)))
-            
-        self._processed_orders[key] = result
+        Entry first; once it fills, the stop loss / take profit levels are
+        attached to its deal(s). If attaching fails, the entry is closed
+        again (cancel-on-failure), so no unprotected position is left.
+        """
+        attach = getattr(self.broker, "attach_bracket_async", None) or getattr(self.broker, "attach_bracket", None)
+        close = getattr(self.broker, "close_position_async", None) or getattr(self.broker, "close_position", None)
+        if attach is None or close is None:
+            msg = f"{type(self.broker).__name__} does not support bracket orders"
+            rejected = OrderResult(status="REJECTED", error_message=msg, timestamp=datetime.utcnow())
+            return BracketResult("REJECTED", rejected, error_message=msg)
+
+        entry = await self.execute_order_async(bracket.entry)
+        if entry.status not in ("FILLED", "PARTIAL"):
+            msg = None if entry.status in ("REJECTED", "FAILED", "SKIPPED") else "Entry not confirmed, levels not attached"
+            return BracketResult(entry.status, entry, error_message=msg or entry.error_message)
+        if bracket.stop_loss is None and bracket.take_profit is None:
+            return BracketResult("FILLED", entry)
+
+        deals = (entry.raw_response or {}).get("deals") or [entry.broker_order_id]
+        try:
+            for deal_id in deals:
+                await self._call(attach, deal_id, bracket.stop_loss, bracket.take_profit)
+        except Exception as e:
+            logger.error(f"Bracket for {bracket.entry.idempotency_key} failed ({e}); closing entry")
+            for deal_id in deals:
+                try:
+                    await self._call(close, deal_id)
+                except Exception as close_error:
+                    logger.critical(f"Could not close unprotected deal {deal_id}: {close_error}")
+                    return BracketResult("FAILED", entry, error_message=f"Bracket failed and close failed: {close_error}")
+            return BracketResult("CANCELLED", entry, error_message=f"Bracket failed: {e}")
+
+        return BracketResult("FILLED", entry, bracket.stop_loss, bracket.take_profit)
+
+    @staticmethod
+    async def _call(fn, *args):
+        if inspect.iscoroutinefunction(fn):
+            return await fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    def _reserve(self, intent: OrderIntent) -> Optional[OrderResult]:
+        """Claims the intent's key; returns the earlier result for a duplicate."""
+        entry = self.ledger.reserve(intent.idempotency_key)
+        if entry is None:
+            return None
+        if entry.result is not None:
+            logger.info(f"Idempotency hit for key: {intent.idempotency_key}. Returning cached result.")
+            return entry.result
+        logger.warning(f"Idempotency hit for key: {intent.idempotency_key}: order in flight or outcome unknown.")
+        return OrderResult(status="SKIPPED", error_message="Duplicate Order (in flight)", timestamp=datetime.utcnow())
+
+    def _record(self, intent: OrderIntent, result: OrderResult) -> None:
+        """Stores an accepted outcome; frees the key after a failure so the order can be retried."""
+        if result.status == "FAILED":
+            self.ledger.release(intent.idempotency_key)
+        else:
+            self.ledger.complete(intent.idempotency_key, result)
 
 if __name__ == "__main__":
     print("Execution Router Module Loaded")
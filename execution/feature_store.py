@@ -0,0 +1,224 @@
+"""
+Feature Store Module
+
+Computes a standard feature matrix per (symbol, timeframe) once after each
+closed bar and persists it next to the candle store:
+
+    execution/data/features/{symbol}/{timeframe}.parquet
+
+Features (column names):
+    sma_{n}, ema_{n}             SMA / EMA grids on close
+    atr_{n}, rsi_{n}, adx_{n}    Same formulas as BaselineSMACross / the playground
+    bb_mid|bb_upper|bb_lower_{n} Bollinger Bands (n, BB_STD_DEV)
+    {session}_high|_low          Running high/low of today's session (UTC), no lookahead
+
+Strategies, the optimizer and the dashboard read column slices instead of
+recomputing:
+
+    store = FeatureStore()
+    store.update("USDJPY", "H1", candles)          # after each bar close
+    store.load("USDJPY", "H1", columns=["sma_20", "atr_14"])
+    strategy.calculate(candles, {"indicators": store.view("USDJPY", "H1", candles)})
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from execution.signal_matrix import IndicatorCache
+
+logger = logging.getLogger("ForexPlatform")
+
+DEFAULT_ROOT = Path(__file__).resolve().parent / "data" / "features"
+
+SMA_PERIODS = (5, 10, 20, 30, 50, 100, 200)
+EMA_PERIODS = (9, 21, 50, 100, 200)
+ATR_PERIODS = (14,)
+RSI_PERIODS = (14,)
+ADX_PERIODS = (14,)
+BB_PERIODS = (20,)
+BB_STD_DEV = 2.0
+
+# UTC hours [start, end)
+SESSIONS = {"asia": (0, 7), "london": (7, 16), "newyork": (13, 22)}
+
+
+# --- Indicators ---
+
+def true_range(df: pd.DataFrame) -> pd.Series:
+    prev_close = df["close"].shift()
+    return pd.concat([df["high"] - df["low"], (df["high"] - prev_close).abs(),
+                      (df["low"] - prev_close).abs()], axis=1).max(axis=1)
+
+
+def rsi(close: pd.Series, n: int) -> pd.Series:
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=n).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=n).mean()
+    return 100 - (100 / (1 + gain / loss))
+
+
+def adx(df: pd.DataFrame, n: int, tr: Optional[pd.Series] = None) -> pd.Series:
+    """ADX with EMA (alpha=1/n) smoothing, as in the playground's SmaRsiAdxStrategy."""
+    tr = true_range(df) if tr is None else tr
+    up_move = df["high"] - df["high"].shift()
+    down_move = df["low"].shift() - df["low"]
+    plus_dm = pd.Series(np.where((up_move > down_move) & (up_move > 0), up_move, 0.0), index=df.index)
+    minus_dm = pd.Series(np.where((down_move > up_move) & (down_move > 0), down_move, 0.0), index=df.index)
+
+    tr_s = tr.ewm(alpha=1 / n, min_periods=n).mean()
+    plus_di = 100 * plus_dm.ewm(alpha=1 / n, min_periods=n).mean() / tr_s
+    minus_di = 100 * minus_dm.ewm(alpha=1 / n, min_periods=n).mean() / tr_s
+    dx = 100 * (plus_di - minus_di).abs() / (plus_di + minus_di)
+    return dx.ewm(alpha=1 / n, min_periods=n).mean()
+
+
+def session_levels(df: pd.DataFrame) -> Dict[str, pd.Series]:
+    """Running high/low per UTC day and session; NaN before the session opens."""
+    ts = pd.to_datetime(df["timestamp"], utc=True)
+    day, hour = ts.dt.floor("D"), ts.dt.hour
+    levels = {}
+    for name, (start, end) in SESSIONS.items():
+        in_session = (hour >= start) & (hour < end)
+        high = df["high"].where(in_session).groupby(day).cummax()
+        low = df["low"].where(in_session).groupby(day).cummin()
+        levels[f"{name}_high"] = high.groupby(day).ffill()
+        levels[f"{name}_low"] = low.groupby(day).ffill()
+    return levels
+
+
+def compute_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Feature matrix for normalized candles (timestamp, open, high, low, close)."""
+    close = df["close"].astype(float)
+    cols: Dict[str, pd.Series] = {"timestamp": df["timestamp"]}
+
+    for n in SMA_PERIODS:
+        cols[f"sma_{n}"] = close.rolling(window=n).mean()
+    for n in EMA_PERIODS:
+        cols[f"ema_{n}"] = close.ewm(span=n, adjust=False, min_periods=n).mean()
+
+    tr = true_range(df)
+    for n in ATR_PERIODS:
+        cols[f"atr_{n}"] = tr.rolling(window=n).mean()
+    for n in RSI_PERIODS:
+        cols[f"rsi_{n}"] = rsi(close, n)
+    for n in ADX_PERIODS:
+        cols[f"adx_{n}"] = adx(df, n, tr)
+    for n in BB_PERIODS:
+        mid, std = close.rolling(n).mean(), close.rolling(n).std()
+        cols[f"bb_mid_{n}"] = mid
+        cols[f"bb_upper_{n}"] = mid + BB_STD_DEV * std
+        cols[f"bb_lower_{n}"] = mid - BB_STD_DEV * std
+
+    cols.update(session_levels(df))
+    return pd.DataFrame(cols, index=df.index)
+
+
+def _utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+class FeatureView(IndicatorCache):
+    """
+    IndicatorCache backed by stored features (aligned to the candles).
+
+    Columns the store does not have (e.g. an unusual SMA period) are computed
+    and memoized like a plain IndicatorCache.
+    """
+
+    def __init__(self, df: pd.DataFrame, features: pd.DataFrame):
+        super().__init__(df)
+        self.features = features
+
+    def _get(self, key, compute):
+        column = f"{key[0]}_{key[1]}"
+        if column in self.features.columns:
+            return self.features[column]
+        return super()._get(key, compute)
+
+
+class FeatureStore:
+    """Per (symbol, timeframe) feature matrices, persisted as Parquet."""
+
+    def __init__(self, root: Path = DEFAULT_ROOT):
+        self.root = Path(root)
+        self._memory: Dict[tuple, pd.DataFrame] = {}
+
+    def path(self, symbol: str, timeframe: str) -> Path:
+        return self.root / symbol / f"{timeframe}.parquet"
+
+    def update(self, symbol: str, timeframe: str, candles: pd.DataFrame) -> pd.DataFrame:
+        """
+        Recomputes and persists features when `candles` has a bar the store
+        has not seen; otherwise returns the stored matrix.
+        """
+        if candles.empty:
+            return pd.DataFrame()
+        last_ts = pd.Timestamp(candles["timestamp"].iloc[-1])
+        stored = self._read(symbol, timeframe)
+        if stored is not None and not stored.empty and pd.Timestamp(stored["timestamp"].iloc[-1]) == last_ts \
+                and len(stored) >= len(candles):
+            return stored
+
+        features = compute_features(candles.reset_index(drop=True))
+        self._write(symbol, timeframe, features)
+        logger.debug(f"FeatureStore: {symbol} {timeframe} updated to {last_ts} ({len(features)} bars)")
+        return features
+
+    def load(self, symbol: str, timeframe: str, columns: Optional[Sequence[str]] = None,
+             start=None, end=None) -> pd.DataFrame:
+        """Stored features (optionally a column / time slice); empty if none stored."""
+        features = self._read(symbol, timeframe, columns)
+        if features is None:
+            return pd.DataFrame(columns=["timestamp", *(columns or [])])
+        ts = pd.to_datetime(features["timestamp"], utc=True)
+        mask = pd.Series(True, index=features.index)
+        if start is not None:
+            mask &= ts >= _utc(start)
+        if end is not None:
+            mask &= ts <= _utc(end)
+        return features[mask].reset_index(drop=True)
+
+    def view(self, symbol: str, timeframe: str, candles: pd.DataFrame) -> IndicatorCache:
+        """Indicator source for strategies, aligned to `candles` (updates the store first)."""
+        features = self.update(symbol, timeframe, candles)
+        if features.empty:
+            return IndicatorCache(candles)
+        key = pd.to_datetime(features["timestamp"], utc=True)
+        aligned = features.set_index(key).reindex(pd.to_datetime(candles["timestamp"], utc=True))
+        aligned.index = candles.index
+        return FeatureView(candles, aligned)
+
+    def columns(self, symbol: str, timeframe: str) -> List[str]:
+        features = self._read(symbol, timeframe)
+        return [] if features is None else [c for c in features.columns if c != "timestamp"]
+
+    # --- Persistence ---
+
+    def _read(self, symbol: str, timeframe: str, columns: Optional[Sequence[str]] = None) -> Optional[pd.DataFrame]:
+        key = (symbol, timeframe)
+        features = self._memory.get(key)
+        if features is None:
+            path = self.path(symbol, timeframe)
+            if not path.exists():
+                return None
+            if columns is not None:
+                return pd.read_parquet(path, columns=["timestamp", *columns])
+            features = self._memory[key] = pd.read_parquet(path)
+        return features if columns is None else features[["timestamp", *columns]]
+
+    def _write(self, symbol: str, timeframe: str, features: pd.DataFrame) -> None:
+        path = self.path(symbol, timeframe)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".parquet.tmp")
+        features.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+        self._memory[(symbol, timeframe)] = features
+
+
+feature_store = FeatureStore()
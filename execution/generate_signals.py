@@ -5,6 +5,9 @@ import os
 # Ensure we can find the strategies
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from execution.core.signals import SignalFrame
+from execution.strategy_registry import registry as strategy_registry
+
 class SignalGenerator:
     """
     Engine to generate signals using a selected strategy.
@@ -14,7 +17,8 @@ class SignalGenerator:
         self.strategy_config = strategy_config if strategy_config else {}
         self.strategy = self._load_strategy()
 
-    # Registry of available strategies
+    # Explicit entries; every other name is resolved by the strategy registry
+    # (auto-discovered execution/strategies + strategy_playground/strategies)
     REGISTRY = {
         "baseline_sma_cross": "execution.strategies.baseline_sma_cross.BaselineSMACross"
     }
@@ -24,8 +28,11 @@ class SignalGenerator:
         Dynamically loads the strategy class based on the name.
         """
         if self.strategy_name not in self.REGISTRY:
-            raise ValueError(f"Strategy '{self.strategy_name}' not found in registry. Available: {list(self.REGISTRY.keys())}")
-            
+            if self.strategy_name not in strategy_registry:
+                available = sorted(set(self.REGISTRY) | set(strategy_registry.names()))
+                raise ValueError(f"Strategy '{self.strategy_name}' not found in registry. Available: {available}")
+            return strategy_registry.create(self.strategy_name, **self.strategy_config)
+
         module_path, class_name = self.REGISTRY[self.strategy_name].rsplit('.', 1)
         
         try:
@@ -35,14 +42,26 @@ class SignalGenerator:
         except (ImportError, AttributeError) as e:
             raise ImportError(f"Could not load strategy {self.strategy_name}: {e}")
 
-    def generate(self, data):
+    def generate(self, data, context=None):
         """
         Run the strategy on the provided data.
         
         Args:
             data (pd.DataFrame): Normalized price data.
+            context (dict): Optional context (e.g. {"sentiment": ...}).
             
         Returns:
             list: List of signal events.
         """
-        return self.strategy.calculate(data)
+        return self.strategy.calculate(data, context)
+
+    def generate_frame(self, data, context=None):
+        """
+        Unvalidated, columnar signals for backtests (see core.signals.SignalFrame).
+
+        Strategies without a `calculate_frame` fast path are converted from
+        their regular signals.
+        """
+        if hasattr(self.strategy, "calculate_frame"):
+            return self.strategy.calculate_frame(data, context)
+        return SignalFrame.from_signals(self.strategy.calculate(data, context))
@@ -147,8 +147,9 @@ def run_health_check(send_notification: bool = True) -> dict:
     if send_notification:
         try:
             from execution.notifier import DiscordNotifier
+            from execution.notify_dispatcher import get_dispatcher
             
-            notifier = DiscordNotifier()
+            notifier = DiscordNotifier(dispatcher=get_dispatcher())
             details = {
                 "broker": f"{checks['broker']['status']} - {checks['broker']['message']}",
                 "data_feed": f"{checks['data_feed']['status']} - {checks['data_feed']['message']}",
@@ -158,6 +159,8 @@ def run_health_check(send_notification: bool = True) -> dict:
             }
             
             notifier.send_health_status(overall_status, details)
+            # Short-lived script: deliver before the process exits
+            get_dispatcher().flush(timeout=15)
             print(f"[{datetime.now()}] Health status sent to Discord.")
         except Exception as e:
             print(f"[{datetime.now()}] Failed to send health status: {e}")
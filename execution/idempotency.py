@@ -0,0 +1,210 @@
+"""
+Idempotency Ledger Module
+
+Durable record of order keys, shared by every ExecutionRouter / IGBroker
+instance and every process on the host:
+
+1. reserve(key) is written BEFORE submission (one atomic upsert on a SQLite
+   WAL database): exactly one caller wins a key, every other caller gets
+   the existing entry back.
+2. complete(key, result) stores the OrderResult so a duplicate returns the
+   original result; release(key) frees a key whose submission definitely
+   did not reach the broker.
+3. Lookups hit an in-memory dict first (O(1)). Misses fall through to the
+   primary-key index, which is how keys written by other processes are seen.
+4. Entries older than ttl_s are compacted on open and every COMPACT_EVERY
+   writes; an expired key can be reserved again.
+
+path=None keeps the ledger in memory only (tests, one-off scripts).
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from execution.models import OrderResult
+
+logger = logging.getLogger("ForexPlatform")
+
+DEFAULT_LEDGER_PATH = Path(__file__).resolve().parent / "data" / "idempotency.db"
+DEFAULT_TTL_S = 7 * 24 * 3600.0
+COMPACT_EVERY = 500
+
+PENDING = "PENDING"
+DONE = "DONE"
+
+
+@dataclass
+class LedgerEntry:
+    """One idempotency key."""
+    key: str
+    state: str  # PENDING (reserved, outcome unknown) or DONE
+    result: Optional[OrderResult]
+    updated_at: float
+
+
+def _dump_result(result: OrderResult) -> str:
+    return json.dumps({
+        "status": getattr(result.status, "value", result.status),
+        "broker_order_id": result.broker_order_id,
+        "filled_price": result.filled_price,
+        "filled_quantity": result.filled_quantity,
+        "timestamp": result.timestamp.isoformat() if result.timestamp else None,
+        "error_message": result.error_message,
+        "raw_response": result.raw_response,
+    }, default=str)
+
+
+def _load_result(text: Optional[str]) -> Optional[OrderResult]:
+    if not text:
+        return None
+    data = json.loads(text)
+    if data.get("timestamp"):
+        data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+    return OrderResult(**data)
+
+
+class IdempotencyLedger:
+    """Crash-safe, cross-process order key store."""
+
+    def __init__(self, path: Optional[Path] = DEFAULT_LEDGER_PATH, ttl_s: float = DEFAULT_TTL_S):
+        self.path = Path(path) if path is not None else None
+        self.ttl_s = ttl_s
+        self._index: Dict[str, LedgerEntry] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=30.0, isolation_level=None,
+                                         check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency ("
+                "key TEXT PRIMARY KEY, state TEXT NOT NULL, result TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self.compact()
+
+    def _expired(self, entry: LedgerEntry, now: float) -> bool:
+        return entry.updated_at < now - self.ttl_s
+
+    def get(self, key: str) -> Optional[LedgerEntry]:
+        now = time.time()
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None and entry.state == DONE and not self._expired(entry, now):
+                return entry
+            if self._conn is None:
+                return entry if entry is not None and not self._expired(entry, now) else None
+            row = self._conn.execute(
+                "SELECT state, result, updated_at FROM idempotency WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] < now - self.ttl_s:
+                self._index.pop(key, None)
+                return None
+            entry = LedgerEntry(key, row[0], _load_result(row[1]), row[2])
+            self._index[key] = entry
+            return entry
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def reserve(self, key: str) -> Optional[LedgerEntry]:
+        """Claims `key`; returns None if claimed, else the existing entry."""
+        existing = self.get(key)
+        if existing is not None:
+            return existing
+        now = time.time()
+        with self._lock:
+            if self._conn is None:
+                entry = self._index.get(key)
+                if entry is not None and not self._expired(entry, now):
+                    return entry
+            else:
+                # Atomic across processes: insert, or take over an expired key
+                cursor = self._conn.execute(
+                    "INSERT INTO idempotency (key, state, result, created_at, updated_at) "
+                    "VALUES (?, ?, NULL, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET state = excluded.state, result = NULL, "
+                    "created_at = excluded.created_at, updated_at = excluded.updated_at "
+                    "WHERE idempotency.updated_at < ?",
+                    (key, PENDING, now, now, now - self.ttl_s),
+                )
+                if cursor.rowcount != 1:
+                    row = self._conn.execute(
+                        "SELECT state, result, updated_at FROM idempotency WHERE key = ?", (key,)
+                    ).fetchone()
+                    return LedgerEntry(key, row[0], _load_result(row[1]), row[2])
+            self._index[key] = LedgerEntry(key, PENDING, None, now)
+        self._wrote()
+        return None
+
+    def complete(self, key: str, result: OrderResult) -> None:
+        now = time.time()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT INTO idempotency (key, state, result, created_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET state = excluded.state, result = excluded.result, "
+                    "updated_at = excluded.updated_at",
+                    (key, DONE, _dump_result(result), now, now),
+                )
+            self._index[key] = LedgerEntry(key, DONE, result, now)
+        self._wrote()
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM idempotency WHERE key = ?", (key,))
+            self._index.pop(key, None)
+
+    def compact(self, now: Optional[float] = None) -> int:
+        """Drops entries older than the TTL; returns how many."""
+        cutoff = (now if now is not None else time.time()) - self.ttl_s
+        with self._lock:
+            stale = [k for k, e in self._index.items() if e.updated_at < cutoff]
+            for k in stale:
+                del self._index[k]
+            if self._conn is None:
+                return len(stale)
+            removed = self._conn.execute("DELETE FROM idempotency WHERE updated_at < ?", (cutoff,)).rowcount
+        if removed:
+            logger.info(f"IdempotencyLedger: compacted {removed} expired key(s)")
+        return removed
+
+    def _wrote(self) -> None:
+        self._writes += 1
+        if self._writes % COMPACT_EVERY == 0:
+            self.compact()
+
+    def __len__(self) -> int:
+        if self._conn is None:
+            return len(self._index)
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM idempotency").fetchone()[0]
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+_ledger: Optional[IdempotencyLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger() -> IdempotencyLedger:
+    """Process-wide ledger on DEFAULT_LEDGER_PATH."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = IdempotencyLedger()
+    return _ledger
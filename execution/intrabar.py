@@ -0,0 +1,116 @@
+"""
+Intrabar Resolution Module
+
+When a backtest bar (H1) touches both the stop loss and the take profit, the
+bar alone cannot tell which level was hit first. IntrabarResolver drills into
+the stored M1 bars of that hour (binary search on the sorted M1 timestamps,
+no scan) and returns the level that was touched first.
+
+Only ambiguous bars are refined, so the cost is one lookup per ambiguous bar.
+resolver_for() is the switch the backtests use: config.INTRABAR_RESOLUTION
+(or an explicit flag) and M1 data on disk.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from execution.config import config
+
+logger = logging.getLogger("ForexPlatform")
+
+PROCESSED_DIR = Path(__file__).resolve().parent / "data" / "processed"
+
+SL_FIRST = -1
+UNRESOLVED = 0
+TP_FIRST = 1
+
+
+def _to_utc_ns(timestamps) -> np.ndarray:
+    """Timestamps as int64 UTC nanoseconds (naive values are taken as UTC)."""
+    ts = pd.to_datetime(pd.Series(timestamps), utc=True)
+    return ts.astype("int64").to_numpy()
+
+
+class IntrabarResolver:
+    """Resolves ambiguous SL/TP bars with M1 data."""
+
+    def __init__(self, m1: pd.DataFrame, bar_minutes: int = 60):
+        m1 = m1.sort_values("timestamp")
+        self.timestamps = _to_utc_ns(m1["timestamp"])
+        self.high = m1["high"].to_numpy(dtype=float)
+        self.low = m1["low"].to_numpy(dtype=float)
+        self.bar_ns = int(bar_minutes * 60 * 1e9)
+
+    @classmethod
+    def from_processed(cls, symbol: str, bar_minutes: int = 60,
+                       data_dir: Optional[Path] = None) -> Optional["IntrabarResolver"]:
+        """Loads data/processed/{symbol}/M1.csv, or returns None if it does not exist."""
+        path = Path(data_dir or PROCESSED_DIR) / symbol / "M1.csv"
+        if not path.exists():
+            logger.warning(f"Intrabar: no M1 data for {symbol} at {path}")
+            return None
+        return cls(pd.read_csv(path), bar_minutes=bar_minutes)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def _window(self, start_ns: int) -> slice:
+        lo = np.searchsorted(self.timestamps, start_ns, side="left")
+        hi = np.searchsorted(self.timestamps, start_ns + self.bar_ns, side="left")
+        return slice(lo, hi)
+
+    def first_touch(self, bar_start, direction: str, stop_loss: float, take_profit: float) -> int:
+        """
+        Which level the M1 bars of `bar_start`'s hour hit first.
+
+        Returns SL_FIRST, TP_FIRST or UNRESOLVED (no M1 data for that hour, or
+        neither level touched). A single M1 bar touching both is SL_FIRST.
+        """
+        start_ns = int(_to_utc_ns([bar_start])[0])
+        return self._first_touch_ns(start_ns, direction, stop_loss, take_profit)
+
+    def _first_touch_ns(self, start_ns: int, direction: str, stop_loss: float, take_profit: float) -> int:
+        window = self._window(start_ns)
+        high, low = self.high[window], self.low[window]
+        if not len(high):
+            return UNRESOLVED
+
+        if direction == "LONG":
+            sl_hit, tp_hit = low <= stop_loss, high >= take_profit
+        else:
+            sl_hit, tp_hit = high >= stop_loss, low <= take_profit
+
+        sl_idx = int(np.argmax(sl_hit)) if sl_hit.any() else len(high)
+        tp_idx = int(np.argmax(tp_hit)) if tp_hit.any() else len(high)
+        if sl_idx == tp_idx == len(high):
+            return UNRESOLVED
+        return SL_FIRST if sl_idx <= tp_idx else TP_FIRST
+
+    def resolve_batch(self, bar_starts: Sequence, directions: Sequence[str],
+                      stop_losses: Sequence[float], take_profits: Sequence[float]) -> np.ndarray:
+        """Vector form of first_touch for many ambiguous bars."""
+        if not len(bar_starts):
+            return np.zeros(0, dtype=np.int8)
+        starts = _to_utc_ns(bar_starts)
+        return np.array([
+            self._first_touch_ns(int(s), d, sl, tp)
+            for s, d, sl, tp in zip(starts, directions, stop_losses, take_profits)
+        ], dtype=np.int8)
+
+
+def resolver_for(symbol: str, enabled: Optional[bool] = None, bar_minutes: int = 60,
+                 data_dir: Optional[Path] = None) -> Optional[IntrabarResolver]:
+    """
+    Resolver for `symbol` if intrabar resolution is on (`enabled`, default
+    config.INTRABAR_RESOLUTION) and its M1 data exists, else None.
+    """
+    if not (config.INTRABAR_RESOLUTION if enabled is None else enabled):
+        return None
+    resolver = IntrabarResolver.from_processed(symbol, bar_minutes=bar_minutes, data_dir=data_dir)
+    if resolver is not None:
+        logger.info(f"Intrabar: resolving ambiguous {symbol} bars on {len(resolver)} M1 bars")
+    return resolver
@@ -0,0 +1,207 @@
+"""
+Trade Journal Module
+
+Queryable store for the per-cycle PipelineLogger rows:
+
+1. Rows are buffered in memory and written in one transaction once
+   `batch_size` rows are pending or the oldest is `flush_interval_s` old
+   (and on flush/close/exit). main_loop also runs flush() as a scheduler
+   job every `flush_interval_s`, so a quiet loop (one row per cycle)
+   loses at most that window on a crash. Queries flush this process's
+   buffer first.
+2. SQLite WAL table `journal` with indexes on timestamp, (symbol,
+   timestamp) and (decision, timestamp): time-window queries are index
+   range scans, not full-history scans.
+3. compact(keep_days) rolls rows older than the window into per-day counts
+   (`journal_daily`: day, symbol, decision, reason, row count, total size),
+   deletes them and truncates the WAL. Aggregate queries read both tables,
+   so compacted history still counts.
+
+    journal = get_journal()
+    journal.append(plog.data)
+    journal.decisions_by_reason(days=7)   # [{"decision", "reason", "count"}, ...]
+"""
+
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("ForexPlatform")
+
+DEFAULT_JOURNAL_PATH = Path(__file__).resolve().parent / "data" / "journal.db"
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_FLUSH_INTERVAL_S = 60.0
+DEFAULT_KEEP_DAYS = 90
+
+COLUMNS = ("timestamp", "run_id", "symbol", "price", "signal", "sentiment", "decision", "size", "reason")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS journal ("
+    "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, day TEXT NOT NULL, run_id TEXT, "
+    "symbol TEXT, price REAL, signal TEXT, sentiment TEXT, decision TEXT, size REAL, reason TEXT)",
+    "CREATE INDEX IF NOT EXISTS ix_journal_timestamp ON journal (timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_journal_symbol_timestamp ON journal (symbol, timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_journal_decision_timestamp ON journal (decision, timestamp)",
+    "CREATE TABLE IF NOT EXISTS journal_daily ("
+    "day TEXT NOT NULL, symbol TEXT NOT NULL, decision TEXT NOT NULL, reason TEXT NOT NULL, "
+    "row_count INTEGER NOT NULL, size REAL NOT NULL, PRIMARY KEY (day, symbol, decision, reason))",
+)
+
+
+def _utc_iso(ts: Any) -> str:
+    """Journal timestamps are stored as sortable UTC ISO strings."""
+    if not isinstance(ts, datetime):
+        ts = datetime.fromisoformat(str(ts)) if ts else datetime.now(timezone.utc)
+    if ts.tzinfo is None:
+        ts = ts.astimezone()  # PipelineLogger stamps local time
+    return ts.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TradeJournal:
+    """Buffered, indexed journal of pipeline decisions."""
+
+    def __init__(self, path: Path = DEFAULT_JOURNAL_PATH, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self._buffer: List[tuple] = []
+        self._oldest: Optional[float] = None
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """Buffers one PipelineLogger row; flushes when the batch is full or old enough."""
+        ts = _utc_iso(row.get("timestamp"))
+        record = (ts, ts[:10], row.get("run_id"), row.get("symbol") or "", _float(row.get("price")),
+                  row.get("signal"), row.get("sentiment"), row.get("decision") or "",
+                  _float(row.get("size")), row.get("reason") or "")
+        with self._lock:
+            self._buffer.append(record)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            due = len(self._buffer) >= self.batch_size or time.monotonic() - self._oldest >= self.flush_interval_s
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Writes buffered rows in one transaction; returns how many."""
+        with self._lock:
+            rows, self._buffer, self._oldest = self._buffer, [], None
+            if not rows:
+                return 0
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO journal (timestamp, day, run_id, symbol, price, signal, sentiment, "
+                        "decision, size, reason) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                self._buffer = rows + self._buffer  # Kept for the next flush
+                self._oldest = self._oldest or time.monotonic()
+                logger.error(f"TradeJournal: flush of {len(rows)} row(s) failed: {e}")
+                return 0
+        return len(rows)
+
+    def _query(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        self.flush()
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, r)) for r in cursor.fetchall()]
+
+    @staticmethod
+    def _since(days: float, now: Optional[datetime] = None) -> str:
+        now = now or datetime.now(timezone.utc)
+        return _utc_iso(now - timedelta(days=days))
+
+    def rows(self, days: float = 1.0, symbol: Optional[str] = None, decision: Optional[str] = None,
+             limit: int = 1000, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Raw rows of the last `days`, newest first."""
+        sql = f"SELECT {', '.join(COLUMNS)} FROM journal WHERE timestamp >= ?"
+        params: list = [self._since(days, now)]
+        if symbol is not None:
+            sql += " AND symbol = ?"
+            params.append(symbol)
+        if decision is not None:
+            sql += " AND decision = ?"
+            params.append(decision)
+        sql += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+        return self._query(sql, tuple(params))
+
+    def counts(self, by: tuple = ("decision", "reason"), days: float = 7.0, symbol: Optional[str] = None,
+               now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Row counts over the last `days` grouped by any of day/symbol/decision/reason."""
+        if not by or any(col not in ("day", "symbol", "decision", "reason") for col in by):
+            raise ValueError(f"Cannot group by {by}")
+        since = self._since(days, now)
+        cols = ", ".join(by)
+        where, params = ("", ()) if symbol is None else (" AND symbol = ?", (symbol,))
+        sql = (
+            f"SELECT {cols}, SUM(n) AS count FROM ("
+            f"SELECT {cols}, COUNT(*) AS n FROM journal WHERE timestamp >= ?{where} GROUP BY {cols} "
+            f"UNION ALL "
+            f"SELECT {cols}, SUM(row_count) AS n FROM journal_daily WHERE day >= ?{where} GROUP BY {cols}"
+            f") GROUP BY {cols} ORDER BY count DESC, {cols}"
+        )
+        return self._query(sql, (since, *params, since[:10], *params))
+
+    def decisions_by_reason(self, days: float = 7.0, symbol: Optional[str] = None,
+                            now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return self.counts(("decision", "reason"), days, symbol, now)
+
+    def compact(self, keep_days: float = DEFAULT_KEEP_DAYS, now: Optional[datetime] = None) -> int:
+        """Rolls rows older than `keep_days` (whole days) into journal_daily; returns rows compacted."""
+        self.flush()
+        cutoff_day = self._since(keep_days, now)[:10]
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO journal_daily (day, symbol, decision, reason, row_count, size) "
+                    "SELECT day, symbol, decision, reason, COUNT(*), COALESCE(SUM(size), 0) FROM journal "
+                    "WHERE timestamp < ? GROUP BY day, symbol, decision, reason "
+                    "ON CONFLICT(day, symbol, decision, reason) DO UPDATE SET "
+                    "row_count = row_count + excluded.row_count, size = size + excluded.size",
+                    (cutoff_day,),
+                )
+                removed = self._conn.execute("DELETE FROM journal WHERE timestamp < ?", (cutoff_day,)).rowcount
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if removed:
+            logger.info(f"TradeJournal: compacted {removed} row(s) before {cutoff_day}")
+        return removed
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+_journal: Optional[TradeJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_journal() -> TradeJournal:
+    """Process-wide journal on DEFAULT_JOURNAL_PATH; buffered rows are flushed at exit."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = TradeJournal()
+            atexit.register(_journal.flush)
+    return _journal
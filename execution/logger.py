@@ -12,6 +12,7 @@ from typing import Dict, Any, Optional
 LOG_DIR = ".tmp/runs"
 TRADE_JOURNAL_FILE = "trade_journal.csv"
 MAX_LOG_SIZE = 10 * 1024 * 1024  # 10 MB
+MAX_JOURNAL_SIZE = 10 * 1024 * 1024  # CSV is rotated beyond this
 BACKUP_COUNT = 5
 
 # Global run_id for the current process execution
@@ -119,16 +120,33 @@ def log_failure(logger: logging.Logger, message: str, error: Exception, next_ste
         "event_type": "FAILURE"
     }})
 
+def _rotate_journal(filename: str, keys) -> None:
+    """Moves the CSV aside when it is too large or its header differs from `keys`."""
+    if not os.path.isfile(filename):
+        return
+    with open(filename, 'r', newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f), None)
+    if header == list(keys) and os.path.getsize(filename) < MAX_JOURNAL_SIZE:
+        return
+    base, ext = os.path.splitext(filename)
+    rotated = f"{base}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{ext}"
+    os.replace(filename, rotated)
+    logging.getLogger("forex_bot").info(f"Trade journal rotated to {rotated}")
+
+
 class PipelineLogger:
     """
     Context manager to handle pipeline execution state and logging to CSV.
     Ensures that the trade journal is updated exactly once per execution cycle.
+    The row also goes to the queryable TradeJournal (execution.journal).
     """
     KEYS = ["timestamp", "run_id", "symbol", "price", "signal", "sentiment", "decision", "size", "reason"]
 
-    def __init__(self, filename: str = TRADE_JOURNAL_FILE, logger: Optional[logging.Logger] = None):
+    def __init__(self, filename: str = TRADE_JOURNAL_FILE, logger: Optional[logging.Logger] = None,
+                 journal=None):
         self.filename = filename
         self.logger = logger or logging.getLogger("forex_bot")
+        self.journal = journal
         self.start_time = datetime.now()
         self.data: Dict[str, Any] = {
             "timestamp": self.start_time.isoformat(),
@@ -147,21 +165,15 @@ class PipelineLogger:
         self.data.update(kwargs)
 
     def save(self):
-        """Writes the current state to the CSV journal."""
-        file_exists = os.path.isfile(self.filename)
-        
+        """Writes the current state to the CSV journal and the TradeJournal."""
         try:
+            # A foreign header or an oversized file starts a fresh CSV
+            _rotate_journal(self.filename, self.KEYS)
+            file_exists = os.path.isfile(self.filename)
             with open(self.filename, 'a', newline='', encoding='utf-8') as f:
                 writer = csv.DictWriter(f, fieldnames=self.KEYS)
                 if not file_exists:
                     writer.writeheader()
-                else:
-                    # Check if header matches, if not meaningful we might need migration, 
-                    # but for now we append. Ideally we'd check headers.
-                    # Simplified: If keys changed, new columns might be missing in old file, 
-                    # DictWriter handles missing keys by empty string if 'restval' not set, 
-                    # but here we just write row.
-                    pass
                 
                 # Ensure we only write known keys
                 row = {k: self.data.get(k, "") for k in self.KEYS}
@@ -172,6 +184,14 @@ class PipelineLogger:
             else:
                 print(f"Failed to write to trade journal: {e}")
 
+        try:
+            if self.journal is None:
+                from execution.journal import get_journal
+                self.journal = get_journal()
+            self.journal.append(self.data)
+        except Exception as e:
+            self.logger.error(f"Failed to append to TradeJournal: {e}")
+
     def __enter__(self):
         if self.logger:
             self.logger.info("Pipeline Execution Started", extra={"extra_data": {"event_type": "RUN_START"}})
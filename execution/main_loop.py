@@ -1,14 +1,16 @@
 """
 Forex Agent - Main Entry Point
 ==============================
-Continuous execution mode for production trading.
+Continuous execution mode for production trading. One asyncio scheduler
+(execution/scheduler.py) runs the trading cycle at each bar close and the
+housekeeping jobs (health, daily summary, reconciliation, feature backfill)
+on their own schedules, so housekeeping never delays a cycle.
 
 Usage:
-    python execution/main_loop.py           # Normal mode (hourly loop)
+    python execution/main_loop.py           # Normal mode (scheduler)
     python execution/main_loop.py --smoke   # Smoke test (single cycle, exit)
 """
 
-import time
 import sys
 import os
 import argparse
@@ -24,6 +26,16 @@ logger = get_logger("Scheduler")
 
 from execution.health_check import run_health_check
 from execution.daily_summary import run_daily_summary
+from execution.config import config
+from execution.core.database import init_db
+from execution.account import get_account
+from execution.brokers.ig_broker import IGBroker
+from execution.reconcile import ReconciliationWorker
+from execution.journal import get_journal
+from execution.scheduler import Cron, Every, Job, Scheduler, bar_close
+from execution.state_manager import StateManager
+from execution.signal_matrix import fetch_frame
+from execution.feature_store import feature_store
 
 from datetime import datetime, timezone, timedelta
 
@@ -81,8 +93,57 @@ def run_smoke_test():
         return 1
 
 
+def run_daily_housekeeping():
+    """Daily summary, then journal compaction."""
+    try:
+        run_daily_summary()
+    finally:
+        get_journal().compact()
+
+
+def backfill_features():
+    """Re-fetches recent history for every traded market into the feature store."""
+    symbols = {config.SYMBOL} | {cell["symbol"] for cell in config.SIGNAL_MATRIX}
+    for symbol in sorted(symbols):
+        try:
+            feature_store.update(symbol, config.TIMEFRAME, fetch_frame(symbol, config.TIMEFRAME, config.BACKFILL_HISTORY))
+        except Exception as e:
+            logger.error(f"Feature backfill failed for {symbol}: {e}")
+
+
+def build_scheduler(engine: TradingEngine) -> Scheduler:
+    """All periodic jobs of the agent on one scheduler."""
+    scheduler = Scheduler(state=StateManager())
+
+    def health():
+        run_health_check()
+        logger.info(f"Scheduler metrics: {scheduler.metrics()}")
+
+    scheduler.add(Job("trading_cycle", bar_close(config.TIMEFRAME), engine.run_cycle,
+                      timeout_s=config.CYCLE_TIMEOUT_S, delay_s=config.CYCLE_DELAY_S,
+                      catch_up_s=config.CYCLE_CATCH_UP_S))
+    scheduler.add(Job("health_check", Cron(config.HEALTH_SCHEDULE), health, timeout_s=120))
+    scheduler.add(Job("daily_summary", Cron(config.SUMMARY_SCHEDULE), run_daily_housekeeping,
+                      timeout_s=600, catch_up_s=2 * 3600))
+    scheduler.add(Job("feature_backfill", Cron(config.BACKFILL_SCHEDULE), backfill_features, timeout_s=600))
+    # Journal rows become durable (and visible to the dashboard) within one flush interval
+    journal = get_journal()
+    scheduler.add(Job("journal_flush", Every(journal.flush_interval_s), journal.flush, timeout_s=30))
+
+    # --- Broker Reconciliation (closes, PnL, drift) ---
+    if config.BROKER == 'ig':
+        init_db()
+        worker = ReconciliationWorker(IGBroker(), account=get_account())
+        try:
+            worker.reconcile()  # Open IG positions reach the PortfolioRiskEngine before the first cycle
+        except Exception as e:
+            logger.error(f"Startup Reconciliation Failed: {e}")
+        scheduler.add(Job("reconciliation", Every(worker.interval_s), worker.reconcile, timeout_s=worker.interval_s))
+    return scheduler
+
+
 def run_continuous():
-    """Normal continuous execution mode - runs hourly cycles."""
+    """Normal continuous execution mode - runs the job scheduler."""
     print("=" * 50)
     print("   Forex Agent - Continuous Execution Mode")
     print("=" * 50)
@@ -98,50 +159,8 @@ def run_continuous():
             run_health_check()
         except Exception as e:
             logger.error(f"Startup Health Check Failed: {e}")
-        
-        while True:
-            wait_sec = get_seconds_until_next_hour()
-            
-            # Formatting for display
-            wait_mins = int(wait_sec / 60)
-            next_run_time = datetime.now(timezone.utc) + timedelta(seconds=wait_sec)
-            
-            logger.info(f"Waiting {wait_mins} minutes until next check at {next_run_time.strftime('%H:%M:%S')} UTC...")
-            
-            # Sleep until the hour mark + buffer
-            time.sleep(wait_sec + 5) 
-            
-            logger.info("--- STARTING HOURLY CHECK ---")
-            print(f">>> Executing Pipeline at {datetime.now(timezone.utc).strftime('%H:%M:%S')} UTC")
-            
-            try:
-                engine.run_cycle()
-                
-                # --- Scheduled Tasks ---
-                now_check = datetime.now(timezone.utc)
-                
-                # Health Check: Every 5 Hours
-                if now_check.hour % 5 == 0:
-                    logger.info(f"Running Scheduled Health Check (Hour {now_check.hour})...")
-                    try:
-                        run_health_check()
-                    except Exception as e:
-                        logger.error(f"Scheduled Health Check Failed: {e}")
-
-                # Daily Summary: At 22:00 UTC
-                if now_check.hour == 22:
-                    logger.info("Running Daily Summary at 22:00 UTC...")
-                    try:
-                        run_daily_summary()
-                    except Exception as e:
-                        logger.error(f"Daily Summary Failed: {e}")
-
-                logger.info("--- HOURLY CHECK COMPLETED ---")
-            except Exception as e:
-                logger.error(f"Critical Error during pipeline execution: {e}", exc_info=True)
-                
-            # Sleep to prevent double-triggering
-            time.sleep(10)
+
+        build_scheduler(engine).run_forever()
             
     except KeyboardInterrupt:
         print("\n\n[STOPPED] User interrupted execution. Exiting...")
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
 from datetime import datetime
 from enum import Enum, auto
@@ -13,6 +13,7 @@ class OrderSide(str, Enum):
 class OrderType(str, Enum):
     MARKET = "MARKET"
     LIMIT = "LIMIT"
+    STOP = "STOP"
 
 class OrderStatus(str, Enum):
     ACCEPTED = "ACCEPTED"
@@ -21,6 +22,8 @@ class OrderStatus(str, Enum):
     FAILED = "FAILED"
     SUBMITTED = "SUBMITTED"
     PENDING = "PENDING"
+    PARTIAL = "PARTIAL"
+    CANCELLED = "CANCELLED"
 
 @dataclass
 class OrderIntent:
@@ -49,3 +52,39 @@ class OrderResult:
     timestamp: datetime = datetime.utcnow()
     error_message: Optional[str] = None
     raw_response: Optional[Dict[str, Any]] = None
+
+@dataclass
+class BracketOrder:
+    """
+    Entry order plus protective stop loss / take profit levels (prices),
+    executed as one group: if the levels cannot be attached after the
+    entry fills, the entry is closed again.
+    """
+    entry: OrderIntent
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+
+@dataclass
+class BracketResult:
+    """
+    Outcome of a BracketOrder. status is FILLED (entry filled, levels
+    attached), CANCELLED (levels failed, entry closed again) or the entry's
+    own status when it did not fill.
+    """
+    status: str
+    entry: OrderResult
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    error_message: Optional[str] = None
+
+@dataclass
+class BrokerState:
+    """
+    Bulk snapshot of the broker side, keyed by deal id (reconciliation).
+    positions: {deal_id: {deal_reference, symbol, direction, size, level, stop_level, limit_level}}
+    working_orders: {deal_id: {...}}
+    closed: {deal_id: {exit_price, pnl, closed_at}} for deals closed since the requested time
+    """
+    positions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    working_orders: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    closed: Dict[str, Dict[str, Any]] = field(default_factory=dict)
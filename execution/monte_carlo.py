@@ -0,0 +1,221 @@
+"""
+Monte Carlo Robustness Module
+
+Resamples the trade sequence of a backtest into thousands of equity paths
+(evaluated as one NumPy batch) and reports drawdown and ruin-probability
+distributions under the RiskConfig fixed-fractional sizing rules.
+
+Usage:
+    from execution.monte_carlo import run_monte_carlo, trades_to_r_multiples
+    r = trades_to_r_multiples(trades)
+    result = run_monte_carlo(r, config.RISK_CONFIG, n_paths=20000)
+    print(result.summary())
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from execution.risk_limits import RiskConfig
+
+logger = logging.getLogger("ForexPlatform")
+
+# Resampling Methods
+BOOTSTRAP = "bootstrap"  # Draw trades with replacement
+SHUFFLE = "shuffle"      # Permute the original sequence (same trades, new order)
+
+DEFAULT_RUIN_PCT = 50.0   # Equity drop (from start) that counts as "ruin"
+DEFAULT_CHUNK_SIZE = 5000  # Paths per NumPy batch (bounds memory use)
+DEFAULT_REWARD_RATIO = 2.0  # R gained on a "WIN" when only outcomes are known
+
+
+def trades_to_r_multiples(trades: Iterable[Any], reward_ratio: float = DEFAULT_REWARD_RATIO) -> np.ndarray:
+    """
+    Converts a backtester trade list into an array of R-multiples.
+
+    Accepts the formats our backtesters produce:
+    - plain numbers (already R-multiples)
+    - outcome strings "WIN"/"LOSS" (run_deep_tournament)
+    - dicts with "r_multiple", "pnl" (R units, run_single_backtest) or "outcome"
+    Open trades are skipped.
+    """
+    r_values = []
+    for trade in trades:
+        if isinstance(trade, (int, float, np.number)):
+            r_values.append(float(trade))
+        elif isinstance(trade, str):
+            if trade == "WIN":
+                r_values.append(reward_ratio)
+            elif trade == "LOSS":
+                r_values.append(-1.0)
+        elif isinstance(trade, dict):
+            if trade.get("outcome") == "OPEN":
+                continue
+            if trade.get("r_multiple") is not None:
+                r_values.append(float(trade["r_multiple"]))
+            elif trade.get("pnl") is not None:
+                r_values.append(float(trade["pnl"]))
+            elif trade.get("outcome") == "WIN":
+                r_values.append(reward_ratio)
+            elif trade.get("outcome") == "LOSS":
+                r_values.append(-1.0)
+    return np.asarray(r_values, dtype=float)
+
+
+@dataclass
+class MonteCarloResult:
+    """Distributions of a Monte Carlo run (one entry per simulated path)."""
+    risk_per_trade_pct: float
+    start_balance: float
+    ruin_pct: float
+    max_drawdown_pct: np.ndarray
+    final_equity: np.ndarray
+    ruined: np.ndarray
+
+    @property
+    def n_paths(self) -> int:
+        return len(self.final_equity)
+
+    @property
+    def ruin_probability(self) -> float:
+        return float(self.ruined.mean()) if self.n_paths else 0.0
+
+    def drawdown_percentile(self, q: float) -> float:
+        return float(np.percentile(self.max_drawdown_pct, q)) if self.n_paths else 0.0
+
+    def growth_percentile(self, q: float) -> float:
+        if not self.n_paths:
+            return 0.0
+        growth = (self.final_equity / self.start_balance - 1.0) * 100.0
+        return float(np.percentile(growth, q))
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "Risk %": self.risk_per_trade_pct,
+            "Paths": self.n_paths,
+            "DD p50 %": round(self.drawdown_percentile(50), 2),
+            "DD p95 %": round(self.drawdown_percentile(95), 2),
+            "DD p99 %": round(self.drawdown_percentile(99), 2),
+            "Ruin %": round(self.ruin_probability * 100.0, 2),
+            "Growth p5 %": round(self.growth_percentile(5), 1),
+            "Growth p50 %": round(self.growth_percentile(50), 1),
+        }
+
+
+def _sample_paths(r: np.ndarray, n_paths: int, method: str, rng: np.random.Generator) -> np.ndarray:
+    """Builds the (n_paths, n_trades) R-multiple matrix for one batch."""
+    n_trades = len(r)
+    if method == BOOTSTRAP:
+        return r[rng.integers(0, n_trades, size=(n_paths, n_trades))]
+    if method == SHUFFLE:
+        # argsort of uniform noise gives an independent permutation per row
+        order = np.argsort(rng.random((n_paths, n_trades)), axis=1)
+        return r[order]
+    raise ValueError(f"Unknown resampling method '{method}'. Use '{BOOTSTRAP}' or '{SHUFFLE}'.")
+
+
+def _simulate_batch(r: np.ndarray, n_paths: int, fractions: np.ndarray, start_balance: float,
+                    ruin_pct: float, method: str, seed) -> List[tuple]:
+    """
+    Simulates n_paths equity paths for every risk fraction using common random numbers.
+
+    Returns one (max_drawdown_pct, final_equity, ruined) tuple per fraction.
+    """
+    rng = np.random.default_rng(seed)
+    paths = _sample_paths(r, n_paths, method, rng)
+    ruin_level = start_balance * (1.0 - ruin_pct / 100.0)
+
+    out = []
+    for f in fractions:
+        # Fixed-fractional sizing: each trade risks f of *current* equity
+        growth = np.maximum(1.0 + f * paths, 0.0)
+        equity = start_balance * np.cumprod(growth, axis=1)
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), start_balance)
+        max_dd = ((peak - equity) / peak).max(axis=1) * 100.0
+        ruined = equity.min(axis=1) <= ruin_level
+        out.append((max_dd, equity[:, -1], ruined))
+    return out
+
+
+def _simulate_chunk(args) -> List[tuple]:
+    """Process-pool entry point (must be top-level to be picklable)."""
+    return _simulate_batch(*args)
+
+
+def simulate(r_multiples: Sequence[float], risk_pcts: Sequence[float], n_paths: int = 10000,
+             method: str = BOOTSTRAP, start_balance: float = 10000.0, ruin_pct: float = DEFAULT_RUIN_PCT,
+             seed: Optional[int] = None, workers: int = 1,
+             chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[MonteCarloResult]:
+    """
+    Runs the Monte Carlo simulation for several risk-per-trade settings at once.
+
+    All risk settings see the same resampled trade sequences, so their
+    distributions are directly comparable.
+    """
+    r = np.asarray(r_multiples, dtype=float)
+    fractions = np.asarray(risk_pcts, dtype=float) / 100.0
+
+    if len(r) == 0 or n_paths <= 0:
+        empty = np.array([])
+        return [MonteCarloResult(float(p), start_balance, ruin_pct, empty, empty, empty.astype(bool))
+                for p in risk_pcts]
+
+    # Independent, reproducible streams per chunk
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(r, size, fractions, start_balance, ruin_pct, method, s) for size, s in zip(sizes, seeds)]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            chunks = list(pool.map(_simulate_chunk, jobs))
+    else:
+        chunks = [_simulate_chunk(job) for job in jobs]
+
+    results = []
+    for i, pct in enumerate(risk_pcts):
+        results.append(MonteCarloResult(
+            risk_per_trade_pct=float(pct),
+            start_balance=start_balance,
+            ruin_pct=ruin_pct,
+            max_drawdown_pct=np.concatenate([c[i][0] for c in chunks]),
+            final_equity=np.concatenate([c[i][1] for c in chunks]),
+            ruined=np.concatenate([c[i][2] for c in chunks]),
+        ))
+    return results
+
+
+def run_monte_carlo(r_multiples: Sequence[float], risk_config: Optional[RiskConfig] = None,
+                    **kwargs) -> MonteCarloResult:
+    """Runs the simulation with the sizing rule from the given RiskConfig."""
+    risk_config = risk_config or RiskConfig()
+    return simulate(r_multiples, [risk_config.risk_per_trade_pct], **kwargs)[0]
+
+
+def suggest_risk_per_trade(r_multiples: Sequence[float], candidates: Sequence[float] = (0.25, 0.5, 1.0, 1.5, 2.0, 3.0),
+                           max_ruin_prob: float = 0.01, max_drawdown_p95: float = 20.0,
+                           **kwargs) -> Dict[str, Any]:
+    """
+    Picks the largest risk_per_trade_pct whose simulated ruin probability and
+    95th-percentile drawdown stay within the given limits.
+
+    Returns: {"risk_per_trade_pct": float | None, "table": [summary, ...]}
+    """
+    results = simulate(r_multiples, sorted(candidates), **kwargs)
+
+    best = None
+    for res in results:
+        if res.ruin_probability <= max_ruin_prob and res.drawdown_percentile(95) <= max_drawdown_p95:
+            best = res.risk_per_trade_pct
+
+    return {"risk_per_trade_pct": best, "table": [res.summary() for res in results]}
+
+
+def default_workers() -> int:
+    """Worker count for CLI use (leave one core for the system)."""
+    return max(1, (os.cpu_count() or 2) - 1)
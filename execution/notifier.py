@@ -35,7 +35,10 @@ class DiscordNotifier:
     Falls back to main webhook if channel-specific webhooks are not configured.
     """
     
-    def __init__(self, webhook_url: Optional[str] = None):
+    def __init__(self, webhook_url: Optional[str] = None, dispatcher=None):
+        # Optional NotificationDispatcher: posts in the background instead of inline
+        self.dispatcher = dispatcher
+
         # Main/fallback webhook
         self.main_webhook = webhook_url or os.getenv("DISCORD_WEBHOOK_URL")
         
@@ -362,6 +365,10 @@ class DiscordNotifier:
             logger.warning(f"No webhook URL for channel {channel.value}")
             return
 
+        if self.dispatcher is not None:
+            self.dispatcher.submit(webhook_url, data)
+            return
+
         try:
             response = requests.post(webhook_url, json=data, timeout=10)
             response.raise_for_status()
@@ -0,0 +1,301 @@
+"""
+Notification Dispatcher Module
+
+Background delivery for DiscordNotifier so a slow or rate-limited webhook
+never stalls trading:
+
+1. submit() only spools the message to disk and enqueues it (bounded queue).
+2. One worker thread posts over a keep-alive requests.Session.
+3. Rate limits are tracked per webhook: a 429 parks that webhook until its
+   Retry-After has passed (other webhooks keep flowing), and an exhausted
+   X-RateLimit-Remaining bucket is honoured before Discord has to reject.
+4. Embed-only messages to the same webhook/username that arrive within the
+   batch window are coalesced into one multi-embed message (max 10 embeds,
+   6000 characters, Discord's limits).
+5. The spool (one JSON file per message) is removed after delivery and
+   replayed on start, so queued alerts survive a restart.
+
+    notifier = DiscordNotifier(dispatcher=get_dispatcher())
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger("ForexPlatform")
+
+DEFAULT_SPOOL_DIR = Path(__file__).resolve().parent / "data" / "discord_spool"
+
+MAX_EMBEDS = 10          # Per Discord message
+MAX_EMBED_CHARS = 6000   # Per Discord message (all embeds)
+MAX_ATTEMPTS = 5
+BACKOFF_S = 1.0          # Doubled per failed attempt (non-429 errors)
+
+
+@dataclass
+class _Outgoing:
+    """One submitted webhook payload."""
+    id: str
+    url: str
+    payload: Dict[str, Any]
+    attempts: int = 0
+
+    @property
+    def embeddable(self) -> bool:
+        return bool(self.payload.get("embeds")) and not self.payload.get("content")
+
+    @property
+    def embed_chars(self) -> int:
+        return len(json.dumps(self.payload.get("embeds", []), ensure_ascii=False))
+
+
+class NotificationDispatcher:
+    """Queued, rate-limit aware, coalescing webhook delivery."""
+
+    def __init__(self, spool_dir: Optional[Path] = DEFAULT_SPOOL_DIR, maxsize: int = 1000,
+                 batch_window_s: float = 0.25, timeout_s: float = 10.0,
+                 session: Optional[requests.Session] = None):
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self.batch_window_s = batch_window_s
+        self.timeout_s = timeout_s
+        self.session = session or requests.Session()
+        self._queue: "queue.Queue[Optional[_Outgoing]]" = queue.Queue(maxsize=maxsize)
+        self._pending: Dict[str, Deque[_Outgoing]] = {}
+        self._blocked_until: Dict[str, float] = {}
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self.sent_messages = 0
+        self.dropped = 0
+
+    # --- Producer side ---
+
+    def submit(self, url: str, payload: Dict[str, Any]) -> bool:
+        """Spools and enqueues a payload; never blocks on the network."""
+        item = _Outgoing(f"{time.time_ns()}-{uuid.uuid4().hex[:8]}", url, payload)
+        self._spool(item)
+        with self._lock:
+            self._outstanding += 1
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            # Still on disk: delivered after the next restart
+            with self._lock:
+                self._outstanding -= 1
+            self.dropped += 1
+            logger.warning("NotificationDispatcher: queue full, message left in spool")
+            return False
+        self.start()
+        return True
+
+    def start(self) -> "NotificationDispatcher":
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._closing = False
+            self._thread = threading.Thread(target=self._run, name="discord-dispatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def replay_spool(self) -> int:
+        """Re-enqueues messages spooled by a previous run; returns how many."""
+        if self.spool_dir is None or not self.spool_dir.exists():
+            return 0
+        replayed = 0
+        for path in sorted(self.spool_dir.glob("*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                item = _Outgoing(path.stem, data["url"], data["payload"])
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"NotificationDispatcher: unreadable spool file {path.name}: {e}")
+                continue
+            with self._lock:
+                self._outstanding += 1
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                with self._lock:
+                    self._outstanding -= 1
+                break
+            replayed += 1
+        if replayed:
+            logger.info(f"NotificationDispatcher: replaying {replayed} spooled message(s)")
+            self.start()
+        return replayed
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Waits until every submitted message is delivered or dropped."""
+        deadline = time.monotonic() + timeout
+        while self._outstanding > 0:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Delivers what it can within `timeout`; the rest stays spooled."""
+        self.flush(timeout)
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+    # --- Spool ---
+
+    def _spool(self, item: _Outgoing) -> None:
+        if self.spool_dir is None:
+            return
+        try:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            path = self.spool_dir / f"{item.id}.json"
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"url": item.url, "payload": item.payload}, f, ensure_ascii=False, default=str)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.error(f"NotificationDispatcher: spool write failed: {e}")
+
+    def _unspool(self, items: List[_Outgoing]) -> None:
+        for item in items:
+            if self.spool_dir is not None:
+                try:
+                    (self.spool_dir / f"{item.id}.json").unlink()
+                except FileNotFoundError:
+                    pass
+        with self._lock:
+            self._outstanding -= len(items)
+
+    # --- Worker ---
+
+    def _run(self) -> None:
+        while not (self._closing and not any(self._pending.values())):
+            self._collect(self._wait_time())
+            self._deliver_ready()
+
+    def _wait_time(self) -> float:
+        if not any(self._pending.values()):
+            return 0.5
+        now = time.monotonic()
+        ready_at = min(self._blocked_until.get(url, 0.0) for url, dq in self._pending.items() if dq)
+        return min(max(ready_at - now, 0.0), 0.5)
+
+    def _collect(self, timeout: float) -> None:
+        try:
+            items = [self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()]
+        except queue.Empty:
+            return
+        # Batch window: gather what arrives shortly after, for coalescing
+        deadline = time.monotonic() + self.batch_window_s
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                items.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for item in items:
+            if item is None:
+                self._closing = True
+            else:
+                self._pending.setdefault(item.url, deque()).append(item)
+
+    def _take_batch(self, dq: Deque[_Outgoing]) -> List[_Outgoing]:
+        first = dq.popleft()
+        batch = [first]
+        if not first.embeddable:
+            return batch
+        username = first.payload.get("username")
+        embeds, chars = len(first.payload["embeds"]), first.embed_chars
+        while dq and dq[0].embeddable and dq[0].payload.get("username") == username:
+            nxt = dq[0]
+            if embeds + len(nxt.payload["embeds"]) > MAX_EMBEDS or chars + nxt.embed_chars > MAX_EMBED_CHARS:
+                break
+            batch.append(dq.popleft())
+            embeds += len(nxt.payload["embeds"])
+            chars += nxt.embed_chars
+        return batch
+
+    @staticmethod
+    def _merge(batch: List[_Outgoing]) -> Dict[str, Any]:
+        if len(batch) == 1:
+            return batch[0].payload
+        merged = {k: v for k, v in batch[0].payload.items() if k != "embeds"}
+        merged["embeds"] = [e for item in batch for e in item.payload["embeds"]]
+        return merged
+
+    def _deliver_ready(self) -> None:
+        now = time.monotonic()
+        for url, dq in self._pending.items():
+            if dq and self._blocked_until.get(url, 0.0) <= now:
+                batch = self._take_batch(dq)
+                if not self._send(url, batch):
+                    dq.extendleft(reversed(batch))  # Keep order for the retry
+
+    def _send(self, url: str, batch: List[_Outgoing]) -> bool:
+        """Posts one (merged) message; False if it should be retried later."""
+        try:
+            response = self.session.post(url, json=self._merge(batch), timeout=self.timeout_s)
+        except requests.RequestException as e:
+            return self._failed(url, batch, str(e))
+
+        headers = response.headers
+        if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset-After"):
+            self._block(url, float(headers["X-RateLimit-Reset-After"]))
+
+        if response.status_code == 429:
+            retry_after = headers.get("Retry-After")
+            if retry_after is None:
+                try:
+                    retry_after = response.json().get("retry_after")
+                except ValueError:
+                    retry_after = None
+            self._block(url, float(retry_after or 1.0))
+            logger.warning(f"Discord rate limited, retrying in {float(retry_after or 1.0):.2f}s")
+            return False
+        if response.status_code >= 400:
+            return self._failed(url, batch, f"HTTP {response.status_code}")
+
+        self.sent_messages += 1
+        self._unspool(batch)
+        logger.debug(f"Discord notification sent ({len(batch)} message(s) coalesced)")
+        return True
+
+    def _block(self, url: str, seconds: float) -> None:
+        self._blocked_until[url] = max(self._blocked_until.get(url, 0.0), time.monotonic() + seconds)
+
+    def _failed(self, url: str, batch: List[_Outgoing], error: str) -> bool:
+        attempts = max(item.attempts for item in batch) + 1
+        for item in batch:
+            item.attempts = attempts
+        if attempts >= MAX_ATTEMPTS:
+            logger.error(f"Discord notification dropped after {attempts} attempts: {error}")
+            self.dropped += len(batch)
+            self._unspool(batch)
+            return True
+        logger.warning(f"Discord notification failed ({error}), attempt {attempts}/{MAX_ATTEMPTS}")
+        self._block(url, BACKOFF_S * 2 ** (attempts - 1))
+        return False
+
+
+_dispatcher: Optional[NotificationDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> NotificationDispatcher:
+    """Process-wide dispatcher; replays the spool on first use."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = NotificationDispatcher()
+            _dispatcher.replay_spool()
+    return _dispatcher
@@ -0,0 +1,349 @@
+"""
+Portfolio Risk Module
+
+Live position and PnL engine behind the risk checks:
+
+1. Open positions come from broker fills (ExecutionRouter / MockBroker) and
+   are aggregated per symbol as net units and cost, so marking to market on
+   a price update touches one symbol: O(1) in the number of positions.
+2. Daily realized and unrealized PnL and the trade count roll over at UTC
+   midnight.
+3. Portfolio VaR uses an EWMA (RiskMetrics) covariance of bar returns. The
+   covariance changes once per bar (on_bar); between bars a price or fill
+   only moves one exposure, and Sigma*e and e'Sigma*e are updated in place.
+4. The broker is the source of truth for what is open: sync_positions()
+   (every reconciliation pass, and once at startup) adopts broker deals the
+   engine does not know, e.g. after a restart, and drops deals the broker
+   no longer holds, so exposure never only grows.
+
+snapshot() carries the keys RiskManager reads (equity, daily_loss_current,
+daily_trades_count, open_positions), so limits see real exposure. The
+engine is shared by the trading cycle and the reconciliation job, so
+public methods take a lock.
+"""
+
+import functools
+import logging
+import math
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from execution.risk import LOT_SIZE
+
+logger = logging.getLogger("ForexPlatform")
+
+EWMA_LAMBDA = 0.94  # RiskMetrics decay
+VAR_CONFIDENCE = 0.99
+
+
+def quote_to_account(symbol: str, price: float) -> float:
+    """Quote currency -> account (USD) rate; same convention as risk._get_pip_value."""
+    return 1.0 / price if "JPY" in symbol and price > 0 else 1.0
+
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _sign(direction) -> int:
+    if isinstance(direction, (int, float)):
+        return 1 if direction > 0 else -1
+    value = getattr(direction, "value", direction)
+    return 1 if value in ("LONG", "BUY") else -1
+
+
+@dataclass
+class Position:
+    """One open deal."""
+    deal_id: str
+    symbol: str
+    direction: int  # +1 long, -1 short
+    size: float  # lots
+    entry_price: float
+    opened_at: datetime
+
+    @property
+    def units(self) -> float:
+        return self.direction * self.size * LOT_SIZE
+
+
+class PortfolioRiskEngine:
+    """Open positions, PnL and VaR, updated incrementally."""
+
+    def __init__(self, balance: float = 10000.0, ewma_lambda: float = EWMA_LAMBDA,
+                 confidence: float = VAR_CONFIDENCE):
+        self.balance = balance
+        self._lock = threading.RLock()
+        self.ewma_lambda = ewma_lambda
+        self.z = NormalDist().inv_cdf(confidence)
+        self.positions: Dict[str, Position] = {}
+
+        # Per-symbol state (index via _slot)
+        self.symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._units = np.zeros(0)       # Net signed units
+        self._cost = np.zeros(0)        # Sum of units * entry (quote ccy)
+        self._lots = np.zeros(0)        # Net signed lots
+        self._count = np.zeros(0)       # Open deals
+        self._price = np.zeros(0)       # Last price (NaN = none yet)
+        self._unrealized = np.zeros(0)  # Account ccy
+        self._notional = np.zeros(0)    # Signed exposure e (account ccy)
+
+        # Risk model
+        self._cov = np.zeros((0, 0))
+        self._bar_close = np.zeros(0)
+        self._cov_e = np.zeros(0)  # Sigma @ e
+        self._q = 0.0              # e' Sigma e
+        self.bars = 0
+
+        self.unrealized = 0.0
+        self.gross_lots = 0.0
+        self.day: Optional[date] = None
+        self.realized_today = 0.0
+        self.trades_today = 0
+        self._unrealized_day_open = 0.0
+
+    # --- Bookkeeping ---
+
+    def _slot(self, symbol: str) -> int:
+        i = self._index.get(symbol)
+        if i is not None:
+            return i
+        i = self._index[symbol] = len(self.symbols)
+        self.symbols.append(symbol)
+        for name in ("_units", "_cost", "_lots", "_count", "_unrealized", "_notional", "_cov_e"):
+            setattr(self, name, np.append(getattr(self, name), 0.0))
+        self._price = np.append(self._price, np.nan)
+        self._bar_close = np.append(self._bar_close, np.nan)
+        self._cov = np.pad(self._cov, ((0, 1), (0, 1)))
+        return i
+
+    def _roll_day(self, ts: Optional[datetime]) -> None:
+        day = (ts or datetime.now(timezone.utc)).date()
+        if day != self.day:
+            self.day = day
+            self.realized_today = 0.0
+            self.trades_today = 0
+            self._unrealized_day_open = self.unrealized
+
+    def _set_notional(self, i: int, value: float) -> None:
+        delta = value - self._notional[i]
+        if delta == 0.0:
+            return
+        self._q += 2.0 * delta * self._cov_e[i] + delta * delta * self._cov[i, i]
+        self._cov_e += self._cov[:, i] * delta
+        self._notional[i] = value
+
+    def _mark(self, i: int) -> None:
+        price = self._price[i]
+        if math.isnan(price):
+            return
+        fx = quote_to_account(self.symbols[i], price)
+        unrealized = (self._units[i] * price - self._cost[i]) * fx
+        self.unrealized += unrealized - self._unrealized[i]
+        self._unrealized[i] = unrealized
+        self._set_notional(i, self._units[i] * price * fx)
+
+    # --- Updates ---
+
+    @_locked
+    def on_price(self, symbol: str, price: float, ts: Optional[datetime] = None) -> None:
+        """Marks `symbol` to market (O(1) in positions)."""
+        self._roll_day(ts)
+        i = self._slot(symbol)
+        self._price[i] = price
+        self._mark(i)
+
+    def _add(self, pos: Position) -> int:
+        self.positions[pos.deal_id] = pos
+        i = self._slot(pos.symbol)
+        self._units[i] += pos.units
+        self._cost[i] += pos.units * pos.entry_price
+        self._lots[i] += pos.direction * pos.size
+        self._count[i] += 1
+        self.gross_lots += pos.size
+        if math.isnan(self._price[i]):
+            self._price[i] = pos.entry_price
+        return i
+
+    def _remove(self, deal_id: str) -> Position:
+        pos = self.positions.pop(deal_id)
+        i = self._index[pos.symbol]
+        self._units[i] -= pos.units
+        self._cost[i] -= pos.units * pos.entry_price
+        self._lots[i] -= pos.direction * pos.size
+        self._count[i] -= 1
+        self.gross_lots -= pos.size
+        if self._count[i] == 0:
+            self._units[i] = self._cost[i] = self._lots[i] = 0.0  # Drop float residue
+        if not self.positions:
+            self.gross_lots = 0.0
+        return pos
+
+    @_locked
+    def open_position(self, deal_id: str, symbol: str, direction, size: float, price: float,
+                      ts: Optional[datetime] = None) -> Position:
+        self._roll_day(ts)
+        pos = Position(deal_id, symbol, _sign(direction), float(size), float(price),
+                       ts or datetime.now(timezone.utc))
+        i = self._add(pos)
+        self.trades_today += 1
+        self._mark(i)
+        return pos
+
+    @_locked
+    def close_position(self, deal_id: str, price: float, ts: Optional[datetime] = None) -> float:
+        """Closes a deal at `price`; returns realized PnL (account ccy)."""
+        self._roll_day(ts)
+        pos = self._remove(deal_id)
+        i = self._index[pos.symbol]
+        realized = pos.units * (price - pos.entry_price) * quote_to_account(pos.symbol, price)
+        self.balance += realized
+        self.realized_today += realized
+        self._price[i] = price
+        self._mark(i)
+        return realized
+
+    @_locked
+    def sync_positions(self, broker_positions: Dict[str, Dict[str, Any]],
+                       as_of: Optional[datetime] = None) -> Dict[str, List[str]]:
+        """
+        Makes the open deals match the broker ({deal_id: {symbol, direction,
+        size, level}}, as BrokerState.positions). Unknown broker deals are
+        adopted (not counted as today's trades); deals the broker no longer
+        holds are dropped without booking PnL (reconciliation books closes
+        it knows the exit of); a resized deal is replaced. Deals opened after
+        `as_of` (when the broker snapshot was taken) are kept. Returns
+        {"added": [...], "removed": [...]}.
+        """
+        added, removed = [], []
+        touched = set()
+        for deal_id in list(self.positions):
+            broker = broker_positions.get(deal_id)
+            pos = self.positions[deal_id]
+            opened = pos.opened_at if pos.opened_at.tzinfo else pos.opened_at.replace(tzinfo=timezone.utc)
+            if broker is None and as_of is not None and opened >= as_of:
+                continue  # Filled while the snapshot was in flight
+            if broker is not None and abs((broker.get("size") or pos.size) - pos.size) <= 1e-9:
+                continue
+            touched.add(self._remove(deal_id).symbol)
+            removed.append(deal_id)
+        for deal_id, broker in broker_positions.items():
+            if deal_id in self.positions or not broker.get("symbol") or not broker.get("size") \
+                    or broker.get("level") is None:
+                continue
+            pos = Position(deal_id, broker["symbol"], _sign(broker.get("direction")), float(broker["size"]),
+                           float(broker["level"]), datetime.now(timezone.utc))
+            self._add(pos)
+            touched.add(pos.symbol)
+            added.append(deal_id)
+        for symbol in touched:
+            self._mark(self._index[symbol])
+        if added or removed:
+            logger.info(f"PortfolioRiskEngine: synced with broker (+{len(added)} / -{len(removed)} deals, "
+                        f"{self.gross_lots:.2f} lots open)")
+        return {"added": added, "removed": removed}
+
+    @_locked
+    def on_fill(self, intent, result, ts: Optional[datetime] = None) -> Optional[Position]:
+        """Records a filled OrderResult for its OrderIntent."""
+        if result.status not in ("FILLED", "ACCEPTED", "PARTIAL") or not result.filled_price:
+            return None
+        deal_id = result.broker_order_id or intent.idempotency_key
+        return self.open_position(deal_id, intent.symbol, intent.direction,
+                                  result.filled_quantity or intent.quantity, result.filled_price, ts)
+
+    @_locked
+    def on_bar(self, closes: Dict[str, float], ts: Optional[datetime] = None) -> None:
+        """
+        Bar closes for all tracked symbols: updates the EWMA covariance of
+        log returns (O(symbols^2), once per bar) and marks to market.
+        """
+        for symbol in closes:
+            self._slot(symbol)
+        returns = np.zeros(len(self.symbols))
+        for symbol, close in closes.items():
+            i = self._index[symbol]
+            prev = self._bar_close[i]
+            if not math.isnan(prev) and prev > 0 and close > 0:
+                returns[i] = math.log(close / prev)
+            self._bar_close[i] = close
+        if self.bars > 0:
+            lam = self.ewma_lambda
+            self._cov = lam * self._cov + (1.0 - lam) * np.outer(returns, returns)
+        self.bars += 1
+
+        for symbol, close in closes.items():
+            self.on_price(symbol, close, ts)
+        self._cov_e = self._cov @ self._notional
+        self._q = float(self._notional @ self._cov_e)
+
+    # --- Metrics ---
+
+    @property
+    def equity(self) -> float:
+        return self.balance + self.unrealized
+
+    @property
+    def daily_pnl(self) -> float:
+        return self.realized_today + self.unrealized - self._unrealized_day_open
+
+    def var(self, horizon_bars: int = 1) -> float:
+        """Parametric portfolio VaR (account ccy, positive = loss) over `horizon_bars` bars."""
+        return self.z * math.sqrt(max(self._q, 0.0) * horizon_bars)
+
+    @_locked
+    def net_lots(self, symbol: str) -> float:
+        i = self._index.get(symbol)
+        return 0.0 if i is None else float(self._lots[i])
+
+    def correlation(self) -> np.ndarray:
+        vol = np.sqrt(np.diag(self._cov))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = self._cov / np.outer(vol, vol)
+        corr = np.nan_to_num(corr)
+        np.fill_diagonal(corr, 1.0)
+        return corr
+
+    @_locked
+    def correlated_lots(self, symbol: str) -> float:
+        """Net lots on `symbol` plus correlation-weighted net lots of the other pairs."""
+        i = self._index.get(symbol)
+        if i is None:
+            return 0.0
+        return float(self.correlation()[i] @ self._lots)
+
+    @_locked
+    def snapshot(self, balance: Optional[float] = None) -> Dict:
+        """Account snapshot for RiskManager / risk_eval."""
+        bal = self.balance if balance is None else balance
+        daily_pnl = self.daily_pnl
+        return {
+            "balance": bal,
+            "equity": bal + self.unrealized,
+            "unrealized_pnl": self.unrealized,
+            "realized_pnl_today": self.realized_today,
+            "daily_pnl": daily_pnl,
+            "daily_loss": max(0.0, -daily_pnl),
+            "daily_loss_current": max(0.0, -daily_pnl),
+            "daily_trades_count": self.trades_today,
+            "open_positions": [
+                {"deal_id": p.deal_id, "symbol": p.symbol, "direction": "LONG" if p.direction > 0 else "SHORT",
+                 "size": p.size, "entry_price": p.entry_price}
+                for p in self.positions.values()
+            ],
+            "gross_lots": self.gross_lots,
+            "var": self.var(),
+        }
+
+
+portfolio = PortfolioRiskEngine()
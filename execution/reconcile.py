@@ -0,0 +1,233 @@
+"""
+Reconciliation Module
+
+Keeps trade_results in line with what the broker actually holds:
+
+1. One pass loads every OPEN trade in a single query (status index) and
+   pulls positions, working orders and deal history from the broker in
+   bulk (IG: three concurrent requests), then diffs them with dict lookups
+   by broker_order_id.
+2. Deals that closed at the broker get status CLOSED, exit_price, pnl and
+   closed_at. Open deals whose size, fill level or SL/TP drifted, or that
+   are still recorded under their deal reference, are corrected.
+3. All row changes go to the DB as one bulk UPDATE in one transaction.
+   After the commit, the realised PnL is booked on the AccountManager (and
+   the PortfolioRiskEngine) and close alerts are sent to Discord. The
+   PortfolioRiskEngine's open deals are then synced with the broker's, so
+   exposure reflects what is really open (also right after a restart).
+4. Trades the broker does not know and broker positions with no trade row
+   are reported and logged, never written.
+
+    worker = ReconciliationWorker(IGBroker(), account=get_account()).start()
+    report = worker.reconcile()   # ReconcileReport(closed, corrected, ...)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import update
+
+from execution.core.database import SessionLocal
+from execution.core.models import TradeResult
+from execution.models import BrokerState
+
+logger = logging.getLogger("ForexPlatform")
+
+DEFAULT_INTERVAL_S = 60.0
+DEFAULT_LOOKBACK = timedelta(days=1)  # History window when nothing is open
+SIZE_TOLERANCE = 1e-9
+LEVEL_TOLERANCE = 1e-9
+
+
+@dataclass
+class ReconcileReport:
+    """Outcome of one reconciliation pass."""
+    checked: int = 0
+    closed: int = 0
+    corrected: int = 0
+    pending: int = 0  # Still working orders at the broker
+    realized_pnl: float = 0.0
+    missing: List[str] = field(default_factory=list)  # Open in the DB, unknown to the broker
+    orphans: List[str] = field(default_factory=list)  # Open at the broker, no trade row
+    adopted: List[str] = field(default_factory=list)  # Broker deals added to the PortfolioRiskEngine
+    dropped: List[str] = field(default_factory=list)  # Engine deals the broker no longer holds
+    duration_ms: float = 0.0
+
+
+def _differs(recorded: Optional[float], actual: Optional[float], tolerance: float) -> bool:
+    return actual is not None and (recorded is None or abs(recorded - actual) > tolerance)
+
+
+class ReconciliationWorker:
+    """Periodically diffs trade_results against the broker and applies the differences."""
+
+    def __init__(self, broker, account=None, notifier=None, session_factory=SessionLocal,
+                 interval_s: float = DEFAULT_INTERVAL_S):
+        self.broker = broker
+        self._account = account
+        self._notifier = notifier
+        self.session_factory = session_factory
+        self.interval_s = interval_s
+        self.last_report: Optional[ReconcileReport] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def account(self):
+        if self._account is None:
+            from execution.account import get_account
+            self._account = get_account()
+        return self._account
+
+    @property
+    def notifier(self):
+        if self._notifier is None:
+            from execution.notifier import DiscordNotifier
+            from execution.notify_dispatcher import get_dispatcher
+            self._notifier = DiscordNotifier(dispatcher=get_dispatcher())
+        return self._notifier
+
+    def _fetch(self, since: datetime, deal_ids: List[str]) -> BrokerState:
+        fetch_async = getattr(self.broker, "fetch_state_async", None)
+        if fetch_async is not None:
+            return asyncio.run(fetch_async(since, deal_ids))
+        return self.broker.fetch_state(since, deal_ids)
+
+    def reconcile(self) -> ReconcileReport:
+        """One pass; raises if the broker state cannot be fetched (nothing is written then)."""
+        with self._lock:
+            start = time.perf_counter()
+            report = ReconcileReport()
+            db = self.session_factory()
+            try:
+                trades = db.query(TradeResult).filter(TradeResult.status == "OPEN",
+                                                      TradeResult.broker_order_id.isnot(None)).all()
+                report.checked = len(trades)
+                since = min((t.timestamp for t in trades), default=datetime.utcnow() - DEFAULT_LOOKBACK)
+                fetched_at = datetime.now(timezone.utc)
+                state = self._fetch(since, [t.broker_order_id for t in trades])
+
+                by_reference = {p["deal_reference"]: deal_id for deal_id, p in state.positions.items()
+                                if p.get("deal_reference")}
+                updates: List[Dict[str, Any]] = []
+                closes = []
+                matched = set()
+                for trade in trades:
+                    deal_id = trade.broker_order_id
+                    if deal_id not in state.positions and deal_id in by_reference:
+                        deal_id = by_reference[deal_id]  # Submitted unconfirmed, since opened
+                    matched.add(deal_id)
+
+                    if deal_id in state.positions:
+                        changes = self._drift(trade, deal_id, state.positions[deal_id])
+                        if changes:
+                            updates.append({"id": trade.id, **changes})
+                            report.corrected += 1
+                    elif deal_id in state.closed:
+                        closed = state.closed[deal_id]
+                        updates.append({"id": trade.id, "status": "CLOSED", "exit_price": closed["exit_price"],
+                                        "pnl": closed["pnl"], "closed_at": closed["closed_at"]})
+                        closes.append((trade, deal_id, closed))
+                    elif deal_id in state.working_orders:
+                        report.pending += 1
+                    else:
+                        report.missing.append(trade.broker_order_id)
+
+                report.orphans = [d for d in state.positions if d not in matched]
+                # Built before the commit expires the loaded rows
+                close_alerts = [self._close_alert(trade, deal_id, closed) for trade, deal_id, closed in closes]
+                if updates:
+                    db.execute(update(TradeResult), updates)
+                    db.commit()
+            finally:
+                db.close()
+
+            self._book(close_alerts, report)
+            risk_engine = getattr(self.account, "risk_engine", None)
+            if risk_engine is not None:
+                synced = risk_engine.sync_positions(state.positions, as_of=fetched_at)
+                report.adopted, report.dropped = synced["added"], synced["removed"]
+            report.duration_ms = (time.perf_counter() - start) * 1e3
+            self.last_report = report
+
+        if report.missing:
+            logger.warning(f"Reconcile: {len(report.missing)} open trade(s) unknown to the broker: {report.missing}")
+        if report.orphans:
+            logger.warning(f"Reconcile: {len(report.orphans)} broker position(s) without a trade: {report.orphans}")
+        logger.info(f"Reconcile: {report.checked} open, {report.closed} closed, {report.corrected} corrected "
+                    f"in {report.duration_ms:.0f}ms")
+        return report
+
+    @staticmethod
+    def _drift(trade: TradeResult, deal_id: str, position: Dict[str, Any]) -> Dict[str, Any]:
+        """Columns that disagree with the open broker position."""
+        changes: Dict[str, Any] = {}
+        if deal_id != trade.broker_order_id:
+            changes["broker_order_id"] = deal_id
+        if _differs(trade.quantity, position.get("size"), SIZE_TOLERANCE):
+            changes["quantity"] = position["size"]
+        if trade.fill_price is None and position.get("level") is not None:
+            changes["fill_price"] = position["level"]
+        if _differs(trade.stop_loss, position.get("stop_level"), LEVEL_TOLERANCE):
+            changes["stop_loss"] = position["stop_level"]
+        if _differs(trade.take_profit, position.get("limit_level"), LEVEL_TOLERANCE):
+            changes["take_profit"] = position["limit_level"]
+        return changes
+
+    @staticmethod
+    def _close_alert(trade: TradeResult, deal_id: str, closed: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "symbol": trade.symbol,
+            "direction": trade.direction,
+            "entry_price": trade.fill_price if trade.fill_price is not None else trade.entry_price,
+            "exit_price": closed["exit_price"],
+            "quantity": trade.quantity,
+            "broker_order_id": deal_id,
+            "pnl": closed["pnl"],
+            "closed_at": closed["closed_at"],
+        }
+
+    def _book(self, closes: List[Dict[str, Any]], report: ReconcileReport) -> None:
+        """Books realised PnL once per pass, then queues the close alerts."""
+        if not closes:
+            return
+        report.closed = len(closes)
+        report.realized_pnl = sum(c["pnl"] or 0.0 for c in closes)
+        self.account.update_balance(report.realized_pnl)
+        risk_engine = getattr(self.account, "risk_engine", None)
+        for close in closes:
+            if risk_engine is not None and close["broker_order_id"] in risk_engine.positions \
+                    and close["exit_price"] is not None:
+                risk_engine.close_position(close["broker_order_id"], close["exit_price"], close["closed_at"])
+            try:
+                self.notifier.send_close_alert(close, close["pnl"] or 0.0)
+            except Exception as e:
+                logger.error(f"Reconcile: close alert for {close['broker_order_id']} failed: {e}")
+
+    def start(self) -> "ReconciliationWorker":
+        """Reconciles now, then every `interval_s` on a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="reconcile", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.reconcile()
+            except Exception as e:
+                logger.error(f"Reconcile pass failed: {e}")
+            if self._stop.wait(self.interval_s):
+                return
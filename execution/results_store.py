@@ -0,0 +1,293 @@
+"""
+Backtest Results Store
+
+Writes every backtest run (summary stats, trade list, equity curve) to a
+hive-partitioned Parquet store so runs can be compared without re-running:
+
+    {root}/runs/strategy=.../symbol=.../timeframe=.../date=YYYY-MM-DD/{run_id}.parquet
+    {root}/trades/...   (same partitions)
+    {root}/equity/...   (same partitions)
+
+Summary stats use a fixed schema (see RUN_METRICS); params and any other
+stats are kept as JSON. Queries push strategy/symbol/timeframe/date filters
+down to the partition level and only read the requested columns:
+
+    store = ResultsStore()
+    store.top_runs("sharpe_ratio", n=10, symbol="USDJPY", timeframe="H1", days=30)
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger("ForexPlatform")
+
+DEFAULT_ROOT = Path(__file__).resolve().parent / "data" / "results"
+
+PARTITIONS = ["strategy", "symbol", "timeframe", "date"]
+
+# Canonical summary columns (missing values stored as null)
+RUN_METRICS = [
+    "return_pct", "sharpe_ratio", "sortino_ratio", "max_drawdown_pct", "win_rate_pct",
+    "n_trades", "total_r", "profit_factor", "expectancy_pct", "equity_final",
+]
+
+RUNS_SCHEMA = pa.schema(
+    [("run_id", pa.string()), ("created_at", pa.timestamp("us", tz="UTC")), ("params", pa.string()),
+     ("params_hash", pa.string())]
+    + [(m, pa.float64()) for m in RUN_METRICS]
+    + [("extra", pa.string())]
+)
+
+TRADES_SCHEMA = pa.schema([
+    ("run_id", pa.string()), ("entry_time", pa.timestamp("us", tz="UTC")),
+    ("exit_time", pa.timestamp("us", tz="UTC")), ("direction", pa.string()), ("size", pa.float64()),
+    ("entry_price", pa.float64()), ("exit_price", pa.float64()), ("pnl", pa.float64()),
+    ("r_multiple", pa.float64()), ("outcome", pa.string()),
+])
+
+EQUITY_SCHEMA = pa.schema([
+    ("run_id", pa.string()), ("timestamp", pa.timestamp("us", tz="UTC")),
+    ("equity", pa.float64()), ("drawdown_pct", pa.float64()),
+])
+
+_SCHEMAS = {"runs": RUNS_SCHEMA, "trades": TRADES_SCHEMA, "equity": EQUITY_SCHEMA}
+
+# backtesting.py / FastBacktest stats keys -> canonical columns
+_BACKTESTING_STATS = {
+    "Return [%]": "return_pct",
+    "Sharpe Ratio": "sharpe_ratio",
+    "Sortino Ratio": "sortino_ratio",
+    "Max. Drawdown [%]": "max_drawdown_pct",
+    "Win Rate [%]": "win_rate_pct",
+    "# Trades": "n_trades",
+    "Profit Factor": "profit_factor",
+    "Expectancy [%]": "expectancy_pct",
+    "Equity Final [$]": "equity_final",
+}
+
+# backtesting.py _trades columns -> canonical trade columns
+_BACKTESTING_TRADES = {
+    "EntryTime": "entry_time", "ExitTime": "exit_time", "Size": "size", "EntryPrice": "entry_price",
+    "ExitPrice": "exit_price", "PnL": "pnl",
+}
+
+
+def params_hash(params: Dict) -> str:
+    """Stable short hash of a parameter set (same params -> same hash)."""
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:12]
+
+
+def _partition_value(value: str) -> str:
+    # Keep directory names safe; hive partition values cannot contain '/' or '='
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(value))
+
+
+def _to_float(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+class ResultsStore:
+    """Partitioned Parquet store for backtest runs."""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root or DEFAULT_ROOT)
+
+    # --- Write ---
+
+    def write_run(self, strategy: str, symbol: str, timeframe: str, params: Optional[Dict] = None,
+                  stats: Optional[Dict] = None, trades: Optional[pd.DataFrame] = None,
+                  equity: Optional[pd.DataFrame] = None, run_id: Optional[str] = None,
+                  created_at: Optional[datetime] = None) -> str:
+        """
+        Stores one run and returns its run_id.
+
+        stats: canonical metric names (RUN_METRICS); other keys go to `extra`.
+        trades: columns from TRADES_SCHEMA (missing columns are stored as null).
+        equity: `timestamp` and `equity` columns; drawdown_pct is derived if absent.
+        """
+        run_id = run_id or uuid.uuid4().hex
+        created_at = created_at or datetime.now(timezone.utc)
+        self.write_runs(strategy, symbol, timeframe, [{"run_id": run_id, "params": params or {}, **(stats or {})}],
+                        created_at=created_at)
+
+        if trades is not None and not trades.empty:
+            self._write("trades", trades.assign(run_id=run_id), strategy, symbol, timeframe, created_at, run_id)
+        if equity is not None and not equity.empty:
+            equity = equity.assign(run_id=run_id)
+            if "drawdown_pct" not in equity.columns:
+                peak = equity["equity"].cummax()
+                equity["drawdown_pct"] = (peak - equity["equity"]) / peak * 100.0
+            self._write("equity", equity, strategy, symbol, timeframe, created_at, run_id)
+        return run_id
+
+    def write_runs(self, strategy: str, symbol: str, timeframe: str, rows: Sequence[Dict],
+                   created_at: Optional[datetime] = None) -> List[str]:
+        """
+        Stores many summary-only runs (e.g. a parameter sweep) in a single file.
+
+        Each row holds `params` plus metric keys; `run_id` is generated if absent.
+        """
+        created_at = created_at or datetime.now(timezone.utc)
+        records = []
+        for row in rows:
+            row = dict(row)
+            params = row.pop("params", {}) or {}
+            record = {
+                "run_id": row.pop("run_id", None) or uuid.uuid4().hex,
+                "created_at": created_at,
+                "params": json.dumps(params, sort_keys=True, default=str),
+                "params_hash": params_hash(params),
+            }
+            for metric in RUN_METRICS:
+                record[metric] = _to_float(row.pop(metric, None))
+            record["extra"] = json.dumps(row, sort_keys=True, default=str) if row else None
+            records.append(record)
+        if not records:
+            return []
+
+        self._write("runs", pd.DataFrame(records), strategy, symbol, timeframe, created_at,
+                    records[0]["run_id"] if len(records) == 1 else uuid.uuid4().hex)
+        return [r["run_id"] for r in records]
+
+    def write_backtest_stats(self, stats: pd.Series, strategy: str, symbol: str, timeframe: str,
+                             params: Optional[Dict] = None) -> str:
+        """Stores the stats Series returned by backtesting.py / FastBacktest `run()`."""
+        metrics = {col: stats.get(key) for key, col in _BACKTESTING_STATS.items() if key in stats.index}
+
+        trades = None
+        raw_trades = stats.get("_trades")
+        if raw_trades is not None and not raw_trades.empty:
+            trades = raw_trades.rename(columns=_BACKTESTING_TRADES)
+            trades["direction"] = ["LONG" if s > 0 else "SHORT" for s in trades["size"]]
+            trades["size"] = trades["size"].abs()
+            trades["outcome"] = ["WIN" if p > 0 else "LOSS" for p in trades["pnl"]]
+
+        equity = None
+        raw_equity = stats.get("_equity_curve")
+        # Range-indexed data has no timestamps to store
+        if raw_equity is not None and isinstance(raw_equity.index, pd.DatetimeIndex):
+            equity = pd.DataFrame({
+                "timestamp": raw_equity.index,
+                "equity": raw_equity["Equity"].to_numpy(),
+                "drawdown_pct": raw_equity["DrawdownPct"].to_numpy() * 100.0,
+            })
+
+        if params is None:
+            strat = stats.get("_strategy")
+            params = dict(getattr(strat, "_params", {}) or {})
+        return self.write_run(strategy, symbol, timeframe, params, metrics, trades, equity)
+
+    def _write(self, table: str, df: pd.DataFrame, strategy: str, symbol: str, timeframe: str,
+               created_at: datetime, file_id: str) -> Path:
+        schema = _SCHEMAS[table]
+        df = df.copy()
+        for name in schema.names:
+            if name not in df.columns:
+                df[name] = None
+            elif pa.types.is_timestamp(schema.field(name).type):
+                # Naive timestamps are taken as UTC
+                df[name] = pd.to_datetime(df[name], utc=True)
+        table_data = pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+        partition = {
+            "strategy": strategy, "symbol": symbol, "timeframe": timeframe,
+            "date": created_at.astimezone(timezone.utc).strftime("%Y-%m-%d"),
+        }
+        directory = self.root / table
+        for key in PARTITIONS:
+            directory = directory / f"{key}={_partition_value(partition[key])}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{file_id}.parquet"
+        pq.write_table(table_data, path)
+        logger.debug(f"ResultsStore: wrote {len(df)} rows to {path}")
+        return path
+
+    # --- Query ---
+
+    def _dataset(self, table: str) -> Optional[ds.Dataset]:
+        path = self.root / table
+        if not path.exists():
+            return None
+        partition_schema = pa.schema([(key, pa.string()) for key in PARTITIONS])
+        schema = pa.unify_schemas([_SCHEMAS[table], partition_schema])
+        # Fixed schema: no footer scan to infer it, partitions typed as strings
+        return ds.dataset(path, format="parquet", schema=schema,
+                          partitioning=ds.partitioning(partition_schema, flavor="hive"))
+
+    @staticmethod
+    def _filter(strategy: Optional[str], symbol: Optional[str], timeframe: Optional[str],
+                since: Optional[datetime], days: Optional[int], run_ids: Optional[Sequence[str]] = None):
+        expr = ds.scalar(True)
+        if strategy is not None:
+            expr = expr & (ds.field("strategy") == _partition_value(strategy))
+        if symbol is not None:
+            expr = expr & (ds.field("symbol") == _partition_value(symbol))
+        if timeframe is not None:
+            expr = expr & (ds.field("timeframe") == _partition_value(timeframe))
+        if days is not None:
+            since = datetime.now(timezone.utc) - timedelta(days=days)
+        if since is not None:
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            # Partition pruning by day, then exact cut on created_at
+            expr = expr & (ds.field("date") >= since.strftime("%Y-%m-%d"))
+        if run_ids is not None:
+            expr = expr & (ds.field("run_id").isin(list(run_ids)))
+        return expr, since
+
+    def _read(self, table: str, columns: Optional[Sequence[str]], strategy=None, symbol=None, timeframe=None,
+              since=None, days=None, run_ids=None) -> pd.DataFrame:
+        dataset = self._dataset(table)
+        if dataset is None:
+            return pd.DataFrame(columns=list(columns) if columns else None)
+        expr, since = self._filter(strategy, symbol, timeframe, since, days, run_ids)
+        if since is not None and table == "runs":
+            expr = expr & (ds.field("created_at") >= pa.scalar(since, type=pa.timestamp("us", tz="UTC")))
+        return dataset.to_table(columns=list(columns) if columns else None, filter=expr).to_pandas()
+
+    def query_runs(self, columns: Optional[Sequence[str]] = None, strategy: Optional[str] = None,
+                   symbol: Optional[str] = None, timeframe: Optional[str] = None,
+                   since: Optional[datetime] = None, days: Optional[int] = None) -> pd.DataFrame:
+        """Run summaries matching the filters (all columns if `columns` is None)."""
+        return self._read("runs", columns, strategy, symbol, timeframe, since, days)
+
+    def top_runs(self, metric: str = "sharpe_ratio", n: int = 10, ascending: bool = False,
+                 columns: Optional[Sequence[str]] = None, **filters) -> pd.DataFrame:
+        """
+        Best N runs by `metric`, e.g. top_runs("sharpe_ratio", 5, symbol="USDJPY", timeframe="H1", days=30).
+
+        Runs without a value for `metric` are ignored.
+        """
+        if metric not in RUN_METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Choose from {RUN_METRICS}")
+        columns = list(columns or ["run_id", "created_at", "strategy", "symbol", "timeframe", "params"])
+        if metric not in columns:
+            columns.append(metric)
+        runs = self.query_runs(columns, **filters)
+        runs = runs.dropna(subset=[metric])
+        return runs.sort_values(metric, ascending=ascending).head(n).reset_index(drop=True)
+
+    def load_trades(self, run_id: str, **filters) -> pd.DataFrame:
+        """Trade list of one run (pass strategy/symbol/timeframe to prune partitions)."""
+        return self._read("trades", None, run_ids=[run_id], **filters)
+
+    def load_equity(self, run_id: str, **filters) -> pd.DataFrame:
+        """Equity curve of one run (pass strategy/symbol/timeframe to prune partitions)."""
+        return self._read("equity", None, run_ids=[run_id], **filters)
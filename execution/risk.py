@@ -1,6 +1,12 @@
-from typing import Tuple, Dict, Any, Union, Optional
+import time
+from dataclasses import dataclass
+from typing import Tuple, Dict, Any, List, Sequence, Union, Optional
+
+import numpy as np
+
 from execution.config import config
 from execution.models import OrderSide
+from execution.core.signals import FastSignal
 
 # Constants
 RISK_PERCENT = config.RISK_CONFIG.risk_per_trade_pct / 100.0 if config.RISK_CONFIG else 0.02
@@ -15,6 +21,8 @@ def _normalize_signal(signal: Any) -> Dict[str, Any]:
     """Helper to convert Signal object to dictionary safely."""
     if isinstance(signal, dict):
         return signal
+    if isinstance(signal, FastSignal):
+        return signal.to_dict()
     
     # Try pydantic v2
     if hasattr(signal, "model_dump"):
@@ -37,11 +45,18 @@ def _normalize_signal(signal: Any) -> Dict[str, Any]:
              
     return d
 
-from execution.risk_limits import RiskManager
+from execution.risk_limits import RiskConfig, RiskManager
 
-def risk_eval(signal: Union[Dict[str, Any], Any], account_snapshot: Dict[str, float]) -> Tuple[bool, str, float]:
+def risk_eval(signal: Union[Dict[str, Any], Any], account_snapshot: Dict[str, float],
+              risk_manager: Optional[RiskManager] = None,
+              timings: Optional[Dict[str, float]] = None) -> Tuple[bool, str, float]:
     """
     Evaluates risk and calculates a recommended position size.
+
+    risk_manager: reused manager (e.g. with a queued notifier); a new one with
+        config.RISK_CONFIG otherwise.
+    timings: if given, receives seconds spent per check ("limits", "sizing",
+        "exposure").
     
     Returns:
         (is_safe, reason, recommended_size_lots)
@@ -55,10 +70,15 @@ def risk_eval(signal: Union[Dict[str, Any], Any], account_snapshot: Dict[str, fl
         return False, validation_msg, 0.0
 
     # --- INTEGRATION: Risk Manager (Internal Alerts) ---
-    risk_manager = RiskManager(config.RISK_CONFIG)
+    if risk_manager is None:
+        risk_manager = RiskManager(config.RISK_CONFIG)
     
     # 1. Check Daily Limits
+    t0 = time.perf_counter()
     limit_check = risk_manager.check_daily_limits(account_snapshot)
+    t1 = time.perf_counter()
+    if timings is not None:
+        timings["limits"] = t1 - t0
     if not limit_check["allowed"]:
         return False, limit_check["reason"], 0.0
 
@@ -90,12 +110,17 @@ def risk_eval(signal: Union[Dict[str, Any], Any], account_snapshot: Dict[str, fl
 
     # 5. Rounding & Limits
     position_size = round(raw_size, 2)
+    t2 = time.perf_counter()
+    if timings is not None:
+        timings["sizing"] = t2 - t1
     
     if position_size < MIN_LOT_SIZE:
         return False, f"Calculated Size {position_size} < Min {MIN_LOT_SIZE}", 0.0
 
     # 6. Check Exposure Limits
     exposure_check = risk_manager.check_exposure_limits(account_snapshot, position_size)
+    if timings is not None:
+        timings["exposure"] = time.perf_counter() - t2
     if not exposure_check["allowed"]:
          return False, exposure_check["reason"], 0.0
 
@@ -147,3 +172,155 @@ def _get_pip_value(symbol: str, price: float) -> float:
         # Assuming USD Quote (EURUSD, GBPUSD etc)
         # Value per pip per lot = 10 USD (standard)
         return PIP_VALUE_USD
+
+# --- Batched sizing ----------------------------------------------------------
+
+# risk_eval_batch codes (0 = approved), in the order risk_eval checks them
+RISK_APPROVED = 0
+RISK_HOLD = 1
+RISK_NO_EQUITY = 2
+RISK_MISSING_LEVELS = 3
+RISK_DAILY_LOSS = 4
+RISK_MAX_TRADES = 5
+RISK_ZERO_SL = 6
+RISK_ZERO_DIVISION = 7
+RISK_BELOW_MIN_SIZE = 8
+RISK_MAX_EXPOSURE = 9
+
+
+@dataclass
+class RiskBatch:
+    """Result of risk_eval_batch; index i gives risk_eval's (is_safe, reason, size) tuple."""
+    sizes: np.ndarray  # Approved size, 0.0 when rejected
+    codes: np.ndarray
+    rounded_sizes: np.ndarray  # Size before the min-size / exposure checks
+    risk_amount: np.ndarray
+    loss_pct: np.ndarray
+    daily_trades: np.ndarray
+    projected_lots: np.ndarray
+    max_daily_loss_pct: float
+    max_trades_per_day: int
+    max_open_lots: float
+
+    @property
+    def approved(self) -> np.ndarray:
+        return self.codes == RISK_APPROVED
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def reason(self, i: int) -> str:
+        """Same message risk_eval returns for this signal."""
+        code = self.codes[i]
+        size = float(self.sizes[i])
+        if code == RISK_APPROVED:
+            return f"Risk Approved: {size} lots ({self.risk_amount[i]:.2f}$ Risk)"
+        if code == RISK_DAILY_LOSS:
+            return f"DAILY_LOSS_LIMIT_REACHED: {self.loss_pct[i]:.2f}% >= {self.max_daily_loss_pct}%"
+        if code == RISK_MAX_TRADES:
+            return f"MAX_TRADES_LIMIT_REACHED: {self.daily_trades[i]} >= {self.max_trades_per_day}"
+        if code == RISK_BELOW_MIN_SIZE:
+            return f"Calculated Size {float(self.rounded_sizes[i])} < Min {MIN_LOT_SIZE}"
+        if code == RISK_MAX_EXPOSURE:
+            return f"MAX_EXPOSURE_LIMIT: {self.projected_lots[i]:.2f} > {self.max_open_lots}"
+        return _BATCH_REASONS[code]
+
+    @property
+    def reasons(self) -> List[str]:
+        return [self.reason(i) for i in range(len(self))]
+
+    def __getitem__(self, i: int) -> Tuple[bool, str, float]:
+        return bool(self.codes[i] == RISK_APPROVED), self.reason(i), float(self.sizes[i])
+
+
+_BATCH_REASONS = {
+    RISK_HOLD: "Signal is HOLD",
+    RISK_NO_EQUITY: "Insufficient Equity",
+    RISK_MISSING_LEVELS: "Missing Entry/SL in Signal",
+    RISK_ZERO_SL: "Invalid SL Distance (0)",
+    RISK_ZERO_DIVISION: "Invalid Risk Parameters (Zero Division)",
+}
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """
+    round(x, 2) for an array, bit-identical to Python's round().
+
+    np.round scales by 100 first, which can flip values sitting on a .xx5
+    tie; those few are rounded with Python's correctly rounded round().
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100.0
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie & np.isfinite(values)):
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+
+def risk_eval_batch(entry_price, stop_loss, symbol_ids, symbols: Sequence[str], equity,
+                    directions=None, daily_loss=0.0, daily_trades=0, open_lots=0.0,
+                    risk_config: Optional[RiskConfig] = None) -> RiskBatch:
+    """
+    Vectorized risk_eval for many signals (one NumPy pass, no alerts).
+
+    entry_price, stop_loss: price arrays; 0 or NaN counts as missing.
+    symbol_ids: index into `symbols` per signal (pip math per symbol).
+    equity, daily_loss, daily_trades, open_lots: scalars or per-signal arrays
+        (e.g. the equity path of a backtest); open_lots is the sum of open
+        position sizes (account_snapshot["open_positions"]).
+    directions: optional +1/-1/0 array; 0 is HOLD.
+
+    Sizes, codes and reasons match risk_eval for the same inputs, including
+    its rounding and MIN_LOT_SIZE handling. Limit breaches are only reported
+    in the codes; risk_eval would also send Discord alerts.
+    """
+    cfg = risk_config if risk_config is not None else config.RISK_CONFIG
+    limits = cfg or RiskConfig()
+    risk_percent = cfg.risk_per_trade_pct if cfg else RISK_PERCENT * 100
+
+    entry = np.asarray(entry_price, dtype=np.float64)
+    sl = np.asarray(stop_loss, dtype=np.float64)
+    n = len(entry)
+    equity = np.broadcast_to(np.asarray(equity, dtype=np.float64), n)
+    daily_loss = np.broadcast_to(np.asarray(daily_loss, dtype=np.float64), n)
+    daily_trades = np.broadcast_to(np.asarray(daily_trades), n)
+    open_lots = np.broadcast_to(np.asarray(open_lots, dtype=np.float64), n)
+    is_jpy = np.array(["JPY" in s for s in symbols], dtype=bool)[np.asarray(symbol_ids, dtype=np.intp)]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Sizing (risk_eval steps 2-5)
+        risk_amount = equity * (risk_percent / 100.0)
+        sl_pips = np.abs(entry - sl) / np.where(is_jpy, 0.01, 0.0001)
+        pip_value = np.where(is_jpy, np.where(entry > 0, (0.01 / entry) * LOT_SIZE, PIP_VALUE_JPY), PIP_VALUE_USD)
+        rounded = _round2(risk_amount / (sl_pips * pip_value))
+        loss_pct = (daily_loss / equity) * 100.0
+        projected = open_lots + rounded
+
+    # Codes: the first failing check wins, as in risk_eval
+    checks = [
+        (RISK_HOLD, np.zeros(n, dtype=bool) if directions is None else np.asarray(directions) == 0),
+        (RISK_NO_EQUITY, equity <= 0),
+        (RISK_MISSING_LEVELS, (entry == 0) | (sl == 0) | np.isnan(entry) | np.isnan(sl)),
+        (RISK_DAILY_LOSS, loss_pct >= limits.max_daily_loss_pct),
+        (RISK_MAX_TRADES, daily_trades >= limits.max_trades_per_day),
+        (RISK_ZERO_SL, entry == sl),
+        (RISK_ZERO_DIVISION, (sl_pips == 0) | (pip_value == 0)),
+        (RISK_BELOW_MIN_SIZE, rounded < MIN_LOT_SIZE),
+        (RISK_MAX_EXPOSURE, projected > limits.max_open_lots),
+    ]
+    codes = np.full(n, RISK_APPROVED, dtype=np.int8)
+    for code, failed in reversed(checks):
+        codes[failed] = code
+
+    return RiskBatch(
+        sizes=np.where(codes == RISK_APPROVED, rounded, 0.0),
+        codes=codes,
+        rounded_sizes=rounded,
+        risk_amount=risk_amount,
+        loss_pct=loss_pct,
+        daily_trades=daily_trades,
+        projected_lots=projected,
+        max_daily_loss_pct=limits.max_daily_loss_pct,
+        max_trades_per_day=limits.max_trades_per_day,
+        max_open_lots=limits.max_open_lots,
+    )
@@ -0,0 +1,251 @@
+"""
+Pre-Trade Risk Gate Module
+
+Keeps the risk check off the network on the execution-critical path:
+
+1. SnapshotCache: the account snapshot lives in memory. Broker balance is
+   refreshed on a background thread; open positions and daily PnL come from
+   the PortfolioRiskEngine, which is already in memory.
+2. AlertQueue: RiskManager alerts are queued and delivered to Discord by a
+   worker thread instead of blocking the order.
+3. LatencyMetrics: per-check timings (snapshot, limits, sizing, exposure,
+   total) so signal-to-order latency is measurable.
+4. BatchTally: signals approved earlier in the same cycle are not filled
+   yet, so the snapshot does not show them. check(signal, tally) adds
+   their lots, trade count and risk at stake to the snapshot, so several
+   approvals cannot together breach max_open_lots, max_trades_per_day or
+   the daily loss budget.
+
+    snapshots = SnapshotCache(get_account(), IGBroker().get_balance).start()
+    gate = PreTradeRiskGate(snapshots)
+    decision = gate.check(signal)   # GateDecision(approved, reason, size, timings_us, ...)
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from execution.config import config
+from execution.risk import risk_eval
+from execution.risk_limits import RiskConfig, RiskManager
+
+logger = logging.getLogger("ForexPlatform")
+
+DEFAULT_REFRESH_S = 30.0
+DEFAULT_MAX_SNAPSHOT_AGE_S = 300.0  # Reject rather than size on a stale balance
+
+
+class AlertQueue:
+    """Notifier drop-in for RiskManager that delivers alerts on a worker thread."""
+
+    def __init__(self, notifier=None, maxsize: int = 100):
+        self._notifier = notifier
+        self._queue: "queue.Queue" = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @property
+    def notifier(self):
+        if self._notifier is None:
+            from execution.notifier import DiscordNotifier
+            from execution.notify_dispatcher import get_dispatcher
+            self._notifier = DiscordNotifier(dispatcher=get_dispatcher())
+        return self._notifier
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="risk-alerts", daemon=True)
+                self._thread.start()
+
+    def send_risk_alert(self, alert_type: str, details: Dict) -> bool:
+        """Queues the alert; returns False if the queue is full."""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((alert_type, details))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"AlertQueue full, dropped {alert_type}")
+            return False
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self.notifier.send_risk_alert(*item)
+            except Exception as e:
+                logger.error(f"AlertQueue: delivery failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until queued alerts are delivered; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+
+
+class SnapshotCache:
+    """In-memory account snapshot; the broker balance refreshes in the background."""
+
+    def __init__(self, account, balance_source: Optional[Callable[[], Optional[Dict]]] = None,
+                 refresh_s: float = DEFAULT_REFRESH_S):
+        self.account = account
+        self.balance_source = balance_source
+        self.refresh_s = refresh_s
+        self.refreshed_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> None:
+        """Pulls the broker balance into memory (no file I/O)."""
+        if self.balance_source is not None:
+            try:
+                bal = self.balance_source()
+            except Exception as e:
+                logger.warning(f"SnapshotCache: balance refresh failed: {e}")
+                return
+            if not bal or not bal.get("equity"):
+                return
+            self.account.sync_balance(bal.get("balance", bal["equity"]), bal["equity"])
+        self.refreshed_at = time.monotonic()
+
+    @property
+    def age_s(self) -> float:
+        return float("inf") if self.refreshed_at is None else time.monotonic() - self.refreshed_at
+
+    def get(self) -> Dict[str, Any]:
+        if self.refreshed_at is None:
+            self.refresh()
+        return self.account.get_snapshot()
+
+    def start(self) -> "SnapshotCache":
+        """Refreshes now, then every `refresh_s` on a daemon thread."""
+        if self._thread is None or not self._thread.is_alive():
+            self.refresh()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="account-snapshot", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.refresh_s):
+            self.refresh()
+
+
+class LatencyMetrics:
+    """Rolling latency samples per check, in microseconds."""
+
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self.counts: Dict[str, int] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds * 1e6)
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for name, samples in self._samples.items():
+            values = np.fromiter(samples, dtype=float)
+            out[name] = {
+                "count": self.counts[name],
+                "last_us": float(values[-1]),
+                "p50_us": float(np.percentile(values, 50)),
+                "p99_us": float(np.percentile(values, 99)),
+                "max_us": float(values.max()),
+            }
+        return out
+
+
+@dataclass
+class BatchTally:
+    """Orders approved earlier in the same cycle and not yet in the snapshot."""
+    lots: float = 0.0
+    trades: int = 0
+    risk: float = 0.0  # Account ccy lost if every one of them hits its stop
+
+    def apply(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.trades:
+            return snapshot
+        snapshot = dict(snapshot)
+        open_lots = snapshot.get("gross_lots")
+        if open_lots is None:
+            open_lots = sum(p.get("size", 0.0) for p in snapshot.get("open_positions", []))
+        snapshot["gross_lots"] = open_lots + self.lots
+        snapshot["daily_trades_count"] = snapshot.get("daily_trades_count", 0) + self.trades
+        snapshot["daily_loss_current"] = snapshot.get("daily_loss_current", 0.0) + self.risk
+        return snapshot
+
+
+@dataclass
+class GateDecision:
+    """Outcome of one pre-trade check."""
+    approved: bool
+    reason: str
+    size: float
+    timings_us: Dict[str, float] = field(default_factory=dict)
+    snapshot_age_s: float = 0.0
+
+
+class PreTradeRiskGate:
+    """risk_eval on the cached snapshot, with queued alerts and timings."""
+
+    def __init__(self, snapshots: SnapshotCache, risk_config: Optional[RiskConfig] = None,
+                 alerts: Optional[AlertQueue] = None, metrics: Optional[LatencyMetrics] = None,
+                 max_snapshot_age_s: float = DEFAULT_MAX_SNAPSHOT_AGE_S):
+        self.snapshots = snapshots
+        self.alerts = alerts or AlertQueue()
+        self.metrics = metrics or LatencyMetrics()
+        self.max_snapshot_age_s = max_snapshot_age_s
+        self.manager = RiskManager(risk_config or config.RISK_CONFIG, notifier=self.alerts)
+
+    def check(self, signal, tally: Optional[BatchTally] = None) -> GateDecision:
+        """
+        tally: approvals earlier in the same cycle; they are counted against
+        the limits and an approval here is added to it.
+        """
+        start = time.perf_counter()
+        snapshot = self.snapshots.get()
+        if tally is not None:
+            snapshot = tally.apply(snapshot)
+        timings = {"snapshot": time.perf_counter() - start}
+        age = self.snapshots.age_s
+
+        if age > self.max_snapshot_age_s:
+            approved, reason, size = False, f"Stale account snapshot ({age:.0f}s old)", 0.0
+        else:
+            approved, reason, size = risk_eval(signal, snapshot, risk_manager=self.manager, timings=timings)
+        if approved and tally is not None:
+            tally.lots += size
+            tally.trades += 1
+            tally.risk += snapshot.get("equity", 0.0) * config.RISK_CONFIG.risk_per_trade_pct / 100.0  # As risk_eval sizes
+        timings["total"] = time.perf_counter() - start
+
+        for name, seconds in timings.items():
+            self.metrics.record(name, seconds)
+        timings_us = {name: seconds * 1e6 for name, seconds in timings.items()}
+        logger.debug(f"PreTradeRiskGate: {reason} in {timings_us['total']:.0f}us", extra={"timings_us": timings_us})
+        return GateDecision(approved, reason, size, timings_us, age)
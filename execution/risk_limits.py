@@ -38,7 +38,8 @@ class RiskManager:
         """Lazy load notifier to avoid circular imports."""
         if self._notifier is None:
             from execution.notifier import DiscordNotifier
-            self._notifier = DiscordNotifier()
+            from execution.notify_dispatcher import get_dispatcher
+            self._notifier = DiscordNotifier(dispatcher=get_dispatcher())
         return self._notifier
 
     def check_daily_limits(self, account_snapshot: Dict) -> Dict:
@@ -108,9 +109,12 @@ class RiskManager:
         
         Returns: {"allowed": bool, "reason": str, "alert_sent": bool}
         """
-        current_open_lots = 0.0
-        for trade in account_snapshot.get("open_positions", []):
-            current_open_lots += trade.get("size", 0.0)
+        # Live snapshots (PortfolioRiskEngine) carry the running total
+        current_open_lots = account_snapshot.get("gross_lots")
+        if current_open_lots is None:
+            current_open_lots = 0.0
+            for trade in account_snapshot.get("open_positions", []):
+                current_open_lots += trade.get("size", 0.0)
             
         projected_lots = current_open_lots + new_size_lots
         
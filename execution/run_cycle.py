@@ -1,11 +1,13 @@
 
+import asyncio
 import os
 import sys
 import pandas as pd
 import time
 from datetime import datetime, timezone, timedelta
 import uuid
-from typing import Optional, Any
+from dataclasses import replace
+from typing import Optional, Any, Dict, List, Tuple
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -13,16 +15,25 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from execution import market_data as data, risk
 from execution.logger import setup_logger, PipelineLogger
 from execution.generate_signals import SignalGenerator
+from execution.signal_matrix import SignalCell, SignalMatrix, fetch_frame
+from execution.feature_store import feature_store
 from execution.config import config
 from execution.execute_order import ExecutionRouter, OrderIntent
-from execution.models import OrderSide, OrderType, OrderStatus
-from execution.brokers.mock_broker import MockBroker
+from execution.models import BracketOrder, BracketResult, OrderResult, OrderSide, OrderType, OrderStatus
+from execution.brokers.sim_engine import SimulatedBroker
 from execution.brokers.ig_broker import IGBroker
-from execution.account import AccountManager
+from execution.account import get_account
+from execution.portfolio_risk import portfolio
+from execution.risk_gate import BatchTally, PreTradeRiskGate, SnapshotCache
 from execution.filters import TimeFilter
 from data.mcp_client import MCPDataClient
 from execution.state_manager import StateManager
 from execution.notifier import DiscordNotifier
+from execution.notify_dispatcher import get_dispatcher
+from execution.idempotency import get_ledger
+from execution.reconcile import ReconciliationWorker
+from execution.core.database import bulk_insert, init_db
+from execution.core.models import TradeResult, opens_position
 
 def check_time_constraints(log: Any, plog: PipelineLogger) -> bool:
     """Checks if trading is allowed at the current time."""
@@ -87,6 +98,9 @@ def fetch_and_prepare_data(log: Any, plog: PipelineLogger) -> Optional[pd.DataFr
     
     current_price = df.iloc[-1]['close'] if not df.empty else 0
     plog.update(price=current_price)
+    if current_price:
+        portfolio.on_bar({config.SYMBOL: float(current_price)})
+    feed_paper_broker(log, {config.SYMBOL: df})
     
     # Return both DF and the timestamp of the last candle for idempotency
     return df
@@ -109,7 +123,7 @@ def analyze_market(log: Any, df: pd.DataFrame, plog: PipelineLogger) -> Any:
         return None
 
     engine = SignalGenerator(config.STRATEGY, config.STRATEGY_PARAMS)
-    signals = engine.generate(df)
+    signals = engine.generate(df, {"indicators": feature_store.view(config.SYMBOL, config.TIMEFRAME, df)})
     
     latest_signal = signals[-1] if signals else None
     
@@ -124,11 +138,51 @@ def analyze_market(log: Any, df: pd.DataFrame, plog: PipelineLogger) -> Any:
     log.info(f"Step 3 [Strategy]: SIGN: {latest_signal.direction}")
     return latest_signal
 
+def analyze_signal_matrix(log: Any, plog: PipelineLogger) -> List[Any]:
+    """Evaluates config.SIGNAL_MATRIX; returns ranked, de-conflicted signals not yet processed."""
+    cells = [SignalCell.from_dict(c) for c in config.SIGNAL_MATRIX]
+    log.info(f"Step 3 [Strategy]: Evaluating signal matrix ({len(cells)} cells)...")
+
+    frames: Dict[str, pd.DataFrame] = {}
+
+    def fetch(symbol: str, timeframe: str) -> pd.DataFrame:
+        frames[symbol] = fetch_frame(symbol, timeframe)
+        return frames[symbol]
+
+    matrix = SignalMatrix(cells, timeframe=config.TIMEFRAME, latency_budget_s=config.SIGNAL_LATENCY_BUDGET_S,
+                          max_workers=config.SIGNAL_WORKERS, fetcher=fetch, feature_store=feature_store)
+    result = matrix.evaluate()
+    closes = {symbol: float(df['close'].iloc[-1]) for symbol, df in frames.items() if df is not None and not df.empty}
+    if closes:
+        portfolio.on_bar(closes)
+    feed_paper_broker(log, frames)
+    log.info(f"Step 3 [Strategy]: {len(result.signals)} signal(s) in {result.elapsed_ms:.0f} ms")
+    if result.timed_out:
+        log.warning(f"Step 3 [Strategy]: {len(result.timed_out)} cell(s) missed the latency budget")
+    for failed in result.errors:
+        log.warning(f"Step 3 [Strategy]: {failed.cell.label} failed ({failed.error})")
+
+    state_manager = StateManager()
+    signals = []
+    for sig in result.signals:
+        ts_str = sig.timestamp.isoformat() if hasattr(sig.timestamp, 'isoformat') else str(sig.timestamp)
+        if state_manager.is_candle_processed(sig.symbol, config.TIMEFRAME, ts_str):
+            log.info(f"Step 3 [Strategy]: SKIPPED {sig.symbol}. Candle {ts_str} already processed.")
+            continue
+        signals.append(sig)
+
+    if not signals:
+        plog.update(signal=OrderSide.HOLD.value, reason="Strategy: No Signal (matrix)")
+    return signals
+
+def _signal_symbol(latest_signal: Any) -> str:
+    return getattr(latest_signal, 'symbol', None) or config.SYMBOL
+
 def check_news_sentiment(log: Any, latest_signal: Any, plog: PipelineLogger) -> bool:
     """Filters signals based on news sentiment."""
     log.info("Step 4 [News]: Checking Sentiment...")
     mcp = MCPDataClient()
-    sentiment = mcp.get_sentiment(config.SYMBOL)
+    sentiment = mcp.get_sentiment(_signal_symbol(latest_signal))
     plog.update(sentiment=sentiment)
     
     is_news_valid = True
@@ -152,25 +206,32 @@ def check_news_sentiment(log: Any, latest_signal: Any, plog: PipelineLogger) ->
     log.info(f"Step 4 [News]: PASSED ({sentiment})")
     return True
 
-def assess_risk(log: Any, latest_signal: Any, plog: PipelineLogger) -> float:
-    """Calculates position size and validates risk. Returns lots (float) or False (bool) if failed/0."""
+_risk_gate: Optional[PreTradeRiskGate] = None
+
+def get_risk_gate() -> PreTradeRiskGate:
+    """
+    Shared pre-trade gate; the broker balance refreshes in the background.
+    The refresher thread gets its own IGBroker so it never shares the
+    cycle's IGService session.
+    """
+    global _risk_gate
+    if _risk_gate is None:
+        balance_source = IGBroker().get_balance if config.BROKER == 'ig' else None
+        snapshots = SnapshotCache(get_account(), balance_source).start()
+        _risk_gate = PreTradeRiskGate(snapshots)
+    return _risk_gate
+
+def assess_risk(log: Any, latest_signal: Any, plog: PipelineLogger, tally: Optional[BatchTally] = None) -> float:
+    """
+    Calculates position size and validates risk. Returns lots (float) or False (bool) if failed/0.
+    tally: signals approved earlier in this cycle (signal matrix), counted against the limits.
+    """
     log.info("Step 5 [Risk]: Calculating Size...")
-    
-    # Sync Live Equity First
-    account_mgr = AccountManager()
-    if config.BROKER == 'ig':
-        try:
-            broker_sync = IGBroker()
-            if broker_sync.connect():
-                bal = broker_sync.get_balance()
-                if bal and bal.get('equity'):
-                    account_mgr.reset(bal.get('equity'))
-                    log.info(f"Live Equity: {bal.get('equity')}")
-        except Exception as e:
-            log.warning(f"Live Sync Failed: {e}")
 
-    # Evaluate Risk
-    is_safe, risk_reason, recommended_lots = risk.risk_eval(latest_signal, account_mgr.get_snapshot())
+    # In-memory snapshot (balance refreshed in the background), alerts queued
+    decision = get_risk_gate().check(latest_signal, tally)
+    is_safe, risk_reason, recommended_lots = decision.approved, decision.reason, decision.size
+    log.info(f"Step 5 [Risk]: Checked in {decision.timings_us['total']:.0f}us", extra={"timings_us": decision.timings_us})
     
     if not is_safe:
         log.info(f"Step 5 [Risk]: BLOCKED ({risk_reason})")
@@ -184,16 +245,86 @@ def assess_risk(log: Any, latest_signal: Any, plog: PipelineLogger) -> float:
     log.info(f"Step 5 [Risk]: PASSED (Size: {lots})")
     return lots
 
-def execute_trade(log: Any, latest_signal: Any, lots: float, plog: PipelineLogger) -> None:
-    """Executes the trade order."""
-    log.info("Step 6 [Exec]: Submitting Order...")
-    
+_broker = None
+_paper_reconciler: Optional[ReconciliationWorker] = None
+_db_ready = False
+
+def get_broker():
+    """
+    Process-wide broker: IG (one session reused across cycles) or, in PAPER
+    mode, one SimulatedBroker whose positions, resting orders and SL/TP
+    brackets carry over from cycle to cycle.
+    """
+    global _broker
+    if _broker is None:
+        _broker = IGBroker() if config.BROKER == 'ig' else SimulatedBroker(balance=portfolio.balance)
+    return _broker
+
+def feed_paper_broker(log: Any, frames: Dict[str, pd.DataFrame]) -> None:
+    """
+    PAPER: matches this cycle's new candles against the shared SimulatedBroker,
+    then books its SL/TP exits like IG closes (trade_results, account,
+    portfolio, close alerts) with a reconciliation pass.
+    """
+    global _paper_reconciler
+    if config.BROKER == 'ig':
+        return
+    broker = get_broker()
+    for symbol, df in frames.items():
+        if df is not None and not df.empty:
+            broker.feed(symbol, df)
+    if _paper_reconciler is None:
+        _paper_reconciler = ReconciliationWorker(broker, account=get_account())
+    try:
+        _paper_reconciler.reconcile()
+    except Exception as e:
+        log.error(f"PAPER reconcile failed: {e}")
+
+def record_trade(log: Any, latest_signal: Any, intent: OrderIntent, result: Any) -> None:
+    """Persists an opened trade as OPEN in trade_results; the reconciliation worker closes it."""
+    global _db_ready
+    if not opens_position(result):
+        return
+    rationale = getattr(latest_signal, "rationale", None)
+    ts = pd.Timestamp(getattr(latest_signal, "timestamp", None) or datetime.utcnow())
+    row = dict(
+        # Signal candle (as core/engine): never after the fill, so the broker history window covers the close
+        timestamp=(ts.tz_convert(None) if ts.tzinfo else ts).to_pydatetime(),
+        symbol=intent.symbol,
+        direction=getattr(intent.direction, "value", intent.direction),
+        entry_price=float(latest_signal.entry_price),
+        quantity=float(result.filled_quantity or intent.quantity),
+        stop_loss=latest_signal.stop_loss or None,
+        take_profit=latest_signal.take_profit or None,
+        status="OPEN",
+        # IG: dealId once confirmed, else the deal reference (reconcile maps it to the deal later)
+        broker_order_id=result.broker_order_id,
+        fill_price=result.filled_price,
+        latency_ms=(result.raw_response or {}).get("latency_ms"),
+        rationale=rationale[:500] if rationale else None,
+    )
+    try:
+        if not _db_ready:
+            init_db()
+            _db_ready = True
+        bulk_insert(TradeResult, [row])
+    except Exception as e:
+        # The deal exists at the broker either way; reconcile reports it as an orphan
+        log.error(f"Step 6 [Exec]: Failed to persist trade {result.broker_order_id}: {e}")
+
+def build_intent(latest_signal: Any, lots: float) -> OrderIntent:
+    """Market OrderIntent for a signal, with SL/TP as distances (points) from its entry."""
     # Ensure compatible enum type
     side = OrderSide.LONG if latest_signal.direction in ['LONG', OrderSide.LONG.value] else OrderSide.SHORT
 
+    symbol = _signal_symbol(latest_signal)
+    # Deterministic per signal (symbol/timeframe/candle/side): a re-run of the same
+    # candle, in this or another process, hits the idempotency ledger
+    ts = getattr(latest_signal, "timestamp", None)
+    ts_str = ts.isoformat() if hasattr(ts, "isoformat") else ts
     exec_intent = OrderIntent(
-        idempotency_key=str(uuid.uuid4()),
-        symbol=config.SYMBOL,
+        idempotency_key=f"{symbol}:{config.TIMEFRAME}:{ts_str}:{side.value}" if ts_str else str(uuid.uuid4()),
+        symbol=symbol,
         direction=side,
         quantity=float(lots),
         order_type=OrderType.MARKET,
@@ -204,37 +335,105 @@ def execute_trade(log: Any, latest_signal: Any, lots: float, plog: PipelineLogge
     
     # Calculate SL/TP Distances for IG logic if needed (Points)
     # Use centralized utility from risk module
-    point_size = risk.get_point_size(config.SYMBOL)
+    point_size = risk.get_point_size(symbol)
     
     if latest_signal.stop_loss and latest_signal.entry_price:
         exec_intent.sl_distance = abs(latest_signal.entry_price - latest_signal.stop_loss) / point_size
     if latest_signal.take_profit and latest_signal.entry_price:
         exec_intent.tp_distance = abs(latest_signal.take_profit - latest_signal.entry_price) / point_size
+    return exec_intent
 
-    if config.BROKER == 'ig':
-        broker = IGBroker()
-    else:
-        broker = MockBroker()
-        
-    router = ExecutionRouter(broker)
-    result = router.execute_order(exec_intent)
-    
-    log.info(f"Step 6 [Exec]: DONE (Status: {result.status})")
+def _quote_paper_broker(broker: Any, latest_signal: Any) -> None:
+    if config.BROKER != 'ig':
+        # PAPER: fill against the signal's price with spread/depth instead of a dummy level
+        broker.on_quote(_signal_symbol(latest_signal), latest_signal.entry_price,
+                        getattr(latest_signal, "timestamp", None))
+
+def book_result(log: Any, latest_signal: Any, exec_intent: OrderIntent, result: Any, plog: PipelineLogger) -> None:
+    """Books an order result: portfolio, trade_results row, pipeline log and trade alert."""
+    latency_ms = (result.raw_response or {}).get("latency_ms")
+    log.info(f"Step 6 [Exec]: DONE ({exec_intent.symbol} Status: {result.status}, Fill: {result.filled_price}"
+             + (f", {latency_ms:.0f}ms)" if latency_ms is not None else ")"))
+    portfolio.on_fill(exec_intent, result)
+    record_trade(log, latest_signal, exec_intent, result)
     
     plog.update(decision=result.status, reason="Executed" if result.status in [OrderStatus.FILLED.value, OrderStatus.SUBMITTED.value, "FILLED", "SUBMITTED"] else f"Exec Failed: {result.error_message}")
 
-    # CRITICAL: Mark candle as processed FIRST (before Discord notification)
-    # This prevents duplicate notifications if the process crashes between notification and state save
-    state_manager = StateManager()
-    # Get the candle timestamp (will be fetched again in run_pipeline, but critical for idempotency here)
-    pass  # Timestamp handling moved to run_pipeline for proper orchestration
-
     # --- NOTIFICATION ---
-    # Only send notification AFTER state is marked as processed
+    # Only send notification AFTER state is marked as processed (run_pipeline / run_signal_matrix)
     if result.status in [OrderStatus.FILLED.value, OrderStatus.SUBMITTED.value, "FILLED", "SUBMITTED"]:
-        notifier = DiscordNotifier()
+        notifier = DiscordNotifier(dispatcher=get_dispatcher())
         notifier.send_trade_alert(latest_signal, exec_intent, result)
 
+def execute_trade(log: Any, latest_signal: Any, lots: float, plog: PipelineLogger) -> None:
+    """Executes the trade order."""
+    log.info("Step 6 [Exec]: Submitting Order...")
+    exec_intent = build_intent(latest_signal, lots)
+
+    broker = get_broker()
+    _quote_paper_broker(broker, latest_signal)
+        
+    router = ExecutionRouter(broker, ledger=get_ledger())
+    # Async path: IG orders are submitted and confirmed (real fill level and latency)
+    result = asyncio.run(router.execute_order_async(exec_intent))
+    book_result(log, latest_signal, exec_intent, result, plog)
+
+def _bracket_entry(result: Any) -> OrderResult:
+    """The entry OrderResult of a batch result, carrying the bracket's outcome."""
+    if not isinstance(result, BracketResult):
+        return result
+    if result.status == "FILLED":
+        return result.entry  # FILLED or PARTIAL, levels attached
+    # CANCELLED: the entry was closed again, so nothing is open
+    return replace(result.entry, status=result.status,
+                   error_message=result.error_message or result.entry.error_message)
+
+def execute_trades(log: Any, approved: List[Tuple[Any, float]], plog: PipelineLogger) -> None:
+    """
+    Submits the orders of several signals as one batch (ExecutionRouter.execute_batch_async):
+    one SafetyGate pass over all of them, then concurrent submission. Signals with absolute
+    SL/TP levels go as BracketOrders, so the exact levels are attached once the entry fills;
+    the entry keeps its distances, so it is protected while the confirmation is pending.
+    """
+    if not approved:
+        return
+    log.info(f"Step 6 [Exec]: Submitting {len(approved)} order(s) as one batch...")
+    broker = get_broker()
+    intents, orders = [], []
+    for latest_signal, lots in approved:
+        exec_intent = build_intent(latest_signal, lots)
+        _quote_paper_broker(broker, latest_signal)
+        intents.append(exec_intent)
+        if latest_signal.stop_loss or latest_signal.take_profit:
+            orders.append(BracketOrder(exec_intent, latest_signal.stop_loss or None, latest_signal.take_profit or None))
+        else:
+            orders.append(exec_intent)
+
+    router = ExecutionRouter(broker, ledger=get_ledger())
+    results = asyncio.run(router.execute_batch_async(orders, max_parallel=config.SIGNAL_WORKERS,
+                                                     open_lots=portfolio.gross_lots))
+    for (latest_signal, _), exec_intent, result in zip(approved, intents, results):
+        book_result(log, latest_signal, exec_intent, _bracket_entry(result), plog)
+
+def run_signal_matrix(log: Any, plog: PipelineLogger) -> None:
+    """Steps 3-6 for every ranked signal of the signal matrix; the approved ones are executed as one batch."""
+    state_manager = StateManager()
+    approved = []
+    tally = BatchTally()  # Approved but not yet filled: counted against the limits of later signals
+    for latest_signal in analyze_signal_matrix(log, plog):
+        plog.update(symbol=latest_signal.symbol, signal=latest_signal.direction, price=latest_signal.entry_price)
+        portfolio.on_price(latest_signal.symbol, latest_signal.entry_price)
+        if not check_news_sentiment(log, latest_signal, plog): continue
+
+        lots = assess_risk(log, latest_signal, plog, tally)
+        if not lots or lots <= 0: continue
+
+        ts = latest_signal.timestamp
+        ts_str = ts.isoformat() if hasattr(ts, 'isoformat') else str(ts)
+        state_manager.mark_candle_processed(latest_signal.symbol, config.TIMEFRAME, ts_str)
+        approved.append((latest_signal, lots))
+    execute_trades(log, approved, plog)
+
 def run_pipeline() -> None:
     log = setup_logger()
     
@@ -244,6 +443,10 @@ def run_pipeline() -> None:
             log.info("--- PIPELINE START ---")
             
             if not check_time_constraints(log, plog): return
+
+            if config.SIGNAL_MATRIX:
+                run_signal_matrix(log, plog)
+                return
             
             df = fetch_and_prepare_data(log, plog)
             if df is None: return
@@ -270,9 +473,13 @@ def run_pipeline() -> None:
             msg = f"Critical Pipeline Error: {e}"
             log.error(msg, exc_info=True)
             # Send Critical Alert
-            DiscordNotifier().send_error(msg)
+            DiscordNotifier(dispatcher=get_dispatcher()).send_error(msg)
             # PipelineLogger.__exit__ will handle exception logging
             raise e 
 
 if __name__ == "__main__":
-    run_pipeline()
+    try:
+        run_pipeline()
+    finally:
+        # Undelivered alerts stay spooled and go out with the next cycle
+        get_dispatcher().flush(timeout=15)
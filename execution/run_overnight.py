@@ -1,5 +1,3 @@
-import time
-import datetime
 import logging
 import sys
 import os
@@ -8,58 +6,32 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from execution.run_cycle import run_pipeline
+from execution.config import config
+from execution.scheduler import Every, Job, Scheduler, bar_close
+from execution.journal import get_journal
 
 # Setup simple console logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - LOOP - %(message)s')
 logger = logging.getLogger("OvernightLoop")
 
-def get_seconds_until_next_hour():
-    """Calculates seconds remaining until the next full hour."""
-    delta = datetime.timedelta(hours=1)
-    now = datetime.datetime.now()
-    # Reset minutes, seconds, micros to zero and add one hour
-    next_hour = (now + delta).replace(minute=0, second=0, microsecond=0)
-    wait_seconds = (next_hour - now).total_seconds()
-    return wait_seconds
-
 if __name__ == "__main__":
     print("==============================================")
     print("   Forex Agent - OVERNIGHT LOOP (USDJPY)      ")
     print("==============================================")
     print("Provider: Twelve Data (800 calls/day limit safe)")
     print("Strategy: baseline_sma_cross")
-    print("Timeframe: H1")
+    print(f"Timeframe: {config.TIMEFRAME}")
     print("Press Ctrl+C to stop safely.\n")
-    
-    try:
-        # Run ONCE immediately to check system (User wants to test "bis morgen früh", implied start now?)
-        # But usually hourly strategy waits for closed candle.
-        # Let's ask user? Or just wait for next hour? 
-        # Typically "run loop" implies waiting for the schedule.
-        # But let's run a "Sanity Check" (Verification) first?
-        # No, risk of taking trades mid-candle. 
-        # Better: Wait for next hour.
-        
-        while True:
-            wait_sec = get_seconds_until_next_hour()
-            wait_mins = int(wait_sec / 60)
-            next_run_time = datetime.datetime.now() + datetime.timedelta(seconds=wait_sec)
-            
-            logger.info(f"Sleeping {wait_mins} min until {next_run_time.strftime('%H:%M:%S')}...")
-            
-            # Sleep
-            time.sleep(wait_sec + 2) # +2s buffer
-            
-            logger.info("--- WAKE UP: STARTING CYCLE ---")
-            try:
-                run_pipeline()
-                logger.info("--- CYCLE COMPLETED ---")
-            except Exception as e:
-                logger.error(f"Cycle failed: {e}")
-                
-            # Sleep a bit to clear the minute matching logic if any
-            time.sleep(10)
 
+    # Pipeline and journal flush only (no housekeeping), on the same scheduler as main_loop.
+    # Waits for the next bar close: running now would trade a mid-candle signal.
+    scheduler = Scheduler()
+    scheduler.add(Job("overnight_cycle", bar_close(config.TIMEFRAME), run_pipeline,
+                      timeout_s=config.CYCLE_TIMEOUT_S, delay_s=2))
+    journal = get_journal()
+    scheduler.add(Job("journal_flush", Every(journal.flush_interval_s), journal.flush, timeout_s=30))
+    try:
+        scheduler.run_forever()
     except KeyboardInterrupt:
         print("\n[STOPPED] Exiting...")
         sys.exit(0)
@@ -1,6 +1,7 @@
 import logging
 import hashlib
 import json
+from typing import List, Optional
 from execution.config import config
 from execution.models import OrderIntent
 
@@ -66,16 +67,40 @@ class SafetyGate:
             "quantity": float(intent.quantity),
             "sl_distance": float(intent.sl_distance) if intent.sl_distance else None,
             "tp_distance": float(intent.tp_distance) if intent.tp_distance else None,
-            # We assume intent might have a timestamp or distinct ID upstream, 
-            # but if not, this hash protects against sending the exact same params twice in a short loop
-            # if we didn't change them.
-            # ideally, intent should have a 'signal_id' or 'timestamp'.
+            # Signal identity: run_cycle derives it from symbol/timeframe/candle, so the
+            # same signal maps to the same key across cycles, restarts and processes.
+            "intent_key": intent.idempotency_key,
         }
         
-        # If intent has a timestamp or unique ID, use it.
-        # Assuming OrderIntent might be simple dataclass.
-        # Let's verify existing OrderIntent definition if possible, but based on usage in ig_broker:
-        # it has symbol, direction, sl_distance, tp_distance.
-        
         payload = json.dumps(data, sort_keys=True)
         return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def validate_batch(intents: List[OrderIntent], open_lots: Optional[float] = None) -> List[Optional[str]]:
+        """
+        Validates a batch in one pass. Returns one entry per intent: None if
+        it may be sent, else the reason it is blocked. On top of the
+        per-intent checks, keys must be unique within the batch and the
+        positions already open (open_lots, default: the shared
+        PortfolioRiskEngine) plus the batch must stay within max_open_lots.
+        """
+        if open_lots is None:
+            from execution.portfolio_risk import portfolio
+            open_lots = portfolio.gross_lots
+        reasons: List[Optional[str]] = []
+        seen = set()
+        total_lots = open_lots
+        max_lots = config.RISK_CONFIG.max_open_lots
+        for intent in intents:
+            if not SafetyGate.validate_intent(intent):
+                reasons.append("Safety Gate: Invalid Intent or Symbol not allowed")
+            elif intent.idempotency_key in seen:
+                reasons.append(f"Safety Gate: Duplicate key {intent.idempotency_key} in batch")
+            elif total_lots + intent.quantity > max_lots:
+                logger.error(f"SAFETY GATE: Batch quantity exceeds max risk {max_lots}. Blocking {intent.symbol}.")
+                reasons.append(f"Safety Gate: Batch exceeds max_open_lots ({max_lots})")
+            else:
+                total_lots += intent.quantity
+                reasons.append(None)
+            seen.add(intent.idempotency_key)
+        return reasons
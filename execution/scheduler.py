@@ -0,0 +1,333 @@
+"""
+Scheduler Module
+
+One asyncio loop runs every periodic job of the agent on its own schedule:
+
+1. Schedules: Cron("0 */5 * * *") (minute hour day month weekday, UTC,
+   with *, */n, a-b and lists), Every(seconds) (epoch-aligned) and
+   bar_close(timeframe) for candle closes. Job.delay_s shifts a run after
+   its tick (e.g. to let the broker publish the closed bar).
+2. Each job waits on its own task. Synchronous callables run in worker
+   threads, so a slow health check or summary never delays the trading
+   cycle.
+3. Per-job timeout: an async job is cancelled; a thread cannot be
+   killed, so the job is reported as timed out and stays marked running
+   until the thread returns.
+4. Overlap prevention: a tick that arrives while the previous run is
+   still going is skipped (counted), unless allow_overlap.
+5. Missed runs: ticks that passed while the loop was blocked or the host
+   slept are coalesced into one run. With a StateManager, the last tick
+   of each job is persisted, and a tick missed while the process was down
+   is run on start if it is at most catch_up_s old.
+6. SIGTERM (docker stop) stops the loop like stop(), so in-flight jobs
+   get their grace period and atexit hooks run.
+7. Metrics per job: runs, failures, timeouts, skipped and missed counts,
+   and p50/p99 of duration and start jitter (actual start - due time).
+
+    scheduler = Scheduler(state=StateManager())
+    scheduler.add(Job("cycle", bar_close("H1"), engine.run_cycle, timeout_s=900, delay_s=5))
+    scheduler.add(Job("health", Cron("0 */5 * * *"), run_health_check, timeout_s=120))
+    scheduler.run_forever()
+"""
+
+import asyncio
+import inspect
+import logging
+import signal
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional
+
+from execution.risk_gate import LatencyMetrics
+
+logger = logging.getLogger("ForexPlatform")
+
+MAX_SCAN_STEPS = 200_000
+TIMEFRAME_CRONS = {
+    "M1": "* * * * *",
+    "M5": "*/5 * * * *",
+    "M15": "*/15 * * * *",
+    "M30": "*/30 * * * *",
+    "H1": "0 * * * *",
+    "H4": "0 */4 * * *",
+    "D1": "0 0 * * *",
+}
+
+
+def _field(spec: str, lo: int, hi: int) -> frozenset:
+    values = set()
+    for part in spec.split(","):
+        body, _, step = part.partition("/")
+        if body == "*":
+            start, end = lo, hi
+        elif "-" in body:
+            start, end = (int(v) for v in body.split("-"))
+        else:
+            start = int(body)
+            end = hi if step else start
+        if not lo <= start <= end <= hi:
+            raise ValueError(f"Cron field {part!r} outside {lo}-{hi}")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return frozenset(values)
+
+
+class Cron:
+    """Five-field cron expression evaluated in UTC."""
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron needs 5 fields, got {expr!r}")
+        self.expr = expr
+        self.minutes = _field(fields[0], 0, 59)
+        self.hours = _field(fields[1], 0, 23)
+        self.days = _field(fields[2], 1, 31)
+        self.months = _field(fields[3], 1, 12)
+        self.weekdays = frozenset(d % 7 for d in _field(fields[4], 0, 7))  # 0 and 7 = Sunday
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_ok(self, t: datetime) -> bool:
+        dom = t.day in self.days
+        dow = (t.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return dom and dow
+        return dom or dow  # Cron semantics when both are restricted
+
+    def next_after(self, ts: float) -> float:
+        """First tick strictly after `ts` (epoch seconds)."""
+        t = datetime.fromtimestamp(ts, timezone.utc).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(MAX_SCAN_STEPS):
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_ok(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t.timestamp()
+        raise ValueError(f"Cron {self.expr!r} never fires")
+
+    def __repr__(self) -> str:
+        return f"Cron({self.expr!r})"
+
+
+class Every:
+    """Every `seconds`, aligned to the epoch (plus `offset_s`)."""
+
+    def __init__(self, seconds: float, offset_s: float = 0.0):
+        if seconds <= 0:
+            raise ValueError("Every needs a positive period")
+        self.seconds = seconds
+        self.offset_s = offset_s
+
+    def next_after(self, ts: float) -> float:
+        k = (ts - self.offset_s) // self.seconds + 1
+        tick = k * self.seconds + self.offset_s
+        while tick <= ts:  # Float rounding with sub-second periods
+            k += 1
+            tick = k * self.seconds + self.offset_s
+        return tick
+
+    def __repr__(self) -> str:
+        return f"Every({self.seconds})"
+
+
+def bar_close(timeframe: str) -> Cron:
+    """Ticks when a `timeframe` candle closes (M1 ... D1)."""
+    return Cron(TIMEFRAME_CRONS[timeframe])
+
+
+@dataclass
+class Job:
+    """A callable (sync or async) on a schedule."""
+    name: str
+    schedule: Any  # Cron / Every: anything with next_after(ts) -> ts
+    func: Callable[[], Any]
+    timeout_s: Optional[float] = None
+    delay_s: float = 0.0
+    allow_overlap: bool = False
+    catch_up_s: float = 0.0  # Run a tick missed while down if it is at most this old
+    runs: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    skipped: int = 0
+    missed: int = 0
+    next_due: Optional[float] = None
+    last_start: Optional[float] = None
+    last_error: Optional[str] = None
+    in_flight: int = field(default=0, repr=False)
+
+
+class Scheduler:
+    """Runs jobs on their schedules in one asyncio loop."""
+
+    def __init__(self, state=None, clock: Callable[[], float] = time.time):
+        self.jobs: Dict[str, Job] = {}
+        self.state = state
+        self.clock = clock
+        self.durations = LatencyMetrics()
+        self.jitter = LatencyMetrics()
+        self._stop: Optional[asyncio.Event] = None
+        self._running: set = set()
+
+    def add(self, job: Job) -> Job:
+        if job.name in self.jobs:
+            raise ValueError(f"Duplicate job {job.name!r}")
+        self.jobs[job.name] = job
+        return job
+
+    # --- Persistence of last ticks (missed-run catch-up) ---
+
+    def _state_key(self, job: Job) -> str:
+        return f"scheduler_{job.name}"
+
+    def _last_tick(self, job: Job) -> Optional[float]:
+        if self.state is None:
+            return None
+        value = self.state.load_state().get(self._state_key(job))
+        return float(value) if value is not None else None
+
+    def _record_tick(self, job: Job, tick: float) -> None:
+        if self.state is None:
+            return
+        try:
+            self.state.save_state({self._state_key(job): repr(tick)})
+        except Exception as e:
+            logger.warning(f"Scheduler: could not persist {job.name} tick: {e}")
+
+    def _missed_on_start(self, job: Job, now: float) -> Optional[float]:
+        """Latest tick in the catch-up window that never ran."""
+        if job.catch_up_s <= 0 or self.state is None:
+            return None
+        last = self._last_tick(job)
+        latest = None
+        tick = job.schedule.next_after(now - job.catch_up_s)
+        while tick <= now:
+            latest = tick
+            tick = job.schedule.next_after(tick)
+        if latest is None or (last is not None and last >= latest):
+            return None
+        return latest
+
+    # --- Execution ---
+
+    def _launch(self, job: Job, tick: float) -> None:
+        if job.in_flight and not job.allow_overlap:
+            job.skipped += 1
+            logger.warning(f"Scheduler: {job.name} still running, skipped tick "
+                           f"{datetime.fromtimestamp(tick, timezone.utc):%Y-%m-%d %H:%M:%S}")
+            return
+        job.in_flight += 1  # Counted from launch, so the next tick sees it even before the task starts
+        task = asyncio.ensure_future(self._execute(job, tick))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _execute(self, job: Job, tick: float) -> None:
+        start = self.clock()
+        job.last_start = start
+        self.jitter.record(job.name, max(0.0, start - (tick + job.delay_s)))
+        self._record_tick(job, tick)
+
+        if inspect.iscoroutinefunction(job.func):
+            work = asyncio.ensure_future(job.func())
+        else:
+            work = asyncio.ensure_future(asyncio.to_thread(job.func))
+
+        def finished(_):
+            job.in_flight -= 1
+            self.durations.record(job.name, self.clock() - start)
+        work.add_done_callback(finished)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(work), job.timeout_s)
+            job.runs += 1
+        except asyncio.TimeoutError:
+            job.timeouts += 1
+            job.last_error = f"Timed out after {job.timeout_s}s"
+            if inspect.iscoroutinefunction(job.func):
+                work.cancel()
+            logger.error(f"Scheduler: {job.name} timed out after {job.timeout_s}s")
+        except asyncio.CancelledError:
+            work.cancel()
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error(f"Scheduler: {job.name} failed: {e}", exc_info=True)
+
+    async def _job_loop(self, job: Job) -> None:
+        now = self.clock()
+        missed = self._missed_on_start(job, now)
+        if missed is not None:
+            logger.info(f"Scheduler: catching up {job.name} tick missed while down")
+            self._launch(job, missed)
+        due = job.schedule.next_after(now)
+        while True:
+            job.next_due = due
+            wait = due + job.delay_s - self.clock()
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), wait)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+            if self._stop.is_set():
+                return
+            now = self.clock()
+            # Ticks that passed while we were late are coalesced into this run
+            following = job.schedule.next_after(due)
+            while following + job.delay_s <= now:
+                job.missed += 1
+                due, following = following, job.schedule.next_after(following)
+            self._launch(job, due)
+            due = following
+
+    async def run(self, grace_s: float = 5.0) -> None:
+        """Runs until stop(); in-flight jobs get `grace_s` to finish."""
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            # docker stop: stop cleanly so atexit hooks (journal, balance) still run
+            loop.add_signal_handler(signal.SIGTERM, self.stop)
+            handles_sigterm = True
+        except (NotImplementedError, RuntimeError, ValueError):  # Windows / not the main thread
+            handles_sigterm = False
+        loops = [asyncio.ensure_future(self._job_loop(job)) for job in self.jobs.values()]
+        logger.info(f"Scheduler: started {len(loops)} job(s): "
+                    + ", ".join(f"{j.name} {j.schedule!r}" for j in self.jobs.values()))
+        try:
+            await self._stop.wait()
+        finally:
+            if handles_sigterm:
+                loop.remove_signal_handler(signal.SIGTERM)
+            self._stop.set()
+            await asyncio.gather(*loops, return_exceptions=True)
+            if self._running:
+                await asyncio.wait(list(self._running), timeout=grace_s)
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+
+    def run_forever(self) -> None:
+        asyncio.run(self.run())
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-job counters plus duration and start-jitter percentiles (ms)."""
+        durations, jitter = self.durations.summary(), self.jitter.summary()
+        out = {}
+        for name, job in self.jobs.items():
+            out[name] = {
+                "runs": job.runs, "failures": job.failures, "timeouts": job.timeouts,
+                "skipped": job.skipped, "missed": job.missed, "running": job.in_flight > 0,
+                "next_due": job.next_due, "last_error": job.last_error,
+            }
+            for label, stats in (("duration", durations.get(name)), ("jitter", jitter.get(name))):
+                if stats:
+                    out[name][f"{label}_p50_ms"] = stats["p50_us"] / 1e3
+                    out[name][f"{label}_p99_ms"] = stats["p99_us"] / 1e3
+        return out
@@ -0,0 +1,291 @@
+"""
+Signal Matrix Module
+
+Evaluates a matrix of (symbol x strategy x params) cells in one cycle:
+
+1. Candles are fetched once per symbol and shared by every cell on it.
+2. Indicators are memoized per symbol (IndicatorCache), so two SMA-cross
+   cells with the same slow period compute that SMA once.
+3. Cells run concurrently in a thread pool under a fixed latency budget;
+   cells that miss the budget are reported as timed out, not waited for.
+4. Fresh signals (on the last closed candle) are ranked and de-conflicted:
+   one signal per symbol, and opposite directions on a symbol cancel out.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from execution.generate_signals import SignalGenerator
+
+logger = logging.getLogger("ForexPlatform")
+
+DEFAULT_LATENCY_BUDGET_S = 20.0
+DEFAULT_HISTORY = 300  # Candles per symbol (covers SMA 200 + warmup)
+
+
+@dataclass(frozen=True)
+class SignalCell:
+    """One (symbol, strategy, params) combination."""
+    symbol: str
+    strategy: str
+    params: Tuple[Tuple[str, object], ...] = ()
+    priority: int = 0  # Higher ranks first when several cells fire
+
+    @classmethod
+    def from_dict(cls, cfg: Dict) -> "SignalCell":
+        return cls(
+            symbol=cfg["symbol"],
+            strategy=cfg["strategy"],
+            params=tuple(sorted((cfg.get("params") or {}).items())),
+            priority=cfg.get("priority", 0),
+        )
+
+    @property
+    def params_dict(self) -> Dict:
+        return dict(self.params)
+
+    @property
+    def label(self) -> str:
+        args = ",".join(f"{k}={v}" for k, v in self.params)
+        return f"{self.symbol}:{self.strategy}({args})"
+
+
+@dataclass
+class CellResult:
+    """Outcome of one cell."""
+    cell: SignalCell
+    signal: Optional[object] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+    timed_out: bool = False
+
+
+@dataclass
+class MatrixResult:
+    """Ranked, de-conflicted signals plus per-cell diagnostics."""
+    signals: List[object] = field(default_factory=list)
+    cells: List[CellResult] = field(default_factory=list)
+    conflicts: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def timed_out(self) -> List[SignalCell]:
+        return [r.cell for r in self.cells if r.timed_out]
+
+    @property
+    def errors(self) -> List[CellResult]:
+        return [r for r in self.cells if r.error]
+
+
+class IndicatorCache:
+    """
+    Memoized indicators for one symbol's candles (thread-safe).
+
+    Formulas match BaselineSMACross so cached and recomputed values agree.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._values: Dict[Tuple, pd.Series] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: Tuple, compute: Callable[[], pd.Series]) -> pd.Series:
+        with self._lock:
+            cached = self._values.get(key)
+        if cached is not None:
+            return cached
+        value = compute()
+        with self._lock:
+            return self._values.setdefault(key, value)
+
+    def sma(self, period: int) -> pd.Series:
+        return self._get(("sma", period), lambda: self.df["close"].rolling(window=period).mean())
+
+    def atr(self, period: int) -> pd.Series:
+        def compute():
+            high_low = self.df["high"] - self.df["low"]
+            high_close = (self.df["high"] - self.df["close"].shift()).abs()
+            low_close = (self.df["low"] - self.df["close"].shift()).abs()
+            tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+            return tr.rolling(window=period).mean()
+        return self._get(("atr", period), compute)
+
+    def rsi(self, period: int) -> pd.Series:
+        def compute():
+            delta = self.df["close"].diff()
+            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+            rs = gain / loss
+            return 100 - (100 / (1 + rs))
+        return self._get(("rsi", period), compute)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+def fetch_frame(symbol: str, timeframe: str, limit: int = DEFAULT_HISTORY) -> pd.DataFrame:
+    """Candles for one symbol via the configured data provider."""
+    from execution import market_data
+    return market_data.normalize(market_data.fetch_prices(symbol, timeframe, limit))
+
+
+def _signal_score(cell: SignalCell, signal) -> Tuple:
+    risk = abs(signal.entry_price - signal.stop_loss)
+    reward = abs(signal.take_profit - signal.entry_price)
+    rr = reward / risk if risk > 0 else 0.0
+    return (cell.priority, rr)
+
+
+def rank_signals(hits: List[Tuple[SignalCell, object]]) -> Tuple[List[Tuple[SignalCell, object]], List[str]]:
+    """
+    Best signal per symbol, best first. Opposite directions on one symbol
+    cancel each other (reported in the conflicts list).
+    """
+    by_symbol: Dict[str, List[Tuple[SignalCell, object]]] = {}
+    for cell, signal in hits:
+        by_symbol.setdefault(cell.symbol, []).append((cell, signal))
+
+    winners, conflicts = [], []
+    for symbol, entries in by_symbol.items():
+        directions = {signal.direction for _, signal in entries}
+        if len(directions) > 1:
+            conflicts.append(f"{symbol}: " + ", ".join(f"{c.label}={s.direction}" for c, s in entries))
+            continue
+        winners.append(max(entries, key=lambda e: _signal_score(*e)))
+
+    winners.sort(key=lambda e: _signal_score(*e), reverse=True)
+    return winners, conflicts
+
+
+class SignalMatrix:
+    """Concurrent evaluation of a (symbol x strategy x params) matrix."""
+
+    def __init__(self, cells: List[SignalCell], timeframe: str = "H1",
+                 latency_budget_s: float = DEFAULT_LATENCY_BUDGET_S, max_workers: int = 4,
+                 fetcher: Callable[[str, str], pd.DataFrame] = fetch_frame, fresh_only: bool = True,
+                 feature_store=None):
+        self.cells = list(dict.fromkeys(cells))  # Drop duplicate cells, keep order
+        self.timeframe = timeframe
+        self.latency_budget_s = latency_budget_s
+        self.max_workers = max_workers
+        self.fetcher = fetcher
+        self.fresh_only = fresh_only
+        self.feature_store = feature_store  # Optional FeatureStore: indicators read from persisted features
+        # Strategy instances are reused across cycles (they hold no per-run state)
+        self._generators: Dict[SignalCell, SignalGenerator] = {}
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(dict.fromkeys(c.symbol for c in self.cells))
+
+    def _generator(self, cell: SignalCell) -> SignalGenerator:
+        gen = self._generators.get(cell)
+        if gen is None:
+            gen = self._generators[cell] = SignalGenerator(cell.strategy, cell.params_dict)
+        return gen
+
+    def _run_cell(self, cell: SignalCell, df: pd.DataFrame, cache: IndicatorCache,
+                  context: Dict) -> CellResult:
+        start = time.perf_counter()
+        result = CellResult(cell)
+        try:
+            signals = self._generator(cell).generate_frame(df, {**context, "indicators": cache})
+            if signals:
+                latest = signals[-1]
+                if not self.fresh_only or pd.Timestamp(latest.timestamp) == pd.Timestamp(df["timestamp"].iloc[-1]):
+                    result.signal = latest.to_signal()  # Validate only what leaves the matrix
+        except Exception as e:
+            logger.error(f"SignalMatrix: {cell.label} failed: {e}")
+            result.error = f"{type(e).__name__}: {e}"
+        result.elapsed_ms = (time.perf_counter() - start) * 1000.0
+        return result
+
+    def evaluate(self, data: Optional[Dict[str, pd.DataFrame]] = None,
+                 contexts: Optional[Dict[str, Dict]] = None) -> MatrixResult:
+        """
+        Runs every cell within the latency budget.
+
+        data: {symbol: candles}; missing symbols are fetched (concurrently).
+        contexts: {symbol: strategy context, e.g. {"sentiment": "BULLISH"}}.
+        """
+        start = time.perf_counter()
+        deadline = start + self.latency_budget_s
+        data = dict(data or {})
+        contexts = contexts or {}
+        results: Dict[SignalCell, CellResult] = {}
+
+        by_symbol: Dict[str, List[SignalCell]] = {}
+        for cell in self.cells:
+            by_symbol.setdefault(cell.symbol, []).append(cell)
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="signal-matrix")
+        pending: Dict = {}  # future -> symbol (fetch) or SignalCell (cell)
+
+        def submit_cells(symbol: str, df: Optional[pd.DataFrame]):
+            if df is None or df.empty:
+                for cell in by_symbol[symbol]:
+                    results[cell] = CellResult(cell, error="No data")
+                return
+            # Shared by every cell on this symbol
+            if self.feature_store is not None:
+                cache = self.feature_store.view(symbol, self.timeframe, df)
+            else:
+                cache = IndicatorCache(df)
+            for cell in by_symbol[symbol]:
+                fut = pool.submit(self._run_cell, cell, df, cache, contexts.get(symbol, {}))
+                pending[fut] = cell
+
+        try:
+            # Cells start as soon as their symbol's candles are in; one fetch per symbol
+            for symbol in by_symbol:
+                if symbol in data:
+                    submit_cells(symbol, data[symbol])
+                else:
+                    pending[pool.submit(self.fetcher, symbol, self.timeframe)] = symbol
+
+            while pending:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    key = pending.pop(fut)
+                    if isinstance(key, SignalCell):
+                        results[key] = fut.result()
+                        continue
+                    try:
+                        df = fut.result()
+                    except Exception as e:
+                        logger.error(f"SignalMatrix: fetch {key} failed: {e}")
+                        df = None
+                    submit_cells(key, df)
+
+            late = [c for key in pending.values() for c in (by_symbol[key] if isinstance(key, str) else [key])]
+            for fut in pending:
+                fut.cancel()
+            for cell in late:
+                results[cell] = CellResult(cell, timed_out=True,
+                                           elapsed_ms=(time.perf_counter() - start) * 1000.0)
+                logger.warning(f"SignalMatrix: {cell.label} missed the {self.latency_budget_s}s budget")
+        finally:
+            # Do not block the cycle on stragglers
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        ordered = [results[c] for c in self.cells]
+        hits = [(r.cell, r.signal) for r in ordered if r.signal is not None]
+        ranked, conflicts = rank_signals(hits)
+        for conflict in conflicts:
+            logger.info(f"SignalMatrix: conflicting signals dropped ({conflict})")
+
+        return MatrixResult(
+            signals=[signal for _, signal in ranked],
+            cells=ordered,
+            conflicts=conflicts,
+            elapsed_ms=(time.perf_counter() - start) * 1000.0,
+        )
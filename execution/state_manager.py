@@ -1,53 +1,220 @@
+"""
+State Manager Module
+
+Last processed candle per symbol/timeframe (the candle idempotency check):
+
+1. SQLite backend (default, data/state.db): WAL journal, one atomic upsert
+   per mark, busy timeout, so several symbols, timeframes and agent
+   processes share one file without rewriting it. One connection and read
+   cache per path is shared by every StateManager in the process; cache
+   hits skip the DB, misses read through (other processes' marks).
+2. JSON backend (paths ending in .json): the legacy state.json layout,
+   written to a temp file, fsynced and renamed into place, so a crash never
+   leaves a half-written file. Reads are cached until the file changes.
+3. A corrupt store raises StateCorruptedError instead of reading as empty,
+   which would silently disable idempotency.
+4. sync: "full" (fsync every write, default), "normal" (WAL: fsync at
+   checkpoints; JSON: no fsync) or "off".
+
+An existing data/state.json is imported into the SQLite store once.
+"""
+
 import json
-import os
 import logging
-from datetime import datetime
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+STATE_FILE = os.path.join(STATE_DIR, "state.db")
+LEGACY_STATE_FILE = os.path.join(STATE_DIR, "state.json")
+SYNC_MODES = ("full", "normal", "off")
 
-STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "state.json")
 logger = logging.getLogger("StateManager")
 
-class StateManager:
-    def __init__(self, file_path=STATE_FILE):
-        self.file_path = file_path
-        self._ensure_dir()
 
-    def _ensure_dir(self):
-        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-        if not os.path.exists(self.file_path):
-            with open(self.file_path, 'w') as f:
-                json.dump({}, f)
+class StateCorruptedError(Exception):
+    """The state store exists but cannot be read."""
+
 
-    def load_state(self):
+def _key(symbol: str, timeframe: str) -> str:
+    return f"{symbol}_{timeframe}"
+
+
+class SqliteStateBackend:
+    """Key/value state on a SQLite WAL database."""
+
+    def __init__(self, path: str, sync: str = "full"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cache: Dict[str, str] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
         try:
-            with open(self.file_path, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+            self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"PRAGMA synchronous={sync.upper()}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS candle_state ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+        except sqlite3.DatabaseError as e:
+            raise StateCorruptedError(f"{path}: {e}") from e
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM candle_state WHERE key = ?", (key,)).fetchone()
+            value = row[0] if row else None
+            if value is None:
+                self._cache.pop(key, None)
+            else:
+                self._cache[key] = value
+            return value
+
+    def cached(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def put_many(self, items: Dict[str, str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO candle_state (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                [(k, v, now) for k, v in items.items()],
+            )
+            self._cache.update(items)
+
+    def load(self) -> Dict[str, str]:
+        with self._lock:
+            state = dict(self._conn.execute("SELECT key, value FROM candle_state").fetchall())
+            self._cache = dict(state)
+            return state
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
 
-    def save_state(self, state):
+class JsonStateBackend:
+    """The legacy state.json, rewritten atomically."""
+
+    def __init__(self, path: str, sync: str = "full"):
+        self.path = path
+        self.fsync = sync == "full"
+        self._lock = threading.Lock()
+        self._cache: Dict[str, str] = {}
+        self._stamp = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _read(self) -> Dict[str, str]:
         try:
-            with open(self.file_path, 'w') as f:
-                json.dump(state, f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save state: {e}")
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._cache, self._stamp = {}, None
+            return self._cache
+        stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if stamp != self._stamp:
+            try:
+                with open(self.path, "r") as f:
+                    text = f.read()
+                self._cache = json.loads(text) if text.strip() else {}
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise StateCorruptedError(f"{self.path}: {e}") from e
+            self._stamp = stamp
+        return self._cache
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._read().get(key)
+
+    def cached(self, key: str) -> Optional[str]:
+        return None  # The file stat in get() is the cache check
+
+    def put_many(self, items: Dict[str, str]) -> None:
+        with self._lock:
+            state = {**self._read(), **items}
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp = tempfile.mkstemp(prefix=".state-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(state, f, indent=2)
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            self._read()
+
+    def load(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._read())
+
+    def close(self) -> None:
+        pass
+
+
+_backends: Dict[str, object] = {}
+_backends_lock = threading.Lock()
+
+
+def _backend(path: str, sync: str):
+    if sync not in SYNC_MODES:
+        raise ValueError(f"sync must be one of {SYNC_MODES}, got {sync!r}")
+    if path.endswith(".json"):
+        return JsonStateBackend(path, sync)
+    real = os.path.realpath(path)
+    with _backends_lock:
+        backend = _backends.get(real)
+        if backend is None:
+            backend = SqliteStateBackend(path, sync)
+            if real == os.path.realpath(STATE_FILE):
+                _import_legacy(backend)
+            _backends[real] = backend
+    return backend
+
+
+def _import_legacy(backend: SqliteStateBackend) -> None:
+    """One-time copy of data/state.json into an empty store."""
+    if backend.load() or not os.path.exists(LEGACY_STATE_FILE):
+        return
+    try:
+        legacy = JsonStateBackend(LEGACY_STATE_FILE).load()
+    except StateCorruptedError as e:
+        logger.error(f"Legacy state not imported: {e}")
+        return
+    if legacy:
+        backend.put_many({k: str(v) for k, v in legacy.items()})
+        logger.info(f"Imported {len(legacy)} key(s) from {LEGACY_STATE_FILE}")
+
+
+class StateManager:
+    def __init__(self, file_path=STATE_FILE, sync: str = "full"):
+        self.file_path = str(file_path)
+        self.backend = _backend(self.file_path, sync)
+
+    def load_state(self) -> Dict[str, str]:
+        return self.backend.load()
+
+    def save_state(self, state: Dict[str, str]):
+        """Upserts the given keys (other keys are kept)."""
+        self.backend.put_many(state)
 
     def is_candle_processed(self, symbol: str, timeframe: str, timestamp: str) -> bool:
         """
         Checks if the candle (identified by timestamp) has already been processed.
         """
-        state = self.load_state()
-        key = f"{symbol}_{timeframe}"
-        last_processed = state.get(key)
-        
-        if last_processed == timestamp:
+        key = _key(symbol, timeframe)
+        if self.backend.cached(key) == timestamp:
             return True
-        return False
+        return self.backend.get(key) == timestamp
 
     def mark_candle_processed(self, symbol: str, timeframe: str, timestamp: str):
         """
         Updates the state to mark this candle as processed.
         """
-        state = self.load_state()
-        key = f"{symbol}_{timeframe}"
-        state[key] = timestamp
-        self.save_state(state)
+        self.backend.put_many({_key(symbol, timeframe): timestamp})
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from execution.core.signals import Signal, SignalType
+from execution.core.signals import Signal, SignalFrame
 
 class BaselineSMACross:
     """
@@ -29,43 +29,87 @@ class BaselineSMACross:
         """
         Calculates signals based on SMA Crossover with optional Sentiment Filter.
         """
+        return self.calculate_frame(df, context).to_signals()
+
+    def calculate_frame(self, df: pd.DataFrame, context: dict = None) -> SignalFrame:
+        """
+        Same signals as calculate(), as an unvalidated SignalFrame (backtest hot path).
+        """
         if df.empty:
-            return []
-            
+            return SignalFrame.empty()
+
         sentiment = context.get('sentiment', 'NEUTRAL') if context else 'NEUTRAL'
-        
-        # 1. Calculate Indicators
-        data = self._calculate_indicators(df.copy())
-        
-        signals = []
+        indicators = context.get('indicators') if context else None
+
         min_periods = max(self.slow_period, 15)
-        
-        if len(data) < min_periods:
-             return []
-            
-        # Iterate through data to find crossovers
-        # maintain previous_row state for crossover detection
-        previous_row = data.iloc[self.slow_period - 1]
-        
-        for i in range(self.slow_period, len(data)):
-            current_row = data.iloc[i]
-            
-            # Skip valid check
-            if pd.isna(current_row['atr']) or pd.isna(current_row['rsi']):
-                previous_row = current_row
-                continue
-
-            # 2. Analyze Candle for Signal
-            signal = self._analyze_candle(current_row, previous_row, sentiment)
-            if signal:
-                signals.append(signal)
-            
-            previous_row = current_row
-            
-        return signals
-
-    def _calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Adds SMA, ATR, and RSI indicators to the DataFrame."""
+        if len(df) < min_periods:
+            return SignalFrame.empty()
+
+        # 1. Calculate Indicators
+        data = self._calculate_indicators(df.copy(), indicators)
+        fast = data['sma_fast'].to_numpy(dtype=float)
+        slow = data['sma_slow'].to_numpy(dtype=float)
+        atr = data['atr'].to_numpy(dtype=float)
+        rsi = data['rsi'].to_numpy(dtype=float)
+        close = data['close'].to_numpy(dtype=float)
+
+        # 2. Crossovers of candle i against candle i-1, from slow_period on
+        start = self.slow_period
+        cur, prev = slice(start, None), slice(start - 1, -1)
+        valid = ~np.isnan(atr[cur]) & ~np.isnan(rsi[cur])
+        bullish = valid & (fast[prev] <= slow[prev]) & (fast[cur] > slow[cur])
+        bearish = valid & (fast[prev] >= slow[prev]) & (fast[cur] < slow[cur])
+
+        # 3. Filters
+        if sentiment == 'BEARISH':
+            bullish[:] = False
+        if sentiment == 'BULLISH':
+            bearish[:] = False
+        if self.use_rsi_filter:
+            bullish &= (rsi[cur] > self.RSI_BULLISH_MIN) & (rsi[cur] < self.RSI_OVERBOUGHT)
+            bearish &= (rsi[cur] > self.RSI_OVERSOLD) & (rsi[cur] < self.RSI_BEARISH_MAX)
+
+        rows = start + np.flatnonzero(bullish | bearish)
+        if len(rows) == 0:
+            return SignalFrame.empty()
+
+        # 4. Risk Calc (ATR based SL/TP)
+        sign = np.where(bullish[rows - start], 1, -1)
+        entry = close[rows]
+        stop_loss = entry - sign * (self.SL_MULTIPLIER * atr[rows])
+        take_profit = entry + sign * (self.TP_MULTIPLIER * atr[rows])
+        rr = np.abs(take_profit - entry) / np.abs(entry - stop_loss)
+
+        rationale = [
+            f"SMA({self.fast_period}) {'>' if d > 0 else '<'} SMA({self.slow_period}) | ATR={a:.5f} | "
+            f"RSI={r:.1f} | Sentiment={sentiment} | RR={q:.2f}"
+            for d, a, r, q in zip(sign, atr[rows], rsi[rows], rr)
+        ]
+        return SignalFrame(
+            symbol=data['symbol'].to_numpy()[rows],
+            timestamp=data['timestamp'].iloc[rows],
+            direction=sign,
+            entry_price=entry,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            rationale=rationale,
+            metadata=[{'close': float(e)} for e in entry],
+        )
+
+    def _calculate_indicators(self, df: pd.DataFrame, indicators=None) -> pd.DataFrame:
+        """
+        Adds SMA, ATR, and RSI indicators to the DataFrame.
+
+        indicators: optional shared cache (sma/atr/rsi per period) built on the
+        same candles, e.g. signal_matrix.IndicatorCache.
+        """
+        if indicators is not None:
+            df['sma_fast'] = indicators.sma(self.fast_period)
+            df['sma_slow'] = indicators.sma(self.slow_period)
+            df['atr'] = indicators.atr(self.ATR_PERIOD)
+            df['rsi'] = indicators.rsi(self.RSI_PERIOD)
+            return df
+
         # SMAs
         df['sma_fast'] = df['close'].rolling(window=self.fast_period).mean()
         df['sma_slow'] = df['close'].rolling(window=self.slow_period).mean()
@@ -85,88 +129,3 @@ class BaselineSMACross:
         df['rsi'] = 100 - (100 / (1 + rs))
         
         return df
-
-    def _analyze_candle(self, current: pd.Series, previous: pd.Series, sentiment: str) -> dict | None:
-        """Determines if a signal should be generated for the current candle."""
-        
-        # Detect Crossovers
-        bullish_cross = (previous['sma_fast'] <= previous['sma_slow']) and (current['sma_fast'] > current['sma_slow'])
-        bearish_cross = (previous['sma_fast'] >= previous['sma_slow']) and (current['sma_fast'] < current['sma_slow'])
-        
-        if bullish_cross:
-            return self._handle_bullish_signal(current, sentiment)
-        elif bearish_cross:
-            return self._handle_bearish_signal(current, sentiment)
-            
-        return None
-
-    def _handle_bullish_signal(self, row: pd.Series, sentiment: str) -> dict | None:
-        """Validates and creates a LONG signal."""
-        # Sentiment Filter
-        if sentiment == 'BEARISH':
-            return None
-
-        # RSI Filter
-        if self.use_rsi_filter:
-            if not (self.RSI_BULLISH_MIN < row['rsi'] < self.RSI_OVERBOUGHT):
-                return None
-                
-        # Risk Calc
-        atr = row['atr']
-        sl_dist = self.SL_MULTIPLIER * atr
-        tp_dist = self.TP_MULTIPLIER * atr
-        
-        return self._create_signal(
-            signal_type=SignalType.LONG,
-            row=row,
-            stop_loss=row['close'] - sl_dist,
-            take_profit=row['close'] + tp_dist,
-            sentiment=sentiment,
-            rationale=f"SMA({self.fast_period}) > SMA({self.slow_period})"
-        )
-
-    def _handle_bearish_signal(self, row: pd.Series, sentiment: str) -> dict | None:
-        """Validates and creates a SHORT signal."""
-        # Sentiment Filter
-        if sentiment == 'BULLISH':
-            return None
-
-        # RSI Filter
-        if self.use_rsi_filter:
-            if not (self.RSI_OVERSOLD < row['rsi'] < self.RSI_BEARISH_MAX):
-                return None
-
-        # Risk Calc
-        atr = row['atr']
-        sl_dist = self.SL_MULTIPLIER * atr
-        tp_dist = self.TP_MULTIPLIER * atr
-        
-        return self._create_signal(
-            signal_type=SignalType.SHORT,
-            row=row,
-            stop_loss=row['close'] + sl_dist,
-            take_profit=row['close'] - tp_dist,
-            sentiment=sentiment,
-            rationale=f"SMA({self.fast_period}) < SMA({self.slow_period})"
-        )
-
-    def _create_signal(self, signal_type: SignalType, row: pd.Series, stop_loss: float, take_profit: float, sentiment: str, rationale: str) -> Signal:
-        """Constructs a typed Signal object."""
-        entry_price = row['close']
-        rr_ratio = abs(take_profit - entry_price) / abs(entry_price - stop_loss)
-        
-        full_rationale = (
-            f"{rationale} | ATR={row['atr']:.5f} | "
-            f"RSI={row['rsi']:.1f} | Sentiment={sentiment} | RR={rr_ratio:.2f}"
-        )
-        
-        return Signal(
-            timestamp=row['timestamp'],
-            symbol=row['symbol'],
-            signal_type=signal_type,
-            entry_price=entry_price,
-            stop_loss=stop_loss,
-            take_profit=take_profit,
-            rationale=full_rationale,
-            metadata={'close': entry_price}
-        )
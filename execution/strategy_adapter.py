@@ -0,0 +1,127 @@
+"""
+Strategy Adapter Module
+
+Lets backtesting.py-style strategies (strategy_playground) produce Signals
+like the live strategies. The strategy is replayed over the candles with
+FastBacktest (so position-dependent logic behaves as in the playground) and
+every buy()/sell() it places becomes a Signal on that bar.
+
+Strategies that do not set sl/tp get ATR-based levels (same multipliers as
+BaselineSMACross), since a Signal always carries both.
+"""
+
+import logging
+from typing import Dict, List, Optional, Type
+
+import numpy as np
+import pandas as pd
+from backtesting import Strategy
+
+from execution.core.signals import Signal, SignalType
+from execution.strategy_playground.fast_engine import FastBacktest
+
+logger = logging.getLogger("ForexPlatform")
+
+ATR_PERIOD = 14
+SL_ATR_MULT = 1.5
+TP_ATR_MULT = 3.0
+
+# Large virtual account so margin never blocks an order we want to observe
+_REPLAY_CASH = 1_000_000_000
+_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+
+
+def _atr(df: pd.DataFrame, n: int = ATR_PERIOD) -> np.ndarray:
+    prev_close = df["close"].shift()
+    tr = pd.concat([df["high"] - df["low"], (df["high"] - prev_close).abs(),
+                    (df["low"] - prev_close).abs()], axis=1).max(axis=1)
+    return tr.rolling(n).mean().to_numpy()
+
+
+def _recording_subclass(strategy_cls: Type[Strategy], orders: List[Dict]) -> Type[Strategy]:
+    """Strategy subclass that logs every entry order it places."""
+
+    def _record(self, direction: str, kwargs: Dict):
+        orders.append({
+            "bar": len(self.data) - 1,
+            "direction": direction,
+            "sl": kwargs.get("sl"),
+            "tp": kwargs.get("tp"),
+            "size": kwargs.get("size"),
+        })
+
+    def buy(self, **kwargs):
+        _record(self, "LONG", kwargs)
+        return strategy_cls.buy(self, **kwargs)
+
+    def sell(self, **kwargs):
+        _record(self, "SHORT", kwargs)
+        return strategy_cls.sell(self, **kwargs)
+
+    return type(strategy_cls.__name__, (strategy_cls,), {"buy": buy, "sell": sell})
+
+
+class BacktestingStrategyAdapter:
+    """Wraps a backtesting.py Strategy class behind `calculate(df, context)`."""
+
+    def __init__(self, strategy_cls: Type[Strategy], **params):
+        self.strategy_cls = strategy_cls
+        self.params = params
+
+    def _to_backtesting_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        ohlc = df[[c for c in _COLUMNS if c in df.columns]].rename(columns=_COLUMNS).astype(float)
+        ohlc.index = pd.DatetimeIndex(pd.to_datetime(df["timestamp"]))
+        return ohlc
+
+    def calculate(self, df: pd.DataFrame, context: dict = None) -> List[Signal]:
+        """
+        Replays the strategy over `df` and returns one Signal per entry order.
+
+        The sentiment filter matches BaselineSMACross: BEARISH drops LONGs,
+        BULLISH drops SHORTs.
+        """
+        if df.empty:
+            return []
+        sentiment = context.get("sentiment", "NEUTRAL") if context else "NEUTRAL"
+        df = df.reset_index(drop=True)
+
+        orders: List[Dict] = []
+        bt = FastBacktest(self._to_backtesting_frame(df), _recording_subclass(self.strategy_cls, orders),
+                          cash=_REPLAY_CASH, margin=1.0)
+        bt.run(**self.params)
+
+        atr = _atr(df)
+        symbol = str(df["symbol"].iloc[0]) if "symbol" in df.columns else "UNKNOWN"
+        signals = []
+        for order in orders:
+            direction = order["direction"]
+            if (direction == "LONG" and sentiment == "BEARISH") or (direction == "SHORT" and sentiment == "BULLISH"):
+                continue
+            signal = self._to_signal(df, order, atr[order["bar"]], symbol, sentiment)
+            if signal is not None:
+                signals.append(signal)
+        return signals
+
+    def _to_signal(self, df: pd.DataFrame, order: Dict, atr: float, symbol: str,
+                   sentiment: str) -> Optional[Signal]:
+        row = df.iloc[order["bar"]]
+        entry = float(row["close"])
+        sign = 1.0 if order["direction"] == "LONG" else -1.0
+        stop_loss, take_profit = order["sl"], order["tp"]
+        if stop_loss is None or take_profit is None:
+            if np.isnan(atr):
+                logger.debug(f"{self.strategy_cls.__name__}: no ATR yet for fallback SL/TP, skipping order")
+                return None
+            stop_loss = stop_loss if stop_loss is not None else entry - sign * SL_ATR_MULT * atr
+            take_profit = take_profit if take_profit is not None else entry + sign * TP_ATR_MULT * atr
+
+        return Signal(
+            timestamp=row["timestamp"],
+            symbol=symbol,
+            signal_type=SignalType.LONG if sign > 0 else SignalType.SHORT,
+            entry_price=entry,
+            stop_loss=float(stop_loss),
+            take_profit=float(take_profit),
+            rationale=f"{self.strategy_cls.__name__} {order['direction']} | Sentiment={sentiment}",
+            metadata={"close": entry, "strategy": self.strategy_cls.__name__, "params": dict(self.params)},
+        )
@@ -0,0 +1,123 @@
+"""
+Benchmark: backtesting.py vs. FastBacktest
+
+Runs every bundled playground strategy through both engines on the same
+synthetic M15 data, checks that the results agree and prints the timings.
+
+Usage:
+    python execution/strategy_playground/bench_engines.py --bars 100000
+    python execution/strategy_playground/bench_engines.py --optimize
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from backtesting import Backtest
+from execution.strategy_playground.fast_engine import FastBacktest
+from execution.strategy_playground.strategies.alligator_trend import AlligatorTrendStrategy
+from execution.strategy_playground.strategies.bollinger_breakout import BollingerBreakoutStrategy
+from execution.strategy_playground.strategies.fractal_order_block import FractalOrderBlockStrategy
+from execution.strategy_playground.strategies.heiken_ashi_trend import HeikenAshiTrendStrategy
+from execution.strategy_playground.strategies.london_breakout import LondonBreakoutStrategy
+from execution.strategy_playground.strategies.m15_orb_fusion import M15OrbFusionStrategy
+from execution.strategy_playground.strategies.momentum_combo import MomentumComboStrategy
+from execution.strategy_playground.strategies.sma_cross import SmaCross
+from execution.strategy_playground.strategies.sma_rsi_adx import SmaRsiAdxStrategy
+from execution.strategy_playground.strategies.sma_rsi_atr import SmaRsiAtrStrategy
+
+STRATEGIES = [
+    SmaCross,
+    AlligatorTrendStrategy,
+    BollingerBreakoutStrategy,
+    FractalOrderBlockStrategy,
+    HeikenAshiTrendStrategy,
+    LondonBreakoutStrategy,
+    M15OrbFusionStrategy,
+    MomentumComboStrategy,
+    SmaRsiAdxStrategy,
+    SmaRsiAtrStrategy,
+]
+
+BACKTEST_KWARGS = dict(cash=10000, commission=.0002, margin=0.02)
+
+OPTIMIZE_GRID = dict(
+    sl_atr_mult=[2.0, 3.0, 4.0],
+    use_trailing_sl=[True, False],
+    adx_threshold=[20, 25, 30],
+)
+
+
+def make_data(bars: int, seed: int = 42) -> pd.DataFrame:
+    """Random-walk EURUSD-like M15 candles."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=bars, freq="15min")
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0008, bars))
+    open_ = np.r_[close[0], close[:-1]]
+    high = np.maximum(open_, close) + rng.random(bars) * 0.0005
+    low = np.minimum(open_, close) - rng.random(bars) * 0.0005
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": 1.0}, index=index)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    try:
+        return fn(), time.perf_counter() - start, None
+    except Exception as e:
+        return None, time.perf_counter() - start, f"{type(e).__name__}: {e}"
+
+
+def bench_run(df: pd.DataFrame):
+    print(f"{'Strategy':<28} | {'backtesting.py':>14} | {'FastBacktest':>12} | {'Speedup':>7} | {'# Trades':>8} | Match")
+    print("-" * 95)
+    for strategy in STRATEGIES:
+        ref, t_ref, err_ref = _timed(lambda: Backtest(df, strategy, **BACKTEST_KWARGS).run())
+        fast, t_fast, err_fast = _timed(lambda: FastBacktest(df, strategy, **BACKTEST_KWARGS).run())
+
+        if err_ref or err_fast:
+            print(f"{strategy.__name__:<28} | error: {err_ref or err_fast}"[:140])
+            continue
+
+        match = np.allclose(ref._equity_curve['Equity'], fast._equity_curve['Equity'])
+        print(f"{strategy.__name__:<28} | {t_ref:>13.2f}s | {t_fast:>11.2f}s | {t_ref / t_fast:>6.1f}x | "
+              f"{fast['# Trades']:>8} | {'OK' if match else 'DIFF'}")
+
+
+def bench_optimize(df: pd.DataFrame):
+    n_combos = int(np.prod([len(v) for v in OPTIMIZE_GRID.values()]))
+    print(f"\nOptimize AlligatorTrendStrategy ({n_combos} combinations, maximize='Return [%]')")
+    ref, t_ref, err_ref = _timed(lambda: Backtest(df, AlligatorTrendStrategy, **BACKTEST_KWARGS)
+                                 .optimize(maximize='Return [%]', **OPTIMIZE_GRID))
+    fast, t_fast, err_fast = _timed(lambda: FastBacktest(df, AlligatorTrendStrategy, **BACKTEST_KWARGS)
+                                    .optimize(maximize='Return [%]', **OPTIMIZE_GRID))
+    if err_ref or err_fast:
+        print(f"  error: {err_ref or err_fast}")
+        return
+    print(f"  backtesting.py: {t_ref:.2f}s -> {ref._strategy}")
+    print(f"  FastBacktest:   {t_fast:.2f}s -> {fast._strategy}")
+    print(f"  Speedup: {t_ref / t_fast:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backtesting.py vs. FastBacktest")
+    parser.add_argument("--bars", type=int, default=50000, help="Number of synthetic M15 bars")
+    parser.add_argument("--optimize", action="store_true", help="Also benchmark a parameter grid search")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    df = make_data(args.bars)
+    print(f"--- Engine Benchmark ({args.bars} M15 bars) ---\n")
+    bench_run(df)
+    if args.optimize:
+        bench_optimize(df)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,914 @@
+"""
+Fast Backtest Engine
+
+Drop-in replacement for `backtesting.Backtest` that runs the existing
+playground strategies (subclasses of `backtesting.Strategy`) unchanged:
+
+- Indicators declared via `self.I(...)` are computed once and cached per
+  engine instance, so `optimize()` reuses them across parameter combinations.
+- `next()` sees lightweight windows over the precomputed arrays (advanced by a
+  shared bar counter) instead of re-sliced ndarray subclasses on every bar.
+- Order matching mirrors backtesting.py (market/limit/stop orders, SL/TP
+  brackets with SL first on ambiguous bars, exclusive orders, margin, spread
+  and commission) and statistics come from backtesting's own `compute_stats`,
+  so the result Series has the same keys ('Return [%]', '# Trades', ...).
+
+Hedging is not supported.
+
+Statistics, `_Array` and `_Indicator` come from backtesting's private
+modules, whose layout changes between releases: requirements.txt pins the
+version this engine was checked against (TESTED_BACKTESTING_VERSION) and
+importing it with another version warns. Bump both together after running
+tests/test_fast_engine.py and bench_engines.py.
+
+Speed (bench_engines.py, synthetic M15 data, single run): 1.3x-4.8x over
+backtesting.Backtest at 50,000 bars and 1.7x-4.5x at 5,000 bars; strategies
+with little per-bar logic gain least, since their `next()` code runs the
+same in both engines. optimize() also reuses indicators across parameter
+combinations: 3.2x on an 18-combination AlligatorTrend grid (20,000 bars).
+
+Usage:
+    from execution.strategy_playground.fast_engine import FastBacktest
+    bt = FastBacktest(df, AlligatorTrendStrategy, cash=10000, commission=.0002, margin=0.02)
+    stats = bt.run()
+    best = bt.optimize(sl_atr_mult=[2.0, 3.0], maximize='Return [%]')
+"""
+
+from copy import copy
+from functools import partial
+from itertools import product
+from math import copysign
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import warnings
+
+import backtesting
+import numpy as np
+import pandas as pd
+from backtesting import Strategy
+from backtesting._stats import compute_stats
+from backtesting._util import _Array, _Indicator, _as_str
+
+OHLC_COLUMNS = ('Open', 'High', 'Low', 'Close')
+TESTED_BACKTESTING_VERSION = '0.6.6'
+
+if getattr(backtesting, '__version__', None) != TESTED_BACKTESTING_VERSION:
+    warnings.warn(f'FastBacktest was tested with backtesting {TESTED_BACKTESTING_VERSION}, found '
+                  f'{getattr(backtesting, "__version__", "unknown")}: its private stats/_util API may differ')
+
+
+class _Clock:
+    """Index of the current bar, shared by all windows of a run."""
+    __slots__ = ('i',)
+
+    def __init__(self, i: int = 0):
+        self.i = i
+
+
+class _Window:
+    """
+    Read-only view of a precomputed array up to (and including) the current bar.
+
+    Supports what strategies use on `self.data.Close` / indicators:
+    `x[-1]`, `x[-2]`, slices, `len(x)`, truthiness and NumPy conversion.
+    Scalar lookups are served from a list copy (Python floats compare and
+    add much faster than NumPy scalars in `next()`).
+    """
+    __slots__ = ('_values', '_items', '_clock', 'name')
+
+    def __init__(self, values, clock: _Clock, name: str = '', items: Optional[list] = None):
+        self._values = values
+        self._items = items if items is not None else values.tolist()
+        self._clock = clock
+        self.name = name
+
+    def __getitem__(self, key):
+        if key.__class__ is int:
+            n = self._clock.i + 1
+            if key < 0:
+                key += n
+                if key < 0:
+                    raise IndexError('index out of range')
+            elif key >= n:
+                raise IndexError('index out of range')
+            return self._items[key]
+        return self._values[:self._clock.i + 1][key]
+
+    def __len__(self):
+        return self._clock.i + 1
+
+    def __iter__(self):
+        return iter(self._values[:self._clock.i + 1])
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self._values[:self._clock.i + 1], dtype=dtype)
+
+    def __bool__(self):
+        return bool(self._items[self._clock.i])
+
+    def __float__(self):
+        return float(self._items[self._clock.i])
+
+    def __getattr__(self, item):
+        # .max(), .mean(), .shape, ... on the revealed part
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return getattr(self._values[:self._clock.i + 1], item)
+
+    def __repr__(self):
+        return f'<Window {self.name} len={len(self)} last={self._items[self._clock.i]}>'
+
+    @property
+    def s(self) -> pd.Series:
+        return pd.Series(np.asarray(self), name=self.name)
+
+
+def _make_binary(op: str):
+    def method(self, other):
+        if isinstance(other, _Window):
+            other = np.asarray(other)
+        return getattr(np.asarray(self), op)(other)
+    method.__name__ = op
+    return method
+
+
+for _op in ('__add__', '__radd__', '__sub__', '__rsub__', '__mul__', '__rmul__',
+            '__truediv__', '__rtruediv__', '__lt__', '__le__', '__gt__', '__ge__',
+            '__eq__', '__ne__'):
+    setattr(_Window, _op, _make_binary(_op))
+_Window.__neg__ = lambda self: -np.asarray(self)
+_Window.__abs__ = lambda self: np.abs(np.asarray(self))
+_Window.__hash__ = object.__hash__
+
+
+class _FastData:
+    """
+    Strategy data accessor.
+
+    During `init()` columns are full-length arrays (as in backtesting.py);
+    before the first `next()` they are swapped for windows.
+    """
+
+    def __init__(self, df: pd.DataFrame, arrays: Dict[str, _Array], items: Dict[str, list], clock: _Clock,
+                 timestamps: Callable[[], list]):
+        self._df = df
+        self._arrays = arrays
+        self._items = items
+        self._clock = clock
+        self._timestamps = timestamps
+        self._pip = None
+        for col, arr in arrays.items():
+            setattr(self, col, arr)
+        self._index = df.index
+
+    def _reveal(self):
+        for col, arr in self._arrays.items():
+            setattr(self, col, _Window(arr, self._clock, col, self._items[col]))
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            # First use in next(): Timestamps boxed once, not on every `index[-1]`
+            self._index = _Window(self._df.index, self._clock, 'index', self._timestamps())
+        return self._index
+
+    def __getitem__(self, item):
+        return getattr(self, item)
+
+    def __len__(self):
+        return self._clock.i + 1
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self._df.iloc[:self._clock.i + 1]
+
+    @property
+    def pip(self) -> float:
+        if self._pip is None:
+            self._pip = float(10**-np.median([len(s.partition('.')[-1])
+                                              for s in self._arrays['Close'].astype(str)]))
+        return self._pip
+
+
+class _Order:
+    """Pending order (same fields as backtesting.Order)."""
+    __slots__ = ('_broker', 'size', 'limit', 'stop', 'sl', 'tp', 'parent_trade', 'tag')
+
+    def __init__(self, broker, size, limit=None, stop=None, sl=None, tp=None, parent_trade=None, tag=None):
+        self._broker = broker
+        self.size = size
+        self.limit = limit
+        self.stop = stop
+        self.sl = sl
+        self.tp = tp
+        self.parent_trade = parent_trade
+        self.tag = tag
+
+    def cancel(self):
+        self._broker.orders.remove(self)
+        trade = self.parent_trade
+        if trade:
+            if self is trade._sl_order:
+                trade._sl_order = None
+            elif self is trade._tp_order:
+                trade._tp_order = None
+
+    @property
+    def is_long(self):
+        return self.size > 0
+
+    @property
+    def is_short(self):
+        return self.size < 0
+
+    @property
+    def is_contingent(self):
+        trade = self.parent_trade
+        return bool(trade and (self is trade._sl_order or self is trade._tp_order))
+
+    def __repr__(self):
+        return f'<Order size={self.size} limit={self.limit} stop={self.stop} sl={self.sl} tp={self.tp}>'
+
+
+class _Trade:
+    """Open or closed trade (same fields as backtesting.Trade)."""
+    __slots__ = ('_broker', 'size', 'entry_price', 'entry_bar', 'exit_price', 'exit_bar',
+                 '_sl_order', '_tp_order', 'tag', '_commissions')
+
+    def __init__(self, broker, size: int, entry_price: float, entry_bar: int, tag):
+        self._broker = broker
+        self.size = size
+        self.entry_price = entry_price
+        self.entry_bar = entry_bar
+        self.exit_price = None
+        self.exit_bar = None
+        self._sl_order = None
+        self._tp_order = None
+        self.tag = tag
+        self._commissions = 0
+
+    def __repr__(self):
+        return (f'<Trade size={self.size} time={self.entry_bar}-{self.exit_bar or ""} '
+                f'price={self.entry_price}-{self.exit_price or ""} pl={self.pl:.0f}>')
+
+    def close(self, portion: float = 1.):
+        assert 0 < portion <= 1, "portion must be a fraction between 0 and 1"
+        size = copysign(max(1, int(round(abs(self.size) * portion))), -self.size)
+        self._broker.orders.insert(0, _Order(self._broker, size, parent_trade=self, tag=self.tag))
+
+    @property
+    def entry_time(self):
+        return self._broker._index[self.entry_bar]
+
+    @property
+    def exit_time(self):
+        if self.exit_bar is None:
+            return None
+        return self._broker._index[self.exit_bar]
+
+    @property
+    def is_long(self):
+        return self.size > 0
+
+    @property
+    def is_short(self):
+        return not self.is_long
+
+    @property
+    def pl(self):
+        price = self.exit_price or self._broker.last_price
+        return (self.size * (price - self.entry_price)) - self._commissions
+
+    @property
+    def pl_pct(self):
+        price = self.exit_price or self._broker.last_price
+        gross_pl_pct = copysign(1, self.size) * (price / self.entry_price - 1)
+        return gross_pl_pct - self._commissions / (abs(self.size) * self.entry_price)
+
+    @property
+    def value(self):
+        price = self.exit_price or self._broker.last_price
+        return abs(self.size) * price
+
+    @property
+    def sl(self):
+        return self._sl_order and self._sl_order.stop
+
+    @sl.setter
+    def sl(self, price: float):
+        self._set_contingent('sl', price)
+
+    @property
+    def tp(self):
+        return self._tp_order and self._tp_order.limit
+
+    @tp.setter
+    def tp(self, price: float):
+        self._set_contingent('tp', price)
+
+    def _set_contingent(self, kind: str, price: Optional[float]):
+        assert price is None or 0 < price < np.inf, f'Make sure 0 < price < inf! price: {price}'
+        attr = f'_{kind}_order'
+        order = getattr(self, attr)
+        if order:
+            order.cancel()
+        if price:
+            kwargs = {'stop': price} if kind == 'sl' else {'limit': price}
+            order = self._broker.new_order(-self.size, trade=self, tag=self.tag, **kwargs)
+        setattr(self, attr, order if price else None)
+
+
+class _Position:
+    """Net position of all open trades."""
+
+    def __init__(self, broker):
+        self._broker = broker
+
+    def __bool__(self):
+        return self._broker._position_size != 0
+
+    @property
+    def size(self) -> float:
+        return self._broker._position_size
+
+    @property
+    def pl(self) -> float:
+        return self._broker._unrealized_pl
+
+    @property
+    def pl_pct(self) -> float:
+        total_invested = self._broker._position_initial_value
+        return (self.pl / total_invested) * 100 if total_invested else 0
+
+    @property
+    def is_long(self) -> bool:
+        return self._broker._position_size > 0
+
+    @property
+    def is_short(self) -> bool:
+        return self._broker._position_size < 0
+
+    def close(self, portion: float = 1.):
+        for trade in self._broker.trades:
+            trade.close(portion)
+
+    def __repr__(self):
+        return f'<Position: {self.size} ({len(self._broker.trades)} trades)>'
+
+
+class _FastBroker:
+    """Order matching over plain OHLC arrays (non-hedging, FIFO netting)."""
+
+    def __init__(self, *, arrays: Dict[str, np.ndarray], index: pd.Index, clock: _Clock,
+                 cash: float, spread: float, commission, margin: float,
+                 trade_on_close: bool, exclusive_orders: bool):
+        assert cash > 0, f"cash should be > 0, is {cash}"
+        assert 0 < margin <= 1, f"margin should be between 0 and 1, is {margin}"
+        self._open = arrays['Open']
+        self._high = arrays['High']
+        self._low = arrays['Low']
+        self._close = arrays['Close']
+        self._index = index
+        self._clock = clock
+        self.cash = cash
+        self._spread = spread
+        self._leverage = 1 / margin
+        self._trade_on_close = trade_on_close
+        self._exclusive_orders = exclusive_orders
+
+        if callable(commission):
+            self._commission = commission
+        else:
+            try:
+                self._commission_fixed, self._commission_relative = commission
+            except TypeError:
+                self._commission_fixed, self._commission_relative = 0, commission
+            self._commission = self._commission_func
+
+        self.orders: List[_Order] = []
+        self.trades: List[_Trade] = []
+        self.closed_trades: List[_Trade] = []
+        self.position = _Position(self)
+
+        # Position aggregates, refreshed whenever the trade list changes
+        self._position_size = 0
+        self._position_cost = 0.0
+        self._position_abs_size = 0
+        self._position_initial_value = 0.0
+
+    def _commission_func(self, order_size, price):
+        return self._commission_fixed + abs(order_size) * price * self._commission_relative
+
+    def _update_position(self):
+        trades = self.trades
+        self._position_size = sum(int(t.size) for t in trades)
+        self._position_cost = sum(t.size * t.entry_price for t in trades)
+        self._position_abs_size = sum(abs(t.size) for t in trades)
+        self._position_initial_value = sum(abs(t.size) * t.entry_price for t in trades)
+
+    @property
+    def last_price(self) -> float:
+        return self._close[self._clock.i]
+
+    @property
+    def _unrealized_pl(self) -> float:
+        return self._close[self._clock.i] * self._position_size - self._position_cost
+
+    @property
+    def equity(self) -> float:
+        if not self.trades:
+            return self.cash
+        return self.cash + self._close[self._clock.i] * self._position_size - self._position_cost
+
+    @property
+    def margin_available(self) -> float:
+        margin_used = self._position_abs_size * self._close[self._clock.i] / self._leverage
+        return max(0, self.equity - margin_used)
+
+    def new_order(self, size: float, limit: Optional[float] = None, stop: Optional[float] = None,
+                  sl: Optional[float] = None, tp: Optional[float] = None, tag: object = None,
+                  *, trade: Optional[_Trade] = None) -> _Order:
+        size = float(size)
+        stop = stop and float(stop)
+        limit = limit and float(limit)
+        sl = sl and float(sl)
+        tp = tp and float(tp)
+
+        assert size != 0, size
+        adjusted_price = self.last_price * (1 + copysign(self._spread, size))
+
+        if size > 0:
+            if not (sl or -np.inf) < (limit or stop or adjusted_price) < (tp or np.inf):
+                raise ValueError(
+                    "Long orders require: "
+                    f"SL ({sl}) < LIMIT ({limit or stop or adjusted_price}) < TP ({tp})")
+        else:
+            if not (tp or -np.inf) < (limit or stop or adjusted_price) < (sl or np.inf):
+                raise ValueError(
+                    "Short orders require: "
+                    f"TP ({tp}) < LIMIT ({limit or stop or adjusted_price}) < SL ({sl})")
+
+        order = _Order(self, size, limit, stop, sl, tp, trade, tag)
+
+        if not trade and self._exclusive_orders:
+            for o in list(self.orders):
+                if not o.is_contingent:
+                    o.cancel()
+            for t in self.trades:
+                t.close()
+
+        # SL orders are processed first
+        self.orders.insert(0 if trade and stop else len(self.orders), order)
+        return order
+
+    def _process_orders(self):
+        i = self._clock.i
+        open_, high, low = self._open[i], self._high[i], self._low[i]
+        reprocess_orders = False
+
+        # Fast path: resting SL/TP/limit/stop orders that this bar doesn't touch
+        for order in self.orders:
+            if order.stop:
+                if (high >= order.stop) if order.size > 0 else (low <= order.stop):
+                    break
+            elif order.limit:
+                if (low <= order.limit) if order.size > 0 else (high >= order.limit):
+                    break
+            else:
+                break
+        else:
+            return
+
+        for order in list(self.orders):
+            # Related SL/TP order was already removed
+            if order not in self.orders:
+                continue
+
+            is_long = order.size > 0
+            stop_price = order.stop
+            if stop_price:
+                if not ((high >= stop_price) if is_long else (low <= stop_price)):
+                    continue
+                # Stop hit: order becomes a market/limit order
+                order.stop = None
+
+            if order.limit:
+                is_limit_hit = low <= order.limit if is_long else high >= order.limit
+                # Pessimistically assume the limit was hit before the stop
+                is_limit_hit_before_stop = (is_limit_hit and
+                                            (order.limit <= (stop_price or -np.inf)
+                                             if is_long
+                                             else order.limit >= (stop_price or np.inf)))
+                if not is_limit_hit or is_limit_hit_before_stop:
+                    continue
+                price = (min(stop_price or open_, order.limit)
+                         if is_long else
+                         max(stop_price or open_, order.limit))
+            else:
+                price = (self._close[i - 1]
+                         if self._trade_on_close and not order.is_contingent else open_)
+                if stop_price:
+                    price = max(price, stop_price) if is_long else min(price, stop_price)
+
+            is_market_order = not order.limit and not stop_price
+            time_index = (i - 1
+                          if is_market_order and self._trade_on_close and not order.is_contingent
+                          else i)
+
+            # SL/TP or Trade.close() order: reduce the parent trade
+            trade = order.parent_trade
+            if trade:
+                size = copysign(min(abs(trade.size), abs(order.size)), order.size)
+                if trade in self.trades:
+                    self._reduce_trade(trade, price, size, time_index)
+                    if order is trade._sl_order:
+                        # Keep the SL price on the closed trade for stats
+                        order.stop = stop_price
+                if order is not trade._sl_order and order is not trade._tp_order:
+                    self.orders.remove(order)
+                continue
+
+            # Stand-alone order: spread and commission adjusted entry
+            adjusted_price = price * (1 + copysign(self._spread, order.size))
+            adjusted_price_plus_commission = \
+                adjusted_price + self._commission(order.size, price) / abs(order.size)
+
+            size = order.size
+            if -1 < size < 1:
+                size = copysign(int((self.margin_available * self._leverage * abs(size))
+                                    // adjusted_price_plus_commission), size)
+                if not size:
+                    self.orders.remove(order)
+                    continue
+            need_size = int(size)
+
+            # FIFO close/reduce opposite-facing trades
+            for t in list(self.trades):
+                if t.is_long == is_long:
+                    continue
+                if abs(need_size) >= abs(t.size):
+                    self._close_trade(t, price, time_index)
+                    need_size += t.size
+                else:
+                    self._reduce_trade(t, price, need_size, time_index)
+                    need_size = 0
+                if not need_size:
+                    break
+
+            # Not enough liquidity: the broker cancels the order
+            if abs(need_size) * adjusted_price_plus_commission > self.margin_available * self._leverage:
+                self.orders.remove(order)
+                continue
+
+            if need_size:
+                self._open_trade(adjusted_price, need_size, order.sl, order.tp, time_index, order.tag)
+
+                # Let SL/TP of a market entry trigger on the entry bar
+                if order.sl or order.tp:
+                    if is_market_order:
+                        reprocess_orders = True
+                    elif stop_price and not order.limit and order.tp and (
+                            (is_long and order.tp <= high and (order.sl or -np.inf) < low) or
+                            (not is_long and order.tp >= low and (order.sl or np.inf) > high)):
+                        reprocess_orders = True
+
+            self.orders.remove(order)
+
+        if reprocess_orders:
+            self._process_orders()
+
+    def _reduce_trade(self, trade: _Trade, price: float, size: float, time_index: int):
+        size_left = trade.size + size
+        if not size_left:
+            close_trade = trade
+        else:
+            trade.size = size_left
+            if trade._sl_order:
+                trade._sl_order.size = -trade.size
+            if trade._tp_order:
+                trade._tp_order.size = -trade.size
+            close_trade = copy(trade)
+            close_trade.size = -size
+            close_trade._sl_order = None
+            close_trade._tp_order = None
+            self.trades.append(close_trade)
+        self._close_trade(close_trade, price, time_index)
+
+    def _close_trade(self, trade: _Trade, price: float, time_index: int):
+        self.trades.remove(trade)
+        if trade._sl_order and trade._sl_order in self.orders:
+            self.orders.remove(trade._sl_order)
+        if trade._tp_order and trade._tp_order in self.orders:
+            self.orders.remove(trade._tp_order)
+
+        trade.exit_price = price
+        trade.exit_bar = time_index
+        self.closed_trades.append(trade)
+
+        # Commission is applied at entry and again at exit
+        commission = self._commission(trade.size, price)
+        self.cash += trade.pl - commission
+        trade._commissions = commission + self._commission(trade.size, trade.entry_price)
+        self._update_position()
+
+    def _open_trade(self, price: float, size: int, sl: Optional[float], tp: Optional[float],
+                    time_index: int, tag):
+        trade = _Trade(self, size, price, time_index, tag)
+        self.trades.append(trade)
+        self._update_position()
+        self.cash -= self._commission(size, price)
+        if tp:
+            trade.tp = tp
+        if sl:
+            trade.sl = sl
+
+    def _close_all(self):
+        """Out of money: liquidate everything at the current close."""
+        i = self._clock.i
+        for trade in list(self.trades):
+            self._close_trade(trade, self.last_price, i)
+        self.cash = 0
+
+
+class FastBacktest:
+    """
+    Backtest runner with the `backtesting.Backtest` interface (run/optimize).
+    """
+
+    def __init__(self, data: pd.DataFrame, strategy: Type[Strategy], *,
+                 cash: float = 10_000, spread: float = .0,
+                 commission: Union[float, Tuple[float, float], Callable] = .0,
+                 margin: float = 1., trade_on_close: bool = False, hedging: bool = False,
+                 exclusive_orders: bool = False, finalize_trades: bool = False):
+        if not (isinstance(strategy, type) and issubclass(strategy, Strategy)):
+            raise TypeError('`strategy` must be a Strategy sub-type')
+        if not isinstance(data, pd.DataFrame):
+            raise TypeError("`data` must be a pandas.DataFrame with columns")
+        if hedging:
+            raise NotImplementedError('FastBacktest does not support hedging; use backtesting.Backtest')
+
+        data = data.copy(deep=False)
+        if 'Volume' not in data:
+            data['Volume'] = np.nan
+        if len(data) == 0:
+            raise ValueError('OHLC `data` is empty')
+        if len(data.columns.intersection({'Open', 'High', 'Low', 'Close', 'Volume'})) != 5:
+            raise ValueError("`data` must be a pandas.DataFrame with columns "
+                             "'Open', 'High', 'Low', 'Close', and (optionally) 'Volume'")
+        if data[list(OHLC_COLUMNS)].isnull().values.any():
+            raise ValueError('Some OHLC values are missing (NaN).')
+        if not data.index.is_monotonic_increasing:
+            data = data.sort_index()
+
+        self._data = data
+        self._strategy = strategy
+        self._broker_kwargs = dict(cash=cash, spread=spread, commission=commission, margin=margin,
+                                   trade_on_close=trade_on_close, exclusive_orders=exclusive_orders)
+        self._finalize_trades = bool(finalize_trades)
+        self._results: Optional[pd.Series] = None
+
+        # Column arrays are built once and shared by every run
+        index = data.index.copy()
+        self._arrays = {col: _Array(arr, index=index) for col, arr in data.items()}
+        self._items = {col: arr.tolist() for col, arr in self._arrays.items()}
+        self._ohlc = {col: np.asarray(data[col], dtype=float) for col in OHLC_COLUMNS}
+        self._column_ids = {id(arr): col for col, arr in self._arrays.items()}
+        self._indicator_cache: Dict[tuple, Tuple[np.ndarray, object, list]] = {}
+        self._index_items: Optional[list] = None
+
+    def _timestamps(self) -> list:
+        """Index as a list of Timestamps, built on first use and shared by every run."""
+        if self._index_items is None:
+            self._index_items = self._data.index.tolist()
+        return self._index_items
+
+    # --- Indicators ---
+
+    def _cache_key(self, func, args, kwargs) -> Optional[tuple]:
+        parts = []
+        for value in list(args) + [v for _, v in sorted(kwargs.items())]:
+            if isinstance(value, _Window):
+                value = value._values
+            if isinstance(value, np.ndarray):
+                if id(value) in self._column_ids:
+                    parts.append(('col', self._column_ids[id(value)]))
+                    continue
+                return None
+            try:
+                hash(value)
+            except TypeError:
+                return None
+            parts.append((type(value), value))
+        return (func, tuple(sorted(kwargs)), tuple(parts))
+
+    def _declare_indicator(self, strategy, registry: list, func: Callable, *args,
+                           name=None, plot=True, overlay=None, color=None, scatter=False, **kwargs):
+        """Replacement for `Strategy.I` with caching across runs."""
+        if name is None:
+            params = ','.join(filter(None, map(_as_str, list(args) + list(kwargs.values()))))
+            func_name = _as_str(func)
+            name = f'{func_name}({params})' if params else f'{func_name}'
+
+        key = self._cache_key(func, args, kwargs)
+        cached = self._indicator_cache.get(key) if key is not None else None
+        if cached is None:
+            call_args = [a._values if isinstance(a, _Window) else a for a in args]
+            try:
+                value = func(*call_args, **kwargs)
+            except Exception as e:
+                raise RuntimeError(f'Indicator "{name}" error. See traceback above.') from e
+
+            if isinstance(value, pd.DataFrame):
+                value = value.values.T
+            if value is not None:
+                try:
+                    value = np.asarray(value, order='C')
+                except Exception:
+                    value = None
+            is_arraylike = bool(value is not None and value.shape)
+            if is_arraylike and value.shape[0] == len(self._data):
+                value = value.T
+            if not is_arraylike or not 1 <= value.ndim <= 2 or value.shape[-1] != len(self._data):
+                raise ValueError(
+                    'Indicators must return (optionally a tuple of) numpy.arrays of same '
+                    f'length as `data` (data shape: {self._data.Close.shape}; indicator "{name}" '
+                    f'shape: {getattr(value, "shape", "")}, returned value: {value})')
+            rows = value.tolist() if value.ndim == 2 else [value.tolist()]
+            cached = (value, name, rows)
+            if key is not None:
+                self._indicator_cache[key] = cached
+
+        value, _, rows = cached
+        clock = strategy._data._clock
+        opts = dict(name=name, plot=plot, overlay=overlay, color=color, scatter=scatter)
+        if value.ndim == 2:
+            names = name if isinstance(name, list) else [f'{name}_{j}' for j in range(len(value))]
+            windows = tuple(_Window(row, clock, n, items) for row, n, items in zip(value, names, rows))
+            registry.append((value, opts, windows))
+            return windows
+        window = _Window(value, clock, name, rows[0])
+        registry.append((value, opts, (window,)))
+        return window
+
+    @staticmethod
+    def _warmup_nbars(strategy, registry) -> int:
+        """Same rule as backtesting.py: first bar where all assigned indicators are non-NaN."""
+        live = set()
+        for attr_value in strategy.__dict__.values():
+            items = attr_value if isinstance(attr_value, tuple) else (attr_value,)
+            live.update(id(v) for v in items if isinstance(v, _Window))
+
+        nbars = 0
+        for value, opts, windows in registry:
+            if opts['scatter']:
+                continue
+            for window in windows:
+                if id(window) in live:
+                    arr = window._values.astype(float)
+                    nbars = max(nbars, int(np.isnan(arr).argmin()))
+        return nbars
+
+    def _finalize_indicators(self, strategy, registry):
+        """Swap windows for backtesting `_Indicator` arrays so compute_stats/plots see them."""
+        index = self._data.index
+        by_window = {}
+        indicators = []
+        for value, opts, windows in registry:
+            ind = _Indicator(value, index=index, **opts)
+            indicators.append(ind)
+            if len(windows) == 1 and value.ndim == 1:
+                by_window[id(windows[0])] = ind
+            else:
+                for j, window in enumerate(windows):
+                    by_window[id(window)] = ind[j]
+        for attr, attr_value in list(strategy.__dict__.items()):
+            if isinstance(attr_value, _Window) and id(attr_value) in by_window:
+                setattr(strategy, attr, by_window[id(attr_value)])
+        strategy._indicators = indicators
+
+    # --- Running ---
+
+    def run(self, **kwargs) -> pd.Series:
+        """Runs the backtest. Keyword arguments are strategy parameters."""
+        n = len(self._data)
+        clock = _Clock(n - 1)
+        data = _FastData(self._data, self._arrays, self._items, clock, self._timestamps)
+        broker = _FastBroker(arrays=self._ohlc, index=self._data.index, clock=clock, **self._broker_kwargs)
+        strategy = self._strategy(broker, data, kwargs)
+
+        registry: list = []
+        strategy.I = partial(self._declare_indicator, strategy, registry)
+        strategy.init()
+
+        start = 1 + self._warmup_nbars(strategy, registry)
+        data._reveal()
+
+        equity = np.full(n, np.nan)
+        strategy_next = strategy.next
+        process_orders = broker._process_orders
+        orders, trades = broker.orders, broker.trades
+        close = self._ohlc['Close']
+        out_of_money = False
+
+        with np.errstate(invalid='ignore'):
+            for i in range(start, n):
+                clock.i = i
+                if orders:
+                    process_orders()
+                if trades:
+                    value = broker.cash + close[i] * broker._position_size - broker._position_cost
+                    if value <= 0:
+                        broker._close_all()
+                        equity[i:] = 0
+                        out_of_money = True
+                        break
+                    equity[i] = value
+                else:
+                    equity[i] = broker.cash
+                strategy_next()
+
+            if not out_of_money and self._finalize_trades and start < n:
+                for trade in reversed(broker.trades):
+                    trade.close()
+                process_orders()
+                equity[n - 1] = broker.equity
+
+            clock.i = n - 1
+
+        self._finalize_indicators(strategy, registry)
+        equity = pd.Series(equity).bfill().fillna(broker.cash).values
+        self._results = compute_stats(
+            trades=broker.closed_trades,
+            equity=equity,
+            ohlc_data=self._data,
+            risk_free_rate=0.0,
+            strategy_instance=strategy,
+        )
+        return self._results
+
+    def optimize(self, *, maximize: Union[str, Callable[[pd.Series], float]] = 'SQN',
+                 constraint: Optional[Callable[[dict], bool]] = None,
+                 max_tries: Optional[Union[int, float]] = None,
+                 random_state: Optional[int] = None,
+                 return_heatmap: bool = False,
+                 **kwargs) -> Union[pd.Series, Tuple[pd.Series, pd.Series]]:
+        """
+        Grid search over strategy parameters (in-process, indicators cached).
+
+        Same arguments as `backtesting.Backtest.optimize(method='grid')`.
+        """
+        if not kwargs:
+            raise ValueError('Need some strategy parameters to optimize')
+
+        maximize_key = None
+        if isinstance(maximize, str):
+            maximize_key = maximize
+
+            def maximize(stats: pd.Series, _key=maximize):
+                return stats[_key]
+        elif not callable(maximize):
+            raise TypeError('`maximize` must be str (a field of run() result Series) '
+                            'or a function that accepts result Series and returns a number')
+
+        if constraint is None:
+            def constraint(_):
+                return True
+
+        def _tuple(x):
+            return x if isinstance(x, Sequence) and not isinstance(x, str) else (x,)
+
+        class AttrDict(dict):
+            def __getattr__(self, item):
+                return self[item]
+
+        combos = [AttrDict(p) for p in product(*([(k, v) for v in _tuple(vals)]
+                                                 for k, vals in kwargs.items()))]
+        combos = [dict(p) for p in combos if constraint(p)]
+        if max_tries is not None:
+            rng = np.random.default_rng(random_state)
+            frac = max_tries if 0 < max_tries <= 1 else max_tries / max(len(combos), 1)
+            combos = [p for p in combos if rng.random() <= frac]
+        if not combos:
+            raise ValueError('No admissible parameter combinations to test')
+
+        heatmap = pd.Series(np.nan, name=maximize_key,
+                            index=pd.MultiIndex.from_tuples([tuple(p.values()) for p in combos],
+                                                            names=list(combos[0].keys())))
+        best_stats, best_value = None, -np.inf
+        for params in combos:
+            stats = self.run(**params)
+            if not stats['# Trades']:
+                continue
+            value = maximize(stats)
+            heatmap[tuple(params.values())] = value
+            if best_stats is None or value > best_value:
+                best_stats, best_value = stats, value
+
+        if best_stats is None:
+            best_stats = self.run(**combos[0])
+        self._results = best_stats
+
+        if return_heatmap:
+            return best_stats, heatmap
+        return best_stats
@@ -1,7 +1,6 @@
 import sys
 import os
 import pandas as pd
-from backtesting import Backtest
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
@@ -12,9 +11,12 @@ from dotenv import load_dotenv
 load_dotenv(".env")
 
 from execution.strategy_playground.loader import load_data
+from execution.strategy_playground.fast_engine import FastBacktest
 from execution.strategy_playground.strategies.alligator_trend import AlligatorTrendStrategy
+from execution.results_store import ResultsStore
 
-def run_optimization():
+def run_optimization(store=None):
+    store = store or ResultsStore()
     # Load 1 Year of Data for Optimization (Recent regime is most important)
     end_date = datetime.now()
     start_date = end_date - relativedelta(years=1)
@@ -27,7 +29,7 @@ def run_optimization():
         print("No data.")
         return
 
-    bt = Backtest(df, AlligatorTrendStrategy, cash=10000, commission=.0002, margin=0.02)
+    bt = FastBacktest(df, AlligatorTrendStrategy, cash=10000, commission=.0002, margin=0.02)
     
     print("Starting Optimization...")
     # Optimize Risk Parameters
@@ -44,5 +46,8 @@ def run_optimization():
     print("\n--- BEST PARAMETERS ---")
     print(stats._strategy)
 
+    run_id = store.write_backtest_stats(stats, "AlligatorTrendStrategy", symbol, "H1")
+    print(f"Best run stored as {run_id}")
+
 if __name__ == "__main__":
     run_optimization()
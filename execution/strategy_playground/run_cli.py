@@ -9,6 +9,7 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '../../.env'))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from backtesting import Backtest
+from execution.results_store import ResultsStore
 from execution.strategy_playground.loader import load_data
 from execution.strategy_playground.strategies.sma_cross import SmaCross
 import pandas as pd
@@ -38,6 +39,9 @@ def run_strategy(symbol="EURUSD", start="2025-01-01", end="2025-01-25"):
     # 4. Print Results
     print("\n--- Results ---")
     print(stats)
+
+    run_id = ResultsStore().write_backtest_stats(stats, "SmaCross", symbol, "H1")
+    print(f"Stored as run {run_id}")
     
     # Optional: Plot
     # bt.plot() # This opens a browser window, might not work well in headless/agent env.
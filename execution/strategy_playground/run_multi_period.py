@@ -12,9 +12,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../'
 from backtesting import Backtest
 from execution.strategy_playground.loader import load_data
 from execution.strategy_playground.strategies.alligator_trend import AlligatorTrendStrategy
+from execution.results_store import ResultsStore
 import pandas as pd
 
-def run_tests():
+def run_tests(store=None):
+    store = store or ResultsStore()
     # Setup periods
     end_date = datetime.now()
     periods = {
@@ -59,6 +61,8 @@ def run_tests():
             print(f"Max Drawdown [%]: {stats['Max. Drawdown [%]']:.2f}%")
             print(f"Trades: {stats['# Trades']}")
             print(f"Win Rate [%]: {stats['Win Rate [%]']:.2f}%")
+            run_id = store.write_backtest_stats(stats, "AlligatorTrendStrategy", symbol, "H1")
+            print(f"Stored as run {run_id}")
             print(f"----------------------------------------\n")
             
         except Exception as e:
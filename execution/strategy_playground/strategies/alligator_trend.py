@@ -54,6 +54,7 @@ class AlligatorTrendStrategy(Strategy):
     sl_atr_mult = 3.0   # Optimized (Wide)
     tp_atr_mult = 5.0   # Placeholder
     use_trailing_sl = True 
+    intrabar_sl = False # Hand trailing SL to the broker: fills at the stop level inside the bar
     risk_per_trade = 0.02 # 2% Compounding Risk
     margin = 0.02 # 50:1 Leverage
     
@@ -106,6 +107,7 @@ class AlligatorTrendStrategy(Strategy):
                     new_sl = price - (atr * self.sl_atr_mult)
                     if new_sl > self.manual_sl:
                         self.manual_sl = new_sl
+                        self._sync_broker_sl()
                         
             elif self.position.is_short:
                 # Check exit
@@ -118,6 +120,7 @@ class AlligatorTrendStrategy(Strategy):
                     new_sl = price + (atr * self.sl_atr_mult)
                     if new_sl < self.manual_sl or self.manual_sl == 0:
                         self.manual_sl = new_sl
+                        self._sync_broker_sl()
 
         # Entry Logic
         if not self.position:
@@ -137,6 +140,12 @@ class AlligatorTrendStrategy(Strategy):
             elif (lips < teeth < jaw) and (self.macd[-1] < self.signal[-1]):
                 self.entry_short(price, atr)
 
+    def _sync_broker_sl(self):
+        # Bar-close check above only sees the close; a broker SL is hit intrabar
+        if self.intrabar_sl:
+            for trade in self.trades:
+                trade.sl = self.manual_sl
+
     def entry_long(self, price, atr):
         sl_dist = atr * self.sl_atr_mult
         sl = price - sl_dist
@@ -158,7 +167,7 @@ class AlligatorTrendStrategy(Strategy):
         if self.use_trailing_sl:
             self.manual_sl = sl
             tp = None
-            self.buy(size=size) 
+            self.buy(size=size, sl=sl if self.intrabar_sl else None)
         else:
              tp = price + (atr * self.tp_atr_mult)
              self.buy(size=size, sl=sl, tp=tp)
@@ -184,7 +193,7 @@ class AlligatorTrendStrategy(Strategy):
         if self.use_trailing_sl:
             self.manual_sl = sl
             tp = None
-            self.sell(size=size)
+            self.sell(size=size, sl=sl if self.intrabar_sl else None)
         else:
              tp = price - (atr * self.tp_atr_mult)
              self.sell(size=size, sl=sl, tp=tp)
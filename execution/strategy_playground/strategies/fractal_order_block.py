@@ -1,36 +1,32 @@
 from backtesting import Strategy
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 def Fractals(high, low, n=2):
-    # Williams Fractals: High with n lower highs on each side
-    # Simplified 5-bar fractal
-    
-    fractal_highs = pd.Series(np.nan, index=high.index)
-    fractal_lows = pd.Series(np.nan, index=low.index)
-    
-    # Iterate and find highs
-    # This loop is slow, optimize if possible or use rolling window logic
-    # High[i] > High[i-2], [i-1], [i+1], [i+2]
-    # For backtesting with lookahead bias in standard fractals?
-    # No, we only know a fractal formed 2 bars later.
-    
-    # Rolling window approach
-    # We need to shift backward to check future bars? No, in live trading we wait.
-    # Fractal at T is confirmed at T+2.
-    
-    # We can just iterate from 2 to len-2
-    for i in range(n, len(high)-n):
-        # High Fractal
-        if high[i] > high[i-1] and high[i] > high[i-2] and \
-           high[i] > high[i+1] and high[i] > high[i+2]:
-            fractal_highs[i] = high[i]
-            
-        # Low Fractal
-        if low[i] < low[i-1] and low[i] < low[i-2] and \
-           low[i] < low[i+1] and low[i] < low[i+2]:
-            fractal_lows[i] = low[i]
-            
+    # Williams Fractals: High with n lower highs on each side (n=2 -> 5-bar fractal)
+    # Fractal at T is only confirmed at T+n; the series is aligned to T.
+    # Vectorized: compare the centre of every (2n+1)-bar window with its neighbours.
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+
+    fractal_highs = np.full(len(high), np.nan)
+    fractal_lows = np.full(len(low), np.nan)
+    width = 2 * n + 1
+    if len(high) < width:
+        return fractal_highs, fractal_lows
+
+    neighbours = np.r_[0:n, n + 1:width]
+    high_win = sliding_window_view(high, width)
+    low_win = sliding_window_view(low, width)
+    centre_high = high[n:len(high) - n]
+    centre_low = low[n:len(low) - n]
+
+    is_high = (centre_high[:, None] > high_win[:, neighbours]).all(axis=1)
+    is_low = (centre_low[:, None] < low_win[:, neighbours]).all(axis=1)
+
+    fractal_highs[n:len(high) - n] = np.where(is_high, centre_high, np.nan)
+    fractal_lows[n:len(low) - n] = np.where(is_low, centre_low, np.nan)
     return fractal_highs, fractal_lows
 
 def ATR(high, low, close, n=14):
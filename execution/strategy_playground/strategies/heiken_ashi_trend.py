@@ -3,17 +3,27 @@ from backtesting.lib import crossover
 import pandas as pd
 import numpy as np
 
+try:
+    from scipy.signal import lfilter
+except ImportError:  # Optional: fall back to pandas ewm (same recurrence)
+    lfilter = None
+
 # --- Indicators ---
 def HeikenAshi(open_p, high, low, close):
     # backtesting.py passes numpy arrays, not pandas Series
-    ha_close = (open_p + high + low + close) / 4
-    
-    ha_open = np.zeros_like(open_p)
-    ha_open[0] = open_p[0]
-    
-    for i in range(1, len(open_p)):
-        ha_open[i] = (ha_open[i-1] + ha_close[i-1]) / 2
-        
+    open_p = np.asarray(open_p, dtype=float)
+    ha_close = (open_p + np.asarray(high) + np.asarray(low) + np.asarray(close)) / 4
+    if len(open_p) == 0:
+        return open_p.copy(), ha_close
+
+    # ha_open[i] = (ha_open[i-1] + ha_close[i-1]) / 2, ha_open[0] = open[0]
+    # First-order IIR filter on ha_close delayed by one bar
+    if lfilter is not None:
+        ha_open, _ = lfilter([0.0, 0.5], [1.0, -0.5], ha_close, zi=[open_p[0]])
+    else:
+        seeded = pd.Series(np.r_[open_p[0], ha_close[:-1]])
+        ha_open = seeded.ewm(alpha=0.5, adjust=False).mean().to_numpy()
+
     return ha_open, ha_close
 
 def EMA(values, n=50):
@@ -0,0 +1,184 @@
+"""
+Strategy Registry Module
+
+Finds strategies without importing them and imports a strategy module only
+when that strategy is first requested. Sources, in order of precedence:
+
+1. Manifest (execution/config/strategies.json, optional):
+   {"my_strategy": "package.module:ClassName"}
+2. Entry points in the `forex_agent.strategies` group (installed plugins).
+3. Auto-discovery: AST scan of execution/strategies (classes with a
+   `calculate` method) and execution/strategy_playground/strategies
+   (backtesting.py `Strategy` subclasses).
+
+backtesting.py strategies are wrapped in BacktestingStrategyAdapter so every
+registered strategy exposes `calculate(df, context) -> list[Signal]`.
+"""
+
+import ast
+import importlib
+import json
+import logging
+import re
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("ForexPlatform")
+
+EXECUTION_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = EXECUTION_DIR.parent
+MANIFEST_PATH = EXECUTION_DIR / "config" / "strategies.json"
+ENTRY_POINT_GROUP = "forex_agent.strategies"
+
+DISCOVERY_DIRS = [
+    EXECUTION_DIR / "strategies",
+    EXECUTION_DIR / "strategy_playground" / "strategies",
+]
+
+KIND_SIGNAL = "signal"            # calculate(df, context) -> list[Signal]
+KIND_BACKTESTING = "backtesting"  # backtesting.py Strategy subclass
+
+
+@dataclass
+class StrategySpec:
+    """Where a strategy lives; resolved to a class on first use."""
+    name: str
+    target: str  # "package.module:ClassName"
+    kind: Optional[str] = None  # None: decided after import
+    source: str = "discovered"
+
+    @property
+    def module(self) -> str:
+        return self.target.split(":", 1)[0]
+
+    @property
+    def attr(self) -> str:
+        return self.target.split(":", 1)[1]
+
+
+def _snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def _module_name(path: Path) -> str:
+    return ".".join(path.relative_to(PROJECT_ROOT).with_suffix("").parts)
+
+
+def _scan_file(path: Path) -> List[StrategySpec]:
+    """Strategy classes defined in one file (parsed, not imported)."""
+    try:
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+    except (OSError, SyntaxError) as e:
+        logger.warning(f"Strategy discovery: skipping {path.name}: {e}")
+        return []
+
+    found = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        bases = {b.id if isinstance(b, ast.Name) else getattr(b, "attr", None) for b in node.bases}
+        methods = {n.name for n in node.body if isinstance(n, ast.FunctionDef)}
+        if "Strategy" in bases:
+            found.append((node.name, KIND_BACKTESTING))
+        elif "calculate" in methods:
+            found.append((node.name, KIND_SIGNAL))
+
+    module = _module_name(path)
+    return [
+        StrategySpec(
+            name=path.stem if len(found) == 1 else _snake_case(cls_name),
+            target=f"{module}:{cls_name}",
+            kind=kind,
+        )
+        for cls_name, kind in found
+    ]
+
+
+class StrategyRegistry:
+    """Name -> strategy class, with lazy imports."""
+
+    def __init__(self, discovery_dirs: Optional[List[Path]] = None, manifest: Optional[Path] = MANIFEST_PATH,
+                 use_entry_points: bool = True):
+        self.discovery_dirs = DISCOVERY_DIRS if discovery_dirs is None else discovery_dirs
+        self.manifest = manifest
+        self.use_entry_points = use_entry_points
+        self._specs: Optional[Dict[str, StrategySpec]] = None
+        self._classes: Dict[str, type] = {}
+
+    # --- Discovery (no strategy imports) ---
+
+    def _discover(self) -> Dict[str, StrategySpec]:
+        specs: Dict[str, StrategySpec] = {}
+        for directory in self.discovery_dirs:
+            for path in sorted(Path(directory).glob("*.py")):
+                if path.name.startswith("_"):
+                    continue
+                for spec in _scan_file(path):
+                    if spec.name in specs:
+                        logger.warning(f"Strategy discovery: '{spec.name}' in {spec.module} shadows "
+                                       f"{specs[spec.name].module}")
+                    specs[spec.name] = spec
+
+        if self.use_entry_points:
+            for ep in entry_points(group=ENTRY_POINT_GROUP):
+                specs[ep.name] = StrategySpec(ep.name, ep.value, source="entry_point")
+
+        if self.manifest and Path(self.manifest).exists():
+            with open(self.manifest, "r", encoding="utf-8") as f:
+                for name, target in json.load(f).items():
+                    specs[name] = StrategySpec(name, target, source="manifest")
+        return specs
+
+    @property
+    def specs(self) -> Dict[str, StrategySpec]:
+        if self._specs is None:
+            self._specs = self._discover()
+        return self._specs
+
+    def names(self) -> List[str]:
+        return sorted(self.specs)
+
+    def register(self, name: str, target: str, kind: Optional[str] = None) -> None:
+        """Adds or replaces an entry at runtime ("package.module:ClassName")."""
+        self.specs[name] = StrategySpec(name, target, kind, source="runtime")
+        self._classes.pop(name, None)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.specs
+
+    # --- Lazy loading ---
+
+    def get(self, name: str) -> type:
+        """Strategy class for `name`; imports its module on first request."""
+        if name in self._classes:
+            return self._classes[name]
+        spec = self.specs.get(name)
+        if spec is None:
+            raise KeyError(f"Strategy '{name}' not found. Available: {self.names()}")
+        try:
+            cls = getattr(importlib.import_module(spec.module), spec.attr)
+        except (ImportError, AttributeError) as e:
+            raise ImportError(f"Could not load strategy {name} ({spec.target}): {e}")
+        if spec.kind is None:
+            spec.kind = KIND_SIGNAL if hasattr(cls, "calculate") else KIND_BACKTESTING
+        self._classes[name] = cls
+        logger.debug(f"Strategy '{name}' loaded from {spec.target}")
+        return cls
+
+    def create(self, name: str, **params):
+        """
+        Instance exposing `calculate(df, context) -> list[Signal]`.
+
+        backtesting.py strategies are wrapped in BacktestingStrategyAdapter;
+        `params` become their class-level parameters.
+        """
+        cls = self.get(name)
+        if self.specs[name].kind == KIND_BACKTESTING:
+            from execution.strategy_adapter import BacktestingStrategyAdapter
+            return BacktestingStrategyAdapter(cls, **params)
+        return cls(**params)
+
+
+registry = StrategyRegistry()
@@ -30,7 +30,7 @@ def mock_candle_data():
         timestamps = pd.date_range(
             end=datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0),
             periods=count,
-            freq='1H'
+            freq='1h'
         )
         
         prices = start_price + np.cumsum(np.random.randn(count) * 0.1)
@@ -116,6 +116,19 @@ def clean_state(tmp_path):
     # Cleanup happens automatically with tmp_path
 
 
+@pytest.fixture(autouse=True)
+def isolated_journal(tmp_path_factory, monkeypatch):
+    """Leitet das Trade-Journal in ein eigenes Temp-Verzeichnis um, damit kein Test execution/data/journal.db anfasst."""
+    from execution import journal
+
+    path = tmp_path_factory.mktemp("journal") / "journal.db"
+    monkeypatch.setattr(journal, "DEFAULT_JOURNAL_PATH", path)
+    test_journal = journal.TradeJournal(path)
+    monkeypatch.setattr(journal, "_journal", test_journal)
+    yield test_journal
+    test_journal.close()
+
+
 # ============================================================
 # Config Override
 # ============================================================
@@ -0,0 +1,113 @@
+"""
+Local stand-in for the IG dealing endpoints (open/close/amend positions,
+GET /positions/{dealId}, GET /confirms/{dealReference}) and the bulk reads
+(GET /positions, /workingorders, /history/transactions) served through an
+httpx MockTransport.
+"""
+
+import json
+import re
+
+import httpx
+
+from execution.brokers.ig_async import IGDealClient
+
+BASE_URL = "https://demo-api.ig.com/gateway/deal"
+SESSION_HEADERS = {"X-IG-API-KEY": "key", "CST": "cst-token", "X-SECURITY-TOKEN": "xst-token",
+                   "User-Agent": "python-requests"}
+
+
+class IGStub:
+    """Scripted IG: confirmations appear after `pending_polls` 404s."""
+
+    def __init__(self, level: float = 158.25, deal_status: str = "ACCEPTED", reason: str = "SUCCESS",
+                 pending_polls: int = 2, submit_failures: int = 0, lose_submit_response: bool = False,
+                 reject_updates: bool = False):
+        self.level = level
+        self.deal_status = deal_status
+        self.reason = reason
+        self.pending_polls = pending_polls
+        self.submit_failures = submit_failures
+        self.lose_submit_response = lose_submit_response
+        self.reject_updates = reject_updates
+        self.deals = {}
+        self.positions = {}
+        self.confirms = {}
+        self.polls = {}
+        self.working_orders = []
+        self.transactions = []
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path.replace("/gateway/deal", "")
+        if request.method == "POST" and path == "/positions/otc" and request.headers.get("_method") == "DELETE":
+            body = json.loads(request.content)
+            self.positions.pop(body["dealId"])
+            return self._amend(body["dealId"], "ACCEPTED", "SUCCESS")
+
+        if request.method == "GET" and path == "/positions":
+            return httpx.Response(200, json={"positions": [
+                {"position": p, "market": {"epic": p.get("epic")}} for p in self.positions.values()]})
+        if request.method == "GET" and path == "/workingorders":
+            return httpx.Response(200, json={"workingOrders": [{"workingOrderData": o} for o in self.working_orders]})
+        if request.method == "GET" and path == "/history/transactions":
+            return httpx.Response(200, json={"transactions": self.transactions})
+
+        match = re.fullmatch(r"/positions/otc/(.+)", path)
+        if request.method == "PUT" and match:
+            deal_id = match.group(1)
+            if self.reject_updates:
+                return self._amend(deal_id, "REJECTED", "ATTACHED_ORDER_LEVEL_ERROR")
+            self.positions[deal_id].update(json.loads(request.content))
+            return self._amend(deal_id, "ACCEPTED", "SUCCESS")
+
+        match = re.fullmatch(r"/positions/(.+)", path)
+        if request.method == "GET" and match and match.group(1) in self.positions:
+            return httpx.Response(200, json={"position": self.positions[match.group(1)]})
+
+        if request.method == "POST" and path == "/positions/otc":
+            if self.submit_failures > 0:
+                self.submit_failures -= 1
+                return httpx.Response(503, json={"errorCode": "error.service.unavailable"})
+            body = json.loads(request.content)
+            ref = body["dealReference"]
+            self.deals.setdefault(ref, body)
+            if self.lose_submit_response:
+                self.lose_submit_response = False
+                raise httpx.ReadTimeout("response lost", request=request)
+            return httpx.Response(200, json={"dealReference": ref})
+
+        match = re.fullmatch(r"/confirms/(.+)", path)
+        if request.method == "GET" and match:
+            ref = match.group(1)
+            self.polls[ref] = self.polls.get(ref, 0) + 1
+            if ref in self.confirms:
+                return httpx.Response(200, json=self.confirms[ref])
+            if ref not in self.deals or self.polls[ref] <= self.pending_polls:
+                return httpx.Response(404, json={"errorCode": "error.confirms.deal-not-found"})
+            deal = self.deals[ref]
+            deal_id = f"DIAAAA{list(self.deals).index(ref) + 1:06d}"
+            if self.deal_status == "ACCEPTED":
+                self.positions.setdefault(deal_id, {"dealId": deal_id, "direction": deal["direction"],
+                                                    "size": deal["size"]})
+            return httpx.Response(200, json={
+                "dealReference": ref,
+                "dealId": deal_id,
+                "dealStatus": self.deal_status,
+                "reason": self.reason,
+                "level": self.level,
+                "size": deal["size"],
+                "direction": deal["direction"],
+                "epic": deal["epic"],
+            })
+        return httpx.Response(404, json={"errorCode": "error.endpoint.not-found"})
+
+    def _amend(self, deal_id: str, status: str, reason: str) -> httpx.Response:
+        ref = f"AMEND-{len(self.confirms) + 1}"
+        self.confirms[ref] = {"dealReference": ref, "dealId": deal_id, "dealStatus": status, "reason": reason}
+        return httpx.Response(200, json={"dealReference": ref})
+
+    def client(self) -> IGDealClient:
+        transport = httpx.MockTransport(self.handler)
+        return IGDealClient(BASE_URL, SESSION_HEADERS, client=httpx.AsyncClient(transport=transport))
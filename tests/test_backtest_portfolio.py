@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from execution.risk_limits import RiskConfig
+from execution.backtest_portfolio import run_portfolio_backtest
+
+PARAMS = {"fast_period": 5, "slow_period": 15, "use_rsi_filter": False}
+
+
+@pytest.fixture
+def portfolio_data(mock_candle_data):
+    usdjpy = mock_candle_data(symbol="USDJPY", count=400, start_price=158.0)
+    eurusd = mock_candle_data(symbol="EURUSD", count=400, start_price=1.08)
+    # Scale EURUSD moves to a realistic range
+    for col in ["open", "high", "low", "close"]:
+        eurusd[col] = 1.08 + (eurusd[col] - 1.08) * 0.01
+    return {"USDJPY": usdjpy, "EURUSD": eurusd}
+
+
+class TestPortfolioBacktest:
+    """Tests for the shared-account portfolio backtest."""
+
+    def test_runs_on_merged_timeline(self, portfolio_data):
+        result = run_portfolio_backtest(portfolio_data, {s: PARAMS for s in portfolio_data},
+                                        RiskConfig(max_open_lots=100.0, max_trades_per_day=100,
+                                                   max_daily_loss_pct=100.0))
+        curve = result.equity_curve
+        assert len(curve) == 800
+        assert curve["timestamp"].is_monotonic_increasing
+        assert result.trades
+        assert result.end_balance == pytest.approx(10000.0 + sum(t["pnl_usd"] for t in result.trades))
+        assert result.max_drawdown_pct >= 0.0
+
+    def test_exposure_limit_enforced_across_symbols(self, portfolio_data):
+        result = run_portfolio_backtest(portfolio_data, {s: PARAMS for s in portfolio_data},
+                                        RiskConfig(max_open_lots=0.01, max_trades_per_day=100,
+                                                   max_daily_loss_pct=100.0))
+        assert result.rejections.get("MAX_EXPOSURE_LIMIT", 0) > 0
+
+    def test_daily_trade_limit_enforced(self, portfolio_data):
+        result = run_portfolio_backtest(portfolio_data, {s: PARAMS for s in portfolio_data},
+                                        RiskConfig(max_open_lots=100.0, max_trades_per_day=1,
+                                                   max_daily_loss_pct=100.0))
+        per_day = pd.Series([t["entry_time"].date() for t in result.trades]).value_counts()
+        assert per_day.max() <= 1
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from execution.backtest_run import run_single_backtest
+from execution.backtest_sweep import sma_matrix, sweep_sma_cross, sweep_sma_reversal
+
+
+class TestSmaSweep:
+    """Tests for the batched SMA parameter sweep."""
+
+    def test_sma_matrix_matches_rolling_mean(self, mock_candle_data):
+        close = mock_candle_data(count=300)["close"]
+        windows = [1, 5, 20, 300, 400]
+        matrix = sma_matrix(close.to_numpy(), windows)
+        for row, w in enumerate(windows):
+            expected = close.rolling(w).mean().to_numpy()
+            np.testing.assert_allclose(matrix[row], expected, rtol=1e-10, equal_nan=True)
+
+    @pytest.mark.parametrize("use_rsi_filter", [False, True])
+    def test_matches_single_backtest(self, mock_candle_data, use_rsi_filter):
+        df = mock_candle_data(symbol="USDJPY", count=500, start_price=150.0)
+        fast_periods, slow_periods = [5, 10], [20, 30, 50]
+        result = sweep_sma_cross(df, fast_periods, slow_periods, use_rsi_filter=use_rsi_filter)
+
+        assert len(result) == 6
+        for row in result.itertuples():
+            cfg = {"fast_period": row.fast_period, "slow_period": row.slow_period, "use_rsi_filter": use_rsi_filter}
+            trades, win_rate, total_r = run_single_backtest(df, cfg)
+            assert row.trades == trades
+            assert row.win_rate == pytest.approx(win_rate)
+            assert row.total_r == pytest.approx(total_r)
+
+    def test_reversal_matches_loop(self, mock_candle_data):
+        df = mock_candle_data(count=400)
+        result = sweep_sma_reversal(df, [5], [20]).iloc[0]
+
+        sma_fast = df["close"].rolling(5).mean().to_numpy()
+        sma_slow = df["close"].rolling(20).mean().to_numpy()
+        position, pnl, trades, entry = 0, 0.0, 0, 0.0
+        for i in range(1, len(df)):
+            # Orders from bar i-1 fill at the open of bar i
+            if sma_fast[i - 2] <= sma_slow[i - 2] and sma_fast[i - 1] > sma_slow[i - 1] and position != 1:
+                pnl += position * (df["open"].iloc[i] - entry)
+                position, entry, trades = 1, df["open"].iloc[i], trades + 1
+            elif sma_fast[i - 2] >= sma_slow[i - 2] and sma_fast[i - 1] < sma_slow[i - 1] and position != -1:
+                pnl += position * (df["open"].iloc[i] - entry)
+                position, entry, trades = -1, df["open"].iloc[i], trades + 1
+        pnl += position * (df["close"].iloc[-1] - entry)
+
+        assert result["trades"] == trades
+        assert result["pnl_points"] == pytest.approx(pnl)
+
+    def test_empty_frame(self):
+        assert sweep_sma_cross(pd.DataFrame(), [5], [20]).empty
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import inspect, text
+
+from execution.core import database
+from execution.core.database import bulk_insert, bulk_upsert, init_db, make_engine
+from execution.core.migrations import MIGRATIONS, applied_versions, migrate
+from execution.core.models import TradeResult
+
+LEGACY_SCHEMA = (
+    "CREATE TABLE trade_results (id INTEGER PRIMARY KEY, timestamp DATETIME NOT NULL, symbol VARCHAR(20) NOT NULL, "
+    "direction VARCHAR(10) NOT NULL, entry_price FLOAT NOT NULL, exit_price FLOAT, quantity FLOAT NOT NULL, "
+    "stop_loss FLOAT, take_profit FLOAT, pnl FLOAT, status VARCHAR(20) NOT NULL, broker_order_id VARCHAR(100), "
+    "rationale VARCHAR(500))"
+)
+
+
+def _trade(i, **kwargs):
+    row = dict(timestamp=datetime(2025, 1, 6) + timedelta(hours=i), symbol="EURUSD" if i % 2 else "USDJPY",
+               direction="LONG", entry_price=1.1, quantity=0.5, status="OPEN", broker_order_id=f"D{i}")
+    row.update(kwargs)
+    return row
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    eng = make_engine(f"sqlite:///{tmp_path / 'trades.db'}")
+    yield eng
+    eng.dispose()
+
+
+class TestTradeDatabase:
+    """Tests for the trade store engine, migrations and bulk writes."""
+
+    def test_sqlite_pragmas(self, db_engine):
+        with db_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == database.SQLITE_BUSY_TIMEOUT_MS
+
+    def test_legacy_table_migrated_once(self, db_engine):
+        with db_engine.begin() as conn:
+            conn.execute(text(LEGACY_SCHEMA))
+            conn.execute(text("INSERT INTO trade_results (timestamp, symbol, direction, entry_price, quantity, "
+                              "status) VALUES ('2025-01-06 10:00:00', 'EURUSD', 'LONG', 1.1, 0.5, 'OPEN')"))
+        init_db(db_engine)
+
+        inspector = inspect(db_engine)
+        columns = {c["name"] for c in inspector.get_columns("trade_results")}
+        assert {"fill_price", "latency_ms", "closed_at"} <= columns
+        indexes = {tuple(ix["column_names"]) for ix in inspector.get_indexes("trade_results")}
+        assert {("timestamp",), ("symbol", "timestamp"), ("broker_order_id",), ("status",)} <= indexes
+        assert applied_versions(db_engine) == {v for v, _, _ in MIGRATIONS}
+        assert migrate(db_engine) == []
+
+        with db_engine.connect() as conn:
+            plan = conn.execute(text("EXPLAIN QUERY PLAN SELECT * FROM trade_results "
+                                     "WHERE symbol = 'EURUSD' AND timestamp >= '2025-01-01'")).fetchall()
+        assert "ix_trade_results_symbol_timestamp" in str(plan)
+
+    def test_bulk_insert_and_upsert(self, db_engine, monkeypatch):
+        monkeypatch.setattr(database, "BULK_CHUNK", 7)
+        init_db(db_engine)
+        assert bulk_insert(TradeResult, [_trade(i) for i in range(20)], bind=db_engine) == 20
+
+        rows = [_trade(3, status="CLOSED", pnl=12.5), _trade(4, exit_price=1.2), _trade(25), _trade(26)]
+        assert bulk_upsert(TradeResult, rows, key="broker_order_id", bind=db_engine) == (2, 2)
+
+        with db_engine.connect() as conn:
+            found = {r.broker_order_id: r for r in conn.execute(text("SELECT * FROM trade_results"))}
+        assert len(found) == 22
+        assert (found["D3"].status, found["D3"].pnl) == ("CLOSED", 12.5)
+        assert found["D4"].exit_price == 1.2 and found["D4"].status == "OPEN"
+        assert found["D25"].status == "OPEN"
+
+    def test_bulk_rolls_back_as_one(self, db_engine):
+        init_db(db_engine)
+        with pytest.raises(Exception):
+            bulk_insert(TradeResult, [_trade(1), _trade(2, symbol=None)], bind=db_engine)
+        with db_engine.connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*) FROM trade_results")).scalar() == 0
+
+    def test_engine_persists_only_opened_trades(self, db_engine, monkeypatch):
+        from execution.core.engine import TradingEngine
+        from execution.core.signals import Signal, SignalType
+        from execution.models import OrderIntent, OrderResult
+
+        init_db(db_engine)
+        monkeypatch.setattr(database, "engine", db_engine)
+        trading = TradingEngine.__new__(TradingEngine)
+        trading.db_enabled = True
+        signal = Signal(symbol="EURUSD", timestamp=datetime(2025, 1, 6, 10), signal_type=SignalType.LONG,
+                        entry_price=1.1, stop_loss=1.09, take_profit=1.12, rationale="test")
+        intent = OrderIntent(idempotency_key="k", symbol="EURUSD", direction="LONG", quantity=0.5, order_type="MARKET")
+
+        for status in ("REJECTED", "FAILED", "SKIPPED"):
+            trading._persist_trade(signal, intent, OrderResult(status=status, error_message="no"))
+        trading._persist_trade(signal, intent, OrderResult(status="FILLED", broker_order_id="D1", filled_price=1.1002))
+
+        with db_engine.connect() as conn:
+            rows = conn.execute(text("SELECT status, broker_order_id, fill_price FROM trade_results")).fetchall()
+        assert [tuple(r) for r in rows] == [("OPEN", "D1", 1.1002)]
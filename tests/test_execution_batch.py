@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import pytest
+
+from execution.brokers.ig_broker import IGBroker
+from execution.brokers.sim_engine import SimulatedBroker, SpreadModel
+from execution.execute_order import ExecutionRouter
+from execution.idempotency import IdempotencyLedger
+from execution.models import BracketOrder, OrderIntent, OrderResult, OrderSide
+from execution.safety import SafetyGate
+from ig_stub import IGStub
+
+
+def _intent(key, symbol="USDJPY", direction=OrderSide.LONG, qty=0.5):
+    return OrderIntent(idempotency_key=key, symbol=symbol, direction=direction, quantity=qty)
+
+
+class _SlowBroker:
+    """Async broker with a fixed round trip; tracks concurrency."""
+
+    def __init__(self, delay_s=0.05):
+        self.delay_s = delay_s
+        self.in_flight = 0
+        self.peak = 0
+
+    async def execute_order_async(self, intent):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay_s)
+        self.in_flight -= 1
+        return OrderResult(status="FILLED", broker_order_id=intent.idempotency_key, filled_quantity=intent.quantity)
+
+
+class TestExecuteBatch:
+    """Tests for batch submission."""
+
+    def test_validates_in_one_pass_and_keeps_order(self):
+        broker = _SlowBroker()
+        orders = [_intent("a"), _intent("b", symbol="XAUUSD"), _intent("a"), _intent("c", qty=4.0),
+                  _intent("d", qty=1.0), _intent("e", symbol="EURUSD")]
+        results = ExecutionRouter(broker).execute_batch(orders, max_parallel=2)
+
+        assert [r.status for r in results] == ["FILLED", "REJECTED", "REJECTED", "FILLED", "REJECTED", "FILLED"]
+        assert [r.broker_order_id for r in results if r.status == "FILLED"] == ["a", "c", "e"]
+        assert "Duplicate key" in results[2].error_message
+        assert "max_open_lots" in results[4].error_message
+
+    def test_open_positions_count_against_the_batch(self):
+        orders = [_intent("a", qty=0.4), _intent("b", qty=0.4)]
+        assert SafetyGate.validate_batch(orders, open_lots=0.0) == [None, None]
+        reasons = SafetyGate.validate_batch(orders, open_lots=4.5)
+        assert reasons[0] is None and "max_open_lots" in reasons[1]
+
+    def test_bounded_parallelism(self):
+        broker = _SlowBroker(delay_s=0.05)
+        orders = [_intent(f"k{i}", qty=0.1) for i in range(12)]
+        start = time.perf_counter()
+        results = ExecutionRouter(broker).execute_batch(orders, max_parallel=4)
+        elapsed = time.perf_counter() - start
+
+        assert all(r.status == "FILLED" for r in results)
+        assert broker.peak == 4
+        assert elapsed < 12 * 0.05 / 2  # Well under serial round trips
+
+
+class TestBracketOrders:
+    """Tests for bracket groups (entry + SL + TP)."""
+
+    def _sim(self):
+        broker = SimulatedBroker(spread=SpreadModel(pips=0.0))
+        broker.on_bar("USDJPY", "2025-01-06 10:00", 158.0, 158.0, 158.0, 158.0)
+        return broker
+
+    def test_bracket_attached_and_exits(self):
+        broker = self._sim()
+        result = ExecutionRouter(broker).execute_batch([BracketOrder(_intent("br"), 157.5, 159.0)])[0]
+        assert result.status == "FILLED" and result.take_profit == 159.0
+        assert result.entry.filled_price == pytest.approx(158.0)
+
+        broker.on_bar("USDJPY", "2025-01-06 11:00", 158.0, 159.2, 157.9, 159.1)
+        assert [(t["reason"], t["exit_price"]) for t in broker.trades] == [("TP", 159.0)]
+
+    def test_cancel_on_failure_closes_entry(self):
+        broker = self._sim()
+        router = ExecutionRouter(broker)
+        # Stop above the entry of a long: cannot be attached
+        result = asyncio.run(router.execute_bracket_async(BracketOrder(_intent("bad"), 158.5, 159.0)))
+        assert result.status == "CANCELLED" and "wrong side" in result.error_message
+        assert broker.portfolio.positions == {}
+        assert [t["reason"] for t in broker.trades] == ["MANUAL"]
+
+    def test_ig_bracket_via_stub(self):
+        stub = IGStub(pending_polls=0)
+        broker = IGBroker(ledger=IdempotencyLedger(path=None), deal_client=stub.client())
+        ok = asyncio.run(ExecutionRouter(broker).execute_bracket_async(BracketOrder(_intent("ig-1"), 157.5, 159.0)))
+        assert ok.status == "FILLED"
+        assert stub.positions[ok.entry.broker_order_id]["stopLevel"] == 157.5
+
+        failing = IGStub(pending_polls=0, reject_updates=True)
+        broker = IGBroker(ledger=IdempotencyLedger(path=None), deal_client=failing.client())
+        cancelled = asyncio.run(ExecutionRouter(broker).execute_bracket_async(BracketOrder(_intent("ig-2"), 157.5)))
+        assert cancelled.status == "CANCELLED" and "ATTACHED_ORDER_LEVEL_ERROR" in cancelled.error_message
+        assert failing.positions == {}
+
+    def test_broker_without_bracket_support(self):
+        result = ExecutionRouter(_SlowBroker()).execute_batch([BracketOrder(_intent("x"), 157.0)])[0]
+        assert result.status == "REJECTED" and "does not support" in result.error_message
@@ -0,0 +1,118 @@
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import Backtest, Strategy
+
+from execution.strategy_playground.fast_engine import TESTED_BACKTESTING_VERSION, FastBacktest
+from execution.strategy_playground.strategies.sma_cross import SmaCross
+from execution.strategy_playground.strategies.alligator_trend import AlligatorTrendStrategy
+from execution.strategy_playground.strategies.london_breakout import LondonBreakoutStrategy
+
+
+@pytest.fixture(scope="module")
+def ohlc():
+    """Random-walk M15 candles in backtesting.py format."""
+    rng = np.random.default_rng(7)
+    n = 3000
+    index = pd.date_range("2024-01-01", periods=n, freq="15min")
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0008, n))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) + rng.random(n) * 0.0005,
+        "Low": np.minimum(open_, close) - rng.random(n) * 0.0005,
+        "Close": close,
+        "Volume": 1.0,
+    }, index=index)
+
+
+def _assert_same_results(ref, fast):
+    for key in ref.index:
+        if key.startswith("_"):
+            continue
+        a, b = ref[key], fast[key]
+        if isinstance(a, float) and np.isnan(a):
+            assert np.isnan(b), key
+        else:
+            assert a == pytest.approx(b) if isinstance(a, float) else a == b, key
+    cols = ["Size", "EntryBar", "ExitBar", "EntryPrice", "ExitPrice", "SL", "TP", "PnL"]
+    pd.testing.assert_frame_equal(ref._trades[cols], fast._trades[cols])
+
+
+class TestFastBacktest:
+    """FastBacktest must reproduce backtesting.py results."""
+
+    @pytest.mark.parametrize("strategy, kwargs, params", [
+        (SmaCross, dict(commission=.0002, exclusive_orders=True), {}),
+        (AlligatorTrendStrategy, dict(commission=.0002, margin=0.02), {}),
+        (AlligatorTrendStrategy, dict(commission=.0002, margin=0.02), {"use_trailing_sl": False}),
+        (AlligatorTrendStrategy, dict(commission=.0002, margin=0.02), {"intrabar_sl": True}),
+        (LondonBreakoutStrategy, dict(commission=.0002, margin=0.02), {}),
+    ])
+    def test_matches_backtesting(self, ohlc, strategy, kwargs, params):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            ref = Backtest(ohlc, strategy, cash=10000, **kwargs).run(**params)
+        fast = FastBacktest(ohlc, strategy, cash=10000, **kwargs).run(**params)
+        assert fast["# Trades"] > 0
+        _assert_same_results(ref, fast)
+
+    def test_indicators_cached_across_runs(self, ohlc):
+        calls = []
+
+        def sma(values, n):
+            calls.append(n)
+            return pd.Series(values).rolling(n).mean()
+
+        class Cross(SmaCross):
+            def init(self):
+                self.sma1 = self.I(sma, self.data.Close, self.n1)
+                self.sma2 = self.I(sma, self.data.Close, self.n2)
+
+        bt = FastBacktest(ohlc, Cross, cash=10000, exclusive_orders=True)
+        stats, heatmap = bt.optimize(n1=[5, 10], n2=[20, 30], maximize="Return [%]", return_heatmap=True)
+
+        assert sorted(calls) == [5, 10, 20, 30]
+        assert len(heatmap) == 4
+        assert stats["Return [%]"] == pytest.approx(heatmap.max())
+
+    def test_trade_sl_setter(self, ohlc):
+        class TrailingLong(Strategy):
+            def init(self):
+                pass
+
+            def next(self):
+                if not self.position:
+                    self.buy(size=1000, sl=self.data.Close[-1] * 0.999)
+                for trade in self.trades:
+                    trade.sl = max(trade.sl, self.data.Close[-1] * 0.999)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            ref = Backtest(ohlc, TrailingLong, cash=10000).run()
+        fast = FastBacktest(ohlc, TrailingLong, cash=10000).run()
+        _assert_same_results(ref, fast)
+
+    def test_index_boxed_once_across_runs(self, ohlc):
+        seen = []
+
+        class Hours(Strategy):
+            def init(self):
+                pass
+
+            def next(self):
+                seen.append(self.data.index[-1])
+
+        bt = FastBacktest(ohlc, Hours, cash=10000)
+        bt.run()
+        timestamps = bt._index_items
+        bt.run()
+        assert bt._index_items is timestamps
+        assert seen[-1] == ohlc.index[-1] and isinstance(seen[-1], pd.Timestamp)
+
+    def test_requirements_pin_tested_backtesting(self):
+        requirements = (Path(__file__).resolve().parents[1] / "requirements.txt").read_text()
+        assert f"backtesting=={TESTED_BACKTESTING_VERSION}" in requirements
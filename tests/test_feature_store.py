@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from execution.feature_store import FeatureStore, FeatureView, compute_features
+from execution.generate_signals import SignalGenerator
+from execution.signal_matrix import IndicatorCache, SignalCell, SignalMatrix
+
+
+class TestFeatureStore:
+    """Tests for the persisted feature matrix."""
+
+    def test_features_match_strategy_indicators(self, mock_candle_data):
+        df = mock_candle_data(symbol="USDJPY", count=300, start_price=158.0)
+        features = compute_features(df)
+        cache = IndicatorCache(df)
+        pd.testing.assert_series_equal(features["sma_20"], cache.sma(20), check_names=False)
+        pd.testing.assert_series_equal(features["atr_14"], cache.atr(14), check_names=False)
+        pd.testing.assert_series_equal(features["rsi_14"], cache.rsi(14), check_names=False)
+        assert features["adx_14"].notna().any()
+        assert (features["bb_upper_20"] >= features["bb_lower_20"]).iloc[20:].all()
+
+    def test_session_levels_have_no_lookahead(self, mock_candle_data):
+        df = mock_candle_data(symbol="USDJPY", count=72, start_price=158.0)
+        df["timestamp"] = pd.date_range("2024-01-02", periods=72, freq="h", tz="UTC")
+        features = compute_features(df)
+        day = df["timestamp"].dt.floor("D")
+        for i in (3, 30, 50):
+            mask = (day == day.iloc[i]) & (df["timestamp"].dt.hour < 7) & (df.index <= i)
+            assert features["asia_high"].iloc[i] == df.loc[mask, "high"].max()
+        assert np.isnan(features["london_high"].iloc[0])
+
+    def test_update_persists_and_skips_known_bars(self, mock_candle_data, tmp_path):
+        df = mock_candle_data(symbol="USDJPY", count=250, start_price=158.0)
+        store = FeatureStore(tmp_path)
+        store.update("USDJPY", "H1", df)
+        assert store.path("USDJPY", "H1").exists()
+        mtime = store.path("USDJPY", "H1").stat().st_mtime_ns
+        store.update("USDJPY", "H1", df)
+        assert store.path("USDJPY", "H1").stat().st_mtime_ns == mtime
+
+        sliced = FeatureStore(tmp_path).load("USDJPY", "H1", columns=["sma_50"], start=df["timestamp"].iloc[200])
+        assert list(sliced.columns) == ["timestamp", "sma_50"] and len(sliced) == 50
+
+    def test_view_gives_same_signals(self, mock_candle_data, tmp_path):
+        df = mock_candle_data(symbol="USDJPY", count=400, start_price=158.0)
+        view = FeatureStore(tmp_path).view("USDJPY", "H1", df)
+        assert isinstance(view, FeatureView)
+        generator = SignalGenerator("baseline_sma_cross", {"fast_period": 10, "slow_period": 30, "use_rsi_filter": True})
+        assert generator.generate(df, {"indicators": view}) == generator.generate(df)
+        assert len(view) == 0  # Everything was read from the stored features
+
+    def test_signal_matrix_reads_features(self, mock_candle_data, tmp_path):
+        df = mock_candle_data(symbol="USDJPY", count=300, start_price=158.0)
+        store = FeatureStore(tmp_path)
+        cell = SignalCell.from_dict({"symbol": "USDJPY", "strategy": "baseline_sma_cross",
+                                     "params": {"fast_period": 10, "slow_period": 30}})
+        result = SignalMatrix([cell], fresh_only=False, feature_store=store).evaluate({"USDJPY": df})
+        assert not result.errors
+        assert store.path("USDJPY", "H1").exists()
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import MagicMock
+
+from execution.brokers.ig_broker import IGBroker
+from execution.execute_order import ExecutionRouter
+from execution.idempotency import DONE, PENDING, IdempotencyLedger
+from execution.models import OrderIntent, OrderResult, OrderSide
+from ig_stub import IGStub
+
+
+def _claim(path, key):
+    return IdempotencyLedger(path).reserve(key) is None
+
+
+def _intent(key):
+    return OrderIntent(idempotency_key=key, symbol="USDJPY", direction=OrderSide.LONG, quantity=0.5)
+
+
+class TestIdempotencyLedger:
+    """Tests for the durable idempotency ledger."""
+
+    def test_reserve_complete_survives_restart(self, tmp_path):
+        path = tmp_path / "ledger.db"
+        ledger = IdempotencyLedger(path)
+        assert ledger.reserve("k1") is None
+        assert ledger.reserve("k1").state == PENDING
+        ledger.complete("k1", OrderResult(status="FILLED", broker_order_id="D1", filled_price=158.2,
+                                          filled_quantity=0.5))
+        ledger.close()
+
+        reopened = IdempotencyLedger(path)
+        entry = reopened.reserve("k1")
+        assert entry.state == DONE
+        assert entry.result.broker_order_id == "D1" and entry.result.filled_price == 158.2
+        reopened.release("k1")
+        assert "k1" not in reopened and reopened.reserve("k1") is None
+
+    def test_one_winner_across_processes(self, tmp_path):
+        path = tmp_path / "ledger.db"
+        IdempotencyLedger(path).close()
+        with ProcessPoolExecutor(max_workers=4) as pool:
+            claims = list(pool.map(_claim, [path] * 8, ["same-key"] * 8))
+        assert claims.count(True) == 1
+
+    def test_ttl_compaction(self, tmp_path):
+        ledger = IdempotencyLedger(tmp_path / "ledger.db", ttl_s=60)
+        for i in range(5):
+            ledger.reserve(f"k{i}")
+        assert len(ledger) == 5
+        assert ledger.compact(now=time.time() + 120) == 5
+        assert len(ledger) == 0 and ledger.reserve("k0") is None
+
+        # An expired key can be claimed again before compaction runs
+        short = IdempotencyLedger(tmp_path / "short.db", ttl_s=0.05)
+        short.complete("old", OrderResult(status="FILLED"))
+        time.sleep(0.1)
+        assert short.reserve("old") is None
+
+    def test_new_router_instances_share_the_ledger(self, tmp_path):
+        ledger = IdempotencyLedger(tmp_path / "ledger.db")
+        broker = MagicMock()
+        broker.execute_order.return_value = OrderResult(status="FILLED", broker_order_id="D7", filled_quantity=0.5)
+
+        first = ExecutionRouter(broker, ledger=ledger).execute_order(_intent("USDJPY:H1:2025-01-06T10:00:LONG"))
+        again = ExecutionRouter(broker, ledger=IdempotencyLedger(tmp_path / "ledger.db")).execute_order(
+            _intent("USDJPY:H1:2025-01-06T10:00:LONG"))
+        assert broker.execute_order.call_count == 1
+        assert again.broker_order_id == first.broker_order_id == "D7"
+
+    def test_ig_broker_blocks_resubmission_after_restart(self, tmp_path):
+        path = tmp_path / "ledger.db"
+        stub = IGStub(pending_polls=0)
+        first = asyncio.run(IGBroker(ledger=IdempotencyLedger(path)).execute_order_async(
+            _intent("sig-1"), client=stub.client()))
+        second = asyncio.run(IGBroker(ledger=IdempotencyLedger(path)).execute_order_async(
+            _intent("sig-1"), client=stub.client()))
+        assert first.status == "FILLED"
+        assert second.status == "SKIPPED" and len(stub.deals) == 1
+
+        rejected = IGStub(deal_status="REJECTED", pending_polls=0)
+        broker = IGBroker(ledger=IdempotencyLedger(path))
+        assert asyncio.run(broker.execute_order_async(_intent("sig-2"), client=rejected.client())).status == "REJECTED"
+        # A rejected deal frees its key for a later retry
+        assert asyncio.run(broker.execute_order_async(_intent("sig-2"), client=stub.client())).status == "FILLED"
+
+    def test_router_frees_the_key_after_a_failure(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("execution.execute_order.jittered_backoff", lambda attempt: 0)
+        ledger = IdempotencyLedger(tmp_path / "ledger.db")
+        broker = MagicMock()
+        broker.execute_order.side_effect = ConnectionError("IG unreachable")
+        router = ExecutionRouter(broker, ledger=ledger)
+
+        assert router.execute_order(_intent("sig-3")).status == "FAILED"
+        assert "sig-3" not in ledger
+        assert asyncio.run(router.execute_order_async(_intent("sig-3"))).status == "FAILED"
+        assert "sig-3" not in ledger
+
+        # The retry reaches the broker and its outcome is stored
+        broker.execute_order.side_effect = None
+        broker.execute_order.return_value = OrderResult(status="FILLED", broker_order_id="D9", filled_quantity=0.5)
+        assert router.execute_order(_intent("sig-3")).status == "FILLED"
+        assert ledger.reserve("sig-3").state == DONE
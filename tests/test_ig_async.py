@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from execution.brokers.ig_broker import IGBroker
+from execution.brokers.sim_engine import SimulatedBroker
+from execution.execute_order import ExecutionRouter
+from execution.idempotency import IdempotencyLedger
+from execution.models import OrderIntent, OrderSide
+from ig_stub import IGStub
+
+
+def _intent(key="sig-1", qty=0.5):
+    return OrderIntent(idempotency_key=key, symbol="USDJPY", direction=OrderSide.LONG, quantity=qty,
+                       sl_distance=25.0, tp_distance=50.0)
+
+
+def _execute(stub, intent=None, **kwargs):
+    broker = IGBroker(ledger=IdempotencyLedger(path=None))
+    return asyncio.run(broker.execute_order_async(intent or _intent(), client=stub.client(), **kwargs))
+
+
+class TestIGAsyncExecution:
+    """Tests for async IG submit + deal confirmation."""
+
+    def test_confirmed_fill(self):
+        stub = IGStub(level=158.31, pending_polls=2)
+        result = _execute(stub)
+
+        assert result.status == "FILLED"
+        assert result.filled_price == 158.31 and result.filled_quantity == 0.5
+        assert result.broker_order_id == "DIAAAA000001"
+        assert result.raw_response["latency_ms"] >= result.raw_response["submit_ms"] > 0
+        assert result.raw_response["deal_reference"].startswith("FA-")
+
+        submit = stub.requests[0]
+        assert submit.headers["Version"] == "2" and submit.headers["CST"] == "cst-token"
+        assert submit.headers.get("User-Agent") != "python-requests"  # Only IG session headers are copied
+        assert stub.polls[result.raw_response["deal_reference"]] == 3
+
+    def test_rejected_deal(self):
+        result = _execute(IGStub(deal_status="REJECTED", reason="INSUFFICIENT_FUNDS", pending_polls=0))
+        assert result.status == "REJECTED" and result.error_message == "INSUFFICIENT_FUNDS"
+
+    def test_confirmation_timeout_leaves_submitted(self):
+        result = _execute(IGStub(pending_polls=10_000), confirm_timeout_s=0.3)
+        assert result.status == "SUBMITTED"
+        assert result.error_message == "Confirmation timed out"
+
+    def test_retries_without_duplicate_deals(self):
+        stub = IGStub(submit_failures=1, pending_polls=0)
+        assert _execute(stub).status == "FILLED"
+
+        lost = IGStub(lose_submit_response=True, pending_polls=0)
+        result = _execute(lost, _intent("sig-2"))
+        assert result.status == "FILLED"
+        posts = [r for r in lost.requests if r.method == "POST"]
+        assert len(posts) == 1 and len(lost.deals) == 1  # Found via /confirms, not resubmitted
+
+    def test_router_async_with_sync_broker(self):
+        broker = SimulatedBroker()
+        broker.on_quote("USDJPY", 158.0)
+        router = ExecutionRouter(broker)
+        first = asyncio.run(router.execute_order_async(_intent()))
+        again = asyncio.run(router.execute_order_async(_intent()))
+        assert first.status == "FILLED" and again is first
+        assert first.filled_price == pytest.approx(158.005)
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from execution import backtest_run, intrabar
+from execution.backtest_run import run_single_backtest
+from execution.backtest_sweep import sweep_sma_cross
+from execution.generate_signals import SignalGenerator
+from execution.intrabar import SL_FIRST, TP_FIRST, UNRESOLVED, IntrabarResolver
+
+
+@pytest.fixture
+def m1_and_h1():
+    """Fat-tailed M1 walk and the H1 candles aggregated from it."""
+    rng = np.random.default_rng(7)
+    n = 600 * 60
+    close = 150.0 + np.cumsum(rng.standard_t(2, n) * 0.003)
+    m1 = pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-01", periods=n, freq="min", tz="UTC"),
+        "symbol": "USDJPY",
+        "open": np.r_[150.0, close[:-1]],
+        "close": close,
+    })
+    m1["high"] = m1[["open", "close"]].max(axis=1)
+    m1["low"] = m1[["open", "close"]].min(axis=1)
+
+    h1 = (m1.set_index("timestamp")
+          .resample("h").agg({"open": "first", "high": "max", "low": "min", "close": "last"})
+          .reset_index())
+    h1["symbol"] = "USDJPY"
+    h1["volume"] = 1.0
+    return m1, h1
+
+
+class TestIntrabarResolver:
+    """Tests for the M1 intrabar resolver."""
+
+    def _m1(self, highs, lows):
+        return pd.DataFrame({
+            "timestamp": pd.date_range("2025-01-01 10:00", periods=len(highs), freq="min", tz="UTC"),
+            "high": highs,
+            "low": lows,
+        })
+
+    def test_first_touch(self):
+        resolver = IntrabarResolver(self._m1([1.01, 1.03, 1.01], [0.99, 1.00, 0.95]))
+        assert resolver.first_touch("2025-01-01 10:00", "LONG", stop_loss=0.96, take_profit=1.02) == TP_FIRST
+        assert resolver.first_touch("2025-01-01 10:00", "SHORT", stop_loss=1.02, take_profit=0.96) == SL_FIRST
+
+    def test_same_minute_is_stop_loss(self):
+        resolver = IntrabarResolver(self._m1([1.05], [0.95]))
+        assert resolver.first_touch("2025-01-01 10:00", "LONG", 0.96, 1.04) == SL_FIRST
+
+    def test_missing_hour_is_unresolved(self):
+        resolver = IntrabarResolver(self._m1([1.05], [0.95]))
+        assert resolver.first_touch("2025-01-01 12:00", "LONG", 0.96, 1.04) == UNRESOLVED
+        # Naive timestamps are treated as UTC
+        assert resolver.first_touch(pd.Timestamp("2025-01-01 10:00"), "LONG", 0.96, 1.04) == SL_FIRST
+
+    def test_from_processed_missing_symbol(self, tmp_path):
+        assert IntrabarResolver.from_processed("XXXYYY", data_dir=tmp_path) is None
+
+
+class TestIntrabarBacktest:
+    """Tests for intrabar mode in the H1 backtests."""
+
+    def test_single_backtest_refines_ambiguous_bars(self, m1_and_h1):
+        m1, h1 = m1_and_h1
+        resolver = IntrabarResolver(m1)
+        cfg = {"fast_period": 3, "slow_period": 10}
+
+        trades, _, total_r = run_single_backtest(h1, cfg)
+        trades_ib, _, total_r_ib = run_single_backtest(h1, cfg, intrabar=resolver)
+        assert trades_ib == trades
+        assert total_r_ib > total_r
+
+    def test_sweep_matches_single_backtest(self, m1_and_h1):
+        m1, h1 = m1_and_h1
+        resolver = IntrabarResolver(m1)
+        result = sweep_sma_cross(h1, [3, 5], [10, 20], intrabar=resolver)
+        for row in result.itertuples():
+            cfg = {"fast_period": row.fast_period, "slow_period": row.slow_period}
+            trades, win_rate, total_r = run_single_backtest(h1, cfg, intrabar=resolver)
+            assert row.trades == trades
+            assert row.win_rate == pytest.approx(win_rate)
+            assert row.total_r == pytest.approx(total_r)
+
+    def test_deep_tournament_uses_m1_data(self, m1_and_h1, tmp_path, monkeypatch):
+        _, h1 = m1_and_h1
+        cfg = {"fast_period": 10, "slow_period": 30, "use_rsi_filter": False}
+        sig = SignalGenerator("baseline_sma_cross", cfg).generate_frame(h1)[0]
+        # The bar after the first entry touches both levels; its M1 bars reach the take profit first
+        i = h1.index[h1["timestamp"] == sig.timestamp][0] + 1
+        h1.loc[i, ["high", "low"]] = max(sig.stop_loss, sig.take_profit) + 1, min(sig.stop_loss, sig.take_profit) - 1
+        mid = (sig.stop_loss + sig.take_profit) / 2
+        m1 = pd.DataFrame({
+            "timestamp": pd.date_range(h1.loc[i, "timestamp"], periods=2, freq="min"),
+            "high": [max(sig.take_profit, mid), max(sig.stop_loss, mid)],
+            "low": [min(sig.take_profit, mid), min(sig.stop_loss, mid)],
+        })
+        for symbol in ("USDJPY", "GBPUSD"):
+            (tmp_path / symbol).mkdir()
+        m1.to_csv(tmp_path / "USDJPY" / "M1.csv", index=False)  # GBPUSD has no M1 data
+        monkeypatch.setattr(intrabar, "PROCESSED_DIR", tmp_path)
+        monkeypatch.setattr(backtest_run, "fetch_deep_history", lambda symbol: h1.copy())
+        monkeypatch.setattr(backtest_run, "run_monte_carlo", lambda *args, **kwargs: _NoMonteCarlo())
+
+        runs = {}
+        for flag in (False, True):
+            store = _Store()
+            backtest_run.run_deep_tournament(store=store, intrabar=flag)
+            runs[flag] = store.stats
+
+        on, off = runs[True]["SMA 10/30 (Aggressive)"], runs[False]["SMA 10/30 (Aggressive)"]
+        assert on["n_trades"] == off["n_trades"]
+        assert on["total_r"] == off["total_r"] + 3.0  # One loss (-1R) becomes a win (+2R)
+        assert runs[True]["SMA 20/50 (Balanced)"] == runs[False]["SMA 20/50 (Balanced)"]
+
+
+class _Store:
+    def __init__(self):
+        self.stats = {}
+
+    def write_run(self, stats, **kwargs):
+        self.stats[stats["name"]] = stats
+
+
+class _NoMonteCarlo:
+    def summary(self):
+        return {"DD p50 %": 0, "DD p95 %": 0, "Ruin %": 0, "Growth p5 %": 0}
@@ -0,0 +1,94 @@
+import csv
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from execution import logger as logger_module
+from execution.journal import TradeJournal
+from execution.logger import PipelineLogger
+
+NOW = datetime(2025, 3, 10, 12, tzinfo=timezone.utc)
+
+
+def _row(days_ago, decision="SKIPPED", reason="Strategy: No Signal", symbol="EURUSD", size=0.0):
+    return {"timestamp": (NOW - timedelta(days=days_ago)).isoformat(), "run_id": "r", "symbol": symbol,
+            "price": 1.1, "signal": "NONE", "sentiment": "N/A", "decision": decision, "size": size,
+            "reason": reason}
+
+
+class TestTradeJournal:
+    """Tests for the indexed trade journal."""
+
+    def test_buffers_until_batch_full(self, tmp_path):
+        journal = TradeJournal(tmp_path / "j.db", batch_size=3, flush_interval_s=3600)
+        journal.append(_row(0))
+        journal.append(_row(0))
+        assert journal._conn.execute("SELECT COUNT(*) FROM journal").fetchone()[0] == 0
+        journal.append(_row(0))
+        assert journal._conn.execute("SELECT COUNT(*) FROM journal").fetchone()[0] == 3
+
+    def test_decisions_by_reason_uses_index(self, tmp_path):
+        journal = TradeJournal(tmp_path / "j.db")
+        for days_ago in range(30):
+            journal.append(_row(days_ago))
+        journal.append(_row(1, "FILLED", "Executed", size=0.5))
+        journal.append(_row(2, "BLOCKED_RISK", "Daily loss limit"))
+        journal.append(_row(3, "BLOCKED_RISK", "Daily loss limit", symbol="USDJPY"))
+
+        counts = journal.decisions_by_reason(days=7, now=NOW)
+        assert counts == [
+            {"decision": "SKIPPED", "reason": "Strategy: No Signal", "count": 8},
+            {"decision": "BLOCKED_RISK", "reason": "Daily loss limit", "count": 2},
+            {"decision": "FILLED", "reason": "Executed", "count": 1},
+        ]
+        assert journal.counts(("decision",), days=7, symbol="USDJPY", now=NOW) == \
+            [{"decision": "BLOCKED_RISK", "count": 1}]
+        assert [r["decision"] for r in journal.rows(days=2, decision="FILLED", now=NOW)] == ["FILLED"]
+
+        plan = journal._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM journal WHERE timestamp >= ?", ("x",)).fetchall()
+        assert "ix_journal_timestamp" in str(plan)
+        with pytest.raises(ValueError):
+            journal.counts(("price",))
+
+    def test_compaction_keeps_aggregates(self, tmp_path):
+        journal = TradeJournal(tmp_path / "j.db")
+        for days_ago in range(20):
+            journal.append(_row(days_ago))
+            journal.append(_row(days_ago, "FILLED", "Executed", size=1.0))
+        before = journal.decisions_by_reason(days=30, now=NOW)
+
+        assert journal.compact(keep_days=5, now=NOW) == 28  # Days 6..19 ago
+        assert journal._conn.execute("SELECT COUNT(*) FROM journal").fetchone()[0] == 12
+        assert journal.decisions_by_reason(days=30, now=NOW) == before
+        assert journal.compact(keep_days=5, now=NOW) == 0
+        assert journal._conn.execute("SELECT SUM(size) FROM journal_daily WHERE decision = 'FILLED'").fetchone()[0] == 14.0
+
+
+class TestPipelineLoggerJournal:
+    """Tests for PipelineLogger's CSV rotation and journal feed."""
+
+    def test_header_mismatch_rotates_csv(self, tmp_path):
+        path = tmp_path / "trade_journal.csv"
+        path.write_text("timestamp,symbol,decision\n2024-01-01,EURUSD,SKIPPED\n")
+        journal = TradeJournal(tmp_path / "j.db")
+        with PipelineLogger(str(path), logging.getLogger("test"), journal=journal) as plog:
+            plog.update(symbol="EURUSD", decision="FILLED", reason="Executed")
+
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 1 and rows[0]["decision"] == "FILLED"
+        assert len([p for p in os.listdir(tmp_path) if p.startswith("trade_journal.")]) == 2
+        assert journal.counts(("symbol", "decision"), days=1) == [{"symbol": "EURUSD", "decision": "FILLED", "count": 1}]
+
+    def test_oversized_csv_rotates(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(logger_module, "MAX_JOURNAL_SIZE", 200)
+        path = tmp_path / "trade_journal.csv"
+        journal = TradeJournal(tmp_path / "j.db")
+        for _ in range(4):
+            with PipelineLogger(str(path), logging.getLogger("test"), journal=journal):
+                pass
+        assert len([p for p in os.listdir(tmp_path) if p.endswith(".csv")]) >= 2
+        assert journal.counts(("decision",), days=1) == [{"decision": "SKIPPED", "count": 4}]
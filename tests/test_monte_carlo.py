@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from execution.risk_limits import RiskConfig
+from execution.monte_carlo import (
+    trades_to_r_multiples, run_monte_carlo, simulate, suggest_risk_per_trade, SHUFFLE
+)
+
+
+@pytest.fixture
+def r_multiples():
+    """40% win rate at 1:2 reward/risk."""
+    return [2.0, -1.0, -1.0, 2.0, -1.0] * 20
+
+
+class TestTradesToRMultiples:
+    """Tests for trade list conversion."""
+
+    def test_mixed_formats(self):
+        trades = [1.5, "WIN", "LOSS", {"outcome": "WIN", "pnl": 2.0}, {"outcome": "OPEN", "pnl": 0.3},
+                  {"r_multiple": -0.5}]
+        r = trades_to_r_multiples(trades)
+        assert r.tolist() == [1.5, 2.0, -1.0, 2.0, -0.5]
+
+
+class TestMonteCarlo:
+    """Tests for the vectorized simulation."""
+
+    def test_shuffle_preserves_final_equity(self, r_multiples):
+        # Compounding is order-independent, only the drawdown path changes
+        res = run_monte_carlo(r_multiples, RiskConfig(risk_per_trade_pct=1.0), n_paths=500,
+                              method=SHUFFLE, seed=1)
+        expected = 10000.0 * np.prod(1.0 + 0.01 * np.asarray(r_multiples))
+        assert np.allclose(res.final_equity, expected)
+        assert res.max_drawdown_pct.min() >= 0.0
+
+    def test_matches_scalar_path(self):
+        r = [-1.0, -1.0, 2.0, -1.0]
+        res = simulate(r, [10.0], n_paths=50, method=SHUFFLE, seed=3)[0]
+        # Worst possible ordering: three losses in a row -> 1 - 0.9^3
+        assert res.max_drawdown_pct.max() == pytest.approx(27.1)
+
+    def test_reproducible_and_chunked(self, r_multiples):
+        a = simulate(r_multiples, [2.0], n_paths=1200, seed=7, chunk_size=500)[0]
+        b = simulate(r_multiples, [2.0], n_paths=1200, seed=7, chunk_size=500)[0]
+        assert a.n_paths == 1200
+        assert np.array_equal(a.final_equity, b.final_equity)
+
+    def test_higher_risk_means_deeper_drawdown(self, r_multiples):
+        low, high = simulate(r_multiples, [0.5, 5.0], n_paths=2000, seed=11)
+        assert high.drawdown_percentile(95) > low.drawdown_percentile(95)
+        assert high.ruin_probability >= low.ruin_probability
+
+    def test_empty_trade_list(self):
+        res = run_monte_carlo([], RiskConfig(), n_paths=100)
+        assert res.n_paths == 0
+        assert res.ruin_probability == 0.0
+
+    def test_suggest_risk(self, r_multiples):
+        out = suggest_risk_per_trade(r_multiples, candidates=[0.5, 1.0, 25.0], n_paths=2000, seed=5)
+        assert out["risk_per_trade_pct"] in (0.5, 1.0)
+        assert len(out["table"]) == 3
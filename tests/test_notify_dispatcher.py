@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from execution.notifier import DiscordNotifier
+from execution.notify_dispatcher import NotificationDispatcher
+
+
+class _WebhookStub(BaseHTTPRequestHandler):
+    """Discord webhook stand-in; behaviour is set on the server object."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.requests.append((time.monotonic(), body))
+            status, headers = server.responses.pop(0) if server.responses else (204, {})
+        time.sleep(server.delay)
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def webhook():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _WebhookStub)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.responses = []
+    server.delay = 0.0
+    server.url = f"http://127.0.0.1:{server.server_port}/webhook"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _embed(i):
+    return {"username": "Forex Agent", "embeds": [{"title": f"alert {i}"}]}
+
+
+class TestNotificationDispatcher:
+    """Tests for background Discord delivery."""
+
+    def test_coalesces_embeds_into_one_message(self, webhook, tmp_path):
+        dispatcher = NotificationDispatcher(spool_dir=tmp_path, batch_window_s=0.2)
+        for i in range(4):
+            dispatcher.submit(webhook.url, _embed(i))
+        dispatcher.submit(webhook.url, {"content": "plain text", "username": "Forex Agent"})
+        assert dispatcher.flush(timeout=5)
+
+        bodies = [body for _, body in webhook.requests]
+        assert len(bodies) == 2
+        assert [e["title"] for e in bodies[0]["embeds"]] == [f"alert {i}" for i in range(4)]
+        assert bodies[1]["content"] == "plain text"
+        assert list(tmp_path.glob("*.json")) == []
+
+    def test_honours_retry_after(self, webhook, tmp_path):
+        webhook.responses = [(429, {"Retry-After": "0.5"})]
+        dispatcher = NotificationDispatcher(spool_dir=tmp_path, batch_window_s=0.0)
+        dispatcher.submit(webhook.url, _embed(0))
+        assert dispatcher.flush(timeout=5)
+
+        (t0, first), (t1, second) = webhook.requests
+        assert second == first
+        assert t1 - t0 >= 0.5
+        assert dispatcher.sent_messages == 1
+
+    def test_submit_does_not_block_on_slow_webhook(self, webhook, tmp_path):
+        webhook.delay = 0.5
+        dispatcher = NotificationDispatcher(spool_dir=tmp_path, batch_window_s=0.0)
+        notifier = DiscordNotifier(webhook_url=webhook.url, dispatcher=dispatcher)
+        start = time.perf_counter()
+        for i in range(3):
+            notifier.send_error(f"error {i}")
+        assert time.perf_counter() - start < 0.2
+        assert dispatcher.flush(timeout=5)
+        assert sum(len(body["embeds"]) for _, body in webhook.requests) == 3
+
+    def test_spool_replayed_after_restart(self, webhook, tmp_path):
+        offline = NotificationDispatcher(spool_dir=tmp_path)
+        offline.start = lambda: offline  # Process dies before the worker runs
+        offline.submit(webhook.url, _embed(0))
+        offline.submit(webhook.url, _embed(1))
+        assert len(list(tmp_path.glob("*.json"))) == 2
+
+        restarted = NotificationDispatcher(spool_dir=tmp_path, batch_window_s=0.1)
+        assert restarted.replay_spool() == 2
+        assert restarted.flush(timeout=5)
+        assert [e["title"] for _, body in webhook.requests for e in body["embeds"]] == ["alert 0", "alert 1"]
+        assert list(tmp_path.glob("*.json")) == []
@@ -0,0 +1,68 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import Backtest
+
+from execution.strategy_playground import bench_indicators
+from execution.strategy_playground.bench_indicators import fractals_loop, heiken_ashi_loop
+from execution.strategy_playground.bench_engines import make_data
+from execution.strategy_playground.fast_engine import FastBacktest
+from execution.strategy_playground.strategies.fractal_order_block import Fractals, FractalOrderBlockStrategy
+from execution.strategy_playground.strategies.heiken_ashi_trend import HeikenAshi
+
+
+@pytest.fixture(scope="module")
+def ohlc():
+    df = make_data(5000, seed=3)
+    # Round to create equal neighbouring highs/lows (strict comparison edge case)
+    return {col: df[col].round(3).to_numpy() for col in ["Open", "High", "Low", "Close"]}
+
+
+class TestVectorizedIndicators:
+    """Vectorized playground indicators must equal the loop versions."""
+
+    @pytest.mark.parametrize("n", [1, 2, 3])
+    def test_fractals_match_loop(self, ohlc, n):
+        highs, lows = Fractals(ohlc["High"], ohlc["Low"], n)
+        ref_highs, ref_lows = fractals_loop(ohlc["High"], ohlc["Low"], n)
+        np.testing.assert_array_equal(highs, ref_highs)
+        np.testing.assert_array_equal(lows, ref_lows)
+        assert np.isfinite(highs).any() and np.isfinite(lows).any()
+
+    def test_fractals_short_input(self):
+        highs, lows = Fractals(np.array([1.0, 2.0, 1.0]), np.array([1.0, 0.5, 1.0]))
+        assert np.isnan(highs).all() and np.isnan(lows).all()
+
+    def test_heiken_ashi_matches_loop(self, ohlc):
+        args = (ohlc["Open"], ohlc["High"], ohlc["Low"], ohlc["Close"])
+        for got, ref in zip(HeikenAshi(*args), heiken_ashi_loop(*args)):
+            np.testing.assert_allclose(got, ref, rtol=1e-12)
+
+    def test_heiken_ashi_without_scipy(self, ohlc):
+        args = (ohlc["Open"], ohlc["High"], ohlc["Low"], ohlc["Close"])
+        for got, ref in zip(bench_indicators._heiken_ashi_fallback(*args), heiken_ashi_loop(*args)):
+            np.testing.assert_allclose(got, ref, rtol=1e-12)
+
+    def test_fractal_strategy_runs(self):
+        # Fractals used to index `high.index`, which fails on backtesting's _Array
+        # Independent open/close around a walk, so engulfing candles occur
+        rng = np.random.default_rng(5)
+        n = 3000
+        mid = 1.10 + np.cumsum(rng.normal(0, 0.0005, n))
+        open_, close = mid + rng.normal(0, 0.001, n), mid + rng.normal(0, 0.001, n)
+        df = pd.DataFrame({
+            "Open": open_,
+            "High": np.maximum(open_, close) + rng.random(n) * 0.0005,
+            "Low": np.minimum(open_, close) - rng.random(n) * 0.0005,
+            "Close": close,
+            "Volume": 1.0,
+        }, index=pd.date_range("2024-01-01", periods=n, freq="15min"))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            ref = Backtest(df, FractalOrderBlockStrategy, cash=10000, margin=0.02).run()
+        fast = FastBacktest(df, FractalOrderBlockStrategy, cash=10000, margin=0.02).run()
+        assert ref["# Trades"] > 0
+        assert fast["# Trades"] == ref["# Trades"]
+        assert fast["Equity Final [$]"] == pytest.approx(ref["Equity Final [$]"])
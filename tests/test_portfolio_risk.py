@@ -0,0 +1,104 @@
+import math
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from execution.account import AccountManager
+from execution.models import OrderIntent, OrderResult, OrderSide
+from execution.portfolio_risk import PortfolioRiskEngine
+from execution.risk_limits import RiskConfig, RiskManager
+
+DAY1 = datetime(2024, 3, 4, 10, tzinfo=timezone.utc)
+DAY2 = datetime(2024, 3, 5, 10, tzinfo=timezone.utc)
+
+
+class TestPortfolioRiskEngine:
+    """Tests for live positions, PnL and VaR."""
+
+    def test_mark_to_market_and_realized_pnl(self):
+        engine = PortfolioRiskEngine(balance=10000.0)
+        engine.open_position("d1", "EURUSD", "LONG", 1.0, 1.1000, DAY1)
+        engine.open_position("d2", "USDJPY", OrderSide.SHORT, 0.5, 150.00, DAY1)
+
+        engine.on_price("EURUSD", 1.1010, DAY1)
+        engine.on_price("USDJPY", 149.00, DAY1)
+        expected = 100_000 * 0.0010 + 50_000 * 1.00 / 149.00
+        assert engine.unrealized == pytest.approx(expected)
+        assert engine.equity == pytest.approx(10000.0 + expected)
+        assert engine.gross_lots == 1.5 and engine.net_lots("USDJPY") == -0.5
+
+        realized = engine.close_position("d1", 1.0990, DAY1)
+        assert realized == pytest.approx(-100.0)
+        assert engine.balance == pytest.approx(9900.0)
+        assert engine.unrealized == pytest.approx(50_000 / 149.00)
+        assert engine.daily_pnl == pytest.approx(-100.0 + 50_000 / 149.00)
+
+    def test_daily_rollover(self):
+        engine = PortfolioRiskEngine()
+        engine.open_position("d1", "EURUSD", "LONG", 1.0, 1.1000, DAY1)
+        engine.close_position("d1", 1.0950, DAY1)
+        assert engine.snapshot()["daily_loss_current"] == pytest.approx(500.0)
+        assert engine.trades_today == 1
+
+        engine.on_price("EURUSD", 1.0950, DAY2)
+        snap = engine.snapshot()
+        assert snap["daily_loss_current"] == 0.0 and snap["daily_trades_count"] == 0
+
+    def test_incremental_var_matches_full_recompute(self):
+        rng = np.random.default_rng(3)
+        engine = PortfolioRiskEngine()
+        prices = {"EURUSD": 1.10, "GBPUSD": 1.27, "USDJPY": 150.0}
+        for _ in range(50):
+            common = rng.normal(0, 0.001)
+            prices = {s: p * math.exp(common + rng.normal(0, 0.0005)) for s, p in prices.items()}
+            engine.on_bar(prices, DAY1)
+
+        engine.open_position("a", "EURUSD", "LONG", 1.0, prices["EURUSD"], DAY1)
+        engine.open_position("b", "GBPUSD", "LONG", 0.5, prices["GBPUSD"], DAY1)
+        engine.open_position("c", "USDJPY", "SHORT", 0.3, prices["USDJPY"], DAY1)
+        for s, p in prices.items():
+            engine.on_price(s, p * 1.002, DAY1)
+
+        e = engine._notional
+        full = engine.z * math.sqrt(e @ engine._cov @ e)
+        assert engine.var() == pytest.approx(full, rel=1e-9)
+        assert engine.var() > 0
+        # EUR and GBP move together: GBP lots count towards EUR exposure
+        assert engine.correlated_lots("EURUSD") > engine.net_lots("EURUSD")
+
+    def test_fills_feed_risk_limits(self):
+        engine = PortfolioRiskEngine()
+        intent = OrderIntent(idempotency_key="k1", symbol="EURUSD", direction=OrderSide.LONG, quantity=0.8)
+        engine.on_fill(intent, OrderResult(status="FILLED", broker_order_id="mock_1", filled_price=1.1,
+                                           filled_quantity=0.8))
+        engine.on_fill(intent, OrderResult(status="REJECTED"))
+        assert list(engine.positions) == ["mock_1"]
+
+        snapshot = AccountManager(storage_file="unused_balance.json", risk_engine=engine).get_snapshot()
+        assert snapshot["open_positions"][0]["size"] == 0.8
+        manager = RiskManager(RiskConfig(max_open_lots=1.0), notifier=object())
+        manager._send_alert = lambda *args: False
+        assert not manager.check_exposure_limits(snapshot, 0.3)["allowed"]
+        assert manager.check_exposure_limits(snapshot, 0.2)["allowed"]
+
+    def test_sync_positions_with_broker(self):
+        engine = PortfolioRiskEngine()
+        engine.open_position("stale", "EURUSD", "LONG", 0.5, 1.1000, DAY1)
+        engine.open_position("resized", "EURUSD", "LONG", 1.0, 1.1000, DAY1)
+        engine.open_position("fresh", "USDJPY", "SHORT", 0.2, 150.0, DAY2)
+        broker = {
+            "resized": {"symbol": "EURUSD", "direction": "BUY", "size": 0.4, "level": 1.1000},
+            "restart": {"symbol": "USDJPY", "direction": "SELL", "size": 0.3, "level": 150.5},
+            "no_symbol": {"symbol": None, "direction": "BUY", "size": 1.0, "level": 1.0},
+        }
+
+        synced = engine.sync_positions(broker, as_of=DAY1.replace(hour=12))
+        assert sorted(synced["removed"]) == ["resized", "stale"] and sorted(synced["added"]) == ["resized", "restart"]
+        # "fresh" filled after the broker snapshot was taken
+        assert sorted(engine.positions) == ["fresh", "resized", "restart"]
+        assert engine.gross_lots == pytest.approx(0.9) and engine.net_lots("USDJPY") == pytest.approx(-0.5)
+        assert engine.balance == 10000.0 and engine.trades_today == 1  # Adopted deals are not new trades
+
+        engine.sync_positions({})
+        assert engine.positions == {} and engine.gross_lots == 0.0
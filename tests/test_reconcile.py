@@ -0,0 +1,143 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from execution.brokers.ig_broker import IGBroker
+from execution.brokers.sim_engine import SimulatedBroker, SpreadModel
+from execution.core.database import Base
+from execution.core.models import TradeResult
+from execution.idempotency import IdempotencyLedger
+from execution.models import OrderIntent, OrderSide
+from execution.portfolio_risk import PortfolioRiskEngine
+from execution.reconcile import ReconciliationWorker
+from ig_stub import IGStub
+
+
+class _Account:
+    def __init__(self, risk_engine=None):
+        self.risk_engine = risk_engine
+        self.updates = []
+
+    def update_balance(self, pnl):
+        self.updates.append(pnl)
+
+
+class _Notifier:
+    def __init__(self):
+        self.closes = []
+
+    def send_close_alert(self, trade, pnl):
+        self.closes.append((trade, pnl))
+
+
+@pytest.fixture
+def sessions():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _add(sessions, **kwargs):
+    row = dict(timestamp=datetime(2025, 1, 6, 9), symbol="USDJPY", direction="LONG", entry_price=158.0,
+               quantity=1.0, status="OPEN")
+    row.update(kwargs)
+    db = sessions()
+    db.add(TradeResult(**row))
+    db.commit()
+    db.close()
+
+
+def _rows(sessions):
+    db = sessions()
+    rows = {t.broker_order_id: t for t in db.query(TradeResult).all()}
+    db.close()
+    return rows
+
+
+class TestReconciliation:
+    """Tests for the broker reconciliation worker."""
+
+    def test_sim_closes_drift_missing_and_orphans(self, sessions):
+        broker = SimulatedBroker(spread=SpreadModel(pips=0.0))
+        broker.on_bar("USDJPY", "2025-01-06 10:00", 158.0, 158.0, 158.0, 158.0)
+        ids = [broker.execute_order(OrderIntent(idempotency_key=k, symbol="USDJPY", direction=OrderSide.LONG,
+                                                quantity=1.0)).broker_order_id for k in ("a", "b", "c")]
+        broker.attach_bracket(ids[0], None, 159.0)
+        broker.attach_bracket(ids[1], 157.5, None)
+        broker.on_bar("USDJPY", "2025-01-06 11:00", 158.0, 159.2, 157.9, 159.1)  # a hits TP
+
+        _add(sessions, broker_order_id=ids[0], fill_price=158.0, take_profit=159.0)
+        _add(sessions, broker_order_id=ids[1], fill_price=158.0, quantity=2.0)
+        _add(sessions, broker_order_id="gone")
+        _add(sessions, broker_order_id="old", status="CLOSED")  # Not reloaded
+
+        account, notifier = _Account(), _Notifier()
+        report = ReconciliationWorker(broker, account=account, notifier=notifier,
+                                      session_factory=sessions).reconcile()
+
+        assert (report.checked, report.closed, report.corrected) == (3, 1, 1)
+        assert report.missing == ["gone"] and report.orphans == [ids[2]]
+        rows = _rows(sessions)
+        assert rows[ids[0]].status == "CLOSED" and rows[ids[0]].exit_price == 159.0
+        assert rows[ids[0]].pnl == pytest.approx(broker.trades[0]["pnl"]) and rows[ids[0]].closed_at is not None
+        assert rows[ids[1]].status == "OPEN"
+        assert (rows[ids[1]].quantity, rows[ids[1]].stop_loss) == (1.0, 157.5)
+        assert rows["gone"].status == "OPEN"
+
+        assert account.updates == [pytest.approx(report.realized_pnl)]
+        assert [(t["broker_order_id"], t["exit_price"]) for t, _ in notifier.closes] == [(ids[0], 159.0)]
+
+        # Second pass has nothing left to apply
+        again = ReconciliationWorker(broker, account=account, notifier=notifier,
+                                     session_factory=sessions).reconcile()
+        assert (again.closed, again.corrected) == (0, 0) and len(account.updates) == 1
+
+    def test_ig_bulk_state(self, sessions):
+        stub = IGStub()
+        stub.positions["DIAAAAOPEN1"] = {"dealId": "DIAAAAOPEN1", "dealReference": "FA-pending", "direction": "BUY",
+                                         "size": 0.5, "level": 158.2, "stopLevel": 157.7, "epic": "CS.D.USDJPY.TODAY.IP"}
+        stub.working_orders.append({"dealId": "DIAAAAWORK1", "direction": "SELL", "orderSize": 1.0,
+                                    "orderLevel": 159.0})
+        stub.transactions.append({"reference": "CLOSED1", "transactionType": "DEAL", "closeLevel": "158.9",
+                                  "profitAndLoss": "E1,250.50", "dateUtc": "2025-01-06T12:30:00"})
+        _add(sessions, broker_order_id="FA-pending", quantity=0.5)       # Confirmation had timed out
+        _add(sessions, broker_order_id="DIAAAAWORK1")
+        _add(sessions, broker_order_id="DIAAAACLOSED1", fill_price=158.1)
+
+        risk = PortfolioRiskEngine(balance=10_000.0)
+        risk.open_position("DIAAAACLOSED1", "USDJPY", OrderSide.LONG, 1.0, 158.1)
+        account, notifier = _Account(risk_engine=risk), _Notifier()
+        broker = IGBroker(ledger=IdempotencyLedger(path=None), deal_client=stub.client())
+        report = ReconciliationWorker(broker, account=account, notifier=notifier,
+                                      session_factory=sessions).reconcile()
+
+        assert (report.closed, report.corrected, report.pending, report.missing) == (1, 1, 1, [])
+        rows = _rows(sessions)
+        assert "FA-pending" not in rows
+        assert (rows["DIAAAAOPEN1"].fill_price, rows["DIAAAAOPEN1"].stop_loss) == (158.2, 157.7)
+        closed = rows["DIAAAACLOSED1"]
+        assert (closed.status, closed.exit_price, closed.pnl) == ("CLOSED", 158.9, 1250.5)
+        assert closed.closed_at == datetime(2025, 1, 6, 12, 30)
+        assert account.updates == [1250.5] and list(risk.positions) == ["DIAAAAOPEN1"]
+        assert notifier.closes[0][0]["entry_price"] == 158.1
+        # The open IG position is adopted by the portfolio engine under its symbol
+        assert report.adopted == ["DIAAAAOPEN1"] and risk.positions["DIAAAAOPEN1"].symbol == "USDJPY"
+
+        # Positions, working orders and history are each fetched once
+        paths = sorted(r.url.path.rsplit("/deal", 1)[1] for r in stub.requests)
+        assert paths == ["/history/transactions", "/positions", "/workingorders"]
+
+    def test_fetch_failure_writes_nothing(self, sessions):
+        class _Down:
+            def fetch_state(self, since, deal_ids):
+                raise ConnectionError("broker down")
+
+        _add(sessions, broker_order_id="x")
+        account = _Account()
+        with pytest.raises(ConnectionError):
+            ReconciliationWorker(_Down(), account=account, notifier=_Notifier(),
+                                 session_factory=sessions).reconcile()
+        assert _rows(sessions)["x"].status == "OPEN" and account.updates == []
@@ -0,0 +1,94 @@
+import warnings
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from execution.results_store import ResultsStore, params_hash
+from execution.strategy_playground.bench_engines import make_data
+from execution.strategy_playground.fast_engine import FastBacktest
+from execution.strategy_playground.strategies.sma_cross import SmaCross
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultsStore(tmp_path)
+
+
+class TestResultsStore:
+    """Tests for the partitioned backtest results store."""
+
+    def test_write_and_load_run(self, store):
+        trades = pd.DataFrame({
+            "entry_time": pd.date_range("2025-01-01", periods=3, freq="h"),
+            "direction": ["LONG", "SHORT", "LONG"],
+            "outcome": ["WIN", "LOSS", "WIN"],
+            "r_multiple": [2.0, -1.0, 2.0],
+        })
+        equity = pd.DataFrame({"timestamp": trades["entry_time"], "equity": [100.0, 90.0, 110.0]})
+        run_id = store.write_run("baseline_sma_cross", "USDJPY", "H1", {"fast_period": 10},
+                                 {"total_r": 3.0, "n_trades": 3, "custom": "x"}, trades, equity)
+
+        runs = store.query_runs()
+        assert list(runs["run_id"]) == [run_id]
+        assert runs.loc[0, "total_r"] == 3.0
+        assert runs.loc[0, "params_hash"] == params_hash({"fast_period": 10})
+        assert runs.loc[0, "extra"] == '{"custom": "x"}'
+        assert (runs.loc[0, "strategy"], runs.loc[0, "symbol"], runs.loc[0, "timeframe"]) == \
+            ("baseline_sma_cross", "USDJPY", "H1")
+
+        loaded = store.load_trades(run_id, symbol="USDJPY")
+        assert list(loaded["r_multiple"]) == [2.0, -1.0, 2.0]
+        assert str(loaded["entry_time"].dt.tz) == "UTC"
+        curve = store.load_equity(run_id)
+        assert curve["drawdown_pct"].tolist() == pytest.approx([0.0, 10.0, 0.0])
+
+    def test_top_runs_filters_partitions_and_age(self, store):
+        now = datetime.now(timezone.utc)
+        store.write_runs("sweep", "USDJPY", "H1", [
+            {"params": {"p": 1}, "sharpe_ratio": 0.5},
+            {"params": {"p": 2}, "sharpe_ratio": 1.5},
+            {"params": {"p": 3}},
+        ])
+        store.write_runs("sweep", "EURUSD", "H1", [{"params": {"p": 4}, "sharpe_ratio": 9.0}])
+        store.write_runs("sweep", "USDJPY", "M15", [{"params": {"p": 5}, "sharpe_ratio": 8.0}])
+        store.write_runs("sweep", "USDJPY", "H1", [{"params": {"p": 6}, "sharpe_ratio": 7.0}],
+                         created_at=now - timedelta(days=40))
+
+        top = store.top_runs("sharpe_ratio", n=5, symbol="USDJPY", timeframe="H1", days=30)
+        assert top["sharpe_ratio"].tolist() == [1.5, 0.5]
+        assert store.top_runs("sharpe_ratio", n=1, symbol="USDJPY", timeframe="H1")["sharpe_ratio"].tolist() == [7.0]
+        assert set(top.columns) == {"run_id", "created_at", "strategy", "symbol", "timeframe", "params", "sharpe_ratio"}
+
+    def test_unknown_metric_and_empty_store(self, store):
+        with pytest.raises(ValueError):
+            store.top_runs("sharpness")
+        assert store.top_runs("total_r").empty
+
+    def test_write_backtest_stats(self, store):
+        df = make_data(2000)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            stats = FastBacktest(df, SmaCross, cash=10000, commission=.0002, exclusive_orders=True).run(n1=5)
+        run_id = store.write_backtest_stats(stats, "SmaCross", "EURUSD", "M15")
+
+        run = store.query_runs(strategy="SmaCross").iloc[0]
+        assert run["run_id"] == run_id
+        assert run["n_trades"] == stats["# Trades"]
+        assert run["return_pct"] == pytest.approx(stats["Return [%]"])
+        assert '"n1": 5' in run["params"]
+        assert len(store.load_trades(run_id)) == stats["# Trades"]
+        assert len(store.load_equity(run_id)) == len(df)
+
+    def test_ig_tournament_writes_every_config(self, store, monkeypatch):
+        from execution import backtest_ig
+
+        h1 = make_data(3000).reset_index(names="timestamp").rename(columns=str.lower).assign(symbol="USDJPY")
+        monkeypatch.setattr(backtest_ig, "fetch_ig_history", lambda symbol, limit: h1.copy())
+        backtest_ig.run_ig_tournament(store=store)
+
+        runs = store.query_runs(strategy="baseline_sma_cross", symbol="USDJPY")
+        assert len(runs) == 2
+        assert all('"source": "ig"' in extra for extra in runs["extra"])
+        for run in runs.itertuples():
+            assert len(store.load_trades(run.run_id)) == run.n_trades > 0
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from execution import risk
+from execution.risk import (RISK_APPROVED, RISK_BELOW_MIN_SIZE, RISK_HOLD, RISK_MAX_EXPOSURE,
+                            RISK_MISSING_LEVELS, RISK_NO_EQUITY, risk_eval, risk_eval_batch)
+from execution.risk_limits import RiskManager
+
+SYMBOLS = ["USDJPY", "EURUSD", "GBPJPY", "GBPUSD"]
+
+
+@pytest.fixture
+def no_alerts(monkeypatch):
+    monkeypatch.setattr(RiskManager, "_send_alert", lambda self, alert_type, details: False)
+
+
+def _scalar(entry, sl, symbol, direction, equity, daily_loss, trades, open_lots):
+    signal = {"entry_price": entry, "stop_loss": sl, "symbol": symbol,
+              "direction": {1: "LONG", -1: "SHORT", 0: "HOLD"}[direction]}
+    account = {"equity": equity, "daily_loss_current": daily_loss, "daily_trades_count": trades,
+               "open_positions": [{"size": open_lots}]}
+    return risk_eval(signal, account)
+
+
+class TestRiskEvalBatch:
+    """Tests for vectorized risk sizing."""
+
+    def test_matches_scalar_risk_eval(self, no_alerts):
+        rng = np.random.default_rng(7)
+        n = 3000
+        symbol_ids = rng.integers(0, len(SYMBOLS), n)
+        is_jpy = np.array(["JPY" in s for s in SYMBOLS])[symbol_ids]
+        entry = np.where(is_jpy, rng.uniform(140, 190, n), rng.uniform(1.0, 1.4, n)).round(5)
+        dist = rng.choice([0.0, 0.0002, 0.003, 0.02, 0.3, 1.5], n) * rng.uniform(0.5, 1.5, n)
+        sl = entry - dist
+        sl[rng.random(n) < 0.02] = 0.0
+        directions = rng.choice([1, -1, 0], n, p=[0.48, 0.48, 0.04])
+        equity = rng.choice([0.0, 50.0, 1000.0, 10_000.0, 250_000.0], n)
+        daily_loss = rng.uniform(0, 800, n)
+        trades = rng.integers(0, 12, n)
+        open_lots = rng.choice([0.0, 1.0, 4.9], n)
+
+        batch = risk_eval_batch(entry, sl, symbol_ids, SYMBOLS, equity, directions=directions,
+                                daily_loss=daily_loss, daily_trades=trades, open_lots=open_lots)
+        assert len(batch) == n
+        for i in range(n):
+            expected = _scalar(float(entry[i]), float(sl[i]), SYMBOLS[symbol_ids[i]], int(directions[i]),
+                               float(equity[i]), float(daily_loss[i]), int(trades[i]), float(open_lots[i]))
+            assert batch[i] == expected, i
+        assert len(set(batch.codes.tolist())) >= 6
+
+    def test_rounding_matches_python_round(self):
+        # Values on a .xx5 tie where np.round and round() can disagree
+        values = np.array([0.125, 0.135, 1.005, 2.675, 0.285, 1.115, 0.015])
+        assert risk._round2(values).tolist() == [round(float(v), 2) for v in values]
+
+    def test_codes_and_sizes(self):
+        batch = risk_eval_batch([150.0, 150.0, 1.1, 150.0, 0.0], [149.0, 149.0, 1.099, 149.0, 149.0],
+                                [0, 0, 1, 0, 0], SYMBOLS, equity=[10_000.0, 10_000.0, 10.0, 0.0, 10_000.0],
+                                directions=[1, 0, 1, 1, 1])
+        assert batch.codes.tolist() == [RISK_APPROVED, RISK_HOLD, RISK_BELOW_MIN_SIZE, RISK_NO_EQUITY,
+                                        RISK_MISSING_LEVELS]
+        assert batch.sizes[0] > 0 and (batch.sizes[1:] == 0).all()
+        assert batch.reasons[1] == "Signal is HOLD"
+
+        exposed = risk_eval_batch([150.0], [140.0], [0], SYMBOLS, equity=10_000_000.0)
+        assert exposed.codes[0] == RISK_MAX_EXPOSURE
+        assert exposed.reasons[0].startswith("MAX_EXPOSURE_LIMIT")
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from execution.account import AccountManager
+from execution.portfolio_risk import PortfolioRiskEngine
+from execution.risk import risk_eval
+from execution.risk_gate import AlertQueue, BatchTally, PreTradeRiskGate, SnapshotCache
+from execution.risk_limits import RiskConfig
+
+SIGNAL = {"symbol": "EURUSD", "direction": "LONG", "entry_price": 1.1000, "stop_loss": 1.0980}
+
+
+class SlowNotifier:
+    def __init__(self):
+        self.sent = []
+        self.release = threading.Event()
+
+    def send_risk_alert(self, alert_type, details):
+        self.release.wait(2.0)
+        self.sent.append(alert_type)
+
+
+def _gate(tmp_path, engine=None, balance_source=None, **kwargs):
+    account = AccountManager(storage_file=str(tmp_path / "balance.json"), risk_engine=engine)
+    return PreTradeRiskGate(SnapshotCache(account, balance_source), **kwargs)
+
+
+class TestPreTradeRiskGate:
+    """Tests for the in-memory pre-trade risk gate."""
+
+    def test_matches_risk_eval(self, tmp_path):
+        config = RiskConfig(risk_per_trade_pct=2.0, max_open_lots=5.0)
+        gate = _gate(tmp_path, risk_config=config)
+        decision = gate.check(SIGNAL)
+        snapshot = gate.snapshots.get()
+        assert (decision.approved, decision.reason, decision.size) == \
+            risk_eval(SIGNAL, snapshot, risk_manager=gate.manager)
+        assert set(decision.timings_us) == {"snapshot", "limits", "sizing", "exposure", "total"}
+        assert gate.metrics.summary()["total"]["count"] == 1
+
+    def test_balance_refreshed_in_memory(self, tmp_path):
+        gate = _gate(tmp_path, balance_source=lambda: {"balance": 25000.0, "equity": 25500.0})
+        gate.snapshots.start()
+        gate.snapshots.stop()
+        assert gate.snapshots.get()["equity"] == 25500.0
+        assert not (tmp_path / "balance.json").exists()
+
+    def test_stale_snapshot_rejected(self, tmp_path):
+        gate = _gate(tmp_path, balance_source=lambda: None)
+        decision = gate.check(SIGNAL)
+        assert not decision.approved and decision.reason.startswith("Stale account snapshot")
+
+    def test_alerts_do_not_block(self, tmp_path):
+        notifier = SlowNotifier()
+        engine = PortfolioRiskEngine()
+        engine.open_position("d1", "EURUSD", "LONG", 4.9, 1.1, None)
+        gate = _gate(tmp_path, engine=engine, risk_config=RiskConfig(max_open_lots=5.0),
+                     alerts=AlertQueue(notifier))
+
+        start = time.perf_counter()
+        decision = gate.check(SIGNAL)
+        assert time.perf_counter() - start < 0.5
+        assert not decision.approved and decision.reason.startswith("MAX_EXPOSURE_LIMIT")
+
+        notifier.release.set()
+        assert gate.alerts.flush(timeout=2.0)
+        assert notifier.sent == ["MAX_EXPOSURE_LIMIT"]
+
+    def test_tally_counts_earlier_approvals(self, tmp_path):
+        notifier = SlowNotifier()
+        notifier.release.set()
+        engine = PortfolioRiskEngine()
+        limits = RiskConfig(max_open_lots=5.0, max_trades_per_day=10, max_daily_loss_pct=5.0)
+        gate = _gate(tmp_path, engine=engine, risk_config=limits, alerts=AlertQueue(notifier))
+
+        tally = BatchTally()
+        first = gate.check(SIGNAL, tally)
+        assert first.approved and (tally.trades, tally.lots) == (1, first.size)
+        # Risk at stake of the approvals so far counts toward the daily loss budget
+        decisions = [gate.check(SIGNAL, tally) for _ in range(3)]
+        assert [d.approved for d in decisions] == [True, True, False]
+        assert decisions[-1].reason.startswith("DAILY_LOSS_LIMIT_REACHED") and tally.trades == 3
+
+        limits.max_trades_per_day = 2
+        tally = BatchTally()
+        assert [gate.check(SIGNAL, tally).approved for _ in range(3)] == [True, True, False]
+        assert gate.check(SIGNAL).approved  # Without a tally every check sees the same snapshot
+        assert gate.alerts.flush(timeout=2.0)
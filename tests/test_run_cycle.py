@@ -0,0 +1,288 @@
+import functools
+import logging
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from execution import run_cycle
+from execution.account import AccountManager
+from execution.brokers.ig_broker import IGBroker
+from execution.config import config
+from execution.core import database
+from execution.core.database import init_db, make_engine
+from execution.core.models import TradeResult
+from execution.core.signals import Signal, SignalType
+from execution.execute_order import ExecutionRouter
+from execution.idempotency import IdempotencyLedger
+from execution.models import BracketOrder
+from execution.portfolio_risk import PortfolioRiskEngine
+from execution.reconcile import ReconciliationWorker
+from execution.risk_gate import AlertQueue, PreTradeRiskGate, SnapshotCache
+from execution.risk_limits import RiskConfig, RiskManager
+from execution.state_manager import StateManager
+from ig_stub import IGStub
+
+LOG = logging.getLogger("test")
+
+
+class _Plog:
+    def __init__(self):
+        self.data = {}
+
+    def update(self, **kwargs):
+        self.data.update(kwargs)
+
+
+class _Notifier:
+    def __init__(self, *args, **kwargs):
+        self.trades, self.closes = [], []
+
+    def send_trade_alert(self, *args):
+        self.trades.append(args)
+
+    def send_close_alert(self, trade, pnl):
+        self.closes.append((trade, pnl))
+
+    def send_risk_alert(self, alert_type, details):
+        return True
+
+
+class _Account:
+    def __init__(self, risk_engine):
+        self.risk_engine = risk_engine
+        self.updates = []
+
+    def update_balance(self, pnl):
+        self.updates.append(pnl)
+
+
+def _bars(*closes_and_ranges):
+    """H1 candles from 08:00 UTC; each item is (open, high, low, close)."""
+    rows = list(closes_and_ranges)
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2025-01-06 08:00", periods=len(rows), freq="h", tz="UTC"),
+        "open": [r[0] for r in rows], "high": [r[1] for r in rows],
+        "low": [r[2] for r in rows], "close": [r[3] for r in rows],
+    })
+
+
+QUIET = (158.0, 158.1, 157.9, 158.0)
+TAKE_PROFIT = (158.0, 159.3, 157.9, 159.1)
+
+
+def _limits(max_open_lots=1.0):
+    manager = RiskManager(RiskConfig(max_open_lots=max_open_lots), notifier=object())
+    manager._send_alert = lambda *args: False
+    return manager
+
+
+def _signal(symbol="USDJPY", direction=SignalType.LONG, hour=10, entry=158.0, sl=157.5, tp=159.0):
+    return Signal(symbol=symbol, timestamp=datetime(2025, 1, 6, hour), signal_type=direction,
+                  entry_price=entry, stop_loss=sl, take_profit=tp, rationale="test")
+
+
+@pytest.fixture
+def trade_db(tmp_path, monkeypatch):
+    engine = make_engine(f"sqlite:///{tmp_path / 'trades.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(run_cycle, "_db_ready", False)
+    init_db(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def live(monkeypatch):
+    """Fresh portfolio, in-memory idempotency ledger and no Discord."""
+    risk = PortfolioRiskEngine(balance=10_000.0)
+    monkeypatch.setattr(run_cycle, "portfolio", risk)
+    monkeypatch.setattr(run_cycle, "get_ledger", lambda: IdempotencyLedger(path=None))
+    monkeypatch.setattr(run_cycle, "DiscordNotifier", _Notifier)
+    return risk
+
+
+class TestExecuteTradeToReconcile:
+    """Tests for trades placed by the live cycle flowing through reconciliation."""
+
+    def test_ig_fill_persisted_then_closed(self, trade_db, live, monkeypatch):
+        stub = IGStub(level=158.25, pending_polls=0)
+        broker = IGBroker(ledger=IdempotencyLedger(path=None), deal_client=stub.client())
+        monkeypatch.setattr(config, "BROKER", "ig")
+        monkeypatch.setattr(run_cycle, "get_broker", lambda: broker)
+
+        run_cycle.execute_trade(LOG, _signal(), 0.5, _Plog())
+        db = trade_db()
+        (trade,) = db.query(TradeResult).all()
+        db.close()
+        assert (trade.status, trade.broker_order_id, trade.fill_price) == ("OPEN", "DIAAAA000001", 158.25)
+        assert trade.quantity == 0.5 and trade.latency_ms is not None
+        assert "DIAAAA000001" in live.positions
+
+        # Stopped out at the broker
+        stub.positions.clear()
+        stub.transactions.append({"reference": "000001", "transactionType": "DEAL", "closeLevel": "157.5",
+                                  "profitAndLoss": "E-23.81", "dateUtc": "2025-01-06T12:00:00"})
+        account, notifier = _Account(live), _Notifier()
+        report = ReconciliationWorker(broker, account=account, notifier=notifier,
+                                      session_factory=trade_db).reconcile()
+
+        assert (report.checked, report.closed, report.missing, report.orphans) == (1, 1, [], [])
+        assert account.updates == [-23.81] and live.positions == {} and live.gross_lots == 0.0
+        assert notifier.closes[0][0]["broker_order_id"] == "DIAAAA000001"
+
+    def test_restart_adopts_open_ig_positions(self, trade_db, live):
+        stub = IGStub(level=158.25, pending_polls=0)
+        for n, size in ((1, 0.6), (2, 0.3)):  # Opened before the restart
+            stub.positions[f"DIAAAAOLD{n}"] = {"dealId": f"DIAAAAOLD{n}", "direction": "BUY", "size": size,
+                                               "level": 158.0, "epic": "CS.D.USDJPY.TODAY.IP"}
+        broker = IGBroker(ledger=IdempotencyLedger(path=None), deal_client=stub.client())
+        worker = ReconciliationWorker(broker, account=_Account(live), notifier=_Notifier(),
+                                      session_factory=trade_db)
+
+        report = worker.reconcile()  # Startup pass
+        assert sorted(report.adopted) == ["DIAAAAOLD1", "DIAAAAOLD2"]
+        assert live.gross_lots == pytest.approx(0.9) and live.net_lots("USDJPY") == pytest.approx(0.9)
+        assert not _limits().check_exposure_limits(live.snapshot(), 0.5)["allowed"]
+
+        # Closed by hand on the IG platform: the exposure is released on the next pass
+        del stub.positions["DIAAAAOLD1"]
+        report = worker.reconcile()
+        assert report.dropped == ["DIAAAAOLD1"] and list(live.positions) == ["DIAAAAOLD2"]
+        assert _limits().check_exposure_limits(live.snapshot(), 0.5)["allowed"]
+
+    def test_rejected_order_not_persisted(self, trade_db, live, monkeypatch):
+        stub = IGStub(deal_status="REJECTED", pending_polls=0)
+        broker = IGBroker(ledger=IdempotencyLedger(path=None), deal_client=stub.client())
+        monkeypatch.setattr(config, "BROKER", "ig")
+        monkeypatch.setattr(run_cycle, "get_broker", lambda: broker)
+
+        plog = _Plog()
+        run_cycle.execute_trade(LOG, _signal(), 0.5, plog)
+        assert plog.data["decision"] == "REJECTED"
+        db = trade_db()
+        assert db.query(TradeResult).count() == 0
+        db.close()
+
+
+class TestPaperBroker:
+    """Tests for the shared PAPER SimulatedBroker across cycles."""
+
+    @pytest.fixture
+    def paper(self, trade_db, live, monkeypatch):
+        account, notifier = _Account(live), _Notifier()
+        monkeypatch.setattr(config, "BROKER", "paper")
+        monkeypatch.setattr(run_cycle, "_broker", None)
+        monkeypatch.setattr(run_cycle, "_paper_reconciler", None)
+        monkeypatch.setattr(run_cycle, "get_account", lambda: account)
+        monkeypatch.setattr(run_cycle, "ReconciliationWorker",
+                            functools.partial(ReconciliationWorker, session_factory=trade_db, notifier=notifier))
+        return account, notifier
+
+    def test_bracket_exit_booked_on_a_later_cycle(self, paper, live, trade_db):
+        account, notifier = paper
+        candles = [QUIET, QUIET]
+        run_cycle.feed_paper_broker(LOG, {"USDJPY": _bars(*candles)})
+        run_cycle.execute_trade(LOG, _signal(hour=9), 0.5, _Plog())
+        broker = run_cycle.get_broker()
+        (deal_id,) = live.positions
+        assert deal_id in broker.portfolio.positions
+
+        candles.append((158.0, 158.3, 157.8, 158.2))  # Inside SL/TP
+        run_cycle.feed_paper_broker(LOG, {"USDJPY": _bars(*candles)})
+        assert broker.trades == [] and deal_id in live.positions
+
+        run_cycle.feed_paper_broker(LOG, {"USDJPY": _bars(*candles)})  # Same window again: no bar re-matched
+        candles.append((158.2, 159.3, 158.1, 159.1))  # Take profit
+        run_cycle.feed_paper_broker(LOG, {"USDJPY": _bars(*candles)})
+
+        assert [t["reason"] for t in broker.trades] == ["TP"]
+        assert live.positions == {} and live.gross_lots == 0.0
+        assert account.updates == [pytest.approx(broker.trades[0]["pnl"])]
+        db = trade_db()
+        (trade,) = db.query(TradeResult).all()
+        db.close()
+        assert (trade.broker_order_id, trade.status) == (deal_id, "CLOSED")
+        assert trade.exit_price == pytest.approx(trade.fill_price + 1.0)  # TP 100 points from the fill
+        assert notifier.closes[0][0]["broker_order_id"] == deal_id
+
+    def test_exposure_released_across_cycles(self, paper, live):
+        account, _ = paper
+        limits = _limits(max_open_lots=1.0)
+        candles = [QUIET, QUIET]
+        for cycle in range(4):  # 4 x 0.5 lots would breach 1.0 if closes were never booked
+            run_cycle.feed_paper_broker(LOG, {"USDJPY": _bars(*candles)})
+            assert limits.check_exposure_limits(live.snapshot(), 0.5)["allowed"]
+            run_cycle.execute_trade(LOG, _signal(hour=7 + len(candles)), 0.5, _Plog())
+            assert live.gross_lots == pytest.approx(0.5)
+
+            candles += [TAKE_PROFIT, QUIET]
+            run_cycle.feed_paper_broker(LOG, {"USDJPY": _bars(*candles)})
+            assert live.positions == {} and live.gross_lots == 0.0
+
+        broker = run_cycle.get_broker()
+        assert [t["reason"] for t in broker.trades] == ["TP"] * 4
+        assert len(account.updates) == 4
+
+
+class TestSignalMatrixBatch:
+    """Tests for executing the signal matrix's approved signals as one batch."""
+
+    def test_batch_with_brackets(self, trade_db, live, tmp_path, monkeypatch):
+        signals = [_signal(hour=9),
+                   _signal("EURUSD", SignalType.SHORT, hour=9, entry=1.1000, sl=1.1050, tp=1.0900),
+                   _signal("GBPUSD", hour=9, entry=1.2500, sl=1.2450, tp=1.2600)]
+        monkeypatch.setattr(config, "BROKER", "paper")
+        monkeypatch.setattr(config.RISK_CONFIG, "max_open_lots", 1.0)
+        monkeypatch.setattr(run_cycle, "_broker", None)
+        monkeypatch.setattr(run_cycle, "analyze_signal_matrix", lambda log, plog: signals)
+        monkeypatch.setattr(run_cycle, "check_news_sentiment", lambda log, signal, plog: True)
+        monkeypatch.setattr(run_cycle, "assess_risk", lambda log, signal, plog, tally=None: 0.4)
+        monkeypatch.setattr(run_cycle, "StateManager", lambda: StateManager(str(tmp_path / "state.json")))
+        batches = []
+        submit = ExecutionRouter.execute_batch_async
+        monkeypatch.setattr(ExecutionRouter, "execute_batch_async",
+                            lambda router, orders, **kw: batches.append(orders) or submit(router, orders, **kw))
+
+        run_cycle.run_signal_matrix(LOG, _Plog())
+
+        (orders,) = batches
+        assert [type(o) for o in orders] == [BracketOrder] * 3
+        broker = run_cycle.get_broker()
+        # Exact signal levels attached; the third order breaches max_open_lots for the batch
+        levels = {p["symbol"]: (p["stop_level"], p["limit_level"])
+                  for p in broker.fetch_state(datetime(2025, 1, 6), ()).positions.values()}
+        assert levels == {"USDJPY": (157.5, 159.0), "EURUSD": (1.1050, 1.0900)}
+        assert live.gross_lots == pytest.approx(0.8)
+        db = trade_db()
+        assert sorted(t.symbol for t in db.query(TradeResult).all()) == ["EURUSD", "USDJPY"]
+        db.close()
+
+    def test_approvals_in_one_cycle_add_up(self, trade_db, live, tmp_path, monkeypatch):
+        # 2% of 10,000 at risk: 79 pips on USDJPY and 50 pips on EURUSD size to 0.4 lots each
+        signals = [_signal(hour=9, entry=158.0, sl=157.21, tp=159.58),
+                   _signal("EURUSD", hour=9, entry=1.1000, sl=1.0950, tp=1.1100)]
+        live.open_position("held", "GBPUSD", "LONG", 0.5, 1.2500)
+        monkeypatch.setattr(config, "BROKER", "paper")
+        monkeypatch.setattr(config.RISK_CONFIG, "max_open_lots", 1.0)
+        monkeypatch.setattr(run_cycle, "_broker", None)
+        monkeypatch.setattr(run_cycle, "analyze_signal_matrix", lambda log, plog: signals)
+        monkeypatch.setattr(run_cycle, "check_news_sentiment", lambda log, signal, plog: True)
+        monkeypatch.setattr(run_cycle, "StateManager", lambda: StateManager(str(tmp_path / "state.json")))
+        account = AccountManager(storage_file=str(tmp_path / "balance.json"), risk_engine=live)
+        gate = PreTradeRiskGate(SnapshotCache(account), alerts=AlertQueue(notifier=_Notifier()))
+        monkeypatch.setattr(run_cycle, "_risk_gate", gate)
+        batches = []
+        submit = ExecutionRouter.execute_batch_async
+        monkeypatch.setattr(ExecutionRouter, "execute_batch_async",
+                            lambda router, orders, **kw: batches.append(orders) or submit(router, orders, **kw))
+
+        run_cycle.run_signal_matrix(LOG, _Plog())
+
+        # The pre-trade gate already counts the first approval: only one order reaches the batch
+        (orders,) = batches
+        assert [o.entry.symbol for o in orders] == ["USDJPY"]
+        # 0.5 + 0.4 fits; the second 0.4 would make 1.3 lots although each alone passes against the snapshot
+        assert live.gross_lots == pytest.approx(0.9)
+        assert sorted(p.symbol for p in live.positions.values()) == ["GBPUSD", "USDJPY"]
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import signal
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from execution.journal import TradeJournal
+from execution.scheduler import Cron, Every, Job, Scheduler, bar_close
+from execution.state_manager import StateManager
+
+
+def _ts(*args) -> float:
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def _run_for(scheduler: Scheduler, seconds: float) -> None:
+    async def main():
+        task = asyncio.ensure_future(scheduler.run(grace_s=2.0))
+        await asyncio.sleep(seconds)
+        scheduler.stop()
+        await task
+    asyncio.run(main())
+
+
+class TestSchedules:
+    """Tests for cron and interval schedules."""
+
+    def test_cron_next_after(self):
+        assert Cron("0 */5 * * *").next_after(_ts(2025, 1, 6, 7, 30)) == _ts(2025, 1, 6, 10, 0)
+        assert Cron("0 22 * * *").next_after(_ts(2025, 1, 6, 22, 0)) == _ts(2025, 1, 7, 22, 0)
+        # Friday 10:00 -> Monday 09:00 for weekdays only
+        assert Cron("0 9 * * 1-5").next_after(_ts(2025, 1, 10, 10, 0)) == _ts(2025, 1, 13, 9, 0)
+        assert Cron("15,45 * 1 * *").next_after(_ts(2025, 1, 31, 23, 50)) == _ts(2025, 2, 1, 0, 15)
+        assert bar_close("H4").next_after(_ts(2025, 1, 6, 5, 0, 1)) == _ts(2025, 1, 6, 8, 0)
+        with pytest.raises(ValueError):
+            Cron("61 * * * *")
+        with pytest.raises(ValueError):
+            Cron("0 * * *")
+
+    def test_every_is_epoch_aligned(self):
+        assert Every(60).next_after(_ts(2025, 1, 6, 7, 30, 10)) == _ts(2025, 1, 6, 7, 31)
+        assert Every(60).next_after(_ts(2025, 1, 6, 7, 31)) == _ts(2025, 1, 6, 7, 32)
+
+
+class TestScheduler:
+    """Tests for job execution, timeouts, overlap, catch-up and metrics."""
+
+    def test_timeout_cancels_async_job(self):
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        scheduler = Scheduler()
+        job = scheduler.add(Job("slow", Every(0.2), slow, timeout_s=0.05))
+        _run_for(scheduler, 0.5)
+        assert job.timeouts >= 1 and job.runs == 0
+        assert cancelled and job.in_flight == 0
+
+    def test_overlap_skipped_and_failures_isolated(self):
+        calls = []
+        scheduler = Scheduler()
+        busy = scheduler.add(Job("busy", Every(0.1), lambda: (calls.append(1), time.sleep(0.35))))
+        broken = scheduler.add(Job("broken", Every(0.1), lambda: 1 / 0))
+        _run_for(scheduler, 0.65)
+        assert busy.skipped >= 2
+        assert len(calls) <= 3
+        assert broken.failures >= 3 and "division" in broken.last_error
+
+    def test_blocked_loop_coalesces_missed_ticks(self):
+        async def hog():
+            time.sleep(0.45)  # Blocks the event loop on purpose
+
+        scheduler = Scheduler()
+        scheduler.add(Job("hog", Every(10, offset_s=time.time() % 10 + 0.05), hog))
+        ticker = scheduler.add(Job("ticker", Every(0.1), lambda: None))
+        _run_for(scheduler, 0.8)
+        assert ticker.missed >= 2
+        assert scheduler.metrics()["ticker"]["jitter_p99_ms"] > 0
+
+    def test_catch_up_after_restart(self, tmp_path):
+        state = StateManager(str(tmp_path / "state.db"))
+        runs = []
+        scheduler = Scheduler(state=state)
+        job = scheduler.add(Job("daily", Every(3600), lambda: runs.append(1), catch_up_s=7200))
+        _run_for(scheduler, 0.3)
+        assert runs == [1] and job.runs == 1
+        assert float(state.load_state()["scheduler_daily"]) == Every(3600).next_after(time.time()) - 3600
+
+        # Tick already recorded: nothing to catch up
+        again = Scheduler(state=state)
+        again.add(Job("daily", Every(3600), lambda: runs.append(2), catch_up_s=7200))
+        _run_for(again, 0.3)
+        assert runs == [1]
+
+    def test_metrics(self):
+        scheduler = Scheduler()
+        scheduler.add(Job("fast", Every(0.1), lambda: time.sleep(0.01)))
+        _run_for(scheduler, 0.45)
+        metrics = scheduler.metrics()["fast"]
+        assert metrics["runs"] >= 3 and metrics["failures"] == 0
+        assert metrics["duration_p50_ms"] >= 10
+        assert "jitter_p50_ms" in metrics and metrics["next_due"] > time.time() - 1
+
+    def test_sigterm_stops_after_journal_flush(self, tmp_path):
+        journal = TradeJournal(tmp_path / "j.db", flush_interval_s=3600)
+        journal.append({"timestamp": "2025-03-10T12:00:00+00:00", "decision": "SKIPPED"})
+
+        scheduler = Scheduler()
+        scheduler.add(Job("journal_flush", Every(0.1), journal.flush, timeout_s=1))
+
+        async def main():
+            task = asyncio.ensure_future(scheduler.run(grace_s=1.0))
+            await asyncio.sleep(0.3)
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.wait_for(task, 2.0)
+        asyncio.run(main())
+
+        assert scheduler.jobs["journal_flush"].runs >= 1
+        assert journal._conn.execute("SELECT COUNT(*) FROM journal").fetchone()[0] == 1
@@ -0,0 +1,99 @@
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+from execution.generate_signals import SignalGenerator
+from execution.signal_matrix import IndicatorCache, SignalCell, SignalMatrix, rank_signals
+
+SMA = "baseline_sma_cross"
+
+
+def _cell(symbol, fast, slow, priority=0):
+    return SignalCell.from_dict({"symbol": symbol, "strategy": SMA, "priority": priority,
+                                 "params": {"fast_period": fast, "slow_period": slow, "use_rsi_filter": False}})
+
+
+class TestSignalMatrix:
+    """Tests for concurrent multi-symbol, multi-strategy signal evaluation."""
+
+    def test_cached_indicators_match_recomputed(self, mock_candle_data):
+        df = mock_candle_data(symbol="USDJPY", count=400, start_price=158.0)
+        params = {"fast_period": 5, "slow_period": 20, "use_rsi_filter": True}
+        plain = SignalGenerator(SMA, params).generate(df)
+        cached = SignalGenerator(SMA, params).generate(df, {"indicators": IndicatorCache(df)})
+        assert plain
+        assert [(s.timestamp, s.direction, s.stop_loss) for s in plain] == \
+               [(s.timestamp, s.direction, s.stop_loss) for s in cached]
+
+    def test_indicators_shared_across_cells(self, mock_candle_data):
+        df = mock_candle_data(symbol="USDJPY", count=300, start_price=158.0)
+        cells = [_cell("USDJPY", fast, 50) for fast in (5, 10, 20)]
+        matrix = SignalMatrix(cells, fresh_only=False)
+
+        caches = []
+        original = IndicatorCache.__init__
+
+        def tracking_init(self, frame):
+            original(self, frame)
+            caches.append(self)
+
+        IndicatorCache.__init__ = tracking_init
+        try:
+            result = matrix.evaluate({"USDJPY": df})
+        finally:
+            IndicatorCache.__init__ = original
+
+        assert not result.errors and not result.timed_out
+        # fast 5/10/20 + slow 50 + atr + rsi, instead of 4 per cell
+        assert len(caches) == 1 and len(caches[0]) == 6
+
+    def test_fetches_each_symbol_once(self, mock_candle_data):
+        calls = []
+
+        def fetcher(symbol, timeframe):
+            calls.append(symbol)
+            return mock_candle_data(symbol=symbol, count=200, start_price=158.0)
+
+        cells = [_cell("USDJPY", 5, 20), _cell("USDJPY", 10, 30), _cell("GBPJPY", 5, 20)]
+        result = SignalMatrix(cells, fetcher=fetcher).evaluate()
+        assert sorted(calls) == ["GBPJPY", "USDJPY"]
+        assert len(result.cells) == 3
+
+    def test_fresh_only_keeps_last_candle_signals(self, mock_candle_data):
+        df = mock_candle_data(symbol="USDJPY", count=400, start_price=158.0)
+        cell = _cell("USDJPY", 5, 20)
+        stale = SignalMatrix([cell], fresh_only=False).evaluate({"USDJPY": df})
+        fresh = SignalMatrix([cell], fresh_only=True).evaluate({"USDJPY": df})
+        assert stale.signals
+        last = pd.Timestamp(df["timestamp"].iloc[-1])
+        assert all(pd.Timestamp(s.timestamp) == last for s in fresh.signals)
+
+    def test_opposite_directions_cancel(self):
+        def sig(direction, sl, tp):
+            return SimpleNamespace(direction=direction, entry_price=100.0, stop_loss=sl, take_profit=tp)
+
+        hits = [
+            (_cell("USDJPY", 5, 20), sig("LONG", 99.0, 102.0)),
+            (_cell("USDJPY", 10, 30), sig("SHORT", 101.0, 98.0)),
+            (_cell("GBPJPY", 5, 20), sig("LONG", 99.0, 101.0)),
+            (_cell("GBPJPY", 10, 30, priority=1), sig("LONG", 99.0, 101.5)),
+            (_cell("EURJPY", 5, 20), sig("SHORT", 101.0, 97.0)),
+        ]
+        ranked, conflicts = rank_signals(hits)
+        assert [c.symbol for c, _ in ranked] == ["GBPJPY", "EURJPY"]
+        assert ranked[0][0].priority == 1
+        assert len(conflicts) == 1 and conflicts[0].startswith("USDJPY")
+
+    def test_latency_budget(self, mock_candle_data):
+        def slow_fetcher(symbol, timeframe):
+            if symbol == "GBPJPY":
+                time.sleep(2.0)
+            return mock_candle_data(symbol=symbol, count=200, start_price=158.0)
+
+        cells = [_cell("USDJPY", 5, 20), _cell("GBPJPY", 5, 20)]
+        start = time.perf_counter()
+        result = SignalMatrix(cells, latency_budget_s=0.5, fetcher=slow_fetcher).evaluate()
+        assert time.perf_counter() - start < 1.5
+        assert result.timed_out == [cells[1]]
+        assert not result.cells[0].timed_out
@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from execution.core.signals import FastSignal, Signal, SignalFrame, SignalType
+from execution.generate_signals import SignalGenerator
+from execution.risk import risk_eval
+
+
+def _signal(**overrides):
+    fields = dict(symbol="USDJPY", timestamp=datetime(2024, 1, 2, 10, tzinfo=timezone.utc),
+                  signal_type=SignalType.LONG, entry_price=150.0, stop_loss=149.5, take_profit=151.0,
+                  rationale="Test", metadata={"close": 150.0})
+    fields.update(overrides)
+    return Signal(**fields)
+
+
+class TestSignalTypes:
+    """Tests for FastSignal / SignalFrame and their conversions."""
+
+    def test_round_trip(self):
+        signal = _signal()
+        fast = FastSignal.from_signal(signal)
+        assert fast.direction == "LONG"
+        assert fast.to_signal() == signal
+
+        frame = SignalFrame.from_signals([signal, _signal(signal_type=SignalType.SHORT, stop_loss=150.5)])
+        assert len(frame) == 2 and list(frame.direction) == [1, -1]
+        assert frame.to_signals()[0] == signal
+        assert frame[-1].direction == "SHORT"
+        assert list(frame.to_frame()["direction"]) == ["LONG", "SHORT"]
+
+    def test_validation_only_at_boundary(self):
+        fast = FastSignal("USDJPY", "not a date", "LONG", 150.0, 149.5, 151.0)
+        with pytest.raises(ValidationError):
+            fast.to_signal()
+
+    def test_frame_matches_validated_signals(self, mock_candle_data):
+        df = mock_candle_data(symbol="USDJPY", count=500, start_price=158.0)
+        generator = SignalGenerator("baseline_sma_cross", {"fast_period": 5, "slow_period": 20})
+        signals = generator.generate(df)
+        frame = generator.generate_frame(df)
+        assert signals and len(frame) == len(signals)
+        assert frame.to_signals() == signals
+        assert not SignalGenerator("baseline_sma_cross").generate_frame(df.head(10))
+
+    def test_risk_eval_accepts_fast_signal(self):
+        account = {"equity": 10000.0}
+        signal = _signal()
+        assert risk_eval(FastSignal.from_signal(signal), account) == risk_eval(signal, account)
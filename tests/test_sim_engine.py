@@ -0,0 +1,108 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from execution.brokers.sim_engine import BookModel, LatencyModel, SimulatedBroker, SpreadModel
+from execution.execute_order import ExecutionRouter
+from execution.models import OrderIntent, OrderSide, OrderType
+
+
+def _intent(key, direction=OrderSide.LONG, qty=1.0, order_type=OrderType.MARKET, price=None, sl=None, tp=None):
+    return OrderIntent(idempotency_key=key, symbol="USDJPY", direction=direction, quantity=qty,
+                       order_type=order_type, limit_price=price, sl_distance=sl, tp_distance=tp)
+
+
+def _bar(broker, ts, o, h, l, c):
+    broker.on_bar("USDJPY", pd.Timestamp(ts, tz="UTC"), o, h, l, c)
+
+
+class TestSimulatedBroker:
+    """Tests for the simulated matching engine."""
+
+    def test_market_order_spread_depth_and_latency(self):
+        broker = SimulatedBroker(spread=SpreadModel(pips=2.0), book=BookModel(levels=2, level_lots=1.0),
+                                 latency=LatencyModel("fixed", mean_s=0.25))
+        broker.on_quote("USDJPY", 158.00, "2025-01-06 10:00")
+        assert broker.quote("USDJPY") == pytest.approx((157.99, 158.01))
+
+        start = time.perf_counter()
+        result = broker.execute_order(_intent("a", qty=1.5))
+        assert time.perf_counter() - start < 0.05  # Virtual latency, no sleep
+        assert result.status == "FILLED"
+        # 1 lot at the ask, 0.5 one level (0.2 pips) deeper
+        assert result.filled_price == pytest.approx((158.01 + 0.5 * 158.012) / 1.5)
+        assert result.raw_response["latency_s"] == 0.25
+        assert result.timestamp == pd.Timestamp("2025-01-06 10:00:00.25", tz="UTC")
+
+        partial = broker.execute_order(_intent("b", direction=OrderSide.SHORT, qty=5.0))
+        assert partial.status == "PARTIAL" and partial.filled_quantity == 2.0
+        assert broker.execute_order(_intent("c", direction=OrderSide.HOLD)).status == "REJECTED"
+
+    def test_limit_and_stop_orders(self):
+        broker = SimulatedBroker(spread=SpreadModel(pips=0.0), book=BookModel(level_lots=1.0))
+        _bar(broker, "2025-01-06 10:00", 158.0, 158.1, 157.9, 158.0)
+
+        limit = broker.execute_order(_intent("l", qty=2.5, order_type=OrderType.LIMIT, price=157.5))
+        stop = broker.execute_order(_intent("s", direction=OrderSide.SHORT, order_type=OrderType.STOP, price=157.7))
+        assert limit.status == stop.status == "PENDING"
+
+        _bar(broker, "2025-01-06 11:00", 157.8, 157.9, 157.4, 157.6)
+        assert broker.get_status(stop.broker_order_id).filled_price == pytest.approx(157.7)
+        partial = broker.get_status(limit.broker_order_id)
+        assert partial.status == "PARTIAL" and partial.filled_quantity == 1.0
+        assert partial.filled_price == pytest.approx(157.5)
+
+        # Gaps below the limit: the rest fills at the (better) open, one level per bar
+        _bar(broker, "2025-01-06 12:00", 157.2, 157.3, 157.1, 157.2)
+        _bar(broker, "2025-01-06 13:00", 157.2, 157.3, 157.1, 157.2)
+        done = broker.get_status(limit.broker_order_id)
+        assert done.status == "FILLED" and done.filled_quantity == 2.5
+        assert broker.working_orders == []
+        assert broker.portfolio.net_lots("USDJPY") == pytest.approx(2.5 - 1.0)
+
+    def test_stop_loss_and_take_profit(self):
+        broker = SimulatedBroker(spread=SpreadModel(pips=0.0))
+        _bar(broker, "2025-01-06 10:00", 158.0, 158.0, 158.0, 158.0)
+        broker.execute_order(_intent("long", sl=50, tp=100))                              # SL 157.5, TP 159.0
+        broker.execute_order(_intent("short", direction=OrderSide.SHORT, sl=50, tp=100))  # SL 158.5, TP 157.0
+
+        _bar(broker, "2025-01-06 11:00", 158.0, 158.6, 157.9, 158.4)
+        assert [(t["direction"], t["reason"], t["exit_price"]) for t in broker.trades] == [("SHORT", "SL", 158.5)]
+
+        # Touches both levels in one bar: SL first
+        broker.execute_order(_intent("both", sl=20, tp=20))
+        _bar(broker, "2025-01-06 12:00", 158.4, 159.5, 157.0, 158.0)
+        reasons = {t["deal_id"]: t["reason"] for t in broker.trades}
+        assert list(reasons.values()) == ["SL", "SL", "SL"]
+        assert broker.portfolio.positions == {}
+        assert broker.portfolio.balance == pytest.approx(10000.0 + sum(t["pnl"] for t in broker.trades))
+
+    def test_replay_thousands_of_orders(self):
+        rng = np.random.default_rng(1)
+        n = 2000
+        close = 158.0 + np.cumsum(rng.normal(0, 0.05, n))
+        candles = pd.DataFrame({
+            "timestamp": pd.date_range("2025-01-01", periods=n, freq="h", tz="UTC"),
+            "symbol": "USDJPY", "open": np.r_[158.0, close[:-1]], "close": close,
+        })
+        candles["high"] = candles[["open", "close"]].max(axis=1) + 0.02
+        candles["low"] = candles[["open", "close"]].min(axis=1) - 0.02
+
+        broker = SimulatedBroker(latency=LatencyModel("lognormal", mean_s=0.08, std_s=0.03, seed=2))
+        router = ExecutionRouter(broker)
+        results = []
+
+        def strategy(broker, symbol, bar):
+            side = OrderSide.LONG if bar.close >= bar.open else OrderSide.SHORT
+            results.append(router.execute_order(_intent(f"k{len(results)}", direction=side, qty=0.1, sl=20, tp=30)))
+
+        start = time.perf_counter()
+        trades = broker.replay(candles, on_bar=strategy)
+        elapsed = time.perf_counter() - start
+
+        assert len(results) == n and all(r.status == "FILLED" for r in results)
+        assert len(trades) > n / 2
+        assert {t["reason"] for t in trades} == {"SL", "TP"}
+        assert n / elapsed > 1000  # Orders per second
@@ -0,0 +1,74 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from execution import state_manager as sm
+from execution.state_manager import SqliteStateBackend, StateCorruptedError, StateManager
+
+
+def _mark_many(path, symbol, n):
+    manager = StateManager(path, sync="normal")
+    for i in range(n):
+        manager.mark_candle_processed(symbol, "H1", f"2025-01-06T{i:02d}:00:00+00:00")
+
+
+class TestStateManager:
+    """Tests for the candle state store."""
+
+    def test_sqlite_upserts_and_cache(self, tmp_path):
+        path = str(tmp_path / "state.db")
+        manager = StateManager(path)
+        assert not manager.is_candle_processed("EURUSD", "H1", "t1")
+        manager.mark_candle_processed("EURUSD", "H1", "t1")
+        manager.mark_candle_processed("USDJPY", "M15", "t1")
+        assert manager.is_candle_processed("EURUSD", "H1", "t1")
+        assert StateManager(path).backend is manager.backend  # One connection per path
+
+        # A write from another connection (process) is seen on a cache miss
+        other = SqliteStateBackend(path)
+        other.put_many({"EURUSD_H1": "t2"})
+        other.close()
+        assert manager.is_candle_processed("EURUSD", "H1", "t2")
+        assert manager.load_state() == {"EURUSD_H1": "t2", "USDJPY_M15": "t1"}
+
+    def test_processes_share_one_store(self, tmp_path):
+        path = str(tmp_path / "shared.db")
+        ctx = multiprocessing.get_context("spawn")
+        procs = [ctx.Process(target=_mark_many, args=(path, sym, 20)) for sym in ("EURUSD", "USDJPY", "XAUUSD")]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(60)
+            assert p.exitcode == 0
+        state = StateManager(path).load_state()
+        assert state == {f"{s}_H1": "2025-01-06T19:00:00+00:00" for s in ("EURUSD", "USDJPY", "XAUUSD")}
+
+    def test_json_atomic_and_thread_safe(self, tmp_path):
+        path = str(tmp_path / "state.json")
+        manager = StateManager(path)
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda i: manager.mark_candle_processed(f"SYM{i}", "H1", "t"), range(40)))
+        with open(path) as f:
+            assert len(json.load(f)) == 40
+        assert os.listdir(tmp_path) == ["state.json"]  # No temp files left behind
+
+    def test_corrupt_json_is_not_empty_state(self, tmp_path):
+        path = tmp_path / "state.json"
+        path.write_text('{"EURUSD_H1": "t1"')
+        with pytest.raises(StateCorruptedError):
+            StateManager(str(path)).is_candle_processed("EURUSD", "H1", "t1")
+
+    def test_legacy_json_imported(self, tmp_path, monkeypatch):
+        legacy = tmp_path / "state.json"
+        legacy.write_text(json.dumps({"EURUSD_H1": "2025-01-06T10:00:00+00:00"}))
+        monkeypatch.setattr(sm, "STATE_FILE", str(tmp_path / "state.db"))
+        monkeypatch.setattr(sm, "LEGACY_STATE_FILE", str(legacy))
+        manager = StateManager(sm.STATE_FILE)
+        assert manager.is_candle_processed("EURUSD", "H1", "2025-01-06T10:00:00+00:00")
+
+    def test_invalid_sync_mode(self, tmp_path):
+        with pytest.raises(ValueError):
+            StateManager(str(tmp_path / "x.db"), sync="sometimes")
@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from execution.generate_signals import SignalGenerator
+from execution.strategy_registry import KIND_BACKTESTING, KIND_SIGNAL, StrategyRegistry
+
+LAZY_IMPORT_CHECK = """
+import sys
+from execution.strategy_registry import registry
+assert "sma_cross" in registry.names() and "baseline_sma_cross" in registry.names()
+loaded = [m for m in ("backtesting", "execution.strategy_playground.strategies.sma_cross",
+                      "execution.strategies.baseline_sma_cross") if m in sys.modules]
+print(",".join(loaded))
+"""
+
+
+class TestStrategyRegistry:
+    """Tests for strategy discovery and lazy loading."""
+
+    def test_discovers_both_strategy_folders(self):
+        registry = StrategyRegistry(manifest=None, use_entry_points=False)
+        specs = registry.specs
+        assert specs["baseline_sma_cross"].kind == KIND_SIGNAL
+        assert specs["sma_cross"].kind == KIND_BACKTESTING
+        assert specs["alligator_trend"].target.endswith(":AlligatorTrendStrategy")
+
+    def test_discovery_does_not_import_strategies(self):
+        out = subprocess.run([sys.executable, "-c", LAZY_IMPORT_CHECK], capture_output=True, text=True,
+                             check=True)
+        assert out.stdout.strip() == ""
+
+    def test_manifest_overrides_discovery(self, tmp_path):
+        manifest = tmp_path / "strategies.json"
+        manifest.write_text(json.dumps({"custom": "execution.strategies.baseline_sma_cross:BaselineSMACross"}))
+        registry = StrategyRegistry(discovery_dirs=[], manifest=manifest, use_entry_points=False)
+        assert registry.names() == ["custom"]
+        strategy = registry.create("custom", fast_period=5, slow_period=20)
+        assert strategy.fast_period == 5
+        assert registry.specs["custom"].kind == KIND_SIGNAL
+
+    def test_unknown_strategy(self):
+        registry = StrategyRegistry(discovery_dirs=[], manifest=None, use_entry_points=False)
+        with pytest.raises(KeyError):
+            registry.get("nope")
+        with pytest.raises(ValueError, match="not found in registry"):
+            SignalGenerator("nope")
+
+
+class TestBacktestingStrategyAdapter:
+    """Tests for running backtesting.py strategies through SignalGenerator."""
+
+    def test_signals_match_backtest_entries(self, mock_candle_data):
+        df = mock_candle_data(symbol="USDJPY", count=400)
+        signals = SignalGenerator("sma_cross", {"n1": 5, "n2": 15}).generate(df)
+        assert signals
+
+        # SmaCross orders on every crossover of SMA(5) and SMA(15)
+        fast = df["close"].rolling(5).mean()
+        slow = df["close"].rolling(15).mean()
+        crossed = ((fast.shift() < slow.shift()) & (fast > slow)) | ((fast.shift() > slow.shift()) & (fast < slow))
+        expected = set(df.index[crossed])
+        signal_bars = {df.index[df["timestamp"] == s.timestamp][0] for s in signals}
+        assert signal_bars == expected
+
+        for sig in signals:
+            assert sig.symbol == "USDJPY"
+            if sig.direction == "LONG":
+                assert sig.stop_loss < sig.entry_price < sig.take_profit
+            else:
+                assert sig.take_profit < sig.entry_price < sig.stop_loss
+
+    def test_sentiment_filter(self, mock_candle_data):
+        df = mock_candle_data(count=400)
+        generator = SignalGenerator("sma_cross", {"n1": 5, "n2": 15})
+        signals = generator.generate(df, {"sentiment": "BEARISH"})
+        assert signals and all(s.direction == "SHORT" for s in signals)